@@ -1,33 +1,145 @@
-import requests
-from bs4 import BeautifulSoup
 import argparse
+import asyncio
+import atexit
+import codecs
+import contextlib
+import os
+import sys
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from HttpCache import HttpCache
+from ParserBackends import BACKENDS, DEFAULT_BACKEND, resolve_backend, extract_elements
+from ElementExtraction import FIELDS, NO_TITLE, ElementCollector, StreamingHTMLParser
+from UrlNormalization import build_link_index
+from PageSnapshots import SnapshotStore, analyze_changes
+from ResultFormats import OUTPUT_FORMATS, open_result_writer
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Instrumentation import instrumented, enable as enable_metrics, disable as disable_metrics, make_sink
+from Dependencies import MissingDependencyError, require, preload
+from FetchPolicy import (DEFAULT_BACKOFF, DEFAULT_RETRIES, FAILURE_THRESHOLD, RESET_TIMEOUT, SINGLE_ATTEMPT, FetchError,
+                         FetchPolicy)
 
-def fetch_page_content(url):
+# Таймауты (соединение, чтение) в секундах: зависший сервер не должен занимать поток навсегда
+DEFAULT_TIMEOUT = (10, 30)
+# Маркер, которым fetch_page_stream сообщает об остановке чтения по лимиту байт
+TRUNCATED_BY_BYTES = object()
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'analyze_web', 'http_cache.sqlite3')
+DEFAULT_SNAPSHOTS_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'analyze_web', 'snapshots.sqlite3')
+# Тяжёлые зависимости импортируются при первом использовании (см. Dependencies.require): вывод справки
+# и потоковый разбор не тратят время на импорт requests и bs4
+HEAVY_MODULES = ('requests', 'bs4', 'lxml', 'selectolax.lexbor')
+
+def preload_dependencies():
+    """
+    Импортирует установленные тяжёлые зависимости заранее (для прогреваемых процессов-обработчиков).
+    
+    :return: Список модулей, которые не удалось импортировать (lxml и selectolax необязательны).
+    """
+    return preload(HEAVY_MODULES)
+
+def _requests():
+    # requests импортируется при первом запросе
+    return require('requests', purpose='загрузки страниц')
+
+def create_session(pool_size=10):
+    """
+    Создаёт HTTP-сессию с общим пулом соединений (keep-alive).
+
+    :param pool_size: Максимальное число соединений, хранимых в пуле для одного хоста.
+    :return: Объект requests.Session.
+    """
+    requests = _requests()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_page(url, session=None, timeout=DEFAULT_TIMEOUT, cache=None, policy=None):
     """
     Получает HTML-контент веб-страницы по её URL.
     
     :param url: URL веб-страницы для анализа.
+    :param session: Необязательная сессия requests.Session, через пул которой выполняется запрос.
+    :param timeout: Таймаут запроса: число секунд или пара (соединение, чтение).
+    :param cache: Необязательный HttpCache: свежий ответ берётся из него без запроса,
+                  устаревший проверяется условным запросом (If-None-Match/If-Modified-Since);
+                  сохранение и время свежести учитывают Cache-Control ответа.
+    :param policy: FetchPolicy: повторы, ограничение частоты запросов к хосту и автомат защиты хоста;
+                   по умолчанию - одна попытка.
     :return: HTML-контент страницы в виде строки.
+    :raises FetchError: Если страницу не удалось получить.
     """
+    requests = _requests()
+    http = session if session is not None else requests
+    entry = None
+    request_options = {'timeout': timeout}
+    if cache is not None:
+        entry = cache.lookup(url)
+        if entry is not None and cache.is_fresh(entry):
+            cache.record('hits')
+            return entry.body
+        if entry is not None:
+            request_options['headers'] = entry.conditional_headers()
+    response = (policy or SINGLE_ATTEMPT).request(http.get, url, **request_options)
+    if entry is not None and response.status_code == 304:
+        cache.record('revalidations')
+        cache.refresh(url, response.headers.get('Cache-Control'))
+        return entry.body
     try:
-        response = requests.get(url)
         response.raise_for_status()  # Проверяет, успешен ли запрос
-        return response.text
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при получении страницы: {e}")
+    except requests.exceptions.HTTPError as e:
+        raise FetchError(url, 'http', str(e), status=response.status_code) from e
+    if cache is not None:
+        cache.record('misses')
+        cache.store(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                    response.headers.get('Cache-Control'))
+    return response.text
+
+def print_fetch_error(error):
+    """
+    Выводит ошибку загрузки страницы в консоль.
+    
+    :param error: FetchError.
+    """
+    print(f"Ошибка при получении страницы: {error}")
+
+@instrumented('fetch_page_content', bytes_out=len, failed=lambda html_content: html_content is None)
+def fetch_page_content(url, session=None, timeout=DEFAULT_TIMEOUT, cache=None, policy=None, on_error=None):
+    """
+    Получает HTML-контент веб-страницы по её URL (см. fetch_page); ошибка не прерывает работу.
+    
+    :param url: URL веб-страницы для анализа.
+    :param session: Необязательная сессия requests.Session, через пул которой выполняется запрос.
+    :param timeout: Таймаут запроса: число секунд или пара (соединение, чтение).
+    :param cache: Необязательный HttpCache (см. fetch_page).
+    :param policy: Необязательная FetchPolicy (см. fetch_page).
+    :param on_error: Функция on_error(FetchError), вызываемая при ошибке; по умолчанию - print_fetch_error.
+    :return: HTML-контент страницы в виде строки или None, если страницу не удалось получить.
+    """
+    try:
+        return fetch_page(url, session, timeout, cache, policy)
+    except FetchError as e:
+        (on_error or print_fetch_error)(e)
         return None
 
-def parse_page_content(html_content):
+@instrumented('parse_page_content', bytes_in=len)
+def parse_page_content(html_content, parser=DEFAULT_BACKEND):
     """
     Анализирует HTML-контент веб-страницы и возвращает объект BeautifulSoup.
     
     :param html_content: HTML-контент страницы.
-    :return: Объект BeautifulSoup для навигации по HTML-документу.
+    :param parser: Имя бэкенда разбора ('html.parser', 'lxml', 'selectolax', 'stream');
+                   если бэкенд не установлен, используется следующий по цепочке.
+    :return: Объект BeautifulSoup для навигации по HTML-документу (или документ выбранного бэкенда).
     """
     if html_content:
-        return BeautifulSoup(html_content, 'html.parser')
+        return resolve_backend(parser).parse(html_content)
     return None
 
+@instrumented('extract_title')
 def extract_title(soup):
     """
     Извлекает заголовок страницы.
@@ -35,25 +147,25 @@ def extract_title(soup):
     :param soup: Объект BeautifulSoup, представляющий HTML-документ.
     :return: Заголовок страницы или "Нет заголовка", если он отсутствует или пустой.
     """
-    if soup.title and soup.title.string:
-        return soup.title.string.strip()
-    return "Нет заголовка"
+    return extract_elements(soup, fields=('title',))['title']
 
-def extract_links(soup):
+@instrumented('extract_links')
+def extract_links(soup, page_url=None):
     """
     Извлекает все ссылки (теги <a>) из страницы.
     
     :param soup: Объект BeautifulSoup, представляющий HTML-документ.
-    :return: Список словарей с текстом и URL ссылок.
+    :param page_url: Необязательный URL страницы. Если задан, ссылки разрешаются относительно него
+                     (с учётом <base href>), приводятся к каноническому виду и объединяются в индекс.
+    :return: Список словарей с текстом и URL ссылок (значения href как есть)
+             или, если задан page_url, индекс ссылок (см. build_link_index).
     """
-    links = []
-    for link in soup.find_all('a', href=True):
-        links.append({
-            'text': link.text.strip(),
-            'href': link['href']
-        })
-    return links
+    if page_url is None:
+        return extract_elements(soup, fields=('links',))['links']
+    elements = extract_elements(soup, fields=('links', 'base'))
+    return build_link_index(elements['links'], page_url, elements['base'])
 
+@instrumented('extract_paragraphs')
 def extract_paragraphs(soup):
     """
     Извлекает все параграфы (теги <p>) из страницы.
@@ -61,9 +173,9 @@ def extract_paragraphs(soup):
     :param soup: Объект BeautifulSoup, представляющий HTML-документ.
     :return: Список текстов параграфов.
     """
-    paragraphs = [p.text.strip() for p in soup.find_all('p')]
-    return paragraphs
+    return extract_elements(soup, fields=('paragraphs',))['paragraphs']
 
+@instrumented('extract_images')
 def extract_images(soup):
     """
     Извлекает все изображения (теги <img>) из страницы.
@@ -71,53 +183,417 @@ def extract_images(soup):
     :param soup: Объект BeautifulSoup, представляющий HTML-документ.
     :return: Список словарей с источником и текстом alt изображений.
     """
-    images = []
-    for img in soup.find_all('img'):
-        images.append({
-            'src': img.get('src', ''),
-            'alt': img.get('alt', '')
-        })
-    return images
+    return extract_elements(soup, fields=('images',))['images']
 
+@instrumented('extract_common_elements')
 def extract_common_elements(soup):
     """
-    Извлекает все общие элементы (заголовок, ссылки, параграфы, изображения) из страницы.
+    Извлекает все общие элементы (заголовок, ссылки, параграфы, изображения) из страницы
+    за один обход дерева.
     
-    :param soup: Объект BeautifulSoup, представляющий HTML-документ.
+    :param soup: Объект BeautifulSoup, представляющий HTML-документ (или документ другого бэкенда).
     :return: Словарь с извлечёнными элементами.
     """
-    return {
-        'title': extract_title(soup),
-        'links': extract_links(soup),
-        'paragraphs': extract_paragraphs(soup),
-        'images': extract_images(soup)
-    }
+    return extract_elements(soup)
+
+@instrumented('analyze_html', bytes_in=len)
+def analyze_html(html_content, parser='stream', page_url=None):
+    """
+    Разбирает HTML-контент и извлекает из него общие элементы.
+    По умолчанию используется потоковый проход без построения дерева.
+    
+    :param html_content: HTML-контент страницы.
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param page_url: Необязательный URL страницы. Если задан, вместо списка ссылок 'links'
+                     результат содержит индекс 'link_index' (см. build_link_index).
+    :return: Словарь с извлечёнными элементами или None, если контент пустой.
+    """
+    document = parse_page_content(html_content, parser)
+    if document is None:
+        return None
+    if page_url is None:
+        return extract_elements(document)
+    elements = extract_elements(document, fields=FIELDS + ('base',))
+    link_index = build_link_index(elements['links'], page_url, elements['base'])
+    return {'title': elements['title'], 'link_index': link_index,
+            'paragraphs': elements['paragraphs'], 'images': elements['images']}
 
-def analyze_web_page(url):
+def analyze_web_page(url, parser='stream', cache=None, resolve_links=False, timeout=DEFAULT_TIMEOUT, policy=None):
     """
     Анализирует веб-страницу и возвращает извлечённые элементы.
     
     :param url: URL веб-страницы для анализа.
-    :return: Словарь с извлечёнными элементами.
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param cache: Необязательный HttpCache (см. fetch_page_content).
+    :param resolve_links: Вернуть индекс разрешённых ссылок 'link_index' вместо списка 'links'.
+    :param timeout: Таймаут запроса (см. fetch_page_content).
+    :param policy: Необязательная FetchPolicy (см. fetch_page).
+    :return: Словарь с извлечёнными элементами или None, если страницу не удалось получить.
     """
-    html_content = fetch_page_content(url)
-    soup = parse_page_content(html_content)
-    return extract_common_elements(soup)
+    html_content = fetch_page_content(url, timeout=timeout, cache=cache, policy=policy)
+    return analyze_html(html_content, parser, url if resolve_links else None)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Анализ веб-страницы по указанному URL.')
-    parser.add_argument('url', type=str, help='URL веб-страницы для анализа')
+def analyze_html_changes(html_content, url, snapshots, parser='stream', resolve_links=False):
+    """
+    Анализирует HTML-контент страницы инкрементально: если нормализованный HTML не изменился
+    с предыдущего запуска, страница не разбирается, иначе выводятся только изменения элементов.
+    
+    :param html_content: HTML-контент страницы.
+    :param url: URL страницы.
+    :param snapshots: SnapshotStore с результатами предыдущих запусков; обновляется.
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param resolve_links: Сравнивать ссылки индекса 'link_index' вместо списка 'links'.
+    :return: Запись изменений (см. PageSnapshots.analyze_changes) или None, если контент пустой.
+    """
+    if not html_content:
+        return None
+    page_url = url if resolve_links else None
+    # Бэкенды дают одинаковый результат, поэтому с прежним результатом несравним только другой вид ссылок
+    return analyze_changes(url, html_content, snapshots, lambda html: analyze_html(html, parser, page_url),
+                           mode='link_index' if resolve_links else 'links')
 
-    args = parser.parse_args()
+def analyze_web_page_changes(url, snapshots, parser='stream', cache=None, resolve_links=False,
+                             timeout=DEFAULT_TIMEOUT, policy=None):
+    """
+    Анализирует веб-страницу инкрементально (см. analyze_html_changes).
     
-    url = args.url
-    result = analyze_web_page(url)
+    :param url: URL веб-страницы для анализа.
+    :param snapshots: SnapshotStore с результатами предыдущих запусков.
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param cache: Необязательный HttpCache (см. fetch_page_content).
+    :param resolve_links: Сравнивать ссылки индекса 'link_index' вместо списка 'links'.
+    :param timeout: Таймаут запроса (см. fetch_page_content).
+    :param policy: Необязательная FetchPolicy (см. fetch_page).
+    :return: Запись изменений или None, если страницу не удалось получить.
+    """
+    html_content = fetch_page_content(url, timeout=timeout, cache=cache, policy=policy)
+    return analyze_html_changes(html_content, url, snapshots, parser, resolve_links)
+
+def fetch_page_stream(url, session=None, timeout=DEFAULT_TIMEOUT, chunk_size=64 * 1024, max_bytes=None, policy=None):
+    """
+    Получает HTML-контент веб-страницы частями, не загружая тело ответа целиком.
     
+    :param url: URL веб-страницы для анализа.
+    :param session: Необязательная сессия requests.Session.
+    :param timeout: Таймаут запроса (см. fetch_page_content).
+    :param chunk_size: Размер читаемой части тела в байтах.
+    :param max_bytes: Максимальное число читаемых байт; None - без ограничения.
+    :param policy: Необязательная FetchPolicy (см. fetch_page); повторяется только запрос, но не чтение тела.
+    :return: Генератор декодированных частей HTML. Если чтение остановлено по max_bytes,
+             последним значением отдаётся TRUNCATED_BY_BYTES.
+    :raises FetchError: Если запрос не удался или чтение тела прервалось (при получении очередной части).
+    """
+    requests = _requests()
+    http = session if session is not None else requests
+    response = (policy or SINGLE_ATTEMPT).request(http.get, url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()  # Проверяет, успешен ли запрос
+    except requests.exceptions.HTTPError as e:
+        response.close()
+        raise FetchError(url, 'http', str(e), status=response.status_code) from e
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        received = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if max_bytes is not None and received + len(chunk) > max_bytes:
+                yield decoder.decode(chunk[:max_bytes - received], final=True)
+                yield TRUNCATED_BY_BYTES
+                return
+            received += len(chunk)
+            yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+    except requests.exceptions.Timeout as e:
+        raise FetchError(url, 'timeout', str(e)) from e
+    except requests.exceptions.RequestException as e:
+        raise FetchError(url, 'connection', str(e)) from e
+    finally:
+        response.close()
+
+def iter_web_page_elements(url, session=None, timeout=DEFAULT_TIMEOUT, max_bytes=None, max_elements=None,
+                           chunk_size=64 * 1024, policy=None, on_error=None):
+    """
+    Потоково анализирует веб-страницу: части тела передаются инкрементальному парсеру,
+    и ссылки, параграфы и изображения отдаются по мере их закрытия в документе.
+    Память не зависит от размера страницы: в ней держится только текущий необработанный фрагмент.
+    
+    :param url: URL веб-страницы для анализа.
+    :param session: Необязательная сессия requests.Session.
+    :param timeout: Таймаут запроса (см. fetch_page_content).
+    :param max_bytes: Максимальное число читаемых байт тела; None - без ограничения.
+    :param max_elements: Максимальное число отдаваемых элементов; None - без ограничения.
+    :param chunk_size: Размер читаемой части тела в байтах.
+    :param policy: Необязательная FetchPolicy (см. fetch_page_stream).
+    :param on_error: Функция on_error(FetchError) для ошибки, прервавшей чтение тела;
+                     по умолчанию ошибка выводится в консоль.
+    :return: Генератор пар (вид, значение): ('links', {...}), ('paragraphs', '...'), ('images', {...}),
+             в конце ('title', '...') и, если разбор остановлен, ('truncated', причина): 'max_bytes'
+             или 'max_elements' - по лимиту, 'error' - чтение тела прервалось ошибкой.
+    :raises FetchError: Если страницу не удалось получить (до первой части тела).
+    """
+    ready = deque()
+    collector = ElementCollector(on_element=lambda kind, value: ready.append((kind, value)))
+    html_parser = StreamingHTMLParser(collector)
+    emitted = 0
+    truncated = None
+    received = False
+    chunks = fetch_page_stream(url, session, timeout, chunk_size, max_bytes, policy)
+    try:
+        for chunk in chunks:
+            received = True
+            if chunk is TRUNCATED_BY_BYTES:
+                truncated = 'max_bytes'
+                break
+            html_parser.feed(chunk)
+            while ready:
+                if max_elements is not None and emitted >= max_elements:
+                    truncated = 'max_elements'
+                    break
+                emitted += 1
+                yield ready.popleft()
+            if truncated:
+                break
+    except FetchError as e:
+        # Без единой части тела страницы нет; иначе отдаём разобранное и отмечаем обрыв
+        if not received:
+            raise
+        truncated = 'error'
+        (on_error or print_fetch_error)(e)
+    finally:
+        chunks.close()
+    if truncated != 'max_elements':
+        html_parser.close()
+        while ready:
+            if max_elements is not None and emitted >= max_elements:
+                truncated = 'max_elements'
+                break
+            emitted += 1
+            yield ready.popleft()
+    yield 'title', collector.title
+    if truncated:
+        yield 'truncated', truncated
+
+def analyze_web_page_stream(url, session=None, timeout=DEFAULT_TIMEOUT, max_bytes=None, max_elements=None,
+                            policy=None, on_error=None):
+    """
+    Анализирует веб-страницу в потоковом режиме с ограничением объёма (см. iter_web_page_elements).
+    
+    :param url: URL веб-страницы для анализа.
+    :param session: Необязательная сессия requests.Session.
+    :param timeout: Таймаут запроса (см. fetch_page_content).
+    :param max_bytes: Максимальное число читаемых байт тела; None - без ограничения.
+    :param max_elements: Максимальное число извлекаемых элементов; None - без ограничения.
+    :param policy: Необязательная FetchPolicy (см. fetch_page_stream).
+    :param on_error: Функция on_error(FetchError) для ошибок загрузки (см. fetch_page_content).
+    :return: Словарь с извлечёнными элементами и ключом 'truncated': None или причина остановки
+             ('max_bytes', 'max_elements' или 'error'); None, если страницу не удалось получить.
+    """
+    result = {'title': NO_TITLE, 'links': [], 'paragraphs': [], 'images': [], 'truncated': None}
+    try:
+        for kind, value in iter_web_page_elements(url, session, timeout, max_bytes, max_elements, policy=policy,
+                                                  on_error=on_error):
+            if kind in ('title', 'truncated'):
+                result[kind] = value
+            else:
+                result[kind].append(value)
+    except FetchError as e:
+        (on_error or print_fetch_error)(e)
+        return None
+    return result
+
+async def analyze_web_pages_async(urls, concurrency=10, per_host=2, session=None,
+                                  timeout=DEFAULT_TIMEOUT, max_buffered=10000, parser='stream', cache=None,
+                                  resolve_links=False, snapshots=None, policy=None, on_error=None):
+    """
+    Асинхронно анализирует набор веб-страниц и отдаёт результаты по мере готовности.
+
+    Загрузка страниц выполняется в пуле потоков через общую сессию с keep-alive,
+    разбор - в отдельном потоке, поэтому сеть и разбор идут одновременно.
+    URL ставятся в очередь своего хоста, и запросы запускаются из тех очередей,
+    у которых есть свободный слот: занятый хост не задерживает остальные.
+
+    :param urls: Итерируемый набор URL (читается лениво).
+    :param concurrency: Максимальное число одновременных запросов.
+    :param per_host: Максимальное число одновременных запросов к одному хосту.
+    :param session: Необязательная сессия requests.Session; по умолчанию создаётся своя.
+    :param timeout: Таймаут каждого запроса (см. fetch_page_content).
+    :param max_buffered: Максимальное число прочитанных, но ещё не запущенных URL.
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param cache: Необязательный HttpCache (см. fetch_page_content).
+    :param resolve_links: Возвращать индекс разрешённых ссылок 'link_index' вместо списка 'links'.
+    :param snapshots: Необязательный SnapshotStore: вместо результатов возвращаются записи изменений
+                      относительно предыдущего запуска (см. analyze_html_changes).
+    :param policy: Необязательная FetchPolicy (см. fetch_page): общая для всех запросов, поэтому ограничение
+                   частоты и автомат защиты действуют на хост в целом. Паузы выполняются в потоках загрузки.
+    :param on_error: Функция on_error(FetchError) для ошибок загрузки (см. fetch_page_content);
+                     вызывается в потоке загрузки.
+    :return: Асинхронный генератор пар (url, результат); результат равен None при ошибке.
+    """
+    if concurrency < 1 or per_host < 1:
+        raise ValueError("concurrency и per_host должны быть не меньше 1")
+    loop = asyncio.get_running_loop()
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max(concurrency, per_host))
+    fetch_pool = ThreadPoolExecutor(max_workers=concurrency)
+    # Разбор упирается в GIL, поэтому одного потока достаточно, чтобы не мешать загрузке
+    parse_pool = ThreadPoolExecutor(max_workers=1)
+
+    url_iter = iter(urls)
+    exhausted = False
+    queues = {}         # хост -> очередь ещё не запущенных URL
+    running = {}        # хост -> число выполняемых запросов
+    ready = deque()     # хосты, у которых есть URL в очереди и свободный слот
+    buffered = 0
+    fetches = {}        # задача загрузки -> (url, хост)
+    parses = {}         # задача разбора -> url
+
+    def mark_ready(host):
+        if queues.get(host) and running.get(host, 0) < per_host and host not in ready:
+            ready.append(host)
+
+    def start_fetch(host):
+        nonlocal buffered
+        url = queues[host].popleft()
+        buffered -= 1
+        if not queues[host]:
+            del queues[host]
+        running[host] = running.get(host, 0) + 1
+        future = loop.run_in_executor(fetch_pool, fetch_page_content, url, session, timeout, cache, policy, on_error)
+        fetches[future] = (url, host)
+        mark_ready(host)
+
+    def release_host(host):
+        running[host] -= 1
+        if not running[host]:
+            del running[host]
+        mark_ready(host)
+
+    def schedule():
+        nonlocal exhausted, buffered
+        # Новые запросы не запускаются, пока поток разбора не разгрузится
+        while len(fetches) < concurrency and len(parses) < concurrency:
+            if ready:
+                start_fetch(ready.popleft())
+                continue
+            if exhausted or buffered >= max_buffered:
+                break
+            url = next(url_iter, None)
+            if url is None:
+                exhausted = True
+                break
+            host = urlsplit(url).netloc.lower()
+            queues.setdefault(host, deque()).append(url)
+            buffered += 1
+            mark_ready(host)
+
+    async def parse(url, html_content):
+        try:
+            if snapshots is not None:
+                return url, await loop.run_in_executor(parse_pool, analyze_html_changes, html_content, url,
+                                                       snapshots, parser, resolve_links)
+            return url, await loop.run_in_executor(parse_pool, analyze_html, html_content, parser,
+                                                   url if resolve_links else None)
+        except Exception as e:
+            print(f"Ошибка при разборе страницы {url}: {e}")
+            return url, None
+
+    try:
+        while True:
+            schedule()
+            if not fetches and not parses:
+                break
+            done, _ = await asyncio.wait(list(fetches) + list(parses), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task in fetches:
+                    url, host = fetches.pop(task)
+                    release_host(host)
+                    html_content = None if task.exception() else task.result()
+                    parses[asyncio.ensure_future(parse(url, html_content))] = url
+                else:
+                    del parses[task]
+                    yield task.result()
+    finally:
+        pending = list(fetches) + list(parses)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+        if own_session:
+            session.close()
+
+def analyze_web_pages(urls, concurrency=10, per_host=2, session=None, timeout=DEFAULT_TIMEOUT,
+                      parser='stream', cache=None, resolve_links=False, snapshots=None, policy=None, on_error=None):
+    """
+    Анализирует набор веб-страниц параллельно и отдаёт результаты по мере готовности.
+    
+    :param urls: Итерируемый набор URL (читается лениво).
+    :param concurrency: Максимальное число одновременных запросов.
+    :param per_host: Максимальное число одновременных запросов к одному хосту.
+    :param session: Необязательная сессия requests.Session; по умолчанию создаётся своя.
+    :param timeout: Таймаут каждого запроса (см. fetch_page_content).
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param cache: Необязательный HttpCache (см. fetch_page_content).
+    :param resolve_links: Возвращать индекс разрешённых ссылок 'link_index' вместо списка 'links'.
+    :param snapshots: Необязательный SnapshotStore: вместо результатов возвращаются записи изменений.
+    :param policy: Необязательная FetchPolicy (см. analyze_web_pages_async).
+    :param on_error: Функция on_error(FetchError) для ошибок загрузки (см. fetch_page_content).
+    :return: Генератор пар (url, результат); результат равен None при ошибке.
+    """
+    loop = asyncio.new_event_loop()
+    results = analyze_web_pages_async(urls, concurrency, per_host, session, timeout,
+                                        parser=parser, cache=cache, resolve_links=resolve_links,
+                                        snapshots=snapshots, policy=policy, on_error=on_error)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+def read_urls(stream):
+    """
+    Читает URL из текстового потока: по одному на строку, пустые строки и комментарии (#) пропускаются.
+    
+    :param stream: Текстовый поток (файл или sys.stdin).
+    :return: Генератор URL.
+    """
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+def print_link_index(link_index):
+    """
+    Выводит индекс ссылок страницы в консоль.
+    
+    :param link_index: Индекс ссылок (см. build_link_index).
+    """
+    for kind, label in (('internal', "Внутренние ссылки"), ('external', "Внешние ссылки")):
+        print(f"{label}:")
+        for link in link_index[kind]:
+            count = f" (x{link['count']})" if link['count'] > 1 else ""
+            print(f"- {link['text']} : {link['url']}{count}")
+    if link_index['skipped']:
+        print(f"Пропущено ссылок не на веб-страницы: {link_index['skipped']}")
+
+def print_result(result):
+    """
+    Выводит извлечённые элементы страницы в консоль.
+    
+    :param result: Словарь с извлечёнными элементами.
+    """
     print(f"Заголовок страницы: {result['title']}\n")
     
-    print("Найденные ссылки:")
-    for link in result['links']:
-        print(f"- {link['text']} : {link['href']}")
+    if 'link_index' in result:
+        print_link_index(result['link_index'])
+    else:
+        print("Найденные ссылки:")
+        for link in result['links']:
+            print(f"- {link['text']} : {link['href']}")
     
     print("\nНайденные параграфы:")
     for paragraph in result['paragraphs']:
@@ -125,4 +601,254 @@ if __name__ == "__main__":
     
     print("\nНайденные изображения:")
     for img in result['images']:
-        print(f"- Источник: {img['src']}, Alt: {img['alt']}")
\ No newline at end of file
+        print(f"- Источник: {img['src']}, Alt: {img['alt']}")
+
+def _describe_element(field, element):
+    if field == 'links':
+        return f"{element['text']} : {element.get('url', element.get('href'))}"
+    if field == 'images':
+        return f"Источник: {element['src']}, Alt: {element['alt']}"
+    return element
+
+def print_changes(record):
+    """
+    Выводит изменения страницы относительно предыдущего запуска в консоль.
+    
+    :param record: Запись изменений (см. analyze_html_changes).
+    """
+    statuses = {'new': "новая страница", 'changed': "изменилась", 'unchanged': "без изменений"}
+    print(f"Статус: {statuses[record['status']]}")
+    if 'previous_title' in record:
+        print(f"Заголовок страницы: {record['title']} (было: {record['previous_title']})")
+    elif 'title' in record:
+        print(f"Заголовок страницы: {record['title']}")
+    labels = {'links': "ссылки", 'paragraphs': "параграфы", 'images': "изображения"}
+    for change, sign, label in (('added', '+', "Добавлены"), ('removed', '-', "Удалены")):
+        for field, elements in record[change].items():
+            print(f"{label} {labels[field]}:")
+            for element in elements:
+                print(f"{sign} {_describe_element(field, element)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Анализ веб-страницы по указанному URL.')
+    parser.add_argument('url', type=str, nargs='?', help='URL веб-страницы для анализа')
+    parser.add_argument('-i', '--input', type=str,
+                        help='Файл со списком URL (по одному на строку), "-" - чтение из stdin')
+    parser.add_argument('-c', '--concurrency', type=int, default=10,
+                        help='Максимальное число одновременных запросов в пакетном режиме')
+    parser.add_argument('-p', '--parser', choices=list(BACKENDS), default='stream',
+                        help='Бэкенд разбора HTML (при отсутствии библиотеки выбирается следующий доступный)')
+    parser.add_argument('--per-host', type=int, default=2,
+                        help='Максимальное число одновременных запросов к одному хосту')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_TIMEOUT[0],
+                        help='Таймаут установления соединения в секундах')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_TIMEOUT[1],
+                        help='Таймаут ожидания данных от сервера в секундах')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='Сколько раз повторять запрос при таймауте, ошибке соединения и кодах 429, 5xx')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF,
+                        help='Базовая пауза перед повтором в секундах (удваивается с каждой попыткой, '
+                             'со случайным разбросом; Retry-After сервера имеет приоритет)')
+    parser.add_argument('--host-rate', type=float, default=None,
+                        help='Максимальное число запросов в секунду к одному хосту (по умолчанию без ограничения)')
+    parser.add_argument('--host-burst', type=int, default=1,
+                        help='Сколько запросов к хосту можно выполнить подряд без паузы при --host-rate')
+    parser.add_argument('--circuit-failures', type=int, default=FAILURE_THRESHOLD,
+                        help='После стольких ошибок подряд запросы к хосту временно не выполняются (0 - никогда)')
+    parser.add_argument('--circuit-reset', type=float, default=RESET_TIMEOUT,
+                        help='На сколько секунд отключается хост после --circuit-failures ошибок подряд')
+    parser.add_argument('--no-cache', action='store_true', help='Не использовать дисковый кэш ответов')
+    parser.add_argument('--cache-path', type=str, default=DEFAULT_CACHE_PATH, help='Путь к файлу кэша ответов')
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help='Время (с), в течение которого ответ из кэша отдаётся без повторной проверки')
+    parser.add_argument('--cache-max-mb', type=float, default=256, help='Максимальный размер кэша в МБ')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='Вывести в stderr счётчики кэша (попадания, промахи, повторные проверки)')
+    parser.add_argument('--resolve-links', action='store_true',
+                        help='Разрешать ссылки относительно страницы (с учётом <base href>), приводить к '
+                             'каноническому виду и выводить без повторов, разделив на внутренние и внешние')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text',
+                        help='Формат результатов: text - текст для чтения, jsonl - запись JSON на страницу, '
+                             'columnar - колоночный файл (Parquet при установленном pyarrow, иначе встроенный '
+                             'формат; нужен --output)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Инкрементальный режим: неизменившаяся с прошлого запуска страница не разбирается, '
+                             'выводятся только добавленные и удалённые ссылки, параграфы и изображения')
+    parser.add_argument('--snapshots-path', type=str, default=DEFAULT_SNAPSHOTS_PATH,
+                        help='Инкрементальный режим: файл результатов предыдущих запусков')
+    parser.add_argument('--stream', action='store_true',
+                        help='Потоковый режим: страница читается частями, элементы выводятся по мере разбора')
+    parser.add_argument('--max-bytes', type=int, default=None,
+                        help='Потоковый режим: максимальное число читаемых байт страницы')
+    parser.add_argument('--max-elements', type=int, default=None,
+                        help='Потоковый режим: максимальное число выводимых элементов')
+    parser.add_argument('--metrics', action='append', default=None, metavar='SINK',
+                        help='Замеры этапов (загрузка, разбор, extract_*): log - строки в stderr, json:ПУТЬ - итоги '
+                             'в JSON, prometheus:ПУТЬ - итоги в формате Prometheus; можно указать несколько раз')
+    parser.add_argument('--metrics-memory', action='store_true',
+                        help='Замерять также пиковую память Python этапов (tracemalloc, замедляет работу)')
+    parser.add_argument('--crawl', action='store_true',
+                        help='Режим обхода: переходить по ссылкам, начиная с URL (и/или списка --input)')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Файл результатов для форматов jsonl и columnar и режима обхода (по умолчанию stdout)')
+    parser.add_argument('--max-depth', type=int, default=2,
+                        help='Режим обхода: максимальная глубина перехода по ссылкам (0 - только начальные URL)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Режим обхода: максимальное число обрабатываемых страниц')
+    parser.add_argument('--delay', type=float, default=1.0,
+                        help='Режим обхода: пауза между запросами к одному хосту в секундах')
+    parser.add_argument('--all-sites', action='store_true',
+                        help='Режим обхода: переходить и по ссылкам на другие сайты')
+    parser.add_argument('--ignore-robots', action='store_true', help='Режим обхода: не соблюдать robots.txt')
+    parser.add_argument('--crawl-state', type=str, default=None,
+                        help='Режим обхода: файл очереди и встреченных URL на диске (для больших обходов); '
+                             'повторный запуск с ним продолжает обход и дописывает результаты')
+
+    args = parser.parse_args()
+    if not args.url and not args.input:
+        parser.error('необходимо указать URL или файл со списком URL (--input)')
+    if args.concurrency < 1:
+        parser.error('--concurrency должно быть не меньше 1')
+    if args.per_host < 1:
+        parser.error('--per-host должно быть не меньше 1')
+    if args.max_depth < 0:
+        parser.error('--max-depth должно быть не меньше 0')
+    if args.max_pages is not None and args.max_pages < 1:
+        parser.error('--max-pages должно быть не меньше 1')
+    if args.delay < 0:
+        parser.error('--delay должно быть не меньше 0')
+    if args.connect_timeout <= 0 or args.read_timeout <= 0:
+        parser.error('--connect-timeout и --read-timeout должны быть больше 0')
+    if args.retries < 0 or args.backoff < 0:
+        parser.error('--retries и --backoff должны быть не меньше 0')
+    if args.host_rate is not None and args.host_rate <= 0:
+        parser.error('--host-rate должно быть больше 0')
+    if args.host_burst < 1:
+        parser.error('--host-burst должно быть не меньше 1')
+    if args.circuit_failures < 0 or args.circuit_reset < 0:
+        parser.error('--circuit-failures и --circuit-reset должны быть не меньше 0')
+    if args.incremental and (args.stream or args.crawl):
+        parser.error('--incremental нельзя сочетать с --stream и --crawl')
+    if args.format == 'columnar' and (args.stream or args.crawl or args.incremental or not args.output):
+        parser.error('--format columnar требует --output и не сочетается с --stream, --crawl и --incremental')
+    if args.format != 'text' and args.stream:
+        parser.error('--stream поддерживает только --format text')
+    if args.output and args.format == 'text' and not args.crawl:
+        parser.error('--output используется с --format jsonl или columnar и в режиме обхода')
+    try:
+        # Без requests страницы не загрузить - сообщаем об этом до начала работы
+        _requests()
+    except MissingDependencyError as e:
+        parser.exit(1, f"Ошибка: {e}\n")
+
+    if args.metrics or args.metrics_memory:
+        try:
+            sinks = [make_sink(spec, 'analyze_web') for spec in args.metrics or ['log']]
+        except ValueError as e:
+            parser.error(str(e))
+        enable_metrics(sinks, trace_memory=args.metrics_memory)
+        # Итоги передаются приёмникам при любом завершении программы
+        atexit.register(disable_metrics)
+
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_path, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    snapshots = SnapshotStore(args.snapshots_path) if args.incremental else None
+    timeout = (args.connect_timeout, args.read_timeout)
+    policy = FetchPolicy(retries=args.retries, backoff=args.backoff, rate=args.host_rate, burst=args.host_burst,
+                         failure_threshold=args.circuit_failures or None, reset_timeout=args.circuit_reset)
+    # Ошибки загрузки считаются по видам (см. FetchError) и выводятся итогом в stderr
+    fetch_errors = Counter()
+    fetch_errors_lock = threading.Lock()
+
+    def on_fetch_error(error):
+        print_fetch_error(error)
+        with fetch_errors_lock:
+            fetch_errors[error.kind] += 1
+
+    if args.crawl:
+        from Crawler import run_crawl
+        seeds = [args.url] if args.url else []
+        if args.input == '-':
+            seeds.extend(read_urls(sys.stdin))
+        elif args.input:
+            with open(args.input, encoding='utf-8') as stream:
+                seeds.extend(read_urls(stream))
+        resume = args.crawl_state is not None and os.path.exists(args.crawl_state)
+        output = open(args.output, 'a' if resume else 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            # Сообщения об ошибках загрузки идут в stderr, чтобы не смешиваться с JSONL в stdout
+            with contextlib.redirect_stdout(sys.stderr):
+                stats = run_crawl(seeds, output, max_depth=args.max_depth, max_pages=args.max_pages,
+                                  same_site=not args.all_sites, respect_robots=not args.ignore_robots,
+                                  delay=args.delay, concurrency=args.concurrency, state_path=args.crawl_state,
+                                  timeout=timeout, parser=args.parser, cache=cache, policy=policy,
+                                  on_error=on_fetch_error)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        print(f"Обработано страниц: {stats['pages']}, с ошибками: {stats['errors']}", file=sys.stderr)
+    elif args.stream:
+        labels = {'links': "Ссылка", 'paragraphs': "Параграф", 'images': "Изображение"}
+        try:
+            for kind, value in iter_web_page_elements(args.url, timeout=timeout, max_bytes=args.max_bytes,
+                                                      max_elements=args.max_elements, policy=policy,
+                                                      on_error=on_fetch_error):
+                if kind == 'title':
+                    print(f"Заголовок страницы: {value}")
+                elif kind == 'truncated' and value == 'error':
+                    print("[Разбор остановлен: чтение страницы прервалось ошибкой]")
+                elif kind == 'truncated':
+                    print(f"[Разбор остановлен по лимиту: {value}]")
+                elif kind == 'links':
+                    print(f"- {labels[kind]}: {value['text']} : {value['href']}")
+                elif kind == 'images':
+                    print(f"- {labels[kind]}: Источник: {value['src']}, Alt: {value['alt']}")
+                else:
+                    print(f"- {labels[kind]}: {value}")
+        except FetchError as e:
+            on_fetch_error(e)
+    else:
+        stream = None
+        if args.input:
+            stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+            results = analyze_web_pages(read_urls(stream), args.concurrency, args.per_host, timeout=timeout,
+                                        parser=args.parser, cache=cache, resolve_links=args.resolve_links,
+                                        snapshots=snapshots, policy=policy, on_error=on_fetch_error)
+        elif snapshots is not None:
+            results = [(args.url, analyze_web_page_changes(args.url, snapshots, args.parser, cache,
+                                                           args.resolve_links, timeout, policy))]
+        else:
+            results = [(args.url, analyze_web_page(args.url, args.parser, cache, args.resolve_links, timeout,
+                                                   policy))]
+        writer = None if args.format == 'text' else open_result_writer(args.format, args.output)
+        try:
+            # При выводе результатов в файл или JSONL сообщения об ошибках загрузки идут в stderr
+            with contextlib.redirect_stdout(sys.stderr) if writer is not None else contextlib.nullcontext():
+                for url, result in results:
+                    if writer is not None:
+                        writer.write(url, result)
+                        continue
+                    if args.input:
+                        print(f"=== {url}")
+                    if result is not None and snapshots is not None:
+                        print_changes(result)
+                    elif result is not None:
+                        print_result(result)
+                    if args.input:
+                        print()
+        finally:
+            if writer is not None:
+                writer.close()
+            if stream is not None and stream is not sys.stdin:
+                stream.close()
+
+    if fetch_errors:
+        summary = ", ".join(f"{kind}: {count}" for kind, count in sorted(fetch_errors.items()))
+        print(f"Ошибки загрузки: {summary}", file=sys.stderr)
+    if cache is not None:
+        if args.cache_stats:
+            print(f"Кэш: {cache.stats()}", file=sys.stderr)
+        cache.close()
+    if snapshots is not None:
+        snapshots.close()
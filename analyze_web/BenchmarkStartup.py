@@ -0,0 +1,15 @@
+import os
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ImportTiming import main
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# Точки входа и пакеты, которые не должны импортироваться при их запуске со --help:
+# тяжёлые зависимости импортируются только при первом использовании (см. Dependencies.require)
+ENTRY_POINTS = {
+    'AnalyserWeb.py': ('requests', 'bs4', 'lxml', 'selectolax'),
+    'WebService.py': ('requests', 'bs4', 'lxml', 'selectolax'),
+}
+
+
+if __name__ == "__main__":
+    main(DIRECTORY, ENTRY_POINTS)
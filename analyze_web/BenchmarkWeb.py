@@ -0,0 +1,259 @@
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from AnalyserWeb import (create_session, fetch_page_content, parse_page_content, extract_title, extract_links,
+                         extract_paragraphs, extract_images, extract_common_elements, analyze_html)
+from ParserBackends import DEFAULT_BACKEND, available_backends
+
+# Размеры тестовых страниц: число повторяющихся блоков (примерно 1 КБ HTML на блок)
+FIXTURE_SIZES = {'small': 10, 'medium': 200, 'large': 2000}
+DEFAULT_REPEAT = 5
+# Допустимое замедление и рост пиковой памяти относительно базовых результатов (доли)
+TIME_THRESHOLD = 0.10
+MEMORY_THRESHOLD = 0.20
+# Разница меньше этой не считается регрессией: у коротких этапов время и память слишком шумные
+MIN_TIME_DELTA = 0.001
+MIN_MEMORY_DELTA = 64 * 1024
+# Функции извлечения, замеряемые отдельно поверх дерева бэкенда по умолчанию
+EXTRACTORS = {
+    'extract_title': extract_title,
+    'extract_links': extract_links,
+    'extract_paragraphs': extract_paragraphs,
+    'extract_images': extract_images,
+    'extract_common_elements': extract_common_elements,
+}
+
+
+def make_fixture(blocks):
+    """
+    Создаёт детерминированную тестовую страницу.
+
+    :param blocks: Число повторяющихся блоков (заголовок раздела, параграфы со ссылками, изображение, список).
+    :return: HTML-контент страницы.
+    """
+    parts = ["<!DOCTYPE html><html><head><title>Тестовая страница</title>"
+             "<style>p { margin: 0 }</style></head><body>"]
+    for number in range(blocks):
+        parts.append(
+            f"<div class='section'><h2>Раздел {number}</h2>"
+            f"<p>Первый параграф раздела {number} с <a href='/page/{number}?a=1&amp;b=2'>внутренней ссылкой</a> "
+            f"и <b>выделенным</b> текстом, &laquo;сущностями&raquo; и <!-- комментарием -->.</p>"
+            f"<p>Второй параграф со <a href='https://example.org/{number}'>внешней ссылкой</a>"
+            f"<script>var x = '<p>не параграф</p>';</script></p>"
+            f"<img src='/img/{number}.png' alt='Изображение {number}'>"
+            f"<ul><li><a href='#s{number}'>Якорь</a></li><li><a href='mailto:a{number}@example.com'>Почта</a></li>"
+            f"</ul></div>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def measure(func, repeat=DEFAULT_REPEAT, size=None):
+    """
+    Измеряет время и пиковую память вызова func().
+
+    :param func: Замеряемая функция без аргументов.
+    :param repeat: Число повторов; время - лучшее из повторов.
+    :param size: Объём входных данных в байтах для расчёта пропускной способности.
+    :return: Словарь: лучшее время (с), пиковая память Python (байт), объём входа и МБ/с.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # Отдельный прогон под tracemalloc: трассировка сильно замедляет код и исказила бы время
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    result = {'seconds': best, 'peak_bytes': peak}
+    if size is not None:
+        result['bytes'] = size
+        result['mb_per_second'] = size / best / 1024 / 1024 if best else None
+    return result
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    # Отдаёт тестовые страницы сервера по пути /<имя страницы>
+    def do_GET(self):
+        body = self.server.fixtures.get(self.path.lstrip('/'))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(fixtures):
+    """
+    Запускает локальный HTTP-сервер (127.0.0.1, свободный порт), отдающий тестовые страницы.
+
+    :param fixtures: Словарь {имя: HTML-контент}.
+    :return: Запущенный сервер; адрес - server.server_address, остановка - server.shutdown().
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FixtureHandler)
+    server.daemon_threads = True
+    server.fixtures = {name: html.encode('utf-8') for name, html in fixtures.items()}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmarks(sizes=None, repeat=DEFAULT_REPEAT, backends=None):
+    """
+    Замеряет этапы анализа страниц на локальных тестовых страницах, без обращения к сети:
+    загрузку с локального сервера, разбор каждым бэкендом, каждую функцию extract_* и analyze_html.
+
+    :param sizes: Имена размеров страниц (ключи FIXTURE_SIZES); по умолчанию все.
+    :param repeat: Число повторов каждого замера.
+    :param backends: Бэкенды разбора; по умолчанию все установленные.
+    :return: Словарь результатов: {'tool', 'created', 'python', 'platform', 'repeat', 'results'};
+             results - {'этап/страница': замер (см. measure)}.
+    """
+    sizes = sizes or list(FIXTURE_SIZES)
+    backends = backends or available_backends()
+    fixtures = {name: make_fixture(FIXTURE_SIZES[name]) for name in sizes}
+    results = {}
+
+    server = serve_fixtures(fixtures)
+    session = create_session()
+    try:
+        host, port = server.server_address
+        for name, html_content in fixtures.items():
+            size = len(html_content.encode('utf-8'))
+            url = f'http://{host}:{port}/{name}'
+            results[f'fetch/{name}'] = measure(lambda: fetch_page_content(url, session), repeat, size)
+            for backend in backends:
+                results[f'parse/{backend}/{name}'] = measure(
+                    lambda: parse_page_content(html_content, backend), repeat, size)
+                results[f'analyze_html/{backend}/{name}'] = measure(
+                    lambda: analyze_html(html_content, backend), repeat, size)
+            soup = parse_page_content(html_content, DEFAULT_BACKEND)
+            for extractor_name, extractor in EXTRACTORS.items():
+                results[f'{extractor_name}/{name}'] = measure(lambda: extractor(soup), repeat, size)
+    finally:
+        session.close()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'tool': 'analyze_web',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """
+    Сравнивает результаты замеров с базовыми.
+
+    :param baseline: Базовые результаты (см. run_benchmarks).
+    :param current: Текущие результаты.
+    :param time_threshold: Допустимое замедление (доля).
+    :param memory_threshold: Допустимый рост пиковой памяти (доля).
+    :return: Список строк сравнения {'name', 'metric', 'baseline', 'current', 'ratio', 'regression'}
+             по этапам, замеренным в обоих прогонах.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, threshold, min_delta in (('seconds', time_threshold, MIN_TIME_DELTA),
+                                             ('peak_bytes', memory_threshold, MIN_MEMORY_DELTA)):
+            old, new = base[metric], result[metric]
+            ratio = new / old if old else None
+            regression = ratio is not None and ratio > 1 + threshold and new - old > min_delta
+            rows.append({'name': name, 'metric': metric, 'baseline': old, 'current': new,
+                         'ratio': ratio, 'regression': regression})
+    return rows
+
+
+def print_comparison(rows, stream=None):
+    """
+    Выводит таблицу сравнения.
+
+    :param rows: Строки сравнения (см. compare_results).
+    :param stream: Текстовый поток для вывода; по умолчанию sys.stdout.
+    :return: Число регрессий.
+    """
+    stream = stream or sys.stdout
+    print(f"{'этап':<40} {'метрика':<11} {'база':>12} {'сейчас':>12} {'изменение':>10}", file=stream)
+    for row in rows:
+        change = '-' if row['ratio'] is None else f"{row['ratio'] - 1:+.1%}"
+        mark = "  РЕГРЕССИЯ" if row['regression'] else ""
+        print(f"{row['name']:<40} {row['metric']:<11} {row['baseline']:>12.6g} {row['current']:>12.6g} "
+              f"{change:>10}{mark}", file=stream)
+    return sum(row['regression'] for row in rows)
+
+
+def load_results(path):
+    """
+    :param path: Путь к файлу результатов JSON.
+    :return: Результаты замеров (см. run_benchmarks).
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Замеры скорости и памяти этапов анализа веб-страниц')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Выполнить замеры и записать результаты в JSON')
+    run_parser.add_argument('-o', '--output', type=str, default=None, help='Файл результатов (по умолчанию stdout)')
+    run_parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Число повторов каждого замера')
+    run_parser.add_argument('--sizes', nargs='+', choices=list(FIXTURE_SIZES), default=None,
+                            help='Размеры тестовых страниц (по умолчанию все)')
+    run_parser.add_argument('--backends', nargs='+', choices=available_backends(), default=None,
+                            help='Бэкенды разбора (по умолчанию все установленные)')
+    run_parser.add_argument('--baseline', type=str, default=None,
+                            help='Сразу сравнить с базовыми результатами (код возврата 1 при регрессии)')
+    compare_parser = commands.add_parser('compare', help='Сравнить результаты с базовыми')
+    compare_parser.add_argument('baseline', type=str, help='Файл базовых результатов')
+    compare_parser.add_argument('current', type=str, help='Файл текущих результатов')
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD,
+                                    help='Допустимое замедление (доля, по умолчанию 0.10)')
+        command_parser.add_argument('--memory-threshold', type=float, default=MEMORY_THRESHOLD,
+                                    help='Допустимый рост пиковой памяти (доля, по умолчанию 0.20)')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if args.repeat < 1:
+            parser.error('--repeat должно быть не меньше 1')
+        current = run_benchmarks(args.sizes, args.repeat, args.backends)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, ensure_ascii=False, indent=2)
+        else:
+            json.dump(current, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        baseline = load_results(args.baseline) if args.baseline else None
+    else:
+        baseline, current = load_results(args.baseline), load_results(args.current)
+
+    if baseline is not None:
+        # При выводе JSON в stdout таблица идёт в stderr, чтобы не портить результаты
+        stream = sys.stderr if args.command == 'run' and not args.output else sys.stdout
+        regressions = print_comparison(compare_results(baseline, current, args.time_threshold,
+                                                       args.memory_threshold), stream)
+        if regressions:
+            print(f"Регрессий: {regressions}", file=sys.stderr)
+            sys.exit(1)
@@ -0,0 +1,354 @@
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from AnalyserWeb import DEFAULT_TIMEOUT, create_session, fetch_page_content, analyze_html
+from UrlNormalization import normalize_url, url_host, site_of, is_same_site
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require
+
+# Пауза между запросами к одному хосту в секундах (если robots.txt не требует большей)
+DEFAULT_DELAY = 1.0
+DEFAULT_MAX_DEPTH = 2
+USER_AGENT = 'analyze_web-crawler'
+# Сколько разобранных robots.txt держится в памяти
+ROBOTS_CACHE_SIZE = 10000
+
+
+class CrawlFrontier:
+    """
+    Очередь URL обхода с приоритетами и паузами между запросами к одному хосту.
+
+    URL и множество уже встреченных URL хранятся в SQLite (в файле - для обходов на миллионы URL
+    и продолжения после остановки), в памяти - только состояние хостов. К каждому хосту
+    одновременно выполняется не больше одного запроса, следующий - не раньше чем через паузу.
+    Из готовых хостов выбирается тот, у которого в очереди URL с наименьшим приоритетом.
+    """
+
+    def __init__(self, path=None, delay=DEFAULT_DELAY):
+        """
+        :param path: Путь к файлу состояния; None - состояние в памяти.
+        :param delay: Пауза между запросами к одному хосту в секундах.
+        """
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.delay = delay
+        self._db = sqlite3.connect(path or ':memory:')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                host TEXT NOT NULL,
+                priority REAL NOT NULL,
+                depth INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                leased INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS frontier_host ON frontier (host, leased, priority, id)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        # URL, обработка которых прервалась при прошлом запуске, возвращаются в очередь
+        self._db.execute("UPDATE frontier SET leased = 0 WHERE leased = 1")
+        self._db.commit()
+        self._heads = {}        # хост -> наименьший приоритет его URL в очереди
+        self._busy = set()      # хосты, к которым выполняется запрос
+        self._ready_at = {}     # хост -> время (time.monotonic), раньше которого запрос не выполняется
+        self._ready = []        # куча (приоритет, хост); устаревшие записи пропускаются при выборе
+        self._waiting = []      # куча (время готовности, хост)
+        for host, priority in self._db.execute(
+                "SELECT host, MIN(priority) FROM frontier GROUP BY host"):
+            self._heads[host] = priority
+            heapq.heappush(self._ready, (priority, host))
+
+    @staticmethod
+    def _key(url):
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+    def add(self, url, depth, priority=None):
+        """
+        Добавляет URL в очередь, если он ещё не встречался.
+
+        :param url: Канонический URL (см. normalize_url).
+        :param depth: Глубина URL от начальных.
+        :param priority: Приоритет (меньше - раньше); по умолчанию - глубина.
+        :return: True, если URL добавлен.
+        """
+        if self._db.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (self._key(url),)).rowcount == 0:
+            return False
+        host = url_host(url)
+        priority = depth if priority is None else priority
+        self._db.execute("INSERT INTO frontier (host, priority, depth, url) VALUES (?, ?, ?, ?)",
+                         (host, priority, depth, url))
+        if host not in self._heads or priority < self._heads[host]:
+            self._heads[host] = priority
+            heapq.heappush(self._ready, (priority, host))
+        return True
+
+    def commit(self):
+        """Сохраняет добавленные URL на диск."""
+        self._db.commit()
+
+    def next(self, now=None):
+        """
+        Выдаёт следующий URL готового хоста и отмечает хост занятым до вызова finish.
+
+        :param now: Текущее время по time.monotonic.
+        :return: Тройка (id, url, глубина) или None, если готовых хостов нет.
+        """
+        now = time.monotonic() if now is None else now
+        while self._waiting and self._waiting[0][0] <= now:
+            _, host = heapq.heappop(self._waiting)
+            if host in self._heads:
+                heapq.heappush(self._ready, (self._heads[host], host))
+            elif host not in self._busy:
+                self._ready_at.pop(host, None)
+        while self._ready:
+            priority, host = heapq.heappop(self._ready)
+            if host in self._busy or self._heads.get(host) != priority or self._ready_at.get(host, 0) > now:
+                continue
+            entry_id, url, depth = self._db.execute(
+                "SELECT id, url, depth FROM frontier WHERE host = ? AND leased = 0 ORDER BY priority, id LIMIT 1",
+                (host,)).fetchone()
+            self._db.execute("UPDATE frontier SET leased = 1 WHERE id = ?", (entry_id,))
+            head = self._db.execute("SELECT MIN(priority) FROM frontier WHERE host = ? AND leased = 0",
+                                    (host,)).fetchone()[0]
+            if head is None:
+                del self._heads[host]
+            else:
+                self._heads[host] = head
+            self._busy.add(host)
+            return entry_id, url, depth
+        return None
+
+    def finish(self, entry_id, url, delay=None, now=None):
+        """
+        Удаляет обработанный URL из очереди и освобождает его хост после паузы.
+
+        :param entry_id: Идентификатор из next.
+        :param url: URL из next.
+        :param delay: Пауза перед следующим запросом к хосту; по умолчанию - self.delay.
+        :param now: Текущее время по time.monotonic.
+        """
+        now = time.monotonic() if now is None else now
+        host = url_host(url)
+        self._db.execute("DELETE FROM frontier WHERE id = ?", (entry_id,))
+        self._db.commit()
+        self._busy.discard(host)
+        ready_at = now + (self.delay if delay is None else delay)
+        self._ready_at[host] = ready_at
+        heapq.heappush(self._waiting, (ready_at, host))
+
+    def next_ready_time(self):
+        """
+        :return: Время (time.monotonic), когда освободится ближайший хост в паузе, или None.
+        """
+        return self._waiting[0][0] if self._waiting else None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+class RobotsCache:
+    """Правила robots.txt по хостам: загружаются при первом обращении, в памяти держатся последние."""
+
+    def __init__(self, session, user_agent=USER_AGENT, timeout=DEFAULT_TIMEOUT, max_hosts=ROBOTS_CACHE_SIZE):
+        """
+        :param session: Сессия requests.Session для загрузки robots.txt.
+        :param user_agent: Имя робота, для которого проверяются правила.
+        :param timeout: Таймаут загрузки robots.txt.
+        :param max_hosts: Сколько разобранных robots.txt хранить.
+        """
+        self.session = session
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_hosts = max_hosts
+        self._parsers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _parser(self, url):
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        with self._lock:
+            if origin in self._parsers:
+                self._parsers.move_to_end(origin)
+                return self._parsers[origin]
+        robots = RobotFileParser(origin + '/robots.txt')
+        exceptions = require('requests', purpose='загрузки robots.txt').exceptions
+        try:
+            response = self.session.get(robots.url, timeout=self.timeout)
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+        except exceptions.RequestException:
+            # robots.txt недоступен - ограничений нет
+            robots.allow_all = True
+        with self._lock:
+            self._parsers[origin] = robots
+            if len(self._parsers) > self.max_hosts:
+                self._parsers.popitem(last=False)
+        return robots
+
+    def allowed(self, url):
+        """
+        :param url: URL страницы.
+        :return: True, если robots.txt разрешает её загрузку.
+        """
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """
+        :param url: URL страницы.
+        :return: Crawl-delay из robots.txt хоста в секундах или None.
+        """
+        delay = self._parser(url).crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+
+def _crawl_page(url, session, timeout, parser, cache, robots, policy, on_error):
+    # Выполняется в потоке-обработчике: проверка robots.txt, загрузка и разбор страницы
+    delay = None
+    if robots is not None:
+        delay = robots.crawl_delay(url)
+        if not robots.allowed(url):
+            return None, "Запрещено robots.txt", delay
+    errors = []
+
+    def record_error(error):
+        errors.append(error)
+        if on_error is not None:
+            on_error(error)
+
+    html_content = fetch_page_content(url, session, timeout, cache, policy, record_error)
+    if html_content is None:
+        if not errors:
+            return None, "Не удалось получить страницу", delay
+        # Хост, который просит подождать или отключён автоматом защиты, не запрашивается до конца паузы
+        if errors[0].retry_after:
+            delay = max(delay or 0, errors[0].retry_after)
+        return None, f"Не удалось получить страницу: {errors[0]}", delay
+    return analyze_html(html_content, parser, url), None, delay
+
+
+def crawl(seeds, max_depth=DEFAULT_MAX_DEPTH, max_pages=None, same_site=True, respect_robots=True,
+          delay=DEFAULT_DELAY, concurrency=4, state_path=None, session=None, timeout=DEFAULT_TIMEOUT,
+          parser='stream', cache=None, user_agent=USER_AGENT, priority=None, policy=None, on_error=None):
+    """
+    Обходит сайты, начиная с seeds, и анализирует каждую страницу (см. analyze_html).
+    Ссылки страниц разрешаются и приводятся к каноническому виду (см. build_link_index),
+    и каждый URL загружается один раз.
+
+    :param seeds: Начальные URL.
+    :param max_depth: Максимальная глубина перехода по ссылкам от начальных URL (0 - только они).
+    :param max_pages: Максимальное число обрабатываемых за запуск страниц; None - без ограничения.
+    :param same_site: Переходить только по ссылкам на сайты начальных URL и их поддомены.
+    :param respect_robots: Соблюдать robots.txt (Disallow и Crawl-delay).
+    :param delay: Пауза между запросами к одному хосту в секундах.
+    :param concurrency: Число одновременно загружаемых страниц (разных хостов).
+    :param state_path: Файл очереди и множества встреченных URL; None - в памяти.
+                       С файлом повторный запуск продолжает прерванный обход.
+    :param session: Необязательная сессия requests.Session; по умолчанию создаётся своя.
+    :param timeout: Таймаут каждого запроса (см. fetch_page_content).
+    :param parser: Имя бэкенда разбора (см. parse_page_content).
+    :param cache: Необязательный HttpCache (см. fetch_page_content).
+    :param user_agent: Имя робота для robots.txt и заголовка User-Agent собственной сессии.
+    :param priority: Функция priority(url, глубина) -> число (меньше - раньше); по умолчанию - глубина.
+    :param policy: Необязательная FetchPolicy (см. fetch_page): повторы и автомат защиты хоста
+                   (паузы между запросами к хосту задаются delay).
+    :param on_error: Функция on_error(FetchError) для ошибок загрузки; вызывается в потоке-обработчике.
+    :return: Генератор записей {'url', 'depth', 'result', 'error'}; result - словарь элементов
+             с индексом ссылок 'link_index' (см. analyze_html) или None.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency должно быть не меньше 1")
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=concurrency)
+        session.headers['User-Agent'] = user_agent
+    frontier = CrawlFrontier(state_path, delay)
+    robots = RobotsCache(session, user_agent, timeout) if respect_robots else None
+    sites = set()
+    for seed in seeds:
+        url = normalize_url(seed)
+        if url is None:
+            continue
+        sites.add(site_of(url_host(url)))
+        frontier.add(url, 0, priority(url, 0) if priority else None)
+    frontier.commit()
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    active = {}     # задача -> (id, url, глубина)
+    started = 0
+    try:
+        while True:
+            while len(active) < concurrency and (max_pages is None or started < max_pages):
+                entry = frontier.next()
+                if entry is None:
+                    break
+                started += 1
+                active[pool.submit(_crawl_page, entry[1], session, timeout, parser, cache, robots, policy,
+                                   on_error)] = entry
+            # Ждать освобождения хоста имеет смысл, только если есть свободный обработчик
+            ready_time = None
+            if len(active) < concurrency and (max_pages is None or started < max_pages):
+                ready_time = frontier.next_ready_time()
+            if not active:
+                if ready_time is None:
+                    break
+                time.sleep(max(ready_time - time.monotonic(), 0))
+                continue
+            wait_timeout = None if ready_time is None else max(ready_time - time.monotonic(), 0)
+            done, _ = wait(active, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry_id, url, depth = active.pop(future)
+                try:
+                    result, error, crawl_delay = future.result()
+                except Exception as e:
+                    result, error, crawl_delay = None, f"{type(e).__name__}: {e}", None
+                if result is not None and depth < max_depth:
+                    link_index = result['link_index']
+                    for link in link_index['internal'] + link_index['external']:
+                        link_url = link['url']
+                        if same_site and not is_same_site(url_host(link_url), sites):
+                            continue
+                        frontier.add(link_url, depth + 1, priority(link_url, depth + 1) if priority else None)
+                frontier.finish(entry_id, url, max(delay, crawl_delay or 0))
+                yield {'url': url, 'depth': depth, 'result': result, 'error': error}
+    finally:
+        for future in active:
+            future.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+        frontier.close()
+        if own_session:
+            session.close()
+
+
+def run_crawl(seeds, output, **options):
+    """
+    Выполняет обход (см. crawl) и записывает результаты в JSONL, по одной записи на страницу.
+
+    :param seeds: Начальные URL.
+    :param output: Текстовый поток для записи результатов.
+    :param options: Именованные аргументы crawl.
+    :return: Статистика: {'pages': загружено, 'errors': с ошибками}.
+    """
+    stats = {'pages': 0, 'errors': 0}
+    for record in crawl(seeds, **options):
+        stats['pages'] += 1
+        if record['error']:
+            stats['errors'] += 1
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+    return stats
@@ -0,0 +1,324 @@
+from html.parser import HTMLParser
+
+NO_TITLE = "Нет заголовка"
+FIELDS = ('title', 'links', 'paragraphs', 'images')
+# Поля, которые извлекаются только по явному запросу: base - href первого <base> (или None)
+OPTIONAL_FIELDS = ('base',)
+
+# Элементы без содержимого: как и BeautifulSoup, не помещаем их в стек открытых тегов
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+])
+# Текст внутри этих элементов не входит в .text ссылок и параграфов
+SKIPPED_TEXT_ELEMENTS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+# Внутри этих элементов пробельные строки не схлопываются
+PRESERVE_WHITESPACE_ELEMENTS = frozenset(['pre', 'textarea'])
+ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+# Парсеры BeautifulSoup, которые строят дерево по правилам HTML5 (см. ElementCollector, html5_tree)
+HTML5_TREE_BUILDERS = frozenset(['lxml', 'html5lib'])
+
+
+class ElementCollector:
+    """
+    Собирает заголовок, ссылки, параграфы и изображения по событиям разбора HTML
+    (открытие тега, текст, закрытие тега) за один проход, без построения дерева.
+
+    Результат совпадает с extract_title/extract_links/extract_paragraphs/extract_images
+    поверх BeautifulSoup с парсером html.parser.
+    """
+
+    def __init__(self, fields=FIELDS, on_element=None, html5_tree=False):
+        """
+        :param fields: Какие элементы собирать (подмножество FIELDS и OPTIONAL_FIELDS).
+        :param on_element: Необязательный обработчик on_element(kind, value), вызываемый для каждой
+                           готовой ссылки ('links'), параграфа ('paragraphs') и изображения ('images')
+                           в момент её закрытия. Если задан, элементы не накапливаются в списках.
+        :param html5_tree: События получены из дерева, построенного по правилам HTML5 (lxml, selectolax).
+                           Такой парсер отдаёт содержимое <title> сырым текстом, а секцию CDATA - комментарием
+                           '[CDATA[...]]'; оба случая приводятся к результату html.parser.
+        """
+        self.fields = frozenset(fields)
+        self.on_element = on_element
+        self.html5_tree = html5_tree
+        self.links = []
+        self.paragraphs = []
+        self.images = []
+        self._stack = []            # имена открытых элементов
+        self._open = []             # открытые ссылки/параграфы: [глубина, вид, запись, части текста, позиция]
+        self._text = []             # части текущего текстового узла
+        self._skip_depth = 0        # число открытых элементов, текст в которых игнорируется
+        self._preserve_depth = 0    # число открытых <pre>/<textarea>
+        self._title_depth = None    # глубина содержимого первого <title>
+        self._title_path = []       # списки детей открытых узлов внутри <title>
+        self._title = None
+        self.base = None
+
+    def start(self, tag, attrs):
+        """Обрабатывает открывающий тег; attrs - словарь атрибутов."""
+        self.flush_text()
+        if self._title_path:
+            node = ['tag', []]
+            self._title_path[-1].append(node)
+            if tag not in VOID_ELEMENTS:
+                self._title_path.append(node[1])
+        if tag == 'img':
+            if 'images' in self.fields:
+                self._emit('images', {'src': attrs.get('src') or '', 'alt': attrs.get('alt') or ''})
+        elif tag == 'a':
+            if 'links' in self.fields and 'href' in attrs:
+                record = {'text': '', 'href': attrs['href'] or ''}
+                self._open.append([len(self._stack), 'links', record, [], self._reserve('links', record)])
+        elif tag == 'p':
+            if 'paragraphs' in self.fields:
+                self._open.append([len(self._stack), 'paragraphs', None, [], self._reserve('paragraphs', '')])
+        elif tag == 'title':
+            if 'title' in self.fields and self._title_depth is None:
+                self._title_depth = len(self._stack) + 1
+                self._title_path = [[]]
+        elif tag == 'base':
+            # Как и браузер, учитываем только первый <base> с атрибутом href
+            if 'base' in self.fields and self.base is None and 'href' in attrs:
+                self.base = attrs['href'] or ''
+        if tag in VOID_ELEMENTS:
+            return
+        if tag in SKIPPED_TEXT_ELEMENTS:
+            self._skip_depth += 1
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self._preserve_depth += 1
+        self._stack.append(tag)
+
+    def end(self, tag):
+        """Обрабатывает закрывающий тег; незакрытые вложенные элементы закрываются вместе с ним."""
+        self.flush_text()
+        if tag not in self._stack:
+            return
+        while self._stack:
+            name = self._stack.pop()
+            self._close_element(name)
+            if name == tag:
+                break
+
+    def data(self, text):
+        """Обрабатывает текст; соседние вызовы без тегов между ними образуют один текстовый узел."""
+        self._text.append(text)
+
+    def cdata(self, text):
+        """Обрабатывает секцию CDATA: она входит в текст даже внутри <script>/<template>."""
+        self.flush_text()
+        self._add_text_node(text, 'cdata')
+
+    def comment(self, text):
+        """Обрабатывает комментарий: он не входит в текст ссылок и параграфов, но является отдельным узлом."""
+        if self.html5_tree and text.startswith('[CDATA[') and text.endswith(']]'):
+            self.cdata(text[len('[CDATA['):-len(']]')])
+            return
+        self.flush_text()
+        if self._title_path:
+            self._title_path[-1].append(['comment', text])
+
+    def flush_text(self):
+        """Завершает текущий текстовый узел."""
+        if not self._text:
+            return
+        text = ''.join(self._text)
+        self._text = []
+        # Как и BeautifulSoup, схлопываем строки из одних пробелов в один пробел или перевод строки
+        if not self._preserve_depth and text.translate(ASCII_SPACES) == '':
+            text = '\n' if '\n' in text else ' '
+        self._add_text_node(text, 'text')
+
+    def close(self):
+        """Завершает разбор, закрывая все оставшиеся открытыми элементы."""
+        self.flush_text()
+        while self._stack:
+            self._close_element(self._stack.pop())
+
+    @property
+    def title(self):
+        """Заголовок страницы или "Нет заголовка"."""
+        return self._title.strip() if self._title else NO_TITLE
+
+    def result(self):
+        """
+        :return: Словарь с извлечёнными элементами (только запрошенные поля).
+        """
+        return {field: self.title if field == 'title' else getattr(self, field)
+                for field in FIELDS + OPTIONAL_FIELDS if field in self.fields}
+
+    def _add_text_node(self, text, kind):
+        if self._title_path:
+            self._title_path[-1].append([kind, text])
+        if self._open and (kind == 'cdata' or not self._skip_depth):
+            for element in self._open:
+                element[3].append(text)
+
+    def _reserve(self, kind, placeholder):
+        # Место в списке занимается при открытии тега, чтобы сохранить порядок документа
+        if self.on_element is not None:
+            return None
+        items = getattr(self, kind)
+        items.append(placeholder)
+        return len(items) - 1
+
+    def _emit(self, kind, value):
+        if self.on_element is not None:
+            self.on_element(kind, value)
+        else:
+            getattr(self, kind).append(value)
+
+    def _close_element(self, name):
+        depth = len(self._stack)
+        if name in SKIPPED_TEXT_ELEMENTS:
+            self._skip_depth -= 1
+        if name in PRESERVE_WHITESPACE_ELEMENTS:
+            self._preserve_depth -= 1
+        if self._title_path:
+            if depth + 1 == self._title_depth:
+                self._title = _single_string(self._title_path[0])
+                self._title_path = []
+                if self.html5_tree and self._title and '<' in self._title:
+                    self._title = _title_from_markup(self._title)
+            else:
+                self._title_path.pop()
+        while self._open and self._open[-1][0] == depth:
+            _, kind, record, parts, slot = self._open.pop()
+            text = ''.join(parts).strip()
+            if kind == 'links':
+                record['text'] = text
+                value = record
+            else:
+                value = text
+            if slot is None:
+                self.on_element(kind, value)
+            else:
+                getattr(self, kind)[slot] = value
+
+
+def _single_string(children):
+    # Повторяет Tag.string из BeautifulSoup: строка есть, только если у узла ровно один потомок
+    while len(children) == 1:
+        kind, value = children[0]
+        if kind != 'tag':
+            return value
+        children = value
+    return None
+
+
+def _title_from_markup(text):
+    # html.parser разбирает теги внутри <title>; сущности в тексте уже раскрыты, поэтому & экранируется
+    collector = ElementCollector(('title',))
+    parser = StreamingHTMLParser(collector)
+    parser.feed('<title>' + text.replace('&', '&amp;') + '</title>')
+    parser.close()
+    return collector._title
+
+
+class StreamingHTMLParser(HTMLParser):
+    """
+    Потоковый HTML-парсер: передаёт события разбора в ElementCollector, не строя дерево.
+    Контент можно подавать частями через feed().
+    """
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+        # Пустые элементы, закрытые сразу при открытии: имя -> число ещё не встреченных закрывающих тегов.
+        # Столько закрывающих тегов с этим именем игнорируется
+        self._closed_void_elements = {}
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+        if tag in VOID_ELEMENTS:
+            self._closed_void_elements[tag] = self._closed_void_elements.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        pending = self._closed_void_elements.get(tag)
+        if pending:
+            self._closed_void_elements[tag] = pending - 1
+        else:
+            self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+    def handle_comment(self, data):
+        self.collector.comment(data)
+
+    # DOCTYPE и инструкции обработки BeautifulSoup хранит отдельными нетекстовыми узлами
+    def handle_decl(self, decl):
+        self.collector.comment(decl[len('DOCTYPE '):] if decl.startswith('DOCTYPE ') else decl)
+
+    def handle_pi(self, data):
+        self.collector.comment(data)
+
+    def unknown_decl(self, data):
+        if data.startswith('CDATA['):
+            self.collector.cdata(data[len('CDATA['):])
+        else:
+            self.collector.comment(data)
+
+    def close(self):
+        super().close()
+        self.collector.close()
+
+
+def extract_elements_from_html(html_content, fields=FIELDS):
+    """
+    Извлекает общие элементы из HTML-контента за один потоковый проход, без построения DOM.
+
+    :param html_content: HTML-контент страницы.
+    :param fields: Какие элементы извлекать (подмножество FIELDS и OPTIONAL_FIELDS).
+    :return: Словарь с извлечёнными элементами.
+    """
+    collector = ElementCollector(fields)
+    parser = StreamingHTMLParser(collector)
+    parser.feed(html_content)
+    parser.close()
+    return collector.result()
+
+
+def extract_elements_from_soup(soup, fields=FIELDS):
+    """
+    Извлекает общие элементы из уже построенного дерева BeautifulSoup за один обход.
+
+    :param soup: Объект BeautifulSoup, представляющий HTML-документ.
+    :param fields: Какие элементы извлекать (подмножество FIELDS и OPTIONAL_FIELDS).
+    :return: Словарь с извлечёнными элементами.
+    """
+    # Дерево уже построено BeautifulSoup - модуль импортирован; потоковому разбору bs4 не нужен
+    from bs4 import Tag, CData, Comment, Declaration, Doctype, ProcessingInstruction
+    # Строки дерева, которые не являются текстом
+    non_text_strings = (Comment, Declaration, Doctype, ProcessingInstruction)
+    builder = getattr(getattr(soup, 'builder', None), 'NAME', None)
+    collector = ElementCollector(fields, html5_tree=builder in HTML5_TREE_BUILDERS)
+    # Обход в глубину без рекурсии: глубоко вложенные страницы не упираются в лимит стека
+    pending = [(iter(soup.contents), None)]
+    while pending:
+        children, name = pending[-1]
+        node = next(children, None)
+        if node is None:
+            pending.pop()
+            if name is not None:
+                collector.end(name)
+        elif isinstance(node, Tag):
+            attrs = {key: ' '.join(value) if isinstance(value, list) else value
+                     for key, value in node.attrs.items()}
+            collector.start(node.name, attrs)
+            if node.name not in VOID_ELEMENTS:
+                pending.append((iter(node.contents), node.name))
+        elif isinstance(node, CData):
+            collector.cdata(str(node))
+        elif isinstance(node, non_text_strings):
+            collector.comment(str(node))
+        else:
+            # Каждая строка дерева - отдельный узел
+            collector.data(str(node))
+            collector.flush_text()
+    collector.close()
+    return collector.result()
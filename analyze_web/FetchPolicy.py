@@ -0,0 +1,275 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require
+
+# Коды ответа, при которых запрос повторяется: перегрузка и временные ошибки сервера
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+DEFAULT_RETRIES = 2
+# Пауза перед повтором: случайная в пределах backoff * 2^номер попытки, но не больше MAX_BACKOFF секунд
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Если сервер просит подождать (Retry-After) дольше, страница сразу считается недоступной
+MAX_RETRY_AFTER = 60.0
+# Автомат защиты хоста: после FAILURE_THRESHOLD ошибок подряд запросы к хосту не выполняются
+# RESET_TIMEOUT секунд, затем пропускается один пробный запрос
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+# Для скольких хостов хранится состояние (ограничитель и автомат); давно не использованные вытесняются
+MAX_HOSTS = 10000
+
+
+class FetchError(Exception):
+    """
+    Ошибка загрузки страницы. Вид ошибки kind: 'timeout' - таймаут, 'connection' - ошибка соединения,
+    'http' - код ответа ошибки, 'circuit_open' - хост временно отключён автоматом защиты,
+    'request' - прочие ошибки запроса (например, некорректный URL).
+    """
+
+    def __init__(self, url, kind, message, status=None, attempts=1, retry_after=None):
+        # Аргументы передаются в Exception, чтобы ошибка восстанавливалась при передаче между процессами
+        super().__init__(url, kind, message, status, attempts, retry_after)
+        self.url = url
+        self.kind = kind
+        self.message = message
+        self.status = status
+        self.attempts = attempts
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return self.message if self.attempts <= 1 else f"{self.message} (попыток: {self.attempts})"
+
+    def to_dict(self):
+        """:return: Словарь {'url', 'kind', 'message', 'status', 'attempts', 'retry_after'}."""
+        return {'url': self.url, 'kind': self.kind, 'message': self.message, 'status': self.status,
+                'attempts': self.attempts, 'retry_after': self.retry_after}
+
+
+def parse_retry_after(value, now=None):
+    """
+    Разбирает заголовок Retry-After.
+
+    :param value: Значение заголовка: число секунд или дата HTTP.
+    :param now: Текущее время (datetime с часовым поясом); по умолчанию - сейчас.
+    :return: Пауза в секундах (не меньше 0) или None, если заголовка нет или он некорректен.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    # email.utils заметно замедляет запуск программы, а дата в Retry-After встречается редко
+    from email.utils import parsedate_to_datetime
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - (now or datetime.now(timezone.utc))).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов: rate токенов в секунду, не больше capacity накопленных.
+    Токен забирается сразу, даже если его ещё нет: запросы ждут своей очереди и не обгоняют друг друга.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        :param rate: Число запросов в секунду.
+        :param capacity: Сколько запросов можно выполнить подряд без паузы.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = None
+        self._lock = threading.Lock()
+
+    def reserve(self, now=None):
+        """
+        Забирает токен.
+
+        :param now: Текущее время (time.monotonic).
+        :return: Пауза в секундах, после которой можно выполнить запрос (0 - сразу).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._updated is not None:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты хоста: после failure_threshold ошибок подряд хост считается недоступным,
+    и запросы к нему не выполняются reset_timeout секунд. Затем пропускается один пробный запрос:
+    при успехе автомат замыкается, при ошибке - снова размыкается на reset_timeout.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self, now=None):
+        """
+        :param now: Текущее время (time.monotonic).
+        :return: True, если запрос к хосту можно выполнить.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or now - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def retry_in(self, now=None):
+        """
+        :param now: Текущее время (time.monotonic).
+        :return: Через сколько секунд будет пропущен пробный запрос (0 - автомат замкнут или уже можно).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(self._opened_at + self.reset_timeout - now, 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_at = now
+                self._probing = False
+
+
+class FetchPolicy:
+    """
+    Политика выполнения запросов: повторы с экспоненциальной паузой и случайным разбросом
+    при ошибках соединения, таймаутах и кодах RETRY_STATUSES (с учётом Retry-After),
+    ограничение частоты запросов к хосту (TokenBucket) и автомат защиты хоста (CircuitBreaker).
+    Состояние хостов общее для всех потоков, использующих политику.
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=MAX_BACKOFF,
+                 retry_statuses=RETRY_STATUSES, max_retry_after=MAX_RETRY_AFTER, rate=None, burst=1,
+                 failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, max_hosts=MAX_HOSTS):
+        """
+        :param retries: Сколько раз повторять запрос после ошибки.
+        :param backoff: Базовая пауза перед повтором в секундах.
+        :param max_backoff: Максимальная пауза перед повтором в секундах.
+        :param retry_statuses: Коды ответа, при которых запрос повторяется.
+        :param max_retry_after: Максимальная пауза по Retry-After; при большей запрос не повторяется.
+        :param rate: Максимальное число запросов в секунду к одному хосту; None - без ограничения.
+        :param burst: Сколько запросов к хосту можно выполнить подряд без паузы.
+        :param failure_threshold: Число ошибок подряд, после которого хост отключается; None - без автомата.
+        :param reset_timeout: На сколько секунд отключается хост.
+        :param max_hosts: Для скольких хостов хранится состояние.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retry_after = max_retry_after
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_hosts = max_hosts
+        self._hosts = OrderedDict()     # хост -> (TokenBucket или None, CircuitBreaker или None)
+        self._lock = threading.Lock()
+
+    def _host_state(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = (TokenBucket(self.rate, self.burst) if self.rate else None,
+                         CircuitBreaker(self.failure_threshold, self.reset_timeout) if self.failure_threshold else None)
+                self._hosts[host] = state
+                if len(self._hosts) > self.max_hosts:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+        return host, state
+
+    def backoff_delay(self, attempt):
+        """
+        :param attempt: Номер неудачной попытки с 0.
+        :return: Пауза перед следующей попыткой в секундах (full jitter).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, get, url, **options):
+        """
+        Выполняет запрос по политике.
+
+        :param get: Функция запроса (requests.get или Session.get).
+        :param url: URL.
+        :param options: Именованные аргументы get (timeout, headers, stream).
+        :return: Ответ; ответы с кодами ошибок вне retry_statuses возвращаются как есть.
+        :raises FetchError: Если запрос не удался после всех попыток или хост отключён автоматом.
+        """
+        exceptions = require('requests', purpose='загрузки страниц').exceptions
+        if not self.rate and not self.failure_threshold:
+            bucket = breaker = None
+        else:
+            host, (bucket, breaker) = self._host_state(url)
+        for attempt in range(self.retries + 1):
+            if breaker is not None and not breaker.allow():
+                raise FetchError(url, 'circuit_open',
+                                 f"хост {host} временно отключён после {breaker.failures} ошибок подряд",
+                                 attempts=attempt, retry_after=breaker.retry_in())
+            if bucket is not None:
+                wait = bucket.reserve()
+                if wait > 0:
+                    time.sleep(wait)
+            try:
+                response = get(url, **options)
+            except exceptions.Timeout as e:
+                error = FetchError(url, 'timeout', str(e), attempts=attempt + 1)
+            except (exceptions.ConnectionError, exceptions.ChunkedEncodingError) as e:
+                error = FetchError(url, 'connection', str(e), attempts=attempt + 1)
+            except exceptions.RequestException as e:
+                # Ошибка самого запроса, а не хоста: повтор не поможет
+                raise FetchError(url, 'request', str(e), attempts=attempt + 1) from e
+            else:
+                if response.status_code not in self.retry_statuses:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                error = FetchError(url, 'http', f"код ответа {response.status_code}", status=response.status_code,
+                                   attempts=attempt + 1, retry_after=retry_after)
+                response.close()
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt == self.retries:
+                break
+            delay = error.retry_after if error.retry_after is not None else self.backoff_delay(attempt)
+            if delay > self.max_retry_after:
+                break
+            time.sleep(delay)
+        raise error
+
+
+# Политика по умолчанию для функций загрузки: одна попытка, без ограничителя и автомата
+SINGLE_ATTEMPT = FetchPolicy(retries=0, failure_threshold=None)
@@ -0,0 +1,274 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Время последнего использования записей копится в памяти и записывается в файл пачкой
+# при сохранении ответа, закрытии кэша или после стольких обращений
+ACCESS_FLUSH_SIZE = 1000
+# По сколько записей выбирается при вытеснении
+EVICTION_BATCH = 64
+
+
+def parse_cache_control(value):
+    """
+    Разбирает заголовок Cache-Control.
+
+    :param value: Значение заголовка или None.
+    :return: Словарь {директива в нижнем регистре: значение или None}.
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.partition('=')
+        name = name.strip().lower()
+        if name:
+            directives[name] = argument.strip().strip('"') if argument else None
+    return directives
+
+
+def freshness_lifetime(directives):
+    """
+    :param directives: Директивы Cache-Control (см. parse_cache_control).
+    :return: Сколько секунд ответ свежий: 0 для no-cache и некорректного max-age, значение max-age,
+             если он задан, иначе None - используется TTL кэша.
+    """
+    if 'no-cache' in directives:
+        return 0.0
+    if 'max-age' not in directives:
+        return None
+    try:
+        return float(max(int(directives['max-age']), 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CacheEntry:
+    """Сохранённый ответ: тело страницы и валидаторы для условного запроса."""
+
+    __slots__ = ('url', 'body', 'etag', 'last_modified', 'stored_at', 'max_age')
+
+    def __init__(self, url, body, etag, last_modified, stored_at, max_age=None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.max_age = max_age
+
+    def conditional_headers(self):
+        """
+        :return: Заголовки If-None-Match/If-Modified-Since для повторной проверки ответа.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Дисковый кэш HTTP-ответов по URL (SQLite) с TTL и вытеснением давно не использованных записей.
+
+    Свежая запись отдаётся без запроса; устаревшая проверяется условным запросом, и при ответе 304
+    тело берётся из кэша. Время свежести задаёт Cache-Control ответа (max-age; no-cache - проверять
+    всегда), а без него - ttl. Ответы с Cache-Control: no-store не сохраняются.
+    Суммарный размер тел хранится в файле кэша и обновляется вместе с записями, поэтому общий файл
+    могут использовать несколько процессов.
+    """
+
+    def __init__(self, path, ttl=3600, max_bytes=256 * 1024 * 1024):
+        """
+        :param path: Путь к файлу кэша; каталоги создаются при необходимости.
+        :param ttl: Время в секундах, в течение которого запись считается свежей.
+        :param max_bytes: Максимальный суммарный размер тел страниц в кэше.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._accessed = {}     # URL -> время обращения, ещё не записанное в файл
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                max_age REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if 'max_age' not in columns:
+            # Файл кэша прежней версии
+            self._db.execute("ALTER TABLE responses ADD COLUMN max_age REAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS totals (size INTEGER NOT NULL)")
+        if self._db.execute("SELECT 1 FROM totals").fetchone() is None:
+            self._db.execute("INSERT INTO totals SELECT COALESCE(SUM(size), 0) FROM responses")
+        self._db.commit()
+
+    def lookup(self, url):
+        """
+        Ищет запись в кэше и отмечает её как использованную (время обращения записывается в файл отложенно).
+
+        :param url: URL страницы.
+        :return: CacheEntry или None.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT body, etag, last_modified, stored_at, max_age FROM responses WHERE url = ?",
+                                   (url,)).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._db.commit()
+        return CacheEntry(url, *row)
+
+    def is_fresh(self, entry):
+        """
+        :param entry: Запись кэша.
+        :return: True, если запись можно отдать без повторной проверки.
+        """
+        lifetime = self.ttl if entry.max_age is None else entry.max_age
+        return time.time() - entry.stored_at < lifetime
+
+    def store(self, url, body, etag=None, last_modified=None, cache_control=None):
+        """
+        Сохраняет ответ и вытесняет давно не использованные записи сверх лимита размера.
+
+        :param url: URL страницы.
+        :param body: HTML-контент страницы.
+        :param etag: Значение заголовка ETag.
+        :param last_modified: Значение заголовка Last-Modified.
+        :param cache_control: Значение заголовка Cache-Control: при no-store ответ не сохраняется
+                              (и прежняя запись удаляется), max-age и no-cache задают время свежести.
+        """
+        directives = parse_cache_control(cache_control)
+        if 'no-store' in directives:
+            self.discard(url)
+            return
+        size = len(body.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._flush_accessed()
+            self._db.execute(
+                "UPDATE totals SET size = size + ? - COALESCE((SELECT size FROM responses WHERE url = ?), 0)", (size, url))
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, stored_at, accessed_at, size, "
+                "max_age) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, size, freshness_lifetime(directives)))
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, url, cache_control=None):
+        """
+        Продлевает свежесть записи после ответа 304 Not Modified.
+
+        :param url: URL страницы.
+        :param cache_control: Значение заголовка Cache-Control ответа 304 (см. store);
+                              None - время свежести записи не меняется.
+        """
+        directives = parse_cache_control(cache_control)
+        if 'no-store' in directives:
+            self.discard(url)
+            return
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(url, None)
+            if cache_control is None:
+                self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            else:
+                self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ?, max_age = ? WHERE url = ?",
+                                 (now, now, freshness_lifetime(directives), url))
+            self._db.commit()
+
+    def discard(self, url):
+        """
+        Удаляет запись кэша.
+
+        :param url: URL страницы.
+        """
+        with self._lock:
+            self._accessed.pop(url, None)
+            self._delete(url)
+            self._db.commit()
+
+    def clear(self):
+        """Удаляет все записи кэша."""
+        with self._lock:
+            self._accessed.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.execute("UPDATE totals SET size = 0")
+            self._db.commit()
+
+    def size(self):
+        """
+        :return: Суммарный размер тел страниц в кэше в байтах.
+        """
+        with self._lock:
+            return self._db.execute("SELECT size FROM totals").fetchone()[0]
+
+    def record(self, event):
+        """
+        Увеличивает счётчик события.
+
+        :param event: 'hits', 'misses' или 'revalidations'.
+        """
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+
+    def stats(self):
+        """
+        :return: Словарь счётчиков: попадания, промахи, повторные проверки (304), вытеснения.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        """Записывает отложенные времена обращений и закрывает файл кэша."""
+        with self._lock:
+            self._flush_accessed()
+            self._db.commit()
+            self._db.close()
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                                 [(accessed_at, url) for url, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _delete(self, url):
+        self._db.execute("UPDATE totals SET size = size - COALESCE((SELECT size FROM responses WHERE url = ?), 0)",
+                         (url,))
+        self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def _evict(self):
+        # Вызывается после _flush_accessed: порядок вытеснения учитывает все обращения
+        total = self._db.execute("SELECT size FROM totals").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at LIMIT ?",
+                                    (EVICTION_BATCH,)).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._delete(url)
+                total -= size
+                self.evictions += 1
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# Списки элементов, изменения которых выводятся в инкрементальном режиме
+DIFF_FIELDS = ('links', 'paragraphs', 'images')
+# Комментарии и пробельные последовательности не влияют на извлекаемые элементы
+COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_html(html_content):
+    """
+    Приводит HTML к виду, в котором не различаются правки, не меняющие элементы страницы:
+    удаляются комментарии, последовательности пробельных символов заменяются одним пробелом.
+
+    :param html_content: HTML-контент страницы.
+    :return: Нормализованный HTML.
+    """
+    return WHITESPACE_RE.sub(' ', COMMENT_RE.sub('', html_content)).strip()
+
+
+def fingerprint(text):
+    """
+    :param text: Строка.
+    :return: Отпечаток строки (128-битный BLAKE2b в hex).
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def element_lists(result):
+    """
+    :param result: Результат analyze_html (со списком 'links' или индексом 'link_index').
+    :return: Словарь {поле: список элементов} по DIFF_FIELDS; ссылки индекса - внутренние, затем внешние.
+    """
+    if 'link_index' in result:
+        links = result['link_index']['internal'] + result['link_index']['external']
+    else:
+        links = result['links']
+    return {'links': links, 'paragraphs': result['paragraphs'], 'images': result['images']}
+
+
+def _element_key(element):
+    return json.dumps(element, ensure_ascii=False, sort_keys=True)
+
+
+def diff_elements(old, new):
+    """
+    Сравнивает списки элементов как мультимножества: повторяющийся элемент учитывается столько раз,
+    сколько он встречается.
+
+    :param old: Список элементов предыдущего анализа.
+    :param new: Список элементов текущего анализа.
+    :return: Пара (добавленные элементы в порядке new, удалённые элементы в порядке old).
+    """
+    old_keys = [_element_key(element) for element in old]
+    new_keys = [_element_key(element) for element in new]
+    surplus = Counter(new_keys)
+    surplus.subtract(old_keys)
+    added = []
+    for key, element in zip(new_keys, new):
+        if surplus[key] > 0:
+            surplus[key] -= 1
+            added.append(element)
+    removed = []
+    for key, element in zip(old_keys, old):
+        if surplus[key] < 0:
+            surplus[key] += 1
+            removed.append(element)
+    return added, removed
+
+
+class Snapshot:
+    """Сохранённый результат анализа страницы: отпечатки HTML и списков элементов, сами элементы."""
+
+    __slots__ = ('url', 'mode', 'html_digest', 'digests', 'title', 'elements', 'updated_at')
+
+    def __init__(self, url, mode, html_digest, digests, title, elements, updated_at):
+        self.url = url
+        self.mode = mode
+        self.html_digest = html_digest
+        self.digests = digests
+        self.title = title
+        self.elements = elements
+        self.updated_at = updated_at
+
+
+class SnapshotStore:
+    """
+    Хранилище результатов предыдущего анализа страниц по URL (SQLite) для инкрементального режима.
+
+    Для каждой страницы хранятся отпечаток нормализованного HTML, отпечатки списков ссылок, параграфов
+    и изображений и сами списки: при совпадении отпечатка HTML страница не разбирается повторно,
+    а при изменении сравниваются только списки с другим отпечатком.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Путь к файлу хранилища; каталоги создаются при необходимости.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                url TEXT PRIMARY KEY,
+                mode TEXT NOT NULL,
+                html_digest TEXT NOT NULL,
+                digests TEXT NOT NULL,
+                title TEXT,
+                elements TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        self._db.commit()
+
+    def lookup(self, url):
+        """
+        :param url: URL страницы.
+        :return: Snapshot или None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mode, html_digest, digests, title, elements, updated_at FROM snapshots WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        mode, html_digest, digests, title, elements, updated_at = row
+        return Snapshot(url, mode, html_digest, json.loads(digests), title, json.loads(elements), updated_at)
+
+    def store(self, snapshot):
+        """
+        Сохраняет результат анализа страницы, заменяя предыдущий.
+
+        :param snapshot: Snapshot.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (snapshot.url, snapshot.mode, snapshot.html_digest, json.dumps(snapshot.digests),
+                 snapshot.title, json.dumps(snapshot.elements, ensure_ascii=False), snapshot.updated_at))
+            self._db.commit()
+
+    def touch(self, url):
+        """
+        Отмечает время проверки неизменившейся страницы.
+
+        :param url: URL страницы.
+        """
+        with self._lock:
+            self._db.execute("UPDATE snapshots SET updated_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def clear(self):
+        """Удаляет все сохранённые результаты."""
+        with self._lock:
+            self._db.execute("DELETE FROM snapshots")
+            self._db.commit()
+
+    def close(self):
+        """Закрывает файл хранилища."""
+        with self._lock:
+            self._db.close()
+
+
+def analyze_changes(url, html_content, store, analyze, mode=''):
+    """
+    Анализирует страницу относительно результата предыдущего запуска и сохраняет новый результат.
+
+    :param url: URL страницы (ключ хранилища).
+    :param html_content: HTML-контент страницы.
+    :param store: SnapshotStore.
+    :param analyze: Функция analyze(html_content) -> результат analyze_html или None.
+    :param mode: Параметры анализа, влияющие на результат (бэкенд, разрешение ссылок): результат,
+                 полученный с другими параметрами, не сравнивается, страница считается новой.
+    :return: Запись изменений {'url', 'status', 'added', 'removed'} и 'title' для новой страницы или при
+             смене заголовка ('previous_title' - прежний); status - 'new', 'changed' или 'unchanged';
+             added и removed - {поле: список элементов} только по изменившимся полям.
+             None, если контент не удалось разобрать.
+    """
+    html_digest = fingerprint(normalize_html(html_content))
+    previous = store.lookup(url)
+    if previous is not None and previous.mode != mode:
+        previous = None
+    if previous is not None and previous.html_digest == html_digest:
+        store.touch(url)
+        return {'url': url, 'status': 'unchanged', 'added': {}, 'removed': {}}
+    result = analyze(html_content)
+    if result is None:
+        return None
+    elements = element_lists(result)
+    digests = {field: fingerprint(_element_key(elements[field])) for field in DIFF_FIELDS}
+    store.store(Snapshot(url, mode, html_digest, digests, result['title'], elements, time.time()))
+
+    if previous is None:
+        added = {field: elements[field] for field in DIFF_FIELDS if elements[field]}
+        return {'url': url, 'status': 'new', 'title': result['title'], 'added': added, 'removed': {}}
+    record = {'url': url, 'status': 'unchanged', 'added': {}, 'removed': {}}
+    for field in DIFF_FIELDS:
+        # Список с тем же отпечатком не изменился - сравнивать элементы не нужно
+        if digests[field] == previous.digests.get(field):
+            continue
+        added, removed = diff_elements(previous.elements[field], elements[field])
+        if added:
+            record['added'][field] = added
+        if removed:
+            record['removed'][field] = removed
+    if result['title'] != previous.title:
+        record['title'] = result['title']
+        record['previous_title'] = previous.title
+    if record['added'] or record['removed'] or 'title' in record:
+        record['status'] = 'changed'
+    return record
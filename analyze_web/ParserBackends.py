@@ -0,0 +1,146 @@
+import importlib.util
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require
+from ElementExtraction import FIELDS, ElementCollector, extract_elements_from_html, extract_elements_from_soup
+
+
+class ParserBackend:
+    """
+    Бэкенд разбора HTML: строит документ и извлекает из него общие элементы.
+
+    :param name: Имя бэкенда (значение аргумента parser=).
+    :param parse: Функция parse(html_content) -> документ.
+    :param extract: Функция extract(документ, fields) -> словарь элементов.
+    :param document_type: Класс документов, которые строит бэкенд; None - документ BeautifulSoup
+                          (bs4 импортируется только при первом разборе, см. beautiful_soup).
+    :param requires: Модуль, без которого бэкенд недоступен (None - всегда доступен).
+    :param fallback: Имя бэкенда, используемого, если этот недоступен.
+    """
+
+    def __init__(self, name, parse, extract, document_type, requires=None, fallback=None):
+        self.name = name
+        self.parse = parse
+        self.extract = extract
+        self.document_type = document_type
+        self.requires = requires
+        self.fallback = fallback
+
+    def available(self):
+        """Проверяет, установлена ли зависимость бэкенда (без её импорта)."""
+        return self.requires is None or importlib.util.find_spec(self.requires) is not None
+
+
+BACKENDS = {}
+DEFAULT_BACKEND = 'html.parser'
+# lxml и selectolax строят дерево по правилам HTML5, поэтому на некорректной разметке результат может
+# отличаться от html.parser. Содержимое <title> и секции CDATA приводятся к html.parser (см. ElementCollector),
+# а известные расхождения остаются:
+# - вложенная <a> закрывает внешнюю, а <p> и блочные элементы закрывают открытый параграф;
+# - </p> без открытого параграфа создаёт пустой параграф (только selectolax).
+
+
+def register_backend(backend):
+    """
+    Регистрирует бэкенд разбора под его именем.
+
+    :param backend: Объект ParserBackend.
+    """
+    BACKENDS[backend.name] = backend
+
+
+def resolve_backend(name=DEFAULT_BACKEND):
+    """
+    Возвращает бэкенд по имени, переходя по цепочке fallback, если он не установлен.
+
+    :param name: Имя бэкенда.
+    :return: Объект ParserBackend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный парсер: {name}. Доступные: {', '.join(BACKENDS)}")
+    backend = BACKENDS[name]
+    while not backend.available():
+        backend = BACKENDS[backend.fallback or DEFAULT_BACKEND]
+    return backend
+
+
+def available_backends():
+    """
+    :return: Список имён бэкендов, зависимости которых установлены.
+    """
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def extract_elements(document, fields=FIELDS):
+    """
+    Извлекает общие элементы из документа любого зарегистрированного бэкенда.
+
+    :param document: Документ, построенный одним из бэкендов (по умолчанию - BeautifulSoup).
+    :param fields: Какие элементы извлекать.
+    :return: Словарь с извлечёнными элементами.
+    """
+    for backend in BACKENDS.values():
+        if backend.document_type is not None and isinstance(document, backend.document_type):
+            return backend.extract(document, fields)
+    return extract_elements_from_soup(document, fields)
+
+
+def beautiful_soup(html_content, features):
+    """
+    :param html_content: HTML-контент.
+    :param features: Парсер BeautifulSoup ('html.parser', 'lxml').
+    :return: Объект BeautifulSoup; bs4 импортируется при первом вызове.
+    """
+    bs4 = require('bs4', 'beautifulsoup4', 'разбора HTML через BeautifulSoup')
+    return bs4.BeautifulSoup(html_content, features)
+
+
+class StreamDocument(str):
+    """HTML-контент, который разбирается потоково при извлечении, без построения дерева."""
+
+
+class SelectolaxDocument:
+    """Обёртка над деревом selectolax (lexbor), разобранным из HTML-контента."""
+
+    def __init__(self, html_content):
+        from selectolax.lexbor import LexborHTMLParser
+        self.tree = LexborHTMLParser(html_content)
+
+
+def _extract_from_selectolax(document, fields=FIELDS):
+    # Обходим дерево lexbor, передавая события в тот же ElementCollector
+    collector = ElementCollector(fields, html5_tree=True)
+    root = document.tree.root
+    if root is None:
+        return collector.result()
+    collector.start(root.tag, root.attributes)
+    pending = [(root.iter(include_text=True), root.tag)]
+    while pending:
+        children, name = pending[-1]
+        node = next(children, None)
+        if node is None:
+            pending.pop()
+            collector.end(name)
+        elif node.is_text_node:
+            collector.data(node.text_content or '')
+            collector.flush_text()
+        elif node.is_comment_node:
+            collector.comment(node.comment_content or '')
+        elif node.is_element_node:
+            collector.start(node.tag, node.attributes)
+            pending.append((node.iter(include_text=True), node.tag))
+    collector.close()
+    return collector.result()
+
+
+register_backend(ParserBackend(
+    'stream', StreamDocument, lambda document, fields=FIELDS: extract_elements_from_html(document, fields),
+    StreamDocument))
+register_backend(ParserBackend(
+    'html.parser', lambda html_content: beautiful_soup(html_content, 'html.parser'),
+    extract_elements_from_soup, None))
+register_backend(ParserBackend(
+    'lxml', lambda html_content: beautiful_soup(html_content, 'lxml'),
+    extract_elements_from_soup, None, requires='lxml', fallback='html.parser'))
+register_backend(ParserBackend(
+    'selectolax', SelectolaxDocument, _extract_from_selectolax, SelectolaxDocument,
+    requires='selectolax', fallback='lxml'))
@@ -0,0 +1,336 @@
+import importlib.util
+import json
+import sys
+from array import array
+from urllib.parse import urlsplit
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ColumnarFile import ColumnarWriter, detect_file_format, read_blocks
+
+# Форматы вывода результатов: text - текст для чтения (print_result), jsonl - запись JSON на страницу,
+# columnar - колоночный файл (Parquet при установленном pyarrow, иначе встроенный формат)
+OUTPUT_FORMATS = ('text', 'jsonl', 'columnar')
+# Число страниц в блоке колоночного файла: страницы блока хранятся в памяти в компактном виде
+DEFAULT_BLOCK_SIZE = 1000
+
+
+def parquet_available():
+    """Проверяет, установлен ли pyarrow (без его импорта)."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def split_url(url):
+    """
+    Делит URL на схему с хостом и остальную часть. Первая часть интернируется: у ссылок
+    множества страниц одни и те же хосты, и строка каждого хоста хранится в памяти один раз.
+
+    :param url: URL или относительная ссылка.
+    :return: Пара (префикс 'схема://хост' или '', остаток); префикс + остаток == url.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return '', url
+    if not parts.netloc:
+        return '', url
+    prefix = f'{parts.scheme}://{parts.netloc}' if parts.scheme else f'//{parts.netloc}'
+    if not url.startswith(prefix):
+        return '', url
+    return sys.intern(prefix), url[len(prefix):]
+
+
+def _split_urls(urls):
+    prefixes, rests = [], []
+    for url in urls:
+        prefix, rest = split_url(url)
+        prefixes.append(prefix)
+        rests.append(rest)
+    return tuple(prefixes), tuple(rests)
+
+
+class CompactPage:
+    """
+    Компактное представление результата анализа страницы: вместо списков словарей - колонки
+    (кортежи строк и массивы чисел), хосты ссылок и изображений интернированы.
+    """
+
+    __slots__ = ('url', 'ok', 'title', 'link_prefixes', 'link_rests', 'link_texts', 'link_counts',
+                 'internal_links', 'base', 'skipped', 'paragraphs', 'image_prefixes', 'image_rests', 'image_alts')
+
+    def __init__(self, url, ok=True, title=None, link_prefixes=(), link_rests=(), link_texts=(), link_counts=None,
+                 internal_links=0, base=None, skipped=0, paragraphs=(), image_prefixes=(), image_rests=(),
+                 image_alts=()):
+        self.url = url
+        self.ok = ok
+        self.title = title
+        self.link_prefixes = link_prefixes
+        self.link_rests = link_rests
+        self.link_texts = link_texts
+        # None - обычный список ссылок 'links', массив - индекс ссылок 'link_index' со счётчиками повторов
+        self.link_counts = link_counts
+        self.internal_links = internal_links
+        self.base = base
+        self.skipped = skipped
+        self.paragraphs = paragraphs
+        self.image_prefixes = image_prefixes
+        self.image_rests = image_rests
+        self.image_alts = image_alts
+
+    @classmethod
+    def from_result(cls, url, result):
+        """
+        :param url: URL страницы.
+        :param result: Результат analyze_html (со списком 'links' или индексом 'link_index') или None.
+        :return: CompactPage.
+        """
+        if result is None:
+            return cls(url, ok=False)
+        page = cls(url, title=result['title'], paragraphs=tuple(result['paragraphs']))
+        if 'link_index' in result:
+            link_index = result['link_index']
+            links = link_index['internal'] + link_index['external']
+            page.link_prefixes, page.link_rests = _split_urls([link['url'] for link in links])
+            page.link_counts = array('I', [link['count'] for link in links])
+            page.internal_links = len(link_index['internal'])
+            page.base = link_index['base']
+            page.skipped = link_index['skipped']
+        else:
+            links = result['links']
+            page.link_prefixes, page.link_rests = _split_urls([link['href'] for link in links])
+        page.link_texts = tuple(link['text'] for link in links)
+        page.image_prefixes, page.image_rests = _split_urls([image['src'] for image in result['images']])
+        page.image_alts = tuple(image['alt'] for image in result['images'])
+        return page
+
+    def to_result(self):
+        """
+        :return: Результат в исходном виде (как у analyze_html) или None для страницы с ошибкой.
+        """
+        if not self.ok:
+            return None
+        hrefs = [prefix + rest for prefix, rest in zip(self.link_prefixes, self.link_rests)]
+        result = {'title': self.title}
+        if self.link_counts is None:
+            result['links'] = [{'text': text, 'href': href} for text, href in zip(self.link_texts, hrefs)]
+        else:
+            links = [{'url': href, 'text': text, 'count': count}
+                     for href, text, count in zip(hrefs, self.link_texts, self.link_counts)]
+            result['link_index'] = {'base': self.base, 'internal': links[:self.internal_links],
+                                    'external': links[self.internal_links:], 'skipped': self.skipped}
+        result['paragraphs'] = list(self.paragraphs)
+        result['images'] = [{'src': prefix + rest, 'alt': alt}
+                            for prefix, rest, alt in zip(self.image_prefixes, self.image_rests, self.image_alts)]
+        return result
+
+
+def pages_to_columns(pages):
+    """
+    :param pages: Список CompactPage.
+    :return: Колонки блока встроенного формата (см. ColumnarWriter.write_block): колонки страниц
+             и плоские колонки ссылок, параграфов и изображений всех страниц с числом элементов на страницу.
+    """
+    columns = {name: [] for name in (
+        'url', 'ok', 'title', 'link_index', 'internal_links', 'base', 'skipped', 'links', 'paragraphs', 'images',
+        'link_prefix', 'link_rest', 'link_text', 'link_count', 'paragraph', 'image_prefix', 'image_rest', 'image_alt')}
+    for page in pages:
+        columns['url'].append(page.url)
+        columns['ok'].append(int(page.ok))
+        columns['title'].append(page.title)
+        columns['link_index'].append(int(page.link_counts is not None))
+        columns['internal_links'].append(page.internal_links)
+        columns['base'].append(page.base)
+        columns['skipped'].append(page.skipped)
+        columns['links'].append(len(page.link_rests))
+        columns['paragraphs'].append(len(page.paragraphs))
+        columns['images'].append(len(page.image_rests))
+        columns['link_prefix'].extend(page.link_prefixes)
+        columns['link_rest'].extend(page.link_rests)
+        columns['link_text'].extend(page.link_texts)
+        columns['link_count'].extend(page.link_counts or [0] * len(page.link_rests))
+        columns['paragraph'].extend(page.paragraphs)
+        columns['image_prefix'].extend(page.image_prefixes)
+        columns['image_rest'].extend(page.image_rests)
+        columns['image_alt'].extend(page.image_alts)
+    kinds = {'ok': 'int', 'link_index': 'int', 'internal_links': 'int', 'skipped': 'int', 'links': 'int',
+             'paragraphs': 'int', 'images': 'int', 'link_count': 'int', 'link_prefix': 'dict', 'image_prefix': 'dict'}
+    return {name: (kinds.get(name, 'str'), values) for name, values in columns.items()}
+
+
+def pages_from_columns(columns):
+    """
+    :param columns: Колонки блока (см. pages_to_columns).
+    :return: Генератор CompactPage.
+    """
+    link = paragraph = image = 0
+    for number, url in enumerate(columns['url']):
+        links, paragraphs, images = columns['links'][number], columns['paragraphs'][number], columns['images'][number]
+        link_slice = slice(link, link + links)
+        image_slice = slice(image, image + images)
+        yield CompactPage(
+            url, bool(columns['ok'][number]), columns['title'][number],
+            tuple(sys.intern(prefix) for prefix in columns['link_prefix'][link_slice]),
+            tuple(columns['link_rest'][link_slice]), tuple(columns['link_text'][link_slice]),
+            array('I', columns['link_count'][link_slice]) if columns['link_index'][number] else None,
+            columns['internal_links'][number], columns['base'][number], columns['skipped'][number],
+            tuple(columns['paragraph'][paragraph:paragraph + paragraphs]),
+            tuple(sys.intern(prefix) for prefix in columns['image_prefix'][image_slice]),
+            tuple(columns['image_rest'][image_slice]), tuple(columns['image_alt'][image_slice]))
+        link += links
+        paragraph += paragraphs
+        image += images
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    link = pa.struct([('prefix', pa.string()), ('rest', pa.string()), ('text', pa.string()), ('count', pa.int64())])
+    image = pa.struct([('prefix', pa.string()), ('rest', pa.string()), ('alt', pa.string())])
+    return pa.schema([
+        ('url', pa.string()), ('ok', pa.bool_()), ('title', pa.string()), ('link_index', pa.bool_()),
+        ('internal_links', pa.int64()), ('base', pa.string()), ('skipped', pa.int64()),
+        ('links', pa.list_(link)), ('paragraphs', pa.list_(pa.string())), ('images', pa.list_(image)),
+    ])
+
+
+def _page_to_row(page):
+    counts = page.link_counts or [0] * len(page.link_rests)
+    return {
+        'url': page.url, 'ok': page.ok, 'title': page.title, 'link_index': page.link_counts is not None,
+        'internal_links': page.internal_links, 'base': page.base, 'skipped': page.skipped,
+        'links': [{'prefix': prefix, 'rest': rest, 'text': text, 'count': count}
+                  for prefix, rest, text, count in zip(page.link_prefixes, page.link_rests, page.link_texts, counts)],
+        'paragraphs': list(page.paragraphs),
+        'images': [{'prefix': prefix, 'rest': rest, 'alt': alt}
+                   for prefix, rest, alt in zip(page.image_prefixes, page.image_rests, page.image_alts)],
+    }
+
+
+def _page_from_row(row):
+    links, images = row['links'], row['images']
+    return CompactPage(
+        row['url'], row['ok'], row['title'],
+        tuple(sys.intern(link['prefix']) for link in links), tuple(link['rest'] for link in links),
+        tuple(link['text'] for link in links),
+        array('I', [link['count'] for link in links]) if row['link_index'] else None,
+        row['internal_links'], row['base'], row['skipped'], tuple(row['paragraphs']),
+        tuple(sys.intern(image['prefix']) for image in images), tuple(image['rest'] for image in images),
+        tuple(image['alt'] for image in images))
+
+
+class JsonlResultWriter:
+    """Записывает результаты в JSONL: строка {'url', 'result'} на страницу (result равен None при ошибке)."""
+
+    def __init__(self, stream, close_stream=False):
+        """
+        :param stream: Текстовый поток для записи.
+        :param close_stream: Закрыть поток в close().
+        """
+        self.stream = stream
+        self.close_stream = close_stream
+
+    def write(self, url, result):
+        self.stream.write(json.dumps({'url': url, 'result': result}, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        if self.close_stream:
+            self.stream.close()
+
+
+class ColumnarResultWriter:
+    """
+    Записывает результаты в колоночный файл блоками по block_size страниц: до записи блока
+    страницы хранятся в компактном виде (CompactPage). Parquet - при установленном pyarrow
+    (словарное кодирование и сжатие колонок выполняет сам Parquet), иначе встроенный формат.
+    """
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE, engine=None):
+        """
+        :param path: Путь к файлу результатов.
+        :param block_size: Число страниц в блоке (группе строк Parquet).
+        :param engine: 'parquet' или 'builtin'; по умолчанию - parquet, если установлен pyarrow.
+        """
+        self.engine = engine or ('parquet' if parquet_available() else 'builtin')
+        self.block_size = block_size
+        self.pages = []
+        if self.engine == 'parquet':
+            import pyarrow.parquet as pq
+            self._schema = _parquet_schema()
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, 'wb')
+            self._writer = ColumnarWriter(self._file)
+
+    def write(self, url, result):
+        self.pages.append(CompactPage.from_result(url, result))
+        if len(self.pages) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленные страницы блоком."""
+        if not self.pages:
+            return
+        if self.engine == 'parquet':
+            import pyarrow as pa
+            self._writer.write_table(pa.Table.from_pylist([_page_to_row(page) for page in self.pages],
+                                                          schema=self._schema))
+        else:
+            self._writer.write_block(pages_to_columns(self.pages))
+        self.pages = []
+
+    def close(self):
+        self.flush()
+        if self.engine == 'parquet':
+            self._writer.close()
+        else:
+            self._file.close()
+
+
+def open_result_writer(output_format, path=None, stream=None):
+    """
+    :param output_format: 'jsonl' или 'columnar' (см. OUTPUT_FORMATS).
+    :param path: Файл результатов; для columnar обязателен.
+    :param stream: Текстовый поток для jsonl, если path не задан (по умолчанию stdout).
+    :return: Объект с методами write(url, result) и close(). Файл, открытый по path, закрывается в close().
+    """
+    if output_format == 'columnar':
+        if path is None:
+            raise ValueError("для формата columnar необходимо указать файл результатов")
+        return ColumnarResultWriter(path)
+    if output_format != 'jsonl':
+        raise ValueError(f"неизвестный формат результатов: {output_format}")
+    if path is None:
+        return JsonlResultWriter(stream or sys.stdout)
+    return JsonlResultWriter(open(path, 'w', encoding='utf-8'), close_stream=True)
+
+
+def read_pages(path):
+    """
+    Читает результаты в компактном виде из файла любого формата (определяется по сигнатуре).
+
+    :param path: Путь к файлу JSONL, Parquet или встроенного колоночного формата.
+    :return: Генератор CompactPage.
+    """
+    file_format = detect_file_format(path)
+    if file_format == 'columnar':
+        with open(path, 'rb') as file:
+            for columns in read_blocks(file):
+                yield from pages_from_columns(columns)
+    elif file_format == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield _page_from_row(row)
+    else:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield CompactPage.from_result(record['url'], record['result'])
+
+
+def read_results(path):
+    """
+    :param path: Путь к файлу результатов (см. read_pages).
+    :return: Генератор пар (url, результат); результат равен None для страниц с ошибкой.
+    """
+    for page in read_pages(path):
+        yield page.url, page.to_result()
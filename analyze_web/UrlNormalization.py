@@ -0,0 +1,132 @@
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+# Порты по умолчанию: в каноническом URL не указываются
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Схемы ссылок, которые ведут на веб-страницы; javascript:, mailto:, tel: и прочие отбрасываются
+PAGE_SCHEMES = ('http', 'https')
+
+
+def normalize_url(url):
+    """
+    Приводит URL к каноническому виду, чтобы варианты записи одного адреса совпадали:
+    схема и хост в нижнем регистре, без порта по умолчанию и фрагмента, пустой путь - '/',
+    параметры запроса отсортированы (их кодирование не меняется).
+
+    :param url: Абсолютный URL.
+    :return: Канонический URL или None, если URL не разбирается.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ''
+    netloc = f'[{host}]' if ':' in host else host
+    if parts.username is not None:
+        userinfo = parts.netloc.rpartition('@')[0]
+        netloc = f'{userinfo}@{netloc}'
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    path = parts.path or ('/' if netloc else '')
+    query = '&'.join(sorted(parts.query.split('&'))) if parts.query else ''
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_host(url):
+    """
+    :param url: Абсолютный URL.
+    :return: Хост в нижнем регистре без порта ('' для URL без хоста).
+    """
+    try:
+        return urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+
+
+def site_of(host):
+    """
+    :param host: Хост.
+    :return: Хост без префикса 'www.': www.example.com и example.com относятся к одному сайту.
+    """
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_same_site(host, sites):
+    """
+    :param host: Хост проверяемого URL.
+    :param sites: Множество сайтов (см. site_of).
+    :return: True, если хост совпадает с одним из сайтов или является его поддоменом.
+    """
+    site = site_of(host)
+    while site:
+        if site in sites:
+            return True
+        site = site.partition('.')[2]
+    return False
+
+
+def resolve_url(href, base_url):
+    """
+    Разрешает значение href относительно базового URL и приводит результат к каноническому виду.
+
+    :param href: Значение атрибута href как оно записано в HTML.
+    :param base_url: Абсолютный базовый URL документа (см. document_base_url).
+    :return: Канонический URL (см. normalize_url) или None для ссылок не на веб-страницы и неразбираемых.
+    """
+    try:
+        url = normalize_url(urljoin(base_url, href.strip()))
+    except ValueError:
+        return None
+    if url is None or urlsplit(url).scheme not in PAGE_SCHEMES:
+        return None
+    return url
+
+
+def document_base_url(page_url, base_href=None):
+    """
+    :param page_url: URL, по которому получена страница.
+    :param base_href: Значение href первого <base> страницы или None.
+    :return: URL, относительно которого разрешаются ссылки страницы.
+    """
+    if not base_href:
+        return page_url
+    try:
+        return urljoin(page_url, base_href.strip())
+    except ValueError:
+        return page_url
+
+
+def build_link_index(links, page_url, base_href=None):
+    """
+    Составляет индекс ссылок страницы: ссылки разрешаются относительно базового URL (с учётом <base href>),
+    приводятся к каноническому виду, повторы объединяются со счётчиком, а ссылки делятся
+    на внутренние (тот же сайт или его поддомен) и внешние.
+
+    :param links: Список словарей {'text', 'href'} (см. extract_links).
+    :param page_url: URL, по которому получена страница.
+    :param base_href: Значение href первого <base> страницы или None.
+    :return: Словарь {'base': базовый URL, 'internal': [...], 'external': [...], 'skipped': число}.
+             Записи ссылок {'url', 'text', 'count'} идут в порядке первого появления, text - первый
+             непустой текст ссылки; skipped - число отброшенных ссылок (javascript:, mailto: и т. п.).
+    """
+    base_url = document_base_url(page_url, base_href)
+    sites = {site_of(url_host(page_url))}
+    entries = {}
+    skipped = 0
+    for link in links:
+        url = resolve_url(link['href'], base_url)
+        if url is None:
+            skipped += 1
+            continue
+        entry = entries.get(url)
+        if entry is None:
+            entries[url] = {'url': url, 'text': link['text'], 'count': 1}
+        else:
+            entry['count'] += 1
+            if not entry['text']:
+                entry['text'] = link['text']
+    index = {'base': base_url, 'internal': [], 'external': [], 'skipped': skipped}
+    for url, entry in entries.items():
+        index['internal' if is_same_site(url_host(url), sites) else 'external'].append(entry)
+    return index
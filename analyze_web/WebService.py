@@ -0,0 +1,202 @@
+import argparse
+import json
+import signal
+import sys
+from FetchPolicy import FetchError, FetchPolicy
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from LocalService import (DEFAULT_ADDRESS, RETRY_AFTER, JsonRequestHandler, ServiceBusy, ServiceClient, WorkerPool,
+                          make_server, parse_address)
+
+# Очередь по умолчанию: запросы сверх неё сразу получают 503, а не копятся без ограничения
+DEFAULT_QUEUE_SIZE = 32
+
+# Состояние процесса-обработчика: сессия с пулом соединений, кэш и политика запросов создаются один раз
+# при его запуске; автомат защиты хостов у каждого процесса свой
+_session = None
+_cache = None
+_policy = None
+
+
+def _init_worker(cache_path, cache_ttl, cache_max_bytes):
+    global _session, _cache, _policy
+    # Библиотеки загрузки и разбора импортируются при первом использовании; в процессе сервиса -
+    # заранее, один раз на процесс, чтобы не задерживать первые запросы
+    from AnalyserWeb import create_session, preload_dependencies
+    from HttpCache import HttpCache
+    preload_dependencies()
+    _policy = FetchPolicy()
+    _session = create_session()
+    _cache = HttpCache(cache_path, ttl=cache_ttl, max_bytes=cache_max_bytes) if cache_path else None
+
+
+def analyze_url(url, parser='stream', resolve_links=False):
+    """
+    Анализирует страницу в процессе-обработчике: результат тот же, что у analyze_web_page,
+    но запрос идёт через сессию, кэш и политику запросов процесса.
+
+    :param url: URL веб-страницы.
+    :param parser: Имя бэкенда разбора.
+    :param resolve_links: Вернуть индекс разрешённых ссылок 'link_index' вместо списка 'links'.
+    :return: Словарь с извлечёнными элементами.
+    :raises FetchError: Если страницу не удалось получить.
+    """
+    from AnalyserWeb import fetch_page, analyze_html
+    html_content = fetch_page(url, _session, cache=_cache, policy=_policy)
+    return analyze_html(html_content, parser, url if resolve_links else None)
+
+
+class WebServiceHandler(JsonRequestHandler):
+    """
+    POST /analyze с телом {"url": ..., "parser": ..., "resolve_links": ...} - анализ страницы;
+    GET /health - состояние сервиса.
+    """
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok', 'workers': self.server.pool.workers})
+        else:
+            self.send_json(404, {'error': "Неизвестный путь"})
+
+    def do_POST(self):
+        body = self.read_body()
+        if body is None:
+            return
+        if self.path != '/analyze':
+            self.send_json(404, {'error': "Неизвестный путь"})
+            return
+        try:
+            request = json.loads(body)
+            url = request['url']
+            if not isinstance(url, str):
+                raise TypeError("url должен быть строкой")
+            parser = request.get('parser', 'stream')
+            resolve_links = bool(request.get('resolve_links', False))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json(400, {'error': f"Некорректный запрос: {e}"})
+            return
+        try:
+            result = self.server.pool.run(analyze_url, url, parser, resolve_links)
+        except ServiceBusy:
+            self.send_json(503, {'url': url, 'error': "Сервис перегружен"}, {'Retry-After': str(RETRY_AFTER)})
+            return
+        except FetchError as e:
+            self.send_json(502, {'url': url, 'result': None, 'error': f"Не удалось получить страницу: {e}",
+                                 'fetch_error': e.to_dict()})
+            return
+        except ValueError as e:
+            self.send_json(400, {'url': url, 'error': str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {'url': url, 'error': f"{type(e).__name__}: {e}"})
+            return
+        if result is None:
+            self.send_json(502, {'url': url, 'result': None, 'error': "Не удалось получить страницу"})
+        else:
+            self.send_json(200, {'url': url, 'result': result, 'error': None})
+
+
+def create_service(address=DEFAULT_ADDRESS, workers=4, queue_size=DEFAULT_QUEUE_SIZE, cache_path=None,
+                   cache_ttl=3600, cache_max_bytes=256 * 1024 * 1024):
+    """
+    Создаёт сервис анализа страниц с прогретыми процессами-обработчиками.
+
+    :param address: 'host:port' (HTTP) или 'unix:ПУТЬ' (Unix-сокет).
+    :param workers: Число процессов-обработчиков.
+    :param queue_size: Сколько запросов может ждать свободного процесса; остальные получают 503.
+    :param cache_path: Путь к файлу HttpCache; None - без кэша.
+    :param cache_ttl: Время жизни записей кэша (см. HttpCache).
+    :param cache_max_bytes: Максимальный размер кэша.
+    :return: Сервер; запуск - serve_forever(), остановка - shutdown(), затем server_close() и pool.close().
+    """
+    pool = WorkerPool(workers, queue_size, _init_worker, (cache_path, cache_ttl, cache_max_bytes))
+    try:
+        server = make_server(address, WebServiceHandler)
+    except Exception:
+        pool.close()
+        raise
+    server.pool = pool
+    return server
+
+
+def analyze_remote(urls, address=DEFAULT_ADDRESS, parser='stream', resolve_links=False, timeout=None):
+    """
+    Анализирует страницы через сервис (не импортируя библиотеки разбора в процесс клиента).
+
+    :param urls: Итерируемый набор URL.
+    :param address: Адрес сервиса.
+    :param parser: Имя бэкенда разбора.
+    :param resolve_links: Вернуть индекс разрешённых ссылок вместо списка ссылок.
+    :param timeout: Таймаут операций с сокетом в секундах.
+    :return: Генератор записей {'url', 'result', 'error'}.
+    """
+    with ServiceClient(address, timeout) as client:
+        for url in urls:
+            request = json.dumps({'url': url, 'parser': parser, 'resolve_links': resolve_links}).encode('utf-8')
+            _, payload = client.request('POST', '/analyze', request, {'Content-Type': 'application/json'})
+            yield {'url': url, 'result': payload.get('result'), 'error': payload.get('error')}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Сервис анализа веб-страниц с прогретыми процессами и его клиент')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Запустить сервис')
+    serve_parser.add_argument('-w', '--workers', type=int, default=4, help='Число процессов-обработчиков')
+    serve_parser.add_argument('-q', '--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                              help='Сколько запросов может ждать свободного процесса; остальные получают 503')
+    serve_parser.add_argument('--no-cache', action='store_true', help='Не использовать дисковый кэш ответов')
+    serve_parser.add_argument('--cache-path', type=str, default=None, help='Путь к файлу кэша ответов')
+    serve_parser.add_argument('--cache-ttl', type=float, default=3600,
+                              help='Время (с), в течение которого ответ из кэша отдаётся без повторной проверки')
+    serve_parser.add_argument('--cache-max-mb', type=float, default=256, help='Максимальный размер кэша в МБ')
+    serve_parser.add_argument('-v', '--verbose', action='store_true', help='Выводить журнал запросов в stderr')
+    client_parser = commands.add_parser('analyze', help='Проанализировать страницы через запущенный сервис')
+    client_parser.add_argument('urls', nargs='*', help='URL веб-страниц')
+    client_parser.add_argument('-i', '--input', type=str, default=None,
+                               help='Файл со списком URL (по одному на строку), "-" - чтение из stdin')
+    client_parser.add_argument('-p', '--parser', type=str, default='stream', help='Бэкенд разбора HTML')
+    client_parser.add_argument('--resolve-links', action='store_true',
+                               help='Выводить индекс разрешённых ссылок вместо списка ссылок')
+    client_parser.add_argument('--timeout', type=float, default=None, help='Таймаут ожидания ответа в секундах')
+    for command_parser in (serve_parser, client_parser):
+        command_parser.add_argument('-a', '--address', type=str, default=DEFAULT_ADDRESS,
+                                    help=f'Адрес сервиса: host:port или unix:ПУТЬ (по умолчанию {DEFAULT_ADDRESS})')
+    args = parser.parse_args()
+    try:
+        parse_address(args.address)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == 'serve':
+        if args.workers < 1:
+            parser.error('--workers должно быть не меньше 1')
+        if args.queue_size < 0:
+            parser.error('--queue-size должно быть не меньше 0')
+        from AnalyserWeb import DEFAULT_CACHE_PATH
+        cache_path = None if args.no_cache else args.cache_path or DEFAULT_CACHE_PATH
+        server = create_service(args.address, args.workers, args.queue_size, cache_path, args.cache_ttl,
+                                int(args.cache_max_mb * 1024 * 1024))
+        server.verbose = args.verbose
+        # Остановка по SIGTERM проходит через finally: процессы завершаются, файл сокета удаляется
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"Сервис запущен: {args.address}, процессов: {args.workers}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            server.pool.close()
+    else:
+        urls = list(args.urls)
+        if args.input == '-':
+            urls.extend(line.strip() for line in sys.stdin if line.strip() and not line.startswith('#'))
+        elif args.input:
+            with open(args.input, encoding='utf-8') as stream:
+                urls.extend(line.strip() for line in stream if line.strip() and not line.startswith('#'))
+        if not urls:
+            parser.error('необходимо указать URL или файл со списком URL (--input)')
+        errors = 0
+        for record in analyze_remote(urls, args.address, args.parser, args.resolve_links, args.timeout):
+            errors += record['error'] is not None
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        sys.exit(1 if errors else 0)
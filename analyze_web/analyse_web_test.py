@@ -4,6 +4,11 @@ from bs4 import BeautifulSoup
 from unittest.mock import patch, MagicMock
 from io import StringIO
 from AnalyserWeb import  fetch_page_content, parse_page_content, extract_title, extract_links, extract_paragraphs, extract_images
+from AnalyserWeb import analyze_web_pages, read_urls, DEFAULT_TIMEOUT
+from AnalyserWeb import iter_web_page_elements, analyze_web_page_stream
+from ElementExtraction import extract_elements_from_html, extract_elements_from_soup, ElementCollector, StreamingHTMLParser
+import threading
+import time
 
 class TestFetchPageContent(unittest.TestCase):
     
@@ -49,6 +54,17 @@ class TestFetchPageContent(unittest.TestCase):
         fetch_page_content("http://example.com")
         self.assertIn(f"Ошибка при получении страницы: {mock_get.side_effect.args[0]}", mock_stdout.getvalue())
 
+    @patch('requests.get')
+    def test_fetch_page_content_with_session(self, mock_get):
+        """Проверка, что при переданной сессии запрос идёт через неё"""
+        session = MagicMock()
+        session.get.return_value.text = "<html></html>"
+
+        content = fetch_page_content("http://test_4.com", session=session)
+        self.assertEqual(content, "<html></html>")
+        session.get.assert_called_once_with("http://test_4.com", timeout=DEFAULT_TIMEOUT)
+        mock_get.assert_not_called()
+
 
 class TestParsePageContent(unittest.TestCase):
     def test_parse_page_content_with_empty_string(self):
@@ -122,6 +138,23 @@ class TestExtractLinks(unittest.TestCase):
                                             </html>
                                             """, 
                                             'html.parser')
+
+        self.html_with_relative_links = BeautifulSoup("""
+                                            <html>
+                                            <head><base href="/docs/"></head>
+                                            <body>
+                                                <a href="intro.html#start">Введение</a>
+                                                <a href="HTTP://Example.COM:80/docs/intro.html">Ещё раз</a>
+                                                <a href="/api?b=2&amp;a=1"></a>
+                                                <a href="/api?a=1&amp;b=2">API</a>
+                                                <a href="https://blog.example.com/">Блог</a>
+                                                <a href="//other.org/page">Другой сайт</a>
+                                                <a href="mailto:me@example.com">Почта</a>
+                                                <a href="javascript:void(0)">Скрипт</a>
+                                            </body>
+                                            </html>
+                                            """,
+                                            'html.parser')
         return super().setUp()
         
 
@@ -146,6 +179,19 @@ class TestExtractLinks(unittest.TestCase):
         self.assertEqual(links[0], {'text': 'Ссылка на пример', 'href': 'https://example.com'})
         self.assertEqual(links[1], {'text': 'Ссылка на Google', 'href': 'https://google.com'})
 
+    def test_extract_links_with_page_url(self):
+        """Проверка индекса ссылок: разрешение относительно <base href>, канонический вид, повторы и счётчики"""
+        index = extract_links(self.html_with_relative_links, 'https://example.com/index.html')
+        self.assertEqual(index['base'], 'https://example.com/docs/')
+        self.assertEqual(index['internal'], [
+            {'url': 'https://example.com/docs/intro.html', 'text': 'Введение', 'count': 1},
+            {'url': 'http://example.com/docs/intro.html', 'text': 'Ещё раз', 'count': 1},
+            {'url': 'https://example.com/api?a=1&b=2', 'text': 'API', 'count': 2},
+            {'url': 'https://blog.example.com/', 'text': 'Блог', 'count': 1},
+        ])
+        self.assertEqual(index['external'], [{'url': 'https://other.org/page', 'text': 'Другой сайт', 'count': 1}])
+        self.assertEqual(index['skipped'], 2)
+
     def test_extract_links_with_none_soup(self):
         """Проверка на некорректный аргумент"""
         with self.assertRaises(AttributeError):
@@ -300,5 +346,255 @@ class TestExtractImages(unittest.TestCase):
         with self.assertRaises(AttributeError):
             extract_images(None)
 
+class TestAnalyzeWebPages(unittest.TestCase):
+    PAGES = {
+        "http://a.com/1": "<html><head><title>A1</title></head><body><p>Первый</p></body></html>",
+        "http://a.com/2": "<html><head><title>A2</title></head><body></body></html>",
+        "http://b.com/1": "<html><head><title>B1</title></head><body><img src='b.png'></body></html>",
+    }
+
+    @patch('AnalyserWeb.fetch_page_content')
+    def test_analyze_web_pages_returns_all_results(self, mock_fetch):
+        """Проверка, что пакетный режим возвращает результат для каждого URL"""
+        mock_fetch.side_effect = lambda url, *args: self.PAGES[url]
+        results = dict(analyze_web_pages(list(self.PAGES), concurrency=2))
+
+        self.assertEqual(set(results), set(self.PAGES))
+        self.assertEqual(results["http://a.com/1"]['title'], "A1")
+        self.assertEqual(results["http://a.com/1"]['paragraphs'], ["Первый"])
+        self.assertEqual(results["http://b.com/1"]['images'], [{'src': 'b.png', 'alt': ''}])
+
+    @patch('AnalyserWeb.fetch_page_content')
+    def test_analyze_web_pages_with_failed_page(self, mock_fetch):
+        """Проверка, что ошибка загрузки одной страницы не прерывает пакет"""
+        mock_fetch.side_effect = lambda url, *args: None if url == "http://a.com/2" else self.PAGES[url]
+        results = dict(analyze_web_pages(list(self.PAGES)))
+
+        self.assertIsNone(results["http://a.com/2"])
+        self.assertEqual(results["http://b.com/1"]['title'], "B1")
+
+    @patch('AnalyserWeb.fetch_page_content')
+    def test_analyze_web_pages_per_host_limit(self, mock_fetch):
+        """Проверка ограничения числа одновременных запросов к одному хосту"""
+        mock_fetch.side_effect, state = self.make_slow_fetch()
+        urls = [f"http://a.com/{i}" for i in range(8)]
+        results = list(analyze_web_pages(urls, concurrency=8, per_host=2))
+
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(state['max_active']['a.com'], 2)
+
+    @patch('AnalyserWeb.fetch_page_content')
+    def test_analyze_web_pages_host_sorted_input(self, mock_fetch):
+        """Проверка, что занятый хост не блокирует загрузку страниц других хостов"""
+        mock_fetch.side_effect, state = self.make_slow_fetch()
+        urls = [f"http://{host}.com/{i}" for host in "abcd" for i in range(10)]
+        results = list(analyze_web_pages(urls, concurrency=4, per_host=1))
+
+        self.assertEqual(len(results), 40)
+        self.assertGreater(state['max_total'], 1)
+        self.assertTrue(all(count == 1 for count in state['max_active'].values()))
+
+    @patch('AnalyserWeb.fetch_page_content')
+    def test_analyze_web_pages_early_close(self, mock_fetch):
+        """Проверка остановки пакетного режима до получения всех результатов"""
+        mock_fetch.side_effect, _ = self.make_slow_fetch()
+        results = analyze_web_pages([f"http://a.com/{i}" for i in range(20)], concurrency=4, per_host=4)
+        url, _ = next(results)
+        results.close()
+        self.assertTrue(url.startswith("http://a.com/"))
+
+    def test_analyze_web_pages_invalid_concurrency(self):
+        """Проверка отказа при нулевом числе одновременных запросов"""
+        with self.assertRaises(ValueError):
+            list(analyze_web_pages(["http://a.com"], concurrency=0))
+
+    @staticmethod
+    def make_slow_fetch():
+        lock = threading.Lock()
+        state = {'active': {}, 'max_active': {}, 'total': 0, 'max_total': 0}
+
+        def slow_fetch(url, *args):
+            host = url.split('/')[2]
+            with lock:
+                state['active'][host] = state['active'].get(host, 0) + 1
+                state['max_active'][host] = max(state['max_active'].get(host, 0), state['active'][host])
+                state['total'] += 1
+                state['max_total'] = max(state['max_total'], state['total'])
+            time.sleep(0.02)
+            with lock:
+                state['active'][host] -= 1
+                state['total'] -= 1
+            return "<html></html>"
+
+        return slow_fetch, state
+
+
+def extract_with_find_all(soup):
+    """Эталонное извлечение через find_all, как было до однопроходного движка."""
+    return {
+        'title': soup.title.string.strip() if soup.title and soup.title.string else "Нет заголовка",
+        'links': [{'text': a.text.strip(), 'href': a['href']} for a in soup.find_all('a', href=True)],
+        'paragraphs': [p.text.strip() for p in soup.find_all('p')],
+        'images': [{'src': img.get('src', ''), 'alt': img.get('alt', '')} for img in soup.find_all('img')],
+    }
+
+
+class TestElementExtraction(unittest.TestCase):
+    CASES = {
+        'nested_unclosed': "<p>Первый <a href='/a'>ссылка <a href='/b'>вложенная</a><p>Второй<div>текст</div>",
+        'stray_end_tags': "<div><p>текст</div>после</p><a href='x'>a</span>b</a>",
+        'script_in_paragraph': "<p>до<script>var x = '<b>';</script>после<style>p {}</style></p>",
+        'whitespace_nodes': "<p>a<b>x</b>   <i>y</i>\n\t<i>z</i></p><pre><p>a<b>x</b>   <i>y</i></p></pre>",
+        'cdata': "<p>a<![CDATA[b]]>c<script><![CDATA[d]]></script></p>",
+        'comment_pi_doctype': "<!DOCTYPE html><p>a<!-- c -->b<?pi?>c</p>",
+        'title_with_tags': "<html><head><title><b>Жирный</b></title></head></html>",
+        'title_with_mixed_content': "<title>a<b>b</b></title>",
+        'title_with_comment': "<title>a<!-- c -->b</title>",
+        'title_with_tags_and_entities': "<title><b>a &amp;lt; b</b></title>",
+        'entities_and_void': "<p>&amp; &lt;tag&gt;<br>x</br>y</p><img src='1.png'></img><img alt='без src'>",
+        'repeated_void_end_tags': "<p>a<br><br>b</br>c</br>d</br>e<img src='1.png'></img></img></p>",
+        'empty_href': "<a href>пустая</a><a>без href</a><a href=''>пустая строка</a>",
+    }
+
+    def test_extract_elements_from_html_matches_beautifulsoup(self):
+        """Проверка совпадения потокового извлечения с BeautifulSoup"""
+        for name, html in self.CASES.items():
+            with self.subTest(name):
+                expected = extract_with_find_all(BeautifulSoup(html, 'html.parser'))
+                self.assertEqual(extract_elements_from_html(html), expected)
+
+    def test_extract_elements_from_soup_matches_beautifulsoup(self):
+        """Проверка совпадения однопроходного обхода дерева с BeautifulSoup"""
+        for name, html in self.CASES.items():
+            with self.subTest(name):
+                soup = BeautifulSoup(html, 'html.parser')
+                self.assertEqual(extract_elements_from_soup(soup), extract_with_find_all(soup))
+
+    def test_extract_elements_with_fields_subset(self):
+        """Проверка извлечения только запрошенных элементов"""
+        html = "<title>T</title><p>Параграф</p><a href='/a'>A</a><img src='i.png'>"
+        result = extract_elements_from_html(html, fields=('title', 'images'))
+        self.assertEqual(result, {'title': 'T', 'images': [{'src': 'i.png', 'alt': ''}]})
+
+        soup = BeautifulSoup(html, 'html.parser')
+        self.assertEqual(extract_elements_from_soup(soup, fields=('paragraphs',)), {'paragraphs': ['Параграф']})
+
+    def test_extract_elements_from_html_in_chunks(self):
+        """Проверка, что разбиение текста между вызовами data() не меняет результат"""
+        html = self.CASES['whitespace_nodes'] + self.CASES['title_with_comment']
+        collector = ElementCollector()
+        parser = StreamingHTMLParser(collector)
+        for i in range(0, len(html), 3):
+            parser.feed(html[i:i + 3])
+        parser.close()
+        self.assertEqual(collector.result(), extract_elements_from_html(html))
+
+
+class TestElementCollectorCallback(unittest.TestCase):
+    def test_on_element_receives_elements_when_closed(self):
+        """Проверка, что обработчик получает элементы по мере закрытия и списки не заполняются"""
+        events = []
+        collector = ElementCollector(on_element=lambda kind, value: events.append((kind, value)))
+        parser = StreamingHTMLParser(collector)
+        parser.feed("<title>T</title><p>Текст <a href='/a'>ссылка</a></p><img src='i.png'>")
+        parser.close()
+
+        self.assertEqual(events, [
+            ('links', {'text': 'ссылка', 'href': '/a'}),
+            ('paragraphs', 'Текст ссылка'),
+            ('images', {'src': 'i.png', 'alt': ''}),
+        ])
+        self.assertEqual((collector.links, collector.paragraphs, collector.images), ([], [], []))
+        self.assertEqual(collector.title, 'T')
+
+
+class TestStreamingAnalysis(unittest.TestCase):
+    PAGE = ("<html><head><title>Большая страница</title></head><body>"
+            + "".join(f"<p>Параграф {i}</p><a href='/{i}'>Ссылка {i}</a>" for i in range(50))
+            + "<img src='last.png' alt='Последнее'></body></html>").encode('utf-8')
+
+    def make_response(self, body, chunk_size=37):
+        response = MagicMock()
+        response.encoding = 'utf-8'
+        # Разбиваем тело так, чтобы многобайтовые символы попадали на границу частей
+        response.iter_content.side_effect = lambda **kwargs: (
+            body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        return response
+
+    @patch('requests.get')
+    def test_stream_matches_full_analysis(self, mock_get):
+        """Проверка, что потоковый разбор частями даёт тот же результат, что и обычный"""
+        mock_get.return_value = self.make_response(self.PAGE)
+        result = analyze_web_page_stream("http://big.com")
+
+        expected = extract_elements_from_html(self.PAGE.decode('utf-8'))
+        self.assertIsNone(result.pop('truncated'))
+        self.assertEqual(result, expected)
+        self.assertTrue(mock_get.call_args.kwargs['stream'])
+        mock_get.return_value.close.assert_called_once()
+
+    @patch('requests.get')
+    def test_stream_max_bytes(self, mock_get):
+        """Проверка остановки чтения по лимиту байт"""
+        mock_get.return_value = self.make_response(self.PAGE)
+        result = analyze_web_page_stream("http://big.com", max_bytes=300)
+
+        self.assertEqual(result['truncated'], 'max_bytes')
+        self.assertEqual(result['title'], "Большая страница")
+        self.assertLess(len(result['paragraphs']), 50)
+        self.assertEqual(result['images'], [])
+
+    @patch('requests.get')
+    def test_stream_max_elements(self, mock_get):
+        """Проверка остановки разбора по лимиту элементов"""
+        mock_get.return_value = self.make_response(self.PAGE)
+        events = list(iter_web_page_elements("http://big.com", max_elements=5))
+
+        self.assertEqual(len([kind for kind, _ in events if kind in ('links', 'paragraphs', 'images')]), 5)
+        self.assertEqual(events[-1], ('truncated', 'max_elements'))
+        mock_get.return_value.close.assert_called_once()
+
+    @patch('sys.stdout', new_callable=StringIO)
+    @patch('requests.get')
+    def test_stream_request_error(self, mock_get, mock_stdout):
+        """Проверка ошибки запроса в потоковом режиме"""
+        mock_get.side_effect = requests.exceptions.ConnectionError("Connection error")
+        result = analyze_web_page_stream("http://down.com")
+
+        self.assertIsNone(result)
+        self.assertIn("Ошибка при получении страницы: Connection error", mock_stdout.getvalue())
+
+    @patch('requests.get')
+    def test_stream_error_mid_body(self, mock_get):
+        """Проверка обрыва чтения тела: разобранное отдаётся, в конце отметка ('truncated', 'error')"""
+        def broken_body(**kwargs):
+            yield self.PAGE[:400]
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+        mock_get.return_value = self.make_response(self.PAGE)
+        mock_get.return_value.iter_content.side_effect = broken_body
+        errors = []
+        events = list(iter_web_page_elements("http://big.com", on_error=errors.append))
+
+        self.assertEqual(events[-1], ('truncated', 'error'))
+        self.assertIn(('title', "Большая страница"), events)
+        self.assertIn(('paragraphs', "Параграф 0"), events)
+        self.assertEqual([(error.kind, error.url) for error in errors], [('connection', "http://big.com")])
+        mock_get.return_value.close.assert_called_once()
+
+        errors = []
+        result = analyze_web_page_stream("http://big.com", on_error=errors.append)
+        self.assertEqual(result['truncated'], 'error')
+        self.assertLess(len(result['paragraphs']), 50)
+        self.assertEqual(len(errors), 1)
+
+
+class TestReadUrls(unittest.TestCase):
+    def test_read_urls_skips_empty_lines_and_comments(self):
+        """Проверка чтения списка URL из потока"""
+        stream = StringIO("http://a.com\n\n# комментарий\n  http://b.com  \n")
+        self.assertEqual(list(read_urls(stream)), ["http://a.com", "http://b.com"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+import unittest
+from BenchmarkWeb import run_benchmarks, compare_results, make_fixture
+from AnalyserWeb import analyze_html
+
+
+def make_results(**stages):
+    """Создаёт результаты замеров {этап: (время, пиковая память)}."""
+    return {'results': {name: {'seconds': seconds, 'peak_bytes': peak} for name, (seconds, peak) in stages.items()}}
+
+
+class TestBenchmarkWeb(unittest.TestCase):
+    def test_fixture_contains_all_elements(self):
+        """Проверка, что тестовая страница содержит все извлекаемые элементы"""
+        result = analyze_html(make_fixture(3))
+        self.assertEqual(result['title'], 'Тестовая страница')
+        self.assertEqual((len(result['links']), len(result['paragraphs']), len(result['images'])), (12, 6, 3))
+
+    def test_run_measures_every_stage_locally(self):
+        """Проверка замеров загрузки с локального сервера, разбора и каждой функции extract_*"""
+        results = run_benchmarks(sizes=['small'], repeat=1, backends=['stream'])['results']
+        self.assertEqual(set(results), {'fetch/small', 'parse/stream/small', 'analyze_html/stream/small',
+                                        'extract_title/small', 'extract_links/small', 'extract_paragraphs/small',
+                                        'extract_images/small', 'extract_common_elements/small'})
+        self.assertGreater(results['fetch/small']['bytes'], 0)
+        self.assertGreater(results['analyze_html/stream/small']['peak_bytes'], 0)
+
+    def test_compare_flags_regressions(self):
+        """Проверка поиска регрессий: порог в долях и минимальная значимая разница"""
+        baseline = make_results(slow=(1.0, 1000000), noisy=(0.0001, 1000), same=(0.5, 2000000), new_only=(1, 1))
+        current = make_results(slow=(1.2, 1300000), noisy=(0.0005, 5000), same=(0.52, 2000000))
+        rows = {(row['name'], row['metric']): row['regression'] for row in compare_results(baseline, current)}
+        self.assertEqual(rows, {('slow', 'seconds'): True, ('slow', 'peak_bytes'): True,
+                                ('noisy', 'seconds'): False, ('noisy', 'peak_bytes'): False,
+                                ('same', 'seconds'): False, ('same', 'peak_bytes'): False})
+
+
+if __name__ == '__main__':
+    unittest.main()
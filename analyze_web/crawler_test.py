@@ -0,0 +1,148 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from Crawler import CrawlFrontier, RobotsCache, crawl, run_crawl
+from FetchPolicy import FetchError
+
+# Сайт для обхода: URL -> HTML
+SITE = {
+    'http://example.com/': '<title>Главная</title><a href="/a">A</a><a href="b?y=2&x=1#top">B</a>'
+                           '<a href="http://other.org/">Чужой</a><a href="mailto:me@example.com">Почта</a>',
+    'http://example.com/a': '<title>A</title><a href="http://EXAMPLE.com:80/">Назад</a><a href="/a/deep">Глубже</a>',
+    'http://example.com/b?x=1&y=2': '<title>B</title><a href="/private/page">Закрытая</a>',
+    'http://example.com/a/deep': '<title>Глубоко</title><a href="/a/deeper">Ещё глубже</a>',
+    'http://example.com/private/page': '<title>Закрытая</title>',
+}
+
+
+def fake_fetch(url, session=None, timeout=None, cache=None, policy=None, on_error=None):
+    """Имитирует fetch_page_content по словарю SITE."""
+    return SITE.get(url)
+
+
+def make_session(robots_text=None, status_code=200):
+    """Создаёт сессию, которая отдаёт robots.txt с заданным содержимым."""
+    session = MagicMock()
+    session.get.return_value = MagicMock(status_code=status_code if robots_text is not None else 404,
+                                         text=robots_text or "")
+    return session
+
+
+class TestCrawlFrontier(unittest.TestCase):
+    def test_priority_dedup_and_politeness(self):
+        """Проверка порядка выдачи, отсева повторов и паузы между запросами к одному хосту"""
+        frontier = CrawlFrontier(delay=10)
+        self.assertTrue(frontier.add('http://a.com/2', 2))
+        self.assertTrue(frontier.add('http://a.com/1', 1))
+        self.assertTrue(frontier.add('http://b.com/3', 3))
+        self.assertFalse(frontier.add('http://a.com/1', 0))
+
+        first = frontier.next(now=0)
+        self.assertEqual(first[1:], ('http://a.com/1', 1))
+        # Хост a.com занят - выдаётся другой хост, даже с худшим приоритетом
+        self.assertEqual(frontier.next(now=0)[1:], ('http://b.com/3', 3))
+        self.assertIsNone(frontier.next(now=0))
+        frontier.finish(first[0], first[1], now=0)
+        self.assertIsNone(frontier.next(now=5))
+        self.assertEqual(frontier.next_ready_time(), 10)
+        self.assertEqual(frontier.next(now=10)[1:], ('http://a.com/2', 2))
+        frontier.close()
+
+    def test_state_on_disk_survives_restart(self):
+        """Проверка продолжения обхода из файла состояния: невыполненные URL возвращаются в очередь"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state', 'crawl.sqlite3')
+            frontier = CrawlFrontier(path)
+            frontier.add('http://a.com/', 0)
+            frontier.add('http://b.com/', 0)
+            frontier.commit()
+            entry = frontier.next(now=0)
+            frontier.finish(entry[0], entry[1], now=0)
+            frontier.next(now=0)
+            frontier.close()
+
+            frontier = CrawlFrontier(path)
+            self.assertEqual(len(frontier), 1)
+            self.assertFalse(frontier.add(entry[1], 0))
+            self.assertIsNotNone(frontier.next(now=0))
+            frontier.close()
+
+
+class TestRobotsCache(unittest.TestCase):
+    def test_rules_loaded_once_per_host(self):
+        """Проверка правил robots.txt и их кэширования по хосту"""
+        session = make_session("User-agent: *\nDisallow: /private\nCrawl-delay: 3\n")
+        robots = RobotsCache(session)
+
+        self.assertTrue(robots.allowed('http://example.com/a'))
+        self.assertFalse(robots.allowed('http://example.com/private/page'))
+        self.assertEqual(robots.crawl_delay('http://example.com/'), 3.0)
+        session.get.assert_called_once()
+        self.assertEqual(session.get.call_args.args[0], 'http://example.com/robots.txt')
+
+    def test_missing_and_forbidden_robots(self):
+        """Проверка отсутствующего (всё разрешено) и закрытого (всё запрещено) robots.txt"""
+        self.assertTrue(RobotsCache(make_session()).allowed('http://example.com/a'))
+        self.assertFalse(RobotsCache(make_session("", status_code=403)).allowed('http://example.com/a'))
+
+
+@patch('Crawler.fetch_page_content', side_effect=fake_fetch)
+class TestCrawl(unittest.TestCase):
+    def crawl(self, **options):
+        options.setdefault('session', make_session("User-agent: *\nDisallow: /private\n"))
+        return {record['url']: record for record in crawl(['http://example.com'], delay=0, **options)}
+
+    def test_follows_links_once(self, mock_fetch):
+        """Проверка обхода: ссылки разрешаются и нормализуются, каждая страница загружается один раз"""
+        records = self.crawl(max_depth=2)
+
+        self.assertEqual(set(records), {'http://example.com/', 'http://example.com/a', 'http://example.com/b?x=1&y=2',
+                                        'http://example.com/a/deep', 'http://example.com/private/page'})
+        self.assertEqual(records['http://example.com/a/deep']['depth'], 2)
+        self.assertEqual(records['http://example.com/a']['result']['title'], 'A')
+        self.assertEqual(records['http://example.com/private/page']['error'], "Запрещено robots.txt")
+        fetched = [call.args[0] for call in mock_fetch.call_args_list]
+        self.assertEqual(len(fetched), len(set(fetched)))
+        self.assertNotIn('http://example.com/private/page', fetched)
+        self.assertNotIn('http://other.org/', fetched)
+
+    def test_limits(self, mock_fetch):
+        """Проверка ограничений глубины и числа страниц"""
+        self.assertEqual(set(self.crawl(max_depth=0)), {'http://example.com/'})
+        self.assertEqual(len(self.crawl(max_depth=5, max_pages=2)), 2)
+
+    def test_other_sites_and_robots_optional(self, mock_fetch):
+        """Проверка обхода других сайтов и отключения robots.txt"""
+        records = self.crawl(max_depth=1, same_site=False, respect_robots=False)
+
+        self.assertIn('http://other.org/', records)
+        self.assertEqual(records['http://other.org/']['error'], "Не удалось получить страницу")
+
+    def test_fetch_error_in_record(self, mock_fetch):
+        """Проверка: ошибка загрузки попадает в запись обхода и передаётся в on_error"""
+        def failing_fetch(url, session=None, timeout=None, cache=None, policy=None, on_error=None):
+            on_error(FetchError(url, 'http', "код ответа 503", status=503, attempts=3))
+
+        mock_fetch.side_effect = failing_fetch
+        errors = []
+        records = self.crawl(max_depth=0, on_error=errors.append)
+
+        self.assertEqual(records['http://example.com/']['error'],
+                         "Не удалось получить страницу: код ответа 503 (попыток: 3)")
+        self.assertEqual([error.status for error in errors], [503])
+
+    def test_run_crawl_writes_jsonl(self, mock_fetch):
+        """Проверка записи результатов обхода в JSONL"""
+        output = io.StringIO()
+        stats = run_crawl(['http://example.com'], output, max_depth=0, delay=0, session=make_session())
+
+        self.assertEqual(stats, {'pages': 1, 'errors': 0})
+        record = json.loads(output.getvalue())
+        self.assertEqual((record['url'], record['result']['title']), ('http://example.com/', 'Главная'))
+
+
+if __name__ == '__main__':
+    unittest.main()
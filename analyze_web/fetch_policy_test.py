@@ -0,0 +1,151 @@
+import pickle
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+import requests
+from FetchPolicy import FetchError, FetchPolicy, TokenBucket, CircuitBreaker, parse_retry_after
+from AnalyserWeb import fetch_page, fetch_page_content
+
+
+def make_response(status_code, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {}, text=f"<html>{status_code}</html>")
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_parse_retry_after(self):
+        """Проверка разбора Retry-After: секунды, дата HTTP, отсутствующее и некорректное значение"""
+        now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertEqual(parse_retry_after("Mon, 01 Jan 2024 12:00:30 GMT", now=now), 30.0)
+        self.assertEqual(parse_retry_after("Mon, 01 Jan 2024 11:00:00 GMT", now=now), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("скоро"))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_rate_and_burst(self):
+        """Проверка ограничителя: burst запросов сразу, затем по одному за 1/rate секунд в порядке очереди"""
+        bucket = TokenBucket(rate=2, capacity=2)
+        self.assertEqual([bucket.reserve(now=0) for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+        # За секунду набрались два токена, но оба уже обещаны ожидающим запросам
+        self.assertEqual(bucket.reserve(now=1), 0.5)
+        self.assertEqual(bucket.reserve(now=10), 0.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_half_open_close(self):
+        """Проверка автомата: размыкание после ошибок подряд, один пробный запрос, замыкание при успехе"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure(now=0)
+        self.assertTrue(breaker.allow(now=0))
+        breaker.record_failure(now=1)
+        self.assertFalse(breaker.allow(now=5))
+        self.assertEqual(breaker.retry_in(now=5), 6)
+        self.assertTrue(breaker.allow(now=11))
+        self.assertFalse(breaker.allow(now=11))
+        # Неудачный пробный запрос снова размыкает автомат
+        breaker.record_failure(now=12)
+        self.assertFalse(breaker.allow(now=20))
+        self.assertTrue(breaker.allow(now=22))
+        breaker.record_success()
+        self.assertTrue(breaker.allow(now=22))
+        self.assertEqual(breaker.failures, 0)
+
+
+@patch('FetchPolicy.time.sleep')
+class TestFetchPolicy(unittest.TestCase):
+    def test_retries_until_success(self, mock_sleep):
+        """Проверка повторов при кодах 5xx и ошибке соединения с паузами в пределах backoff * 2^попытка"""
+        get = MagicMock(side_effect=[make_response(503), requests.exceptions.ConnectionError("reset"),
+                                     make_response(200)])
+        policy = FetchPolicy(retries=3, backoff=1)
+        self.assertEqual(policy.request(get, "http://a.com/", timeout=5).status_code, 200)
+        self.assertEqual(get.call_count, 3)
+        get.assert_called_with("http://a.com/", timeout=5)
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 1 and 0 <= delays[1] <= 2)
+
+    def test_retry_after_and_give_up(self, mock_sleep):
+        """Проверка паузы по Retry-After и структурированной ошибки после всех попыток"""
+        get = MagicMock(return_value=make_response(429, {'Retry-After': '7'}))
+        with self.assertRaises(FetchError) as context:
+            FetchPolicy(retries=2).request(get, "http://a.com/")
+        error = context.exception
+        self.assertEqual((error.kind, error.status, error.attempts, error.retry_after), ('http', 429, 3, 7.0))
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [7.0, 7.0])
+        # Слишком долгая пауза по Retry-After - запрос не повторяется
+        get = MagicMock(return_value=make_response(503, {'Retry-After': '3600'}))
+        with self.assertRaises(FetchError):
+            FetchPolicy(retries=2).request(get, "http://b.com/")
+        self.assertEqual(get.call_count, 1)
+
+    def test_non_retryable(self, mock_sleep):
+        """Проверка: ответы 4xx возвращаются без повторов, ошибка самого запроса не повторяется"""
+        get = MagicMock(return_value=make_response(404))
+        self.assertEqual(FetchPolicy().request(get, "http://a.com/").status_code, 404)
+        get = MagicMock(side_effect=requests.exceptions.InvalidURL("bad url"))
+        with self.assertRaises(FetchError) as context:
+            FetchPolicy().request(get, "http://a.com/")
+        self.assertEqual(context.exception.kind, 'request')
+        self.assertEqual(get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    def test_circuit_breaker_per_host(self, mock_sleep):
+        """Проверка: после ошибок подряд запросы к хосту не выполняются, другие хосты не затронуты"""
+        def get(url, **options):
+            if 'down.com' in url:
+                raise requests.exceptions.ConnectTimeout("timed out")
+            return make_response(200)
+
+        get = MagicMock(side_effect=get)
+        policy = FetchPolicy(retries=0, failure_threshold=2, reset_timeout=60)
+        for _ in range(2):
+            with self.assertRaises(FetchError) as context:
+                policy.request(get, "http://down.com/page")
+            self.assertEqual(context.exception.kind, 'timeout')
+        with self.assertRaises(FetchError) as context:
+            policy.request(get, "http://DOWN.com/other")
+        self.assertEqual(context.exception.kind, 'circuit_open')
+        self.assertGreater(context.exception.retry_after, 0)
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(policy.request(get, "http://up.com/").status_code, 200)
+
+    def test_host_rate_limit(self, mock_sleep):
+        """Проверка ограничения частоты запросов к хосту"""
+        get = MagicMock(return_value=make_response(200))
+        policy = FetchPolicy(rate=1, burst=1)
+        with patch('FetchPolicy.time.monotonic', return_value=100.0):
+            for url in ("http://a.com/1", "http://a.com/2", "http://b.com/1"):
+                policy.request(get, url)
+        mock_sleep.assert_called_once_with(1.0)
+
+
+class TestFetchPage(unittest.TestCase):
+    @patch('FetchPolicy.time.sleep')
+    @patch('requests.get')
+    def test_fetch_page_structured_errors(self, mock_get, mock_sleep):
+        """Проверка: fetch_page выбрасывает FetchError, fetch_page_content передаёт её в on_error"""
+        mock_get.return_value = make_response(404)
+        mock_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
+        with self.assertRaises(FetchError) as context:
+            fetch_page("http://a.com/")
+        self.assertEqual((context.exception.kind, context.exception.status), ('http', 404))
+
+        mock_get.return_value = make_response(502)
+        errors = []
+        policy = FetchPolicy(retries=1)
+        self.assertIsNone(fetch_page_content("http://a.com/", policy=policy, on_error=errors.append))
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(errors[0].to_dict(), {'url': "http://a.com/", 'kind': 'http', 'message': "код ответа 502",
+                                               'status': 502, 'attempts': 2, 'retry_after': None})
+        self.assertEqual(str(errors[0]), "код ответа 502 (попыток: 2)")
+
+    def test_fetch_error_pickles(self):
+        """Проверка передачи FetchError между процессами"""
+        error = pickle.loads(pickle.dumps(FetchError("http://a.com/", 'timeout', "timed out", attempts=3)))
+        self.assertEqual((error.kind, error.attempts, str(error)), ('timeout', 3, "timed out (попыток: 3)"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from AnalyserWeb import fetch_page_content
+from HttpCache import HttpCache, parse_cache_control, freshness_lifetime
+
+
+def make_response(status_code=200, text="", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache', 'http.sqlite3')
+        self.cache = HttpCache(self.path, ttl=60, max_bytes=100)
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_store_and_lookup(self):
+        """Проверка сохранения и чтения записи"""
+        self.cache.store("http://a.com", "<html>A</html>", etag='"1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        entry = self.cache.lookup("http://a.com")
+        self.assertEqual(entry.body, "<html>A</html>")
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertEqual(entry.conditional_headers(), {
+            'If-None-Match': '"1"',
+            'If-Modified-Since': "Mon, 01 Jan 2024 00:00:00 GMT",
+        })
+        self.assertIsNone(self.cache.lookup("http://b.com"))
+
+    def test_cache_persists_on_disk(self):
+        """Проверка, что записи доступны после повторного открытия кэша"""
+        self.cache.store("http://a.com", "A")
+        self.cache.close()
+        self.cache = HttpCache(self.path)
+        self.assertEqual(self.cache.lookup("http://a.com").body, "A")
+
+    def test_lru_eviction(self):
+        """Проверка вытеснения давно не использованных записей при превышении размера"""
+        with patch('HttpCache.time.time', side_effect=range(1, 100)):
+            self.cache.store("http://a.com", "a" * 40)
+            self.cache.store("http://b.com", "b" * 40)
+            self.cache.lookup("http://a.com")
+            self.cache.store("http://c.com", "c" * 40)
+
+        self.assertIsNotNone(self.cache.lookup("http://a.com"))
+        self.assertIsNone(self.cache.lookup("http://b.com"))
+        self.assertIsNotNone(self.cache.lookup("http://c.com"))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertLessEqual(self.cache.size(), 100)
+
+    def test_clear(self):
+        """Проверка очистки кэша"""
+        self.cache.store("http://a.com", "A")
+        self.cache.clear()
+        self.assertIsNone(self.cache.lookup("http://a.com"))
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_cache_control(self):
+        """Проверка Cache-Control: no-store не сохраняется, max-age и no-cache задают время свежести"""
+        self.assertEqual(parse_cache_control('Public, max-age="30", no-cache'),
+                         {'public': None, 'max-age': '30', 'no-cache': None})
+        self.assertEqual(freshness_lifetime(parse_cache_control('max-age=30')), 30.0)
+        self.assertEqual(freshness_lifetime(parse_cache_control('max-age=abc')), 0.0)
+        self.assertIsNone(freshness_lifetime(parse_cache_control(None)))
+
+        self.cache.store("http://a.com", "A")
+        self.cache.store("http://a.com", "A2", cache_control='private, no-store')
+        self.assertIsNone(self.cache.lookup("http://a.com"))
+        self.assertEqual(self.cache.size(), 0)
+
+        self.cache.store("http://b.com", "B", cache_control='max-age=0')
+        self.assertFalse(self.cache.is_fresh(self.cache.lookup("http://b.com")))
+        self.cache.store("http://c.com", "C", cache_control='no-cache')
+        self.assertFalse(self.cache.is_fresh(self.cache.lookup("http://c.com")))
+        self.cache.ttl = 0
+        self.cache.store("http://d.com", "D", cache_control='max-age=600')
+        self.assertTrue(self.cache.is_fresh(self.cache.lookup("http://d.com")))
+        # Ответ 304 без Cache-Control сохраняет время свежести, с Cache-Control - заменяет
+        self.cache.refresh("http://d.com")
+        self.assertEqual(self.cache.lookup("http://d.com").max_age, 600)
+        self.cache.refresh("http://d.com", 'no-cache')
+        self.assertFalse(self.cache.is_fresh(self.cache.lookup("http://d.com")))
+
+    def test_lookup_defers_access_time(self):
+        """Проверка: обращения не пишутся в файл по одному, а записываются при сохранении и закрытии"""
+        with patch('HttpCache.time.time', return_value=10):
+            self.cache.store("http://a.com", "A")
+        with patch('HttpCache.time.time', return_value=20):
+            self.cache.lookup("http://a.com")
+
+        def accessed_at():
+            with sqlite3.connect(self.path) as db:
+                return db.execute("SELECT accessed_at FROM responses WHERE url = 'http://a.com'").fetchone()[0]
+
+        self.assertEqual(accessed_at(), 10)
+        self.cache.store("http://b.com", "B")
+        self.assertEqual(accessed_at(), 20)
+        with patch('HttpCache.time.time', return_value=30):
+            self.cache.lookup("http://a.com")
+        self.cache.close()
+        self.assertEqual(accessed_at(), 30)
+        self.cache = HttpCache(self.path)
+
+    def test_size_is_shared_between_connections(self):
+        """Проверка суммарного размера: замена и удаление записей, второй процесс с тем же файлом"""
+        other = HttpCache(self.path, max_bytes=100)
+        try:
+            self.cache.store("http://a.com", "a" * 30)
+            other.store("http://b.com", "b" * 30)
+            self.cache.store("http://a.com", "a" * 10)
+            self.assertEqual((self.cache.size(), other.size()), (40, 40))
+            # Вытесняется самая давно использованная запись, сохранённая другим соединением
+            other.store("http://c.com", "c" * 70)
+            self.assertEqual(other.size(), 80)
+            self.assertIsNone(self.cache.lookup("http://b.com"))
+            other.discard("http://c.com")
+            self.assertEqual(self.cache.size(), 10)
+        finally:
+            other.close()
+
+    def test_opens_cache_of_previous_version(self):
+        """Проверка открытия файла кэша прежней версии: без времени свежести и счётчика размера"""
+        path = os.path.join(self.tmp.name, 'old.sqlite3')
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE responses (url TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, "
+                       "last_modified TEXT, stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)")
+            db.execute("INSERT INTO responses VALUES ('http://a.com', 'AAA', NULL, NULL, 1, 1, 3)")
+        db.close()
+        cache = HttpCache(path)
+        try:
+            self.assertEqual(cache.size(), 3)
+            self.assertIsNone(cache.lookup("http://a.com").max_age)
+        finally:
+            cache.close()
+
+
+class TestFetchPageContentWithCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(os.path.join(self.tmp.name, 'http.sqlite3'), ttl=60)
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    @patch('requests.get')
+    def test_miss_stores_response(self, mock_get):
+        """Проверка сохранения ответа при промахе"""
+        mock_get.return_value = make_response(text="<html>A</html>", headers={'ETag': '"v1"'})
+
+        self.assertEqual(fetch_page_content("http://a.com", cache=self.cache), "<html>A</html>")
+        self.assertEqual(self.cache.lookup("http://a.com").etag, '"v1"')
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    @patch('requests.get')
+    def test_fresh_hit_skips_request(self, mock_get):
+        """Проверка, что свежая запись отдаётся без запроса"""
+        self.cache.store("http://a.com", "<html>A</html>")
+
+        self.assertEqual(fetch_page_content("http://a.com", cache=self.cache), "<html>A</html>")
+        mock_get.assert_not_called()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    @patch('requests.get')
+    def test_stale_entry_revalidated_with_304(self, mock_get):
+        """Проверка условного запроса и ответа 304 для устаревшей записи"""
+        self.cache.ttl = 0
+        self.cache.store("http://a.com", "<html>A</html>", etag='"v1"')
+        mock_get.return_value = make_response(status_code=304)
+
+        self.assertEqual(fetch_page_content("http://a.com", cache=self.cache), "<html>A</html>")
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(self.cache.stats()['revalidations'], 1)
+
+    @patch('requests.get')
+    def test_response_cache_control(self, mock_get):
+        """Проверка: ответ с no-store не кэшируется, max-age из ответа задаёт свежесть записи"""
+        mock_get.return_value = make_response(text="<html>A</html>", headers={'Cache-Control': 'no-store'})
+        self.assertEqual(fetch_page_content("http://a.com", cache=self.cache), "<html>A</html>")
+        self.assertIsNone(self.cache.lookup("http://a.com"))
+
+        mock_get.return_value = make_response(text="<html>B</html>", headers={'Cache-Control': 'max-age=0'})
+        fetch_page_content("http://b.com", cache=self.cache)
+        fetch_page_content("http://b.com", cache=self.cache)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('requests.get')
+    def test_stale_entry_replaced_when_changed(self, mock_get):
+        """Проверка замены устаревшей записи, если страница изменилась"""
+        self.cache.ttl = 0
+        self.cache.store("http://a.com", "<html>A</html>", etag='"v1"')
+        mock_get.return_value = make_response(text="<html>B</html>", headers={'ETag': '"v2"'})
+
+        self.assertEqual(fetch_page_content("http://a.com", cache=self.cache), "<html>B</html>")
+        entry = self.cache.lookup("http://a.com")
+        self.assertEqual((entry.body, entry.etag), ("<html>B</html>", '"v2"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Instrumentation import enable, disable
+from AnalyserWeb import analyze_html
+
+
+class TestAnalyzerStages(unittest.TestCase):
+    def tearDown(self):
+        disable()
+        return super().tearDown()
+
+    def test_analyzer_stages(self):
+        """Проверка замеров этапов анализа страницы"""
+        enable()
+        analyze_html("<title>T</title><p>a</p>", 'html.parser')
+        summary = disable()
+        self.assertEqual(set(summary), {'parse_page_content', 'analyze_html'})
+        self.assertEqual(summary['parse_page_content']['bytes_in'], 24)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
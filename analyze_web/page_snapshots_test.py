@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from AnalyserWeb import analyze_html, analyze_web_page_changes, analyze_web_pages
+from PageSnapshots import SnapshotStore, analyze_changes, diff_elements, normalize_html
+
+PAGE = ("<html><head><title>Мониторинг</title></head><body>"
+        "<p>Первый <a href='/a'>A</a></p><p>Второй</p><img src='1.png' alt='один'></body></html>")
+
+
+def make_response(text):
+    response = MagicMock()
+    response.status_code = 200
+    response.text = text
+    response.headers = {}
+    return response
+
+
+class TestPageSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmp.name, 'state', 'snapshots.sqlite3'))
+        return super().setUp()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_normalize_ignores_comments_and_whitespace(self):
+        """Проверка, что комментарии и пробельные символы не меняют нормализованный HTML"""
+        self.assertEqual(normalize_html("<p>a  <!-- x -->\n b</p> "), normalize_html("<p>a \tb</p>"))
+
+    def test_diff_counts_repeated_elements(self):
+        """Проверка сравнения списков как мультимножеств"""
+        added, removed = diff_elements(['a', 'b', 'b', 'c'], ['b', 'c', 'd', 'c'])
+        self.assertEqual((added, removed), (['c', 'd'], ['a', 'b']))
+
+    def test_unchanged_page_is_not_parsed(self):
+        """Проверка, что страница с тем же нормализованным HTML не разбирается повторно"""
+        first = analyze_changes("http://a.com", PAGE, self.store, analyze_html)
+        self.assertEqual(first['status'], 'new')
+        self.assertEqual(first['title'], 'Мониторинг')
+        self.assertEqual(len(first['added']['paragraphs']), 2)
+        analyze = MagicMock()
+        record = analyze_changes("http://a.com", PAGE.replace("Первый ", "Первый\n  ") + "<!-- 12:00 -->", self.store, analyze)
+        self.assertEqual(record, {'url': "http://a.com", 'status': 'unchanged', 'added': {}, 'removed': {}})
+        analyze.assert_not_called()
+
+    def test_only_changes_are_reported(self):
+        """Проверка, что выводятся только добавленные и удалённые элементы и смена заголовка"""
+        analyze_changes("http://a.com", PAGE, self.store, analyze_html)
+        page = PAGE.replace("<p>Второй</p>", "<p>Третий <a href='/b'>B</a></p>").replace("Мониторинг", "Новый")
+        record = analyze_changes("http://a.com", page, self.store, analyze_html)
+        self.assertEqual(record['status'], 'changed')
+        self.assertEqual((record['title'], record['previous_title']), ('Новый', 'Мониторинг'))
+        self.assertEqual(record['added'], {'links': [{'text': 'B', 'href': '/b'}], 'paragraphs': ['Третий B']})
+        self.assertEqual(record['removed'], {'paragraphs': ['Второй']})
+
+    def test_other_link_mode_is_treated_as_new(self):
+        """Проверка, что результат с другим видом ссылок не сравнивается с прежним"""
+        analyze_changes("http://a.com", PAGE, self.store, analyze_html, mode='links')
+        record = analyze_changes("http://a.com", PAGE, self.store, analyze_html, mode='link_index')
+        self.assertEqual(record['status'], 'new')
+
+    @patch('requests.get')
+    def test_page_and_batch_changes(self, mock_get):
+        """Проверка инкрементального анализа одной страницы и набора страниц"""
+        mock_get.return_value = make_response(PAGE)
+        record = analyze_web_page_changes("http://a.com/", self.store, resolve_links=True)
+        self.assertEqual(record['added']['links'], [{'url': 'http://a.com/a', 'text': 'A', 'count': 1}])
+        session = MagicMock()
+        session.get.return_value = make_response(PAGE)
+        results = dict(analyze_web_pages(["http://a.com/"], session=session, resolve_links=True,
+                                         snapshots=self.store))
+        self.assertEqual(results["http://a.com/"]['status'], 'unchanged')
+
+
+if __name__ == '__main__':
+    unittest.main()
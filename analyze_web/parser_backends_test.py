@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+import analyse_web_test
+from AnalyserWeb import parse_page_content, extract_common_elements, analyze_html
+from ParserBackends import BACKENDS, resolve_backend, available_backends, StreamDocument
+
+# Тестовые классы analyse_web_test, фикстуры которых прогоняются через каждый бэкенд
+FIXTURE_TEST_CASES = [
+    analyse_web_test.TestExtractTitle,
+    analyse_web_test.TestExtractLinks,
+    analyse_web_test.TestExtractParagraphs,
+    analyse_web_test.TestExtractImages,
+]
+
+SAMPLE_PAGE = """
+<!DOCTYPE html>
+<html>
+<head><title> Тестовая страница </title></head>
+<body>
+    <h1>Заголовок</h1>
+    <p>Первый <b>параграф</b> с <a href="/one">ссылкой</a>.</p>
+    <p>Второй &amp; последний<!-- комментарий --> параграф</p>
+    <div><a href="https://example.com/two?x=1&amp;y=2">Вторая   ссылка</a><a name="anchor">якорь</a></div>
+    <img src="image1.png" alt="Первое изображение">
+    <img src="image2.png">
+    <script>var p = "<p>не параграф</p>";</script>
+</body>
+</html>
+"""
+
+# Известные расхождения с html.parser на фикстурах TestElementExtraction.CASES: lxml и selectolax строят дерево
+# по правилам HTML5 (см. комментарий к BACKENDS в ParserBackends). Значение - результат этих бэкендов
+KNOWN_DIFFERENCES = {
+    # Вложенная <a> закрывает внешнюю, новый <p> и <div> закрывают открытый параграф
+    'nested_unclosed': ({'lxml', 'selectolax'}, {
+        'title': 'Нет заголовка',
+        'links': [{'text': 'ссылка', 'href': '/a'}, {'text': 'вложенная', 'href': '/b'}],
+        'paragraphs': ['Первый ссылка вложенная', 'Второй'],
+        'images': [],
+    }),
+    # </p> без открытого параграфа создаёт пустой параграф
+    'stray_end_tags': ({'selectolax'}, {
+        'title': 'Нет заголовка',
+        'links': [{'text': 'ab', 'href': 'x'}],
+        'paragraphs': ['текст', ''],
+        'images': [],
+    }),
+}
+
+
+def make_backend_test_case(test_case, backend_name):
+    """Создаёт копию тестового класса, в которой фикстуры разбираются указанным бэкендом."""
+
+    def setUp(self):
+        backend = resolve_backend(backend_name)
+        with patch.object(analyse_web_test, 'BeautifulSoup', lambda html, features=None: backend.parse(html)):
+            test_case.setUp(self)
+
+    name = f"{test_case.__name__}_{backend_name.replace('.', '_')}"
+    return type(name, (test_case,), {'setUp': setUp})
+
+
+for _backend_name in BACKENDS:
+    for _test_case in FIXTURE_TEST_CASES:
+        _generated = make_backend_test_case(_test_case, _backend_name)
+        globals()[_generated.__name__] = _generated
+del _backend_name, _test_case, _generated
+
+
+class TestParserBackends(unittest.TestCase):
+    def test_all_backends_return_identical_output(self):
+        """Проверка, что все бэкенды дают одинаковый результат на корректной странице"""
+        expected = extract_common_elements(BeautifulSoup(SAMPLE_PAGE, 'html.parser'))
+        for name in BACKENDS:
+            with self.subTest(name):
+                self.assertEqual(extract_common_elements(parse_page_content(SAMPLE_PAGE, name)), expected)
+                self.assertEqual(analyze_html(SAMPLE_PAGE, name), expected)
+
+    def test_backends_match_html_parser_on_edge_cases(self):
+        """Проверка всех установленных бэкендов на фикстурах разбора: расхождения только известные"""
+        for case, html in analyse_web_test.TestElementExtraction.CASES.items():
+            expected = analyse_web_test.extract_with_find_all(BeautifulSoup(html, 'html.parser'))
+            for name in available_backends():
+                with self.subTest(case=case, backend=name):
+                    backends, difference = KNOWN_DIFFERENCES.get(case, ((), None))
+                    self.assertEqual(analyze_html(html, name), difference if name in backends else expected)
+
+    def test_parse_page_content_default_backend(self):
+        """Проверка, что по умолчанию строится дерево BeautifulSoup с html.parser"""
+        self.assertIsInstance(parse_page_content(SAMPLE_PAGE), BeautifulSoup)
+
+    def test_stream_backend_does_not_build_tree(self):
+        """Проверка, что потоковый бэкенд не строит дерево"""
+        self.assertIsInstance(parse_page_content(SAMPLE_PAGE, 'stream'), StreamDocument)
+
+    def test_unknown_backend(self):
+        """Проверка на неизвестное имя бэкенда"""
+        with self.assertRaises(ValueError):
+            parse_page_content(SAMPLE_PAGE, 'unknown')
+
+    @patch('importlib.util.find_spec', return_value=None)
+    def test_fallback_when_backend_not_installed(self, mock_find_spec):
+        """Проверка перехода на html.parser, если lxml и selectolax не установлены"""
+        self.assertEqual(resolve_backend('selectolax').name, 'html.parser')
+        self.assertEqual(resolve_backend('lxml').name, 'html.parser')
+        self.assertEqual(available_backends(), ['stream', 'html.parser'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from AnalyserWeb import analyze_html
+from BenchmarkWeb import make_fixture
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ColumnarFile import detect_file_format
+from ResultFormats import CompactPage, ColumnarResultWriter, open_result_writer, read_results, split_url
+
+
+class TestResultFormats(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.results = [('http://a.com/1', analyze_html(make_fixture(3))),
+                        ('http://a.com/2', analyze_html(make_fixture(2), page_url='http://a.com/2')),
+                        ('http://a.com/3', None)]
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_split_url_interns_hosts(self):
+        """Проверка разделения URL на интернированный префикс с хостом и остаток"""
+        self.assertEqual(split_url('https://Example.org/a?b'), ('https://Example.org', '/a?b'))
+        self.assertEqual(split_url('/a'), ('', '/a'))
+        self.assertIs(split_url('http://h.com/' + 'a')[0], split_url('http://h.com/' + 'b')[0])
+
+    def test_compact_page_roundtrip(self):
+        """Проверка, что компактное представление восстанавливает исходный результат"""
+        for url, result in self.results:
+            self.assertEqual(CompactPage.from_result(url, result).to_result(), result)
+
+    def test_files_roundtrip(self):
+        """Проверка записи и чтения результатов в JSONL и встроенном колоночном формате"""
+        for output_format in ('jsonl', 'columnar'):
+            path = os.path.join(self.tmp.name, f'results.{output_format}')
+            if output_format == 'columnar':
+                writer = ColumnarResultWriter(path, block_size=2, engine='builtin')
+            else:
+                writer = open_result_writer(output_format, path)
+            for url, result in self.results:
+                writer.write(url, result)
+            writer.close()
+            self.assertEqual(detect_file_format(path), output_format)
+            self.assertEqual(list(read_results(path)), self.results)
+
+    def test_columnar_requires_path(self):
+        """Проверка, что колоночный формат не пишется в stdout"""
+        with self.assertRaises(ValueError):
+            open_result_writer('columnar')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from UrlNormalization import normalize_url, is_same_site, resolve_url, build_link_index
+
+
+class TestUrlNormalization(unittest.TestCase):
+    def test_normalize_url(self):
+        """Проверка приведения вариантов записи URL к одному виду"""
+        self.assertEqual(normalize_url('HTTP://Example.COM:80'), 'http://example.com/')
+        self.assertEqual(normalize_url('https://example.com:443/a?b=2&a=1#frag'), 'https://example.com/a?a=1&b=2')
+        self.assertEqual(normalize_url('http://example.com:8080/a'), 'http://example.com:8080/a')
+        self.assertIsNone(normalize_url('http://example.com:port/'))
+
+    def test_same_site(self):
+        """Проверка принадлежности хоста сайту с учётом www и поддоменов"""
+        self.assertTrue(is_same_site('www.example.com', {'example.com'}))
+        self.assertTrue(is_same_site('blog.example.com', {'example.com'}))
+        self.assertFalse(is_same_site('example.com.evil.org', {'example.com'}))
+
+    def test_resolve_url(self):
+        """Проверка разрешения относительных ссылок и отсева ссылок не на веб-страницы"""
+        base = 'http://example.com/a/b.html'
+        self.assertEqual(resolve_url('  ../c?y=1&x=2#top ', base), 'http://example.com/c?x=2&y=1')
+        self.assertEqual(resolve_url('#top', base), base)
+        self.assertEqual(resolve_url('', base), base)
+        for href in ('mailto:me@example.com', 'javascript:void(0)', 'tel:+7000', 'http://[::1'):
+            self.assertIsNone(resolve_url(href, base), href)
+
+    def test_link_index_with_www(self):
+        """Проверка, что ссылки на www-вариант сайта считаются внутренними, а текст берётся первый непустой"""
+        links = [{'text': '', 'href': 'http://www.example.com/'}, {'text': 'Главная', 'href': '/'}]
+        index = build_link_index(links, 'http://example.com/page', base_href='http://www.example.com/')
+        self.assertEqual(index['internal'], [{'url': 'http://www.example.com/', 'text': 'Главная', 'count': 2}])
+        self.assertEqual((index['external'], index['skipped']), ([], 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import threading
+import unittest
+from AnalyserWeb import analyze_web_page
+from BenchmarkWeb import make_fixture, serve_fixtures
+from WebService import analyze_remote, create_service
+
+
+class TestWebService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.address = f"unix:{os.path.join(cls.directory.name, 'web.sock')}"
+        cls.fixtures = serve_fixtures({'page': make_fixture(3)})
+        cls.service = create_service(cls.address, workers=1)
+        threading.Thread(target=cls.service.serve_forever, daemon=True).start()
+        host, port = cls.fixtures.server_address
+        cls.base_url = f'http://{host}:{port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+        cls.service.server_close()
+        cls.service.pool.close()
+        cls.fixtures.shutdown()
+        cls.fixtures.server_close()
+        cls.directory.cleanup()
+
+    def test_result_matches_direct_analysis(self):
+        """Проверка, что сервис возвращает тот же результат, что и analyze_web_page"""
+        url = f'{self.base_url}/page'
+        for resolve_links in (False, True):
+            records = list(analyze_remote([url], self.address, resolve_links=resolve_links, timeout=30))
+            expected = analyze_web_page(url, resolve_links=resolve_links)
+            self.assertEqual(records, [{'url': url, 'result': expected, 'error': None}])
+
+    def test_unavailable_page_is_reported_as_error(self):
+        """Проверка, что недоступная страница возвращается записью с ошибкой, а не прерывает обработку"""
+        url = f'{self.base_url}/missing'
+        records = list(analyze_remote([url, f'{self.base_url}/page'], self.address, timeout=30))
+        self.assertIsNone(records[0]['result'])
+        self.assertIsNotNone(records[0]['error'])
+        self.assertIsNone(records[1]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
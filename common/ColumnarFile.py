@@ -0,0 +1,167 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+# Сигнатура встроенного колоночного формата и сигнатура Parquet (для определения формата файла)
+MAGIC = b'CLMN1\n'
+PARQUET_MAGIC = b'PAR1'
+# Типы колонок: str - строки (допускается None), dict - строки со словарным кодированием (для часто
+# повторяющихся значений, например хостов), int - целые числа (int64), float - числа double
+COLUMN_KINDS = ('str', 'dict', 'int', 'float')
+# Длина строки None в колонке str
+NULL_LENGTH = -1
+_HEADER = struct.Struct('<I')
+
+
+def _to_bytes(values):
+    # Числа хранятся в little-endian независимо от платформы
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _encode_strings(values):
+    encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+    lengths = array('i', [NULL_LENGTH if value is None else len(data) for value, data in zip(values, encoded)])
+    return _to_bytes(lengths) + b''.join(encoded)
+
+
+def _decode_strings(data, length):
+    lengths = _from_bytes('i', data[:length * 4])
+    blob = data[length * 4:]
+    values = []
+    position = 0
+    for size in lengths:
+        if size == NULL_LENGTH:
+            values.append(None)
+            continue
+        values.append(blob[position:position + size].decode('utf-8'))
+        position += size
+    return values
+
+
+def encode_column(kind, values):
+    """
+    :param kind: Тип колонки (см. COLUMN_KINDS).
+    :param values: Значения колонки.
+    :return: Сжатое содержимое колонки.
+    """
+    if kind == 'str':
+        data = _encode_strings(values)
+    elif kind == 'dict':
+        positions = {}
+        indices = array('I', [positions.setdefault(value, len(positions)) for value in values])
+        unique = _encode_strings(list(positions))
+        data = _HEADER.pack(len(positions)) + _HEADER.pack(len(unique)) + unique + _to_bytes(indices)
+    elif kind == 'int':
+        data = _to_bytes(array('q', values))
+    elif kind == 'float':
+        data = _to_bytes(array('d', values))
+    else:
+        raise ValueError(f"неизвестный тип колонки: {kind}")
+    return zlib.compress(data)
+
+
+def decode_column(kind, payload, length):
+    """
+    :param kind: Тип колонки (см. COLUMN_KINDS).
+    :param payload: Сжатое содержимое колонки (см. encode_column).
+    :param length: Число значений.
+    :return: Список значений.
+    """
+    data = zlib.decompress(payload)
+    if kind == 'str':
+        return _decode_strings(data, length)
+    if kind == 'dict':
+        count = _HEADER.unpack_from(data, 0)[0]
+        size = _HEADER.unpack_from(data, _HEADER.size)[0]
+        start = 2 * _HEADER.size
+        unique = _decode_strings(data[start:start + size], count)
+        return [unique[index] for index in _from_bytes('I', data[start + size:])]
+    if kind == 'int':
+        return _from_bytes('q', data).tolist()
+    if kind == 'float':
+        return _from_bytes('d', data).tolist()
+    raise ValueError(f"неизвестный тип колонки: {kind}")
+
+
+class ColumnarWriter:
+    """
+    Запись встроенного колоночного формата: после сигнатуры идут независимые блоки,
+    каждый - заголовок JSON с описанием колонок и сжатые колонки. Колонки блока могут
+    иметь разную длину (например, колонка страниц и колонка ссылок всех страниц блока).
+    """
+
+    def __init__(self, stream):
+        """
+        :param stream: Двоичный поток для записи.
+        """
+        self.stream = stream
+        self.stream.write(MAGIC)
+
+    def write_block(self, columns):
+        """
+        :param columns: Словарь {имя: (тип, список значений)}.
+        """
+        header = []
+        payloads = []
+        for name, (kind, values) in columns.items():
+            payload = encode_column(kind, values)
+            header.append([name, kind, len(values), len(payload)])
+            payloads.append(payload)
+        header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        self.stream.write(_HEADER.pack(len(header)) + header + b''.join(payloads))
+        self.stream.flush()
+
+
+def read_blocks(stream):
+    """
+    Читает блоки встроенного колоночного формата.
+
+    :param stream: Двоичный поток, начинающийся с сигнатуры MAGIC.
+    :return: Генератор словарей {имя колонки: список значений}.
+    :raises ValueError: Если поток не начинается с сигнатуры или блок оборван.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("файл не в колоночном формате")
+    while True:
+        size = stream.read(_HEADER.size)
+        if not size:
+            return
+        if len(size) < _HEADER.size:
+            raise ValueError("оборванный блок колоночного файла")
+        header_size = _HEADER.unpack(size)[0]
+        header = stream.read(header_size)
+        if len(header) < header_size:
+            raise ValueError("оборванный блок колоночного файла")
+        columns = {}
+        for name, kind, length, payload_size in json.loads(header):
+            payload = stream.read(payload_size)
+            if len(payload) < payload_size:
+                raise ValueError("оборванный блок колоночного файла")
+            columns[name] = decode_column(kind, payload, length)
+        yield columns
+
+
+def detect_file_format(path):
+    """
+    :param path: Путь к файлу результатов.
+    :return: 'columnar' (встроенный формат), 'parquet' или 'jsonl'.
+    """
+    with open(path, 'rb') as file:
+        head = file.read(len(MAGIC))
+    if head == MAGIC:
+        return 'columnar'
+    if head.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    return 'jsonl'
@@ -0,0 +1,41 @@
+import importlib
+
+
+class MissingDependencyError(ImportError):
+    """Не установлен пакет, без которого недоступна запрошенная возможность."""
+
+
+def require(module, package=None, purpose=None):
+    """
+    Импортирует модуль при первом использовании возможности, которой он нужен: тяжёлые зависимости
+    не замедляют запуск программы, если не используются. Повторные вызовы берут модуль из sys.modules.
+
+    :param module: Имя модуля, например 'pdfminer.high_level'.
+    :param package: Имя пакета для pip install; по умолчанию - первая часть имени модуля.
+    :param purpose: Для чего нужен модуль (для сообщения об ошибке).
+    :return: Модуль.
+    :raises MissingDependencyError: Если не установлен модуль или его собственная зависимость.
+    """
+    try:
+        return importlib.import_module(module)
+    except ModuleNotFoundError as e:
+        package = package or module.split('.')[0]
+        needed = f" для {purpose}" if purpose else ""
+        raise MissingDependencyError(f"не установлен пакет {package}{needed} (pip install {package}): {e}",
+                                     name=e.name) from e
+
+
+def preload(modules):
+    """
+    Импортирует установленные модули заранее, например в прогреваемых процессах-обработчиках сервиса.
+
+    :param modules: Имена модулей.
+    :return: Список модулей, которые не удалось импортировать.
+    """
+    missing = []
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            missing.append(module)
+    return missing
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+DEFAULT_REPEAT = 5
+# Допустимый рост времени импорта относительно базовых результатов (доля) и минимальная
+# разница, которая считается регрессией: запуск интерпретатора слишком шумный для долей миллисекунды
+TIME_THRESHOLD = 0.20
+MIN_TIME_DELTA = 0.005
+# Сколько самых долгих импортов верхнего уровня сохранять в результатах
+TOP_IMPORTS = 10
+
+
+def parse_importtime(output):
+    """
+    Разбирает вывод python -X importtime.
+
+    :param output: Текст stderr интерпретатора.
+    :return: Список кортежей (модуль, собственное время в мкс, время с вложенными импортами в мкс,
+             уровень вложенности); 0 - импорт верхнего уровня.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Строка заголовка
+            continue
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        imports.append((module, int(fields[0]), int(fields[1]), (len(name) - len(module) - 1) // 2))
+    return imports
+
+
+def measure_startup(directory, script, args=('--help',), repeat=DEFAULT_REPEAT, forbidden=()):
+    """
+    Замеряет запуск точки входа в отдельном интерпретаторе с -X importtime.
+
+    :param directory: Каталог программы.
+    :param script: Имя файла точки входа в каталоге программы.
+    :param args: Аргументы запуска.
+    :param repeat: Число запусков; время - лучшее из них.
+    :param forbidden: Пакеты, которые не должны импортироваться при запуске.
+    :return: Словарь: 'seconds' - время запуска, 'import_seconds' - суммарное время импортов,
+             'modules' - число импортированных модулей, 'top' - самые долгие импорты верхнего уровня
+             [модуль, мкс], 'forbidden' - импортированные пакеты из forbidden.
+    :raises RuntimeError: Если точка входа завершилась с ошибкой.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-X', 'importtime', script, *args], cwd=directory,
+                                   capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if completed.returncode != 0:
+            raise RuntimeError(f"{script} завершился с кодом {completed.returncode}: {completed.stderr[-500:]}")
+        imports = parse_importtime(completed.stderr)
+        import_seconds = sum(own for _, own, _, _ in imports) / 1e6
+        if best is None or import_seconds < best['import_seconds']:
+            top = sorted(((module, total) for module, _, total, depth in imports if depth == 0),
+                         key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+            packages = {module.split('.')[0] for module, _, _, _ in imports}
+            best = {'seconds': elapsed, 'import_seconds': import_seconds, 'modules': len(imports),
+                    'top': [list(item) for item in top],
+                    'forbidden': sorted(packages.intersection(forbidden))}
+        else:
+            best['seconds'] = min(best['seconds'], elapsed)
+    return best
+
+
+def run_benchmarks(directory, entry_points, names=None, repeat=DEFAULT_REPEAT):
+    """
+    Замеряет запуск точек входа программы со --help.
+
+    :param directory: Каталог программы.
+    :param entry_points: Словарь {файл точки входа: пакеты, которые не должны импортироваться при запуске}.
+    :param names: Имена файлов замеряемых точек входа; по умолчанию - все из entry_points.
+    :param repeat: Число запусков каждой точки входа.
+    :return: Словарь результатов: {'tool', 'created', 'python', 'platform', 'repeat', 'results'};
+             results - {точка входа: замер (см. measure_startup)}.
+    """
+    results = {name: measure_startup(directory, name, repeat=repeat, forbidden=entry_points.get(name, ()))
+               for name in names or entry_points}
+    return {
+        'tool': os.path.basename(directory),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def check_results(current, baseline=None, time_threshold=TIME_THRESHOLD):
+    """
+    Проверяет результаты замеров: тяжёлые пакеты при запуске и рост времени импорта относительно базовых.
+
+    :param current: Результаты замеров (см. run_benchmarks).
+    :param baseline: Базовые результаты или None.
+    :param time_threshold: Допустимый рост суммарного времени импорта (доля).
+    :return: Список описаний нарушений.
+    """
+    problems = []
+    for name, result in current['results'].items():
+        if result['forbidden']:
+            problems.append(f"{name}: при запуске импортируются {', '.join(result['forbidden'])}")
+        base = (baseline or {}).get('results', {}).get(name)
+        if base is None:
+            continue
+        old, new = base['import_seconds'], result['import_seconds']
+        if old and new / old > 1 + time_threshold and new - old > MIN_TIME_DELTA:
+            problems.append(f"{name}: время импорта {old * 1000:.1f} -> {new * 1000:.1f} мс ({new / old - 1:+.0%})")
+    return problems
+
+
+def print_results(results, stream=None):
+    """
+    Выводит таблицу замеров.
+
+    :param results: Результаты замеров (см. run_benchmarks).
+    :param stream: Текстовый поток для вывода; по умолчанию sys.stdout.
+    """
+    stream = stream or sys.stdout
+    print(f"{'точка входа':<24} {'запуск, мс':>11} {'импорт, мс':>11} {'модулей':>8}  самые долгие импорты",
+          file=stream)
+    for name, result in results['results'].items():
+        top = ", ".join(f"{module} {total / 1000:.1f}" for module, total in result['top'][:3])
+        print(f"{name:<24} {result['seconds'] * 1000:>11.1f} {result['import_seconds'] * 1000:>11.1f} "
+              f"{result['modules']:>8}  {top}", file=stream)
+
+
+def main(directory, entry_points, argv=None):
+    """
+    Точка входа замеров запуска программы (BenchmarkStartup.py в её каталоге).
+
+    :param directory: Каталог программы.
+    :param entry_points: Словарь {файл точки входа: пакеты, которые не должны импортироваться при запуске}.
+    :param argv: Аргументы командной строки; по умолчанию - sys.argv.
+    """
+    parser = argparse.ArgumentParser(description='Замеры времени запуска точек входа (python -X importtime); '
+                                                 'код возврата 1, если при запуске импортируются тяжёлые '
+                                                 'зависимости или время импорта выросло')
+    parser.add_argument('entry_points', nargs='*', help='Файлы точек входа (по умолчанию все)')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Записать результаты в JSON')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Число запусков каждой точки входа')
+    parser.add_argument('--baseline', type=str, default=None, help='Сравнить с базовыми результатами JSON')
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD,
+                        help='Допустимый рост времени импорта (доля, по умолчанию 0.20)')
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error('--repeat должно быть не меньше 1')
+
+    current = run_benchmarks(directory, entry_points, args.entry_points or None, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, ensure_ascii=False, indent=2)
+    print_results(current)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    problems = check_results(current, baseline, args.time_threshold)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    sys.exit(1 if problems else 0)
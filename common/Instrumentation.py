@@ -0,0 +1,274 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Текущий сборщик замеров; None - замеры выключены и обёртки сразу вызывают исходную функцию
+_recorder = None
+# Глубина вложенных замеряемых вызовов в потоке: пиковая память замеряется только у внешнего
+_local = threading.local()
+# Итоговые показатели этапа: (поле, метрика Prometheus, тип, описание)
+PROMETHEUS_METRICS = (
+    ('calls', 'stage_calls_total', 'counter', "Число вызовов этапа"),
+    ('errors', 'stage_errors_total', 'counter', "Число вызовов этапа, завершившихся ошибкой"),
+    ('seconds', 'stage_seconds_total', 'counter', "Суммарное время этапа в секундах"),
+    ('bytes_in', 'stage_bytes_in_total', 'counter', "Объём входных данных этапа (байт или символов текста)"),
+    ('bytes_out', 'stage_bytes_out_total', 'counter', "Объём результата этапа (байт или символов текста)"),
+    ('pages', 'stage_pages_total', 'counter', "Число обработанных страниц"),
+    ('peak_bytes', 'stage_peak_bytes', 'gauge', "Наибольшая пиковая память Python за вызов этапа"),
+)
+
+
+class StageStats:
+    """Накопленные показатели одного этапа."""
+
+    __slots__ = ('calls', 'errors', 'seconds', 'bytes_in', 'bytes_out', 'pages', 'peak_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.pages = 0
+        self.peak_bytes = 0
+
+    def add(self, event):
+        """Учитывает один вызов этапа (см. Recorder.record)."""
+        self.calls += 1
+        self.errors += event['error']
+        self.seconds += event['seconds']
+        self.bytes_in += event['bytes_in'] or 0
+        self.bytes_out += event['bytes_out'] or 0
+        self.pages += event['pages'] or 0
+        self.peak_bytes = max(self.peak_bytes, event['peak_bytes'] or 0)
+
+    def as_dict(self):
+        """:return: Показатели этапа в виде словаря."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class Sink:
+    """
+    Приёмник замеров: emit вызывается после каждого замеряемого вызова,
+    close - один раз при выключении замеров, с итогами по этапам.
+    """
+
+    def emit(self, event):
+        pass
+
+    def close(self, summary):
+        pass
+
+
+class LogSink(Sink):
+    """Выводит строку на каждый вызов этапа и итоги по этапам в текстовый поток (по умолчанию stderr)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, event):
+        error = ", ошибка" if event['error'] else ""
+        print(f"[замер] {format_stats(event['stage'], event)}{error}", file=self.stream or sys.stderr)
+
+    def close(self, summary):
+        for stage, stats in summary.items():
+            errors = f", ошибок: {stats['errors']}" if stats['errors'] else ""
+            print(f"[итого] {format_stats(stage, stats)}, вызовов: {stats['calls']}{errors}",
+                  file=self.stream or sys.stderr)
+
+
+class JsonSink(Sink):
+    """Записывает итоги по этапам в файл JSON."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def close(self, summary):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump({'stages': summary}, file, ensure_ascii=False, indent=2)
+
+
+class PrometheusSink(Sink):
+    """Записывает итоги по этапам в текстовом формате Prometheus (для node_exporter textfile и т.п.)."""
+
+    def __init__(self, path, prefix):
+        self.path = path
+        self.prefix = prefix
+
+    def close(self, summary):
+        lines = []
+        for field, name, kind, description in PROMETHEUS_METRICS:
+            metric = f'{self.prefix}_{name}'
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for stage, stats in summary.items():
+                lines.append(f'{metric}{{stage="{stage}"}} {stats[field]}')
+        # Запись через временный файл: сборщик не должен прочитать файл наполовину
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.path)
+
+
+def format_stats(stage, stats):
+    """
+    :param stage: Имя этапа.
+    :param stats: Замер вызова или итоги этапа.
+    :return: Строка вида "fetch_page_content: 12.3 мс, выход 5120 Б".
+    """
+    parts = [f"{stage}: {stats['seconds'] * 1000:.1f} мс"]
+    for field, label in (('bytes_in', "вход"), ('bytes_out', "выход")):
+        if stats[field]:
+            parts.append(f"{label} {stats[field]} Б")
+    if stats['pages']:
+        parts.append(f"страниц {stats['pages']}")
+    if stats['peak_bytes']:
+        parts.append(f"пик памяти {stats['peak_bytes'] / 1024:.1f} КБ")
+    return ", ".join(parts)
+
+
+def make_sink(spec, prefix):
+    """
+    Создаёт приёмник замеров по описанию из командной строки.
+
+    :param spec: 'log' - строки в stderr, 'json:ПУТЬ' - итоги в JSON, 'prometheus:ПУТЬ' - итоги
+                 в текстовом формате Prometheus.
+    :param prefix: Префикс имён метрик Prometheus (имя программы).
+    :return: Приёмник замеров.
+    """
+    kind, _, path = spec.partition(':')
+    if kind == 'log' and not path:
+        return LogSink()
+    if kind == 'json' and path:
+        return JsonSink(path)
+    if kind == 'prometheus' and path:
+        return PrometheusSink(path, prefix)
+    raise ValueError(f"неизвестный приёмник замеров: {spec} (ожидается log, json:ПУТЬ или prometheus:ПУТЬ)")
+
+
+class Recorder:
+    """Собирает замеры этапов и передаёт их приёмникам; потокобезопасен."""
+
+    def __init__(self, sinks=(), trace_memory=False):
+        """
+        :param sinks: Приёмники замеров (см. Sink).
+        :param trace_memory: Замерять пиковую память Python (tracemalloc) внешних замеряемых вызовов.
+        """
+        self.sinks = list(sinks)
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def record(self, event):
+        """
+        :param event: Замер вызова: {'stage', 'seconds', 'bytes_in', 'bytes_out', 'pages', 'peak_bytes', 'error'}.
+        """
+        with self._lock:
+            stats = self.stages.get(event['stage'])
+            if stats is None:
+                stats = self.stages[event['stage']] = StageStats()
+            stats.add(event)
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def summary(self):
+        """:return: Итоги по этапам {этап: показатели (см. StageStats)}."""
+        with self._lock:
+            return {stage: stats.as_dict() for stage, stats in self.stages.items()}
+
+
+def enable(sinks=(), trace_memory=False):
+    """
+    Включает замеры этапов в текущем процессе.
+
+    :param sinks: Приёмники замеров (см. make_sink).
+    :param trace_memory: Замерять пиковую память Python (замедляет выполнение). tracemalloc общий для процесса,
+                         поэтому при параллельных вызовах в потоках их пики смешиваются.
+    :return: Сборщик замеров (см. Recorder).
+    """
+    global _recorder
+    recorder = Recorder(sinks, trace_memory)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        recorder._started_tracing = True
+    _recorder = recorder
+    return recorder
+
+
+def disable():
+    """
+    Выключает замеры и передаёт итоги приёмникам.
+
+    :return: Итоги по этапам или None, если замеры не были включены.
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is None:
+        return None
+    if recorder._started_tracing:
+        tracemalloc.stop()
+    summary = recorder.summary()
+    for sink in recorder.sinks:
+        sink.close(summary)
+    return summary
+
+
+def _size(measure, value):
+    if measure is None or value is None:
+        return None
+    try:
+        return measure(value)
+    except Exception:
+        return None
+
+
+def instrumented(stage, bytes_in=None, bytes_out=None, pages=None, failed=None):
+    """
+    Декоратор замеряемого этапа. Пока замеры выключены, обёртка только проверяет глобальную переменную
+    и вызывает исходную функцию.
+
+    :param stage: Имя этапа.
+    :param bytes_in: Функция bytes_in(первый аргумент) -> объём входных данных.
+    :param bytes_out: Функция bytes_out(результат) -> объём результата.
+    :param pages: Функция pages(результат) -> число обработанных страниц.
+    :param failed: Функция failed(результат) -> True, если функция сообщила об ошибке результатом
+                   (например, вернула None), а не исключением.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            depth = getattr(_local, 'depth', 0)
+            trace = recorder.trace_memory and depth == 0 and tracemalloc.is_tracing()
+            if trace:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            _local.depth = depth + 1
+            result = None
+            error = True
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                error = failed is not None and failed(result)
+                return result
+            finally:
+                seconds = time.perf_counter() - started
+                _local.depth = depth
+                recorder.record({
+                    'stage': stage,
+                    'seconds': seconds,
+                    'bytes_in': _size(bytes_in, args[0] if args else None),
+                    'bytes_out': None if error else _size(bytes_out, result),
+                    'pages': None if error else _size(pages, result),
+                    'peak_bytes': tracemalloc.get_traced_memory()[1] - baseline if trace else None,
+                    'error': bool(error),
+                })
+        return wrapper
+    return decorator
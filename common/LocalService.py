@@ -0,0 +1,247 @@
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Префикс адреса Unix-сокета; остальные адреса - host:port
+UNIX_PREFIX = 'unix:'
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+# Сколько раз клиент повторяет запрос, если сервер перегружен (503)
+CLIENT_RETRIES = 5
+# Через сколько секунд клиенту стоит повторить запрос, отклонённый из-за заполненной очереди
+RETRY_AFTER = 1
+
+
+class ServiceBusy(Exception):
+    """Очередь сервиса заполнена: запрос отклоняется, а не ждёт без ограничения."""
+
+
+def _ping():
+    return os.getpid()
+
+
+class WorkerPool:
+    """
+    Пул долгоживущих процессов-обработчиков с ограниченной очередью.
+    Процессы запускаются сразу и выполняют initializer один раз: тяжёлые библиотеки импортируются
+    и ресурсы (сессии, кэши) открываются до первого запроса, а не на каждый.
+    """
+
+    def __init__(self, workers, queue_size, initializer=None, initargs=()):
+        """
+        :param workers: Число процессов.
+        :param queue_size: Сколько запросов может ждать свободного процесса; остальные отклоняются (ServiceBusy).
+        :param initializer: Функция, выполняемая в каждом процессе при запуске.
+        :param initargs: Аргументы initializer.
+        """
+        if workers < 1 or queue_size < 0:
+            raise ValueError("workers должно быть не меньше 1, queue_size - не меньше 0")
+        self.workers = workers
+        self._initializer = initializer
+        self._initargs = initargs
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pool = self._start()
+
+    def _start(self):
+        pool = ProcessPoolExecutor(self.workers, initializer=self._initializer, initargs=self._initargs)
+        # Процессы создаются по мере отправки задач - запускаем все сразу, чтобы они прогрелись до запросов
+        wait([pool.submit(_ping) for _ in range(self.workers)])
+        return pool
+
+    def run(self, func, *args):
+        """
+        Выполняет func(*args) в процессе пула и ждёт результата.
+
+        :return: Результат func.
+        :raises ServiceBusy: Если заняты все процессы и места в очереди.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy()
+        try:
+            pool = self._pool
+            try:
+                return pool.submit(func, *args).result()
+            except BrokenProcessPool:
+                # Процесс аварийно завершился: пул заменяется новым, запрос завершается ошибкой
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = self._start()
+                pool.shutdown(wait=False)
+                raise
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_address(address):
+    """
+    :param address: 'unix:/путь/к/сокету' или 'host:port'.
+    :return: Пара (семейство сокета, адрес): (AF_UNIX, путь) или (AF_INET, (host, port)).
+    """
+    if address.startswith(UNIX_PREFIX):
+        path = address[len(UNIX_PREFIX):]
+        if not path:
+            raise ValueError("не указан путь Unix-сокета")
+        return socket.AF_UNIX, path
+    host, separator, port = address.rpartition(':')
+    if not separator or not port.isdigit():
+        raise ValueError(f"адрес должен иметь вид host:port или unix:ПУТЬ: {address}")
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """HTTP-сервер на Unix-сокете: доступен только локальным процессам с правами на файл сокета."""
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # Сокет, оставшийся от прежнего запуска, удаляется; другие файлы не трогаем
+        try:
+            if stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+                os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def make_server(address, handler):
+    """
+    Создаёт многопоточный HTTP-сервер.
+
+    :param address: Адрес (см. parse_address).
+    :param handler: Класс обработчика запросов.
+    :return: Сервер; запуск - serve_forever(), остановка - shutdown() и server_close().
+    """
+    family, location = parse_address(address)
+    server_class = UnixHTTPServer if family == socket.AF_UNIX else ThreadingHTTPServer
+    server = server_class(location, handler)
+    server.daemon_threads = True
+    return server
+
+
+class JsonRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик с ответами в JSON и постоянными соединениями (HTTP/1.1)."""
+
+    protocol_version = 'HTTP/1.1'
+    # Максимальный размер тела запроса в байтах
+    max_body_size = 256 * 1024 * 1024
+
+    def read_body(self):
+        """
+        :return: Тело запроса (bytes) или None, если оно слишком велико (ответ 413 уже отправлен).
+        """
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > self.max_body_size:
+            self.send_json(413, {'error': f"Тело запроса больше {self.max_body_size} байт"})
+            self.close_connection = True
+            return None
+        return self.rfile.read(length)
+
+    def send_json(self, status, payload, headers=None):
+        """
+        Отправляет ответ JSON.
+
+        :param status: Код ответа HTTP.
+        :param payload: Данные ответа.
+        :param headers: Дополнительные заголовки.
+        """
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # У клиентов Unix-сокета нет адреса
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if getattr(self.server, 'verbose', False):
+            super().log_message(format, *args)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP-соединение через Unix-сокет."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """Клиент сервиса: одно постоянное соединение, повтор запроса при перегрузке сервера (503)."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=None, retries=CLIENT_RETRIES):
+        """
+        :param address: Адрес сервиса (см. parse_address).
+        :param timeout: Таймаут операций с сокетом в секундах; None - без ограничения.
+        :param retries: Сколько раз повторять запрос при ответе 503.
+        """
+        family, location = parse_address(address)
+        if family == socket.AF_UNIX:
+            self._connection = UnixHTTPConnection(location, timeout)
+        else:
+            self._connection = http.client.HTTPConnection(*location, timeout=timeout)
+        self.retries = retries
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Выполняет запрос к сервису.
+
+        :param method: Метод HTTP.
+        :param path: Путь с параметрами запроса.
+        :param body: Тело запроса (bytes) или None.
+        :param headers: Заголовки запроса.
+        :return: Пара (код ответа, данные ответа JSON).
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                self._connection.request(method, path, body, headers or {})
+                response = self._connection.getresponse()
+                payload = json.loads(response.read() or b'null')
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Сервер закрыл постоянное соединение - повторяем на новом
+                self._connection.close()
+                if attempt == self.retries:
+                    raise
+                continue
+            if response.status != 503 or attempt == self.retries:
+                return response.status, payload
+            time.sleep(float(response.getheader('Retry-After') or 1))
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,29 @@
+import io
+import unittest
+from ColumnarFile import ColumnarWriter, read_blocks
+
+
+class TestColumnarFile(unittest.TestCase):
+    def test_blocks_roundtrip(self):
+        """Проверка записи и чтения блоков с колонками разной длины и None в строках"""
+        stream = io.BytesIO()
+        writer = ColumnarWriter(stream)
+        blocks = [{'name': ('str', ['a', None, 'ё']), 'host': ('dict', ['x', 'y', 'x', 'x']), 'n': ('int', [1, -2]),
+                   'x': ('float', [0.5])},
+                  {'name': ('str', []), 'host': ('dict', []), 'n': ('int', [2 ** 40])}]
+        for block in blocks:
+            writer.write_block(block)
+        stream.seek(0)
+        expected = [{name: values for name, (_, values) in block.items()} for block in blocks]
+        self.assertEqual(list(read_blocks(stream)), expected)
+
+    def test_truncated_block_is_reported(self):
+        """Проверка, что оборванный блок не читается молча"""
+        stream = io.BytesIO()
+        ColumnarWriter(stream).write_block({'name': ('str', ['abc'] * 10)})
+        with self.assertRaises(ValueError):
+            list(read_blocks(io.BytesIO(stream.getvalue()[:-3])))
+
+
+if __name__ == '__main__':
+    unittest.main()
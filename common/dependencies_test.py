@@ -0,0 +1,22 @@
+import json
+import unittest
+from Dependencies import MissingDependencyError, require, preload
+
+
+class TestDependencies(unittest.TestCase):
+    def test_require(self):
+        """Проверка: установленный модуль возвращается, для отсутствующего - понятная ошибка с именем пакета"""
+        self.assertIs(require('json'), json)
+        with self.assertRaises(MissingDependencyError) as context:
+            require('not_installed_module.sub', 'not-installed-package', 'проверки')
+        self.assertIsInstance(context.exception, ImportError)
+        self.assertIn('pip install not-installed-package', str(context.exception))
+        self.assertIn('для проверки', str(context.exception))
+
+    def test_preload(self):
+        """Проверка предварительного импорта: возвращаются модули, которые не удалось импортировать"""
+        self.assertEqual(preload(['json', 'not_installed_module']), ['not_installed_module'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from ImportTiming import parse_importtime, check_results
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       291 |        291 |   _io
+import time:       120 |        120 |     encodings.aliases
+import time:       480 |        600 |   encodings
+import time:      1500 |       2100 | site
+some other output
+"""
+
+
+class TestImportTiming(unittest.TestCase):
+    def test_parse_importtime(self):
+        """Проверка разбора вывода -X importtime: заголовок и посторонние строки пропускаются"""
+        self.assertEqual(parse_importtime(IMPORTTIME_OUTPUT),
+                         [('_io', 291, 291, 1), ('encodings.aliases', 120, 120, 2), ('encodings', 480, 600, 1),
+                          ('site', 1500, 2100, 0)])
+
+    def test_check_results(self):
+        """Проверка: нарушения - тяжёлые пакеты при запуске и заметный рост времени импорта"""
+        def results(import_seconds, forbidden=()):
+            return {'results': {'Tool.py': {'import_seconds': import_seconds, 'forbidden': list(forbidden)}}}
+
+        self.assertEqual(check_results(results(0.1)), [])
+        self.assertEqual(len(check_results(results(0.1, ['pdfminer']))), 1)
+        self.assertEqual(len(check_results(results(0.2), results(0.1))), 1)
+        # Рост в пределах порога и слишком малая абсолютная разница - не регрессия
+        self.assertEqual(check_results(results(0.11), results(0.1)), [])
+        self.assertEqual(check_results(results(0.003), results(0.001)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
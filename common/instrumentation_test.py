@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import Instrumentation
+from Instrumentation import instrumented, enable, disable, make_sink, LogSink, JsonSink, PrometheusSink
+
+
+@instrumented('double', bytes_in=len, bytes_out=len, pages=len, failed=lambda result: result is None)
+def double(text):
+    """Замеряемая функция для тестов: None для пустой строки, исключение для None."""
+    if text is None:
+        raise TypeError("нет текста")
+    return text * 2 or None
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        disable()
+        return super().tearDown()
+
+    def test_disabled_by_default(self):
+        """Проверка, что без включения замеры не собираются"""
+        self.assertIsNone(Instrumentation._recorder)
+        self.assertEqual(double("ab"), "abab")
+        self.assertIsNone(disable())
+
+    def test_stage_totals(self):
+        """Проверка итогов этапа: вызовы, ошибки (результатом и исключением), объёмы и страницы"""
+        enable()
+        double("ab")
+        double("")
+        with self.assertRaises(TypeError):
+            double(None)
+        stats = disable()['double']
+        self.assertEqual({field: stats[field] for field in ('calls', 'errors', 'bytes_in', 'bytes_out', 'pages')},
+                         {'calls': 3, 'errors': 2, 'bytes_in': 2, 'bytes_out': 4, 'pages': 4})
+        self.assertEqual(stats['peak_bytes'], 0)
+
+    def test_memory_peak_of_outer_stage(self):
+        """Проверка замера пиковой памяти внешнего вызова"""
+        enable(trace_memory=True)
+        double("x" * 1000000)
+        self.assertGreaterEqual(disable()['double']['peak_bytes'], 2000000)
+
+    def test_sinks(self):
+        """Проверка приёмников: строка на вызов, итоги в JSON и в формате Prometheus"""
+        log = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, 'metrics.json')
+            prometheus_path = os.path.join(tmp, 'metrics.prom')
+            enable([LogSink(log), JsonSink(json_path), PrometheusSink(prometheus_path, 'analyze_web')])
+            double("ab")
+            disable()
+            with open(json_path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file)['stages']['double']['calls'], 1)
+            with open(prometheus_path, encoding='utf-8') as file:
+                prometheus = file.read()
+        self.assertIn('[замер] double:', log.getvalue())
+        self.assertIn('[итого] double:', log.getvalue())
+        self.assertIn('# TYPE analyze_web_stage_seconds_total counter', prometheus)
+        self.assertIn('analyze_web_stage_bytes_out_total{stage="double"} 4', prometheus)
+
+    def test_make_sink(self):
+        """Проверка разбора описания приёмника из командной строки"""
+        self.assertIsInstance(make_sink('log', 'analyze_web'), LogSink)
+        self.assertEqual(make_sink('prometheus:/tmp/m.prom', 'analyze_web').path, '/tmp/m.prom')
+        for spec in ('json', 'log:x', 'statsd:host'):
+            with self.assertRaises(ValueError):
+                make_sink(spec, 'analyze_web')
+
+
+if __name__ == '__main__':
+    unittest.main()
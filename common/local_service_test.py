@@ -0,0 +1,63 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from LocalService import (JsonRequestHandler, ServiceBusy, ServiceClient, WorkerPool, make_server, parse_address)
+
+
+def slow_square(value):
+    time.sleep(0.3)
+    return value * value
+
+
+class EchoHandler(JsonRequestHandler):
+    def do_POST(self):
+        body = self.read_body()
+        if body is not None:
+            self.send_json(200, {'path': self.path, 'size': len(body)})
+
+
+class TestLocalService(unittest.TestCase):
+    def test_parse_address(self):
+        """Проверка разбора адресов host:port и unix:ПУТЬ"""
+        self.assertEqual(parse_address('localhost:8080'), (socket.AF_INET, ('localhost', 8080)))
+        self.assertEqual(parse_address(':8080'), (socket.AF_INET, ('127.0.0.1', 8080)))
+        self.assertEqual(parse_address('unix:/tmp/a.sock'), (socket.AF_UNIX, '/tmp/a.sock'))
+        for address in ('localhost', 'localhost:http', 'unix:'):
+            with self.assertRaises(ValueError):
+                parse_address(address)
+
+    def test_pool_rejects_requests_beyond_queue(self):
+        """Проверка, что при занятом процессе и без места в очереди запрос отклоняется, а не ждёт"""
+        pool = WorkerPool(1, 0)
+        try:
+            worker = threading.Thread(target=pool.run, args=(slow_square, 3))
+            worker.start()
+            time.sleep(0.1)
+            with self.assertRaises(ServiceBusy):
+                pool.run(slow_square, 4)
+            worker.join()
+            self.assertEqual(pool.run(slow_square, 4), 16)
+        finally:
+            pool.close()
+
+    def test_unix_socket_roundtrip(self):
+        """Проверка запросов через Unix-сокет на одном соединении и удаления файла сокета при остановке"""
+        with tempfile.TemporaryDirectory() as directory:
+            address = f"unix:{os.path.join(directory, 'service.sock')}"
+            server = make_server(address, EchoHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with ServiceClient(address, timeout=5) as client:
+                    self.assertEqual(client.request('POST', '/a', b'abc'), (200, {'path': '/a', 'size': 3}))
+                    self.assertEqual(client.request('POST', '/b', b''), (200, {'path': '/b', 'size': 0}))
+            finally:
+                server.shutdown()
+                server.server_close()
+            self.assertFalse(os.path.exists(os.path.join(directory, 'service.sock')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,311 @@
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from multiprocessing.connection import wait
+from ExtractionCache import ExtractionCache
+from DocumentFormats import detect_format, format_from_extension
+from TextExtraction import extract_text
+from ResultFormats import open_record_writer
+
+# Время (с) на корректное завершение процесса-обработчика перед принудительной остановкой
+WORKER_SHUTDOWN_TIMEOUT = 5
+
+
+def iter_input_files(source):
+    """
+    Перечисляет файлы для пакетной обработки.
+
+    :param source: Каталог (обходится рекурсивно, берутся файлы поддерживаемых форматов),
+                   шаблон glob (например, "docs/**/*.pdf") или файл-манифест со списком путей
+                   по одному на строку ("-" - чтение из stdin; пустые строки и комментарии # пропускаются).
+    :return: Генератор путей к файлам.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if format_from_extension(name) is not None:
+                    yield os.path.join(root, name)
+    elif glob.has_magic(source):
+        for path in sorted(glob.iglob(source, recursive=True)):
+            if os.path.isfile(path):
+                yield path
+    else:
+        stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+        try:
+            for line in stream:
+                path = line.strip()
+                if path and not path.startswith('#'):
+                    yield path
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def read_finished_paths(output_path, retry_errors=False):
+    """
+    Читает пути уже обработанных файлов из JSONL-результата прерванного запуска.
+
+    :param output_path: Путь к файлу результатов.
+    :param retry_errors: Не считать обработанными файлы, завершившиеся ошибкой.
+    :return: Множество путей.
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, encoding='utf-8') as output:
+        for line in output:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Недописанная строка после аварийного завершения
+                continue
+            if not (retry_errors and record.get('error')):
+                finished.add(record['path'])
+    return finished
+
+
+def _truncate_partial_line(output_path, block_size=64 * 1024):
+    # Отбрасываем строку, недописанную прерванным запуском: файл читается с конца блоками
+    with open(output_path, 'r+b') as output:
+        end = output.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            output.seek(start)
+            block = output.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            output.truncate(position)
+
+
+def extract_file_record(file_path, options=None, cache=None, extractor=extract_text):
+    """
+    Извлекает текст из файла и формирует запись результата.
+
+    :param file_path: Путь к файлу.
+    :param options: Именованные аргументы extract_text (ocr_mode, min_page_chars и т.п.).
+    :param cache: Необязательный ExtractionCache.
+    :param extractor: Функция извлечения текста.
+    :return: Словарь с полями path, format, text, seconds, error и metadata (сведения об извлечении,
+             например языки OCR - см. extract_text).
+    """
+    messages = io.StringIO()
+    metadata = {}
+    started = time.perf_counter()
+    try:
+        # Извлекатели сообщают об ошибках через print: перехватываем их в поле error
+        with contextlib.redirect_stdout(messages):
+            text = extractor(file_path, cache=cache, metadata=metadata, **(options or {}))
+        error = None if text else messages.getvalue().strip() or None
+    except Exception as e:
+        text, error = "", f"{type(e).__name__}: {e}"
+    return {
+        'path': file_path,
+        'format': detect_format(file_path),
+        'text': text,
+        'seconds': round(time.perf_counter() - started, 6),
+        'error': error,
+        'metadata': metadata,
+    }
+
+
+def _worker_main(conn, options, cache_path, cache_max_bytes, extractor):
+    # Процесс-обработчик: импорты и кэш создаются один раз, затем файлы принимаются по одному
+    if hasattr(os, 'setsid'):
+        # Своя группа процессов: при остановке обработчика вместе с ним завершаются запущенные им
+        # djvutxt/antiword и процессы пула OCR (см. _Worker.kill)
+        os.setsid()
+    cache = ExtractionCache(cache_path, cache_max_bytes) if cache_path else None
+    try:
+        while True:
+            file_path = conn.recv()
+            if file_path is None:
+                break
+            conn.send(extract_file_record(file_path, options, cache, extractor))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+        conn.close()
+
+
+class _Worker:
+    """Долгоживущий процесс-обработчик и канал связи с ним."""
+
+    def __init__(self, context, worker_args):
+        self.conn, child_conn = context.Pipe()
+        # Не демон: внутри обработчика может работать пул процессов OCR
+        self.process = context.Process(target=_worker_main, args=(child_conn,) + worker_args)
+        self.process.start()
+        child_conn.close()
+        self.file_path = None
+        self.started = None
+
+    def submit(self, file_path):
+        self.file_path = file_path
+        self.started = time.perf_counter()
+        self.conn.send(file_path)
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(WORKER_SHUTDOWN_TIMEOUT)
+        self.kill()
+
+    def kill(self):
+        if hasattr(os, 'killpg'):
+            # Группа существует, пока в ней есть процессы, даже если сам обработчик уже завершился,
+            # а её номер не может достаться другому процессу
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                # Группы уже нет или обработчик ещё не успел её создать
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _failed_record(file_path, started, error):
+    return {
+        'path': file_path,
+        'format': detect_format(file_path),
+        'text': "",
+        'seconds': round(time.perf_counter() - started, 6),
+        'error': error,
+        'metadata': {},
+    }
+
+
+def extract_files(paths, workers=None, timeout=None, options=None, cache_path=None,
+                  cache_max_bytes=512 * 1024 * 1024, extractor=extract_text):
+    """
+    Извлекает текст из множества файлов в пуле долгоживущих процессов.
+    Процесс, превысивший время на файл или аварийно завершившийся, останавливается и заменяется новым.
+
+    :param paths: Итерируемый набор путей к файлам (читается по мере освобождения процессов).
+    :param workers: Число процессов; по умолчанию - число ядер.
+    :param timeout: Максимальное время обработки одного файла в секундах (None - без ограничения).
+    :param options: Именованные аргументы extract_text (ocr_mode, min_page_chars и т.п.).
+    :param cache_path: Путь к файлу ExtractionCache; None - без кэша.
+    :param cache_max_bytes: Максимальный размер кэша.
+    :param extractor: Функция извлечения текста (должна быть доступна дочерним процессам).
+    :return: Генератор записей (см. extract_file_record) в порядке завершения обработки.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers должно быть не меньше 1")
+    context = multiprocessing.get_context()
+    worker_args = (options, cache_path, cache_max_bytes, extractor)
+    paths = iter(paths)
+    idle = []
+    busy = {}
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(busy) < workers:
+                file_path = next(paths, None)
+                if file_path is None:
+                    exhausted = True
+                    break
+                worker = idle.pop() if idle else _Worker(context, worker_args)
+                worker.submit(file_path)
+                busy[worker.conn] = worker
+            if not busy:
+                return
+
+            wait_timeout = None
+            if timeout is not None:
+                now = time.perf_counter()
+                wait_timeout = max(0, min(worker.started + timeout - now for worker in busy.values()))
+            for conn in wait(list(busy), wait_timeout):
+                worker = busy.pop(conn)
+                try:
+                    record = conn.recv()
+                except (EOFError, OSError):
+                    worker.kill()
+                    yield _failed_record(worker.file_path, worker.started,
+                                         f"Процесс-обработчик завершился аварийно (код {worker.process.exitcode})")
+                    continue
+                idle.append(worker)
+                yield record
+
+            if timeout is not None:
+                now = time.perf_counter()
+                for conn, worker in list(busy.items()):
+                    if now - worker.started >= timeout:
+                        del busy[conn]
+                        worker.kill()
+                        yield _failed_record(worker.file_path, worker.started,
+                                             f"Превышено время обработки файла ({timeout} с)")
+    finally:
+        for worker in list(busy.values()) + idle:
+            if worker in idle:
+                worker.stop()
+            else:
+                worker.kill()
+
+
+def run_batch(source, output_path=None, workers=None, timeout=None, options=None, cache_path=None,
+              cache_max_bytes=512 * 1024 * 1024, resume=True, retry_errors=False, output=None,
+              extractor=extract_text, output_format='jsonl'):
+    """
+    Пакетное извлечение текста с записью результатов в JSONL (одна запись на файл) или колоночный файл.
+
+    :param source: Каталог, шаблон glob или файл-манифест (см. iter_input_files).
+    :param output_path: Файл результатов; при повторном запуске уже обработанные файлы пропускаются.
+    :param workers: Число процессов.
+    :param timeout: Максимальное время обработки одного файла в секундах.
+    :param options: Именованные аргументы extract_text.
+    :param cache_path: Путь к файлу ExtractionCache; None - без кэша.
+    :param cache_max_bytes: Максимальный размер кэша.
+    :param resume: Пропускать файлы, уже записанные в output_path.
+    :param retry_errors: При продолжении повторно обрабатывать файлы, завершившиеся ошибкой.
+    :param output: Текстовый поток для вывода, если output_path не задан (по умолчанию stdout).
+    :param extractor: Функция извлечения текста.
+    :param output_format: 'jsonl' или 'columnar' (см. ResultFormats.OUTPUT_FORMATS). Колоночный файл
+                          не дописывается, поэтому продолжение возможно только для JSONL.
+    :return: Словарь счётчиков: обработано, с ошибками, пропущено.
+    """
+    exists = bool(output_path) and os.path.exists(output_path)
+    if output_format != 'jsonl' and resume and exists:
+        raise ValueError(f"продолжение возможно только для формата jsonl: файл {output_path} уже существует")
+    finished = read_finished_paths(output_path, retry_errors) if output_path and resume else set()
+    stats = {'processed': 0, 'errors': 0, 'skipped': 0}
+
+    def pending_paths():
+        for file_path in iter_input_files(source):
+            if file_path in finished:
+                stats['skipped'] += 1
+            else:
+                yield file_path
+
+    if resume and exists:
+        _truncate_partial_line(output_path)
+    writer = open_record_writer(output_format, output_path, output, append=resume)
+    try:
+        for record in extract_files(pending_paths(), workers, timeout, options, cache_path, cache_max_bytes,
+                                    extractor):
+            writer.write(record)
+            stats['processed'] += 1
+            if record['error']:
+                stats['errors'] += 1
+    finally:
+        writer.close()
+    return stats
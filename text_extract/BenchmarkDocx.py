@@ -0,0 +1,51 @@
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+from TextExtraction import DOCX_ENGINES, extract_text_from_docx
+
+DEFAULT_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files', '*.docx')
+
+
+def measure(docx_path, engine, repeat=5):
+    """
+    Измеряет время и пиковую память извлечения текста DOCX.
+
+    :param docx_path: Путь к файлу DOCX.
+    :param engine: 'native' или 'python-docx'.
+    :param repeat: Число повторов; время - лучшее из повторов.
+    :return: Словарь: лучшее время (с), пиковая память Python (байт; память lxml tracemalloc не видит), длина текста.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = extract_text_from_docx(docx_path, engine)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        extract_text_from_docx(docx_path, engine)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak, 'chars': len(text)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Сравнение потокового извлечения DOCX с python-docx')
+    parser.add_argument('files', nargs='*', help=f'Файлы DOCX (по умолчанию {DEFAULT_FILES})')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Число повторов для каждого файла')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(DEFAULT_FILES))
+    print(f"{'файл':<20} {'способ':<12} {'время, мс':>10} {'память, КБ':>11} {'символов':>9}")
+    for docx_path in files:
+        results = {engine: measure(docx_path, engine, args.repeat) for engine in DOCX_ENGINES}
+        for engine, result in results.items():
+            print(f"{os.path.basename(docx_path):<20} {engine:<12} {result['seconds'] * 1000:>10.2f} "
+                  f"{result['peak_bytes'] / 1024:>11.1f} {result['chars']:>9}")
+        native, fallback = results['native'], results['python-docx']
+        if native['seconds']:
+            print(f"{'':<20} ускорение: x{fallback['seconds'] / native['seconds']:.1f}, "
+                  f"память: x{fallback['peak_bytes'] / max(native['peak_bytes'], 1):.1f}")
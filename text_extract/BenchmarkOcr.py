@@ -0,0 +1,82 @@
+import argparse
+import difflib
+import glob
+import os
+import time
+from OcrPreprocessing import DEFAULT_DPI, make_ocr_settings
+from TextExtraction import get_pdf_page_count, ocr_pdf, pdfminer_extract_text
+
+DEFAULT_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files', 'image*.pdf')
+
+
+def ocr_setting_variants(psm=None, oem=None):
+    """
+    :param psm: Режим сегментации tesseract для всех вариантов.
+    :param oem: Режим движка tesseract для всех вариантов.
+    :return: Список пар (название, настройки OCR); None - растеризация и распознавание без подготовки.
+    """
+    return [
+        ('без подготовки', None),
+        ('серый', make_ocr_settings(DEFAULT_DPI, 'grayscale', False, psm, oem)),
+        ('серый+поля', make_ocr_settings(DEFAULT_DPI, 'grayscale', True, psm, oem)),
+        ('ч/б+поля', make_ocr_settings(DEFAULT_DPI, 'binarize', True, psm, oem)),
+        ('авто DPI', make_ocr_settings('auto', 'grayscale', True, psm, oem)),
+        ('авто DPI ч/б', make_ocr_settings('auto', 'binarize', True, psm, oem)),
+    ]
+
+
+def character_accuracy(reference, text):
+    """
+    :param reference: Эталонный текст.
+    :param text: Распознанный текст.
+    :return: Доля совпадающих символов (0..1) без учёта пробелов и переводов строк.
+    """
+    reference, text = "".join(reference.split()), "".join(text.split())
+    if not reference:
+        return None
+    return difflib.SequenceMatcher(None, reference, text, autojunk=False).ratio()
+
+
+def measure(pdf_path, settings, lang, reference):
+    """
+    Распознаёт все страницы PDF с заданными настройками в одном процессе.
+
+    :param pdf_path: Путь к файлу PDF.
+    :param settings: Настройки OCR или None.
+    :param lang: Языки tesseract.
+    :param reference: Эталонный текст для оценки точности.
+    :return: Словарь: время (с), страниц в секунду, точность по символам (None без эталона).
+    """
+    pages = get_pdf_page_count(pdf_path) or 1
+    started = time.perf_counter()
+    text = ocr_pdf(pdf_path, lang, workers=1, settings=settings)
+    elapsed = time.perf_counter() - started
+    return {'seconds': elapsed, 'pages_per_second': pages / elapsed if elapsed else 0.0,
+            'accuracy': character_accuracy(reference, text)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Скорость и точность OCR PDF при разных настройках подготовки страниц')
+    parser.add_argument('files', nargs='*', help=f'Файлы PDF (по умолчанию {DEFAULT_FILES})')
+    parser.add_argument('--lang', type=str, default='chi_sim',
+                        help='Языки tesseract (тестовые файлы image*.pdf - на китайском)')
+    parser.add_argument('--reference', type=str, default=None,
+                        help='Файл с эталонным текстом (по умолчанию - текстовый слой самого PDF)')
+    parser.add_argument('--psm', type=int, default=None, help='Режим сегментации страницы tesseract (--psm)')
+    parser.add_argument('--oem', type=int, default=None, help='Режим движка tesseract (--oem)')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(DEFAULT_FILES))
+    variants = ocr_setting_variants(args.psm, args.oem)
+    print(f"{'файл':<16} {'настройки':<16} {'время, с':>9} {'стр/с':>7} {'точность':>9}")
+    for pdf_path in files:
+        if args.reference:
+            with open(args.reference, encoding='utf-8') as file:
+                reference = file.read()
+        else:
+            reference = pdfminer_extract_text(pdf_path)
+        for name, settings in variants:
+            result = measure(pdf_path, settings, args.lang, reference)
+            accuracy = '-' if result['accuracy'] is None else f"{result['accuracy']:.1%}"
+            print(f"{os.path.basename(pdf_path):<16} {name:<16} {result['seconds']:>9.2f} "
+                  f"{result['pages_per_second']:>7.2f} {accuracy:>9}")
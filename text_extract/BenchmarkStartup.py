@@ -0,0 +1,15 @@
+import os
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ImportTiming import main
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# Точки входа и пакеты, которые не должны импортироваться при их запуске со --help:
+# тяжёлые зависимости импортируются только при первом использовании (см. Dependencies.require)
+ENTRY_POINTS = {
+    'TextExtraction.py': ('pdfminer', 'pdf2image', 'pytesseract', 'PIL', 'docx'),
+    'ExtractionService.py': ('pdfminer', 'pdf2image', 'pytesseract', 'PIL', 'docx'),
+}
+
+
+if __name__ == "__main__":
+    main(DIRECTORY, ENTRY_POINTS)
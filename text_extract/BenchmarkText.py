@@ -0,0 +1,214 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from TextExtraction import (DOCX_ENGINES, pdfminer_extract_text, ocr_pdf, extract_text_from_docx,
+                            extract_text_from_doc, extract_text_from_djvu)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files')
+DEFAULT_REPEAT = 3
+# OCR на порядки медленнее остальных этапов: замеряется одним прогоном
+OCR_REPEAT = 1
+# Допустимое замедление и рост пиковой памяти относительно базовых результатов (доли)
+TIME_THRESHOLD = 0.10
+MEMORY_THRESHOLD = 0.20
+# Разница меньше этой не считается регрессией: у коротких этапов время и память слишком шумные
+MIN_TIME_DELTA = 0.001
+MIN_MEMORY_DELTA = 64 * 1024
+
+
+def _stage(pattern, extract, tools=(), repeat=None):
+    return {'pattern': pattern, 'extract': extract, 'tools': tools, 'repeat': repeat}
+
+
+def make_stages(lang='chi_sim'):
+    """
+    :param lang: Языки tesseract для этапа OCR (тестовые файлы image*.pdf - на китайском).
+    :return: Словарь этапов {имя: {'pattern', 'extract', 'tools', 'repeat'}}: шаблон файлов корпуса,
+             функция extract(path), необходимые внешние программы и число повторов (None - общее).
+    """
+    stages = {'pdfminer': _stage('*.pdf', pdfminer_extract_text),
+              'ocr': _stage('image*.pdf', lambda path: ocr_pdf(path, lang, workers=1), ('tesseract', 'pdftoppm'),
+                            OCR_REPEAT)}
+    for engine in DOCX_ENGINES:
+        stages[f'docx/{engine}'] = _stage('*.docx', lambda path, engine=engine: extract_text_from_docx(path, engine))
+    stages['antiword'] = _stage('*.doc', extract_text_from_doc, ('antiword',))
+    stages['djvutxt'] = _stage('*.djvu', extract_text_from_djvu, ('djvutxt',))
+    return stages
+
+
+def measure(func, repeat=DEFAULT_REPEAT, size=None):
+    """
+    Измеряет время и пиковую память вызова func().
+
+    :param func: Замеряемая функция без аргументов.
+    :param repeat: Число повторов; время - лучшее из повторов.
+    :param size: Объём входных данных в байтах для расчёта пропускной способности.
+    :return: Словарь: лучшее время (с), пиковая память Python (байт; память внешних программ и
+             tesseract tracemalloc не видит), объём входа, МБ/с и длина результата.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # Отдельный прогон под tracemalloc: трассировка сильно замедляет код и исказила бы время
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    result = {'seconds': best, 'peak_bytes': peak, 'chars': len(text or '')}
+    if size is not None:
+        result['bytes'] = size
+        result['mb_per_second'] = size / best / 1024 / 1024 if best else None
+    return result
+
+
+def run_benchmarks(corpus=DEFAULT_CORPUS, stages=None, repeat=DEFAULT_REPEAT, lang='chi_sim'):
+    """
+    Замеряет этапы извлечения текста на файлах корпуса: pdfminer, OCR, DOCX (оба способа), antiword и djvutxt.
+    Этапы, для которых не установлены внешние программы, пропускаются.
+
+    :param corpus: Каталог с тестовыми файлами.
+    :param stages: Имена этапов (см. make_stages); по умолчанию все.
+    :param repeat: Число повторов каждого замера.
+    :param lang: Языки tesseract для этапа OCR.
+    :return: Словарь результатов: {'tool', 'created', 'python', 'platform', 'repeat', 'results', 'skipped'};
+             results - {'этап/файл': замер (см. measure)}, skipped - {этап или 'этап/файл': причина}.
+    """
+    available = make_stages(lang)
+    results = {}
+    skipped = {}
+    for name in stages or available:
+        stage = available[name]
+        missing = [tool for tool in stage['tools'] if shutil.which(tool) is None]
+        if missing:
+            skipped[name] = f"не установлено: {', '.join(missing)}"
+            continue
+        for path in sorted(glob.glob(os.path.join(corpus, stage['pattern']))):
+            key = f'{name}/{os.path.basename(path)}'
+            try:
+                results[key] = measure(lambda: stage['extract'](path), stage['repeat'] or repeat,
+                                       os.path.getsize(path))
+            except Exception as e:
+                skipped[key] = f"{type(e).__name__}: {e}"
+
+    return {
+        'tool': 'text_extract',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare_results(baseline, current, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """
+    Сравнивает результаты замеров с базовыми.
+
+    :param baseline: Базовые результаты (см. run_benchmarks).
+    :param current: Текущие результаты.
+    :param time_threshold: Допустимое замедление (доля).
+    :param memory_threshold: Допустимый рост пиковой памяти (доля).
+    :return: Список строк сравнения {'name', 'metric', 'baseline', 'current', 'ratio', 'regression'}
+             по этапам, замеренным в обоих прогонах.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, threshold, min_delta in (('seconds', time_threshold, MIN_TIME_DELTA),
+                                             ('peak_bytes', memory_threshold, MIN_MEMORY_DELTA)):
+            old, new = base[metric], result[metric]
+            ratio = new / old if old else None
+            regression = ratio is not None and ratio > 1 + threshold and new - old > min_delta
+            rows.append({'name': name, 'metric': metric, 'baseline': old, 'current': new,
+                         'ratio': ratio, 'regression': regression})
+    return rows
+
+
+def print_comparison(rows, stream=None):
+    """
+    Выводит таблицу сравнения.
+
+    :param rows: Строки сравнения (см. compare_results).
+    :param stream: Текстовый поток для вывода; по умолчанию sys.stdout.
+    :return: Число регрессий.
+    """
+    stream = stream or sys.stdout
+    print(f"{'этап':<40} {'метрика':<11} {'база':>12} {'сейчас':>12} {'изменение':>10}", file=stream)
+    for row in rows:
+        change = '-' if row['ratio'] is None else f"{row['ratio'] - 1:+.1%}"
+        mark = "  РЕГРЕССИЯ" if row['regression'] else ""
+        print(f"{row['name']:<40} {row['metric']:<11} {row['baseline']:>12.6g} {row['current']:>12.6g} "
+              f"{change:>10}{mark}", file=stream)
+    return sum(row['regression'] for row in rows)
+
+
+def load_results(path):
+    """
+    :param path: Путь к файлу результатов JSON.
+    :return: Результаты замеров (см. run_benchmarks).
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Замеры скорости и памяти этапов извлечения текста')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Выполнить замеры и записать результаты в JSON')
+    run_parser.add_argument('-o', '--output', type=str, default=None, help='Файл результатов (по умолчанию stdout)')
+    run_parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Число повторов каждого замера')
+    run_parser.add_argument('--corpus', type=str, default=DEFAULT_CORPUS, help='Каталог с тестовыми файлами')
+    run_parser.add_argument('--stages', nargs='+', choices=list(make_stages()), default=None,
+                            help='Замеряемые этапы (по умолчанию все)')
+    run_parser.add_argument('--lang', type=str, default='chi_sim', help='Языки tesseract для этапа OCR')
+    run_parser.add_argument('--baseline', type=str, default=None,
+                            help='Сразу сравнить с базовыми результатами (код возврата 1 при регрессии)')
+    compare_parser = commands.add_parser('compare', help='Сравнить результаты с базовыми')
+    compare_parser.add_argument('baseline', type=str, help='Файл базовых результатов')
+    compare_parser.add_argument('current', type=str, help='Файл текущих результатов')
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD,
+                                    help='Допустимое замедление (доля, по умолчанию 0.10)')
+        command_parser.add_argument('--memory-threshold', type=float, default=MEMORY_THRESHOLD,
+                                    help='Допустимый рост пиковой памяти (доля, по умолчанию 0.20)')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if args.repeat < 1:
+            parser.error('--repeat должно быть не меньше 1')
+        current = run_benchmarks(args.corpus, args.stages, args.repeat, args.lang)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, ensure_ascii=False, indent=2)
+        else:
+            json.dump(current, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        for name, reason in current['skipped'].items():
+            print(f"Пропущено {name}: {reason}", file=sys.stderr)
+        baseline = load_results(args.baseline) if args.baseline else None
+    else:
+        baseline, current = load_results(args.baseline), load_results(args.current)
+
+    if baseline is not None:
+        # При выводе JSON в stdout таблица идёт в stderr, чтобы не портить результаты
+        stream = sys.stderr if args.command == 'run' and not args.output else sys.stdout
+        regressions = print_comparison(compare_results(baseline, current, args.time_threshold,
+                                                       args.memory_threshold), stream)
+        if regressions:
+            print(f"Регрессий: {regressions}", file=sys.stderr)
+            sys.exit(1)
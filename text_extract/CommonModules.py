@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Модули, общие для analyze_web и text_extract (Dependencies, Instrumentation, LocalService, ColumnarFile,
+# ImportTiming), лежат в каталоге common в корне репозитория. Импорт этого модуля добавляет каталог
+# в конец sys.path, поэтому одноимённые модули программы имеют приоритет
+COMMON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if COMMON_DIRECTORY not in sys.path:
+    sys.path.append(COMMON_DIRECTORY)
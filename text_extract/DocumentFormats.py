@@ -0,0 +1,192 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+
+# Сколько первых байт файла читается для определения формата
+HEAD_SIZE = 2048
+
+PDF_SIGNATURE = b'%PDF-'
+ZIP_SIGNATURE = b'PK\x03\x04'
+OLE2_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+DJVU_SIGNATURE = b'AT&TFORM'
+# Сигнатуры с фиксированным смещением проверяются раньше поиска заголовка PDF
+FIXED_SIGNATURES = (ZIP_SIGNATURE, OLE2_SIGNATURE, DJVU_SIGNATURE)
+# Типы содержимого главной части документа Word в [Content_Types].xml (docx, docm, dotx, dotm)
+WORD_CONTENT_TYPES = (b'wordprocessingml.document.main+xml', b'wordprocessingml.template.main+xml',
+                      b'ms-word.document.macroEnabled.main+xml', b'ms-word.template.macroEnabledTemplate.main+xml')
+
+
+class DocumentFormat:
+    """
+    Формат документа: как его распознать и чем из него извлекать текст.
+
+    :param name: Имя формата ('pdf', 'docx', ...).
+    :param extensions: Расширения файлов формата (используются, если по содержимому формат не определён).
+    :param sniff: Функция sniff(первые байты файла) -> True, если содержимое принадлежит формату.
+    :param extract: Функция extract(источник, options) -> текст; options - словарь параметров extract_text.
+    :param iterate: Функция iterate(источник, options) -> генератор пар (страница, текст) для iter_text.
+    :param key_options: Имена параметров, влияющих на результат (входят в ключ кэша).
+    :param confirm: Необязательная функция confirm(источник) -> True, если документ действительно принадлежит
+                    формату; вызывается, только если совпала сигнатура (для форматов-контейнеров вроде ZIP).
+    """
+
+    def __init__(self, name, extensions, sniff, extract, iterate=None, key_options=(), confirm=None):
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.sniff = sniff
+        self.confirm = confirm
+        self.extract = extract
+        self.iterate = iterate
+        self.key_options = tuple(key_options)
+
+
+FORMATS = {}
+
+
+def register_format(document_format):
+    """
+    Регистрирует формат документа под его именем.
+
+    :param document_format: Объект DocumentFormat.
+    """
+    FORMATS[document_format.name] = document_format
+
+
+def is_pdf(head):
+    # Заголовок %PDF- допускается не в самом начале файла (до 1 КБ мусора перед ним), но файл
+    # с сигнатурой ZIP, OLE2 или DjVu - не PDF, даже если %PDF- встречается во вложенных данных
+    if head.startswith(FIXED_SIGNATURES):
+        return False
+    return PDF_SIGNATURE in head[:1024]
+
+
+def is_docx(head):
+    # Любой пакет OOXML (в том числе xlsx и pptx); документ Word подтверждает is_word_package
+    return head.startswith(ZIP_SIGNATURE) and (b'[Content_Types].xml' in head or b'word/' in head)
+
+
+def is_word_package(source):
+    """
+    Проверяет по оглавлению ZIP, что пакет OOXML - документ Word: в нём есть word/document.xml
+    или главная часть с типом содержимого документа Word.
+
+    :param source: Путь или файловый объект (см. as_source); позиция файлового объекта не меняется.
+    :return: True для документа Word.
+    """
+    position = None if isinstance(source, str) else source.tell()
+    try:
+        with zipfile.ZipFile(source) as package:
+            names = set(package.namelist())
+            if 'word/document.xml' in names:
+                return True
+            if '[Content_Types].xml' not in names:
+                return False
+            content_types = package.read('[Content_Types].xml')
+        return any(content_type in content_types for content_type in WORD_CONTENT_TYPES)
+    except (OSError, zipfile.BadZipFile, KeyError):
+        return False
+    finally:
+        if position is not None:
+            source.seek(position)
+
+
+def is_ole2(head):
+    return head.startswith(OLE2_SIGNATURE)
+
+
+def is_djvu(head):
+    return head.startswith(DJVU_SIGNATURE) and head[12:16] in (b'DJVU', b'DJVM', b'DJVI')
+
+
+def as_source(source):
+    """
+    Приводит источник документа к пути или двоичному файловому объекту с произвольным доступом.
+
+    :param source: Путь к файлу, bytes или двоичный файловый объект.
+    :return: Путь (str) или файловый объект; bytes и потоки без seek() читаются в BytesIO.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if not source.seekable():
+        return io.BytesIO(source.read())
+    return source
+
+
+def read_head(source, size=HEAD_SIZE):
+    """
+    Читает первые байты документа (файловый объект - с начала), не сдвигая позицию файлового объекта.
+
+    :param source: Путь или файловый объект (см. as_source).
+    :param size: Число байт.
+    :return: bytes; пустая строка, если файл не читается.
+    """
+    if isinstance(source, str):
+        try:
+            with open(source, 'rb') as file:
+                return file.read(size)
+        except OSError:
+            return b''
+    position = source.tell()
+    try:
+        source.seek(0)
+        return source.read(size)
+    finally:
+        source.seek(position)
+
+
+def format_from_extension(file_name):
+    """
+    :param file_name: Имя или путь файла.
+    :return: Имя формата по расширению или None.
+    """
+    lowered = file_name.lower()
+    for document_format in FORMATS.values():
+        if lowered.endswith(document_format.extensions):
+            return document_format.name
+    return None
+
+
+def detect_format(source, file_name=None):
+    """
+    Определяет формат документа по сигнатуре в первых байтах, а если она не распознана - по расширению.
+
+    :param source: Путь или файловый объект (см. as_source).
+    :param file_name: Имя файла для определения по расширению, если source - не путь.
+    :return: Имя зарегистрированного формата или None.
+    """
+    head = read_head(source)
+    for document_format in FORMATS.values():
+        if head and document_format.sniff(head) and (document_format.confirm is None
+                                                     or document_format.confirm(source)):
+            return document_format.name
+    if file_name is None:
+        # У открытого файла имя доступно через атрибут name
+        file_name = source if isinstance(source, str) else getattr(source, 'name', None)
+    return format_from_extension(file_name) if isinstance(file_name, str) else None
+
+
+@contextlib.contextmanager
+def source_path(source, suffix=''):
+    """
+    Предоставляет путь к документу для инструментов, которые не читают из памяти (djvutxt, antiword, pdftoppm):
+    путь возвращается как есть, а содержимое файлового объекта временно записывается на диск.
+
+    :param source: Путь или файловый объект (см. as_source).
+    :param suffix: Расширение временного файла.
+    :return: Контекстный менеджер, выдающий путь.
+    """
+    if isinstance(source, str):
+        yield source
+        return
+    position = source.tell()
+    with tempfile.NamedTemporaryFile(suffix=suffix) as spooled:
+        source.seek(0)
+        shutil.copyfileobj(source, spooled)
+        spooled.flush()
+        source.seek(position)
+        yield spooled.name
@@ -0,0 +1,146 @@
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ElementTree
+
+# Пространства имён WordprocessingML (Transitional и Strict OOXML)
+W_NAMESPACES = (
+    'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'http://purl.oclc.org/ooxml/wordprocessingml/main',
+)
+RELATIONSHIP = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+DEFAULT_MAIN_PART = 'word/document.xml'
+# Типы связанных частей документа (окончания URI типа связи), извлекаемых с extras=True, в порядке вывода
+EXTRA_PART_TYPES = ('/header', '/footer', '/footnotes', '/endnotes')
+
+
+def _w_tags(name):
+    return frozenset(f'{{{namespace}}}{name}' for namespace in W_NAMESPACES)
+
+
+PARAGRAPH = _w_tags('p')
+TABLE_CELL = _w_tags('tc')
+RUN = _w_tags('r')
+TEXT = _w_tags('t')
+BREAK = _w_tags('br')
+BREAK_TYPE = frozenset(f'{{{namespace}}}type' for namespace in W_NAMESPACES)
+# Элементы содержимого run и их текстовые эквиваленты (как Run.text в python-docx)
+RUN_CONTENT_TEXT = {}
+for _name, _text in (('tab', '\t'), ('ptab', '\t'), ('cr', '\n'), ('noBreakHyphen', '-')):
+    for _tag in _w_tags(_name):
+        RUN_CONTENT_TEXT[_tag] = _text
+del _name, _text, _tag
+
+
+def _read_relationships(archive, rels_name):
+    try:
+        data = archive.read(rels_name)
+    except KeyError:
+        return []
+    return [(element.get('Type', ''), element.get('Target', ''))
+            for element in ElementTree.fromstring(data).iter(RELATIONSHIP)
+            if element.get('TargetMode') != 'External']
+
+
+def _resolve_target(source_part, target):
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def get_docx_parts(archive, extras=False):
+    """
+    Определяет XML-части пакета DOCX с текстом.
+
+    :param archive: Открытый zipfile.ZipFile.
+    :param extras: Добавить колонтитулы и сноски.
+    :return: Список имён частей: основной документ, затем (с extras) колонтитулы и сноски.
+    """
+    main_part = DEFAULT_MAIN_PART
+    for relationship_type, target in _read_relationships(archive, '_rels/.rels'):
+        if relationship_type.endswith('/officeDocument'):
+            main_part = _resolve_target('', target)
+            break
+    parts = [main_part]
+    if extras:
+        directory, name = posixpath.split(main_part)
+        relationships = _read_relationships(archive, posixpath.join(directory, '_rels', name + '.rels'))
+        names = set(archive.namelist())
+        for part_type in EXTRA_PART_TYPES:
+            for relationship_type, target in relationships:
+                part = _resolve_target(main_part, target)
+                if relationship_type.endswith(part_type) and part in names and part not in parts:
+                    parts.append(part)
+    return parts
+
+
+def iter_part_texts(stream, keep_empty=True):
+    """
+    Потоково разбирает XML-часть DOCX и выдаёт текст параграфов и ячеек таблиц в порядке документа.
+    Разобранные элементы сразу удаляются из дерева, поэтому память не растёт с размером документа.
+
+    :param stream: Двоичный поток XML-части.
+    :param keep_empty: Выдавать пустые параграфы (как python-docx для основного документа).
+    :return: Генератор строк: параграф вне таблицы - одна строка, ячейка таблицы - её параграфы через перевод строки.
+    """
+    open_elements = []
+    paragraphs = []     # части текста открытых параграфов (параграф может содержать надпись с параграфами)
+    cells = []          # тексты параграфов открытых ячеек таблиц
+    fallback_depth = 0  # mc:Fallback дублирует содержимое mc:Choice (например, надписи) - пропускаем его
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if fallback_depth or tag == MC_FALLBACK:
+                fallback_depth += 1
+                continue
+            open_elements.append(element)
+            if tag in PARAGRAPH:
+                paragraphs.append([])
+            elif tag in TABLE_CELL:
+                cells.append([])
+            continue
+
+        if fallback_depth:
+            fallback_depth -= 1
+            if fallback_depth == 0:
+                open_elements[-1].remove(element)
+            continue
+        open_elements.pop()
+        parent = open_elements[-1] if open_elements else None
+        if parent is not None and parent.tag in RUN and paragraphs:
+            if tag in TEXT:
+                paragraphs[-1].append(element.text or '')
+            elif tag in BREAK:
+                # Разрывы страницы и колонки не дают текста, перенос строки - "\n"
+                break_type = next((element.get(name) for name in BREAK_TYPE if element.get(name)), 'textWrapping')
+                if break_type == 'textWrapping':
+                    paragraphs[-1].append('\n')
+            elif tag in RUN_CONTENT_TEXT:
+                paragraphs[-1].append(RUN_CONTENT_TEXT[tag])
+        elif tag in PARAGRAPH:
+            text = ''.join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            elif keep_empty or text:
+                yield text
+        elif tag in TABLE_CELL:
+            text = '\n'.join(cells.pop())
+            if text.strip():
+                yield text
+        if parent is not None:
+            parent.remove(element)
+
+
+def iter_docx_texts(source, extras=False):
+    """
+    Извлекает текст DOCX без python-docx: части пакета читаются из zip и разбираются потоково.
+
+    :param source: Путь к файлу DOCX или двоичный файловый объект.
+    :param extras: Добавить текст колонтитулов и сносок после основного документа.
+    :return: Генератор строк (см. iter_part_texts).
+    """
+    with zipfile.ZipFile(source) as archive:
+        parts = get_docx_parts(archive, extras)
+        for number, part in enumerate(parts):
+            with archive.open(part) as stream:
+                yield from iter_part_texts(stream, keep_empty=number == 0)
@@ -0,0 +1,148 @@
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Время (с), после которого внешний инструмент останавливается
+DEFAULT_TOOL_TIMEOUT = 300
+
+
+class ToolStats:
+    """Счётчики вызовов одного внешнего инструмента."""
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'total', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self):
+        """
+        :return: Словарь: число вызовов, ошибок и остановок по тайм-ауту, суммарное, среднее и максимальное время (с).
+        """
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'total': round(self.total, 6),
+            'mean': round(self.total / self.calls, 6) if self.calls else 0.0,
+            'max': round(self.max, 6),
+        }
+
+
+class ToolRunner:
+    """
+    Запуск внешних инструментов (djvutxt, antiword, djvused): не больше max_concurrency процессов одновременно,
+    с тайм-аутом на вызов (зависший процесс принудительно останавливается) и статистикой задержек по инструментам.
+    """
+
+    def __init__(self, max_concurrency=None, timeout=DEFAULT_TOOL_TIMEOUT):
+        """
+        :param max_concurrency: Максимальное число одновременно запущенных процессов; по умолчанию - число ядер.
+        :param timeout: Тайм-аут вызова по умолчанию в секундах (None - без ограничения).
+        """
+        self.max_concurrency = os.cpu_count() or 1 if max_concurrency is None else max_concurrency
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency должно быть не меньше 1")
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def run(self, args, timeout=None):
+        """
+        Запускает инструмент и возвращает его вывод.
+
+        :param args: Команда и аргументы.
+        :param timeout: Тайм-аут в секундах; по умолчанию - тайм-аут запускателя.
+        :return: Текст stdout.
+        :raises subprocess.TimeoutExpired: Если инструмент не завершился вовремя (процесс остановлен).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._semaphore:
+            started = time.perf_counter()
+            try:
+                # subprocess.run останавливает процесс при истечении тайм-аута
+                result = subprocess.run(args, capture_output=True, text=True, encoding='utf-8', timeout=timeout)
+            except BaseException as e:
+                self._record(args[0], started, e)
+                raise
+            self._record(args[0], started)
+        return result.stdout
+
+    def run_many(self, commands, timeout=None):
+        """
+        Запускает несколько команд параллельно (не больше max_concurrency одновременно).
+
+        :param commands: Список команд.
+        :param timeout: Тайм-аут каждого вызова в секундах.
+        :return: Список выводов в порядке команд; первая ошибка пробрасывается.
+        """
+        if len(commands) == 1:
+            return [self.run(commands[0], timeout)]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(commands))) as pool:
+            return list(pool.map(lambda args: self.run(args, timeout), commands))
+
+    def stream(self, args, timeout=None):
+        """
+        Запускает инструмент и выдаёт его вывод построчно по мере появления.
+        Процесс останавливается по тайм-ауту или при досрочном закрытии генератора.
+
+        :param args: Команда и аргументы.
+        :param timeout: Тайм-аут всего вызова в секундах; по умолчанию - тайм-аут запускателя.
+        :return: Генератор строк stdout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._semaphore:
+            started = time.perf_counter()
+            error = None
+            try:
+                process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                           text=True, encoding='utf-8')
+            except BaseException as e:
+                self._record(args[0], started, e)
+                raise
+            timer = None
+            if timeout is not None:
+                timer = threading.Timer(timeout, process.kill)
+                timer.daemon = True
+                timer.start()
+            try:
+                yield from process.stdout
+                if timer is not None and timer.finished.is_set():
+                    # Таймер сработал до отмены: процесс остановлен по тайм-ауту
+                    raise subprocess.TimeoutExpired(args, timeout)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait()
+                self._record(args[0], started, error)
+
+    def stats(self):
+        """
+        :return: Словарь {инструмент: счётчики (см. ToolStats.as_dict)}.
+        """
+        with self._lock:
+            return {tool: stats.as_dict() for tool, stats in self._stats.items()}
+
+    def _record(self, tool, started, error=None):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats.setdefault(os.path.basename(tool), ToolStats())
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            if isinstance(error, subprocess.TimeoutExpired):
+                stats.timeouts += 1
+            elif error is not None and not isinstance(error, GeneratorExit):
+                stats.errors += 1
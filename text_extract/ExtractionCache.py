@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Размер блока при хэшировании: файл читается потоково, не целиком в память
+HASH_CHUNK_SIZE = 1024 * 1024
+# Время последнего использования записей копится в памяти и записывается в файл пачкой
+# при сохранении текста, закрытии кэша или после стольких обращений
+ACCESS_FLUSH_SIZE = 1000
+# По сколько записей выбирается при вытеснении
+EVICTION_BATCH = 64
+
+
+def file_digest(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Считает SHA-256 содержимого файла, читая его блоками.
+
+    :param file_path: Путь к файлу.
+    :param chunk_size: Размер блока чтения в байтах.
+    :return: Шестнадцатеричная строка хэша.
+    """
+    with open(file_path, 'rb') as file:
+        return stream_digest(file, chunk_size)
+
+
+def stream_digest(stream, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Считает SHA-256 всего содержимого двоичного файлового объекта, читая его блоками;
+    позиция в файле сохраняется.
+
+    :param stream: Двоичный файловый объект с произвольным доступом.
+    :param chunk_size: Размер блока чтения в байтах.
+    :return: Шестнадцатеричная строка хэша.
+    """
+    digest = hashlib.sha256()
+    position = stream.tell()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+def make_cache_key(digest, extractor, version, options=None):
+    """
+    Составляет ключ кэша из хэша содержимого, имени и версии извлекателя и его параметров.
+
+    :param digest: Хэш содержимого файла.
+    :param extractor: Имя извлекателя (например, 'pdf').
+    :param version: Версия извлекателя: при её изменении старые записи перестают находиться.
+    :param options: Словарь параметров, влияющих на результат (язык OCR, режим и т.п.).
+    :return: Строка ключа.
+    """
+    return f"{digest}:{extractor}:{version}:{json.dumps(options or {}, sort_keys=True)}"
+
+
+class ExtractionCache:
+    """
+    Дисковый кэш извлечённого текста (SQLite) с ключом по хэшу содержимого файла.
+
+    Один и тот же документ, переданный под другим именем или из другого каталога, берётся из кэша;
+    при превышении размера вытесняются давно не использованные записи.
+    Суммарный размер текстов хранится в файле кэша и обновляется вместе с записями, поэтому общий файл
+    могут использовать несколько процессов.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        """
+        :param path: Путь к файлу кэша; каталоги создаются при необходимости.
+        :param max_bytes: Максимальный суммарный размер текстов в кэше.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._accessed = {}     # ключ -> время обращения, ещё не записанное в файл
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS texts (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS texts_accessed ON texts (accessed_at)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS totals (size INTEGER NOT NULL)")
+        if self._db.execute("SELECT 1 FROM totals").fetchone() is None:
+            # Новый файл или файл кэша прежней версии
+            self._db.execute("INSERT INTO totals SELECT COALESCE(SUM(size), 0) FROM texts")
+        self._db.commit()
+
+    def get(self, key, count=True):
+        """
+        Ищет текст в кэше и отмечает запись как использованную
+        (время обращения записывается в файл отложенно).
+
+        :param key: Ключ (см. make_cache_key).
+        :param count: Учитывать обращение в статистике попаданий (вспомогательные записи, например языки OCR, не учитываются).
+        :return: Текст или None.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT text FROM texts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += count
+                return None
+            self.hits += count
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._db.commit()
+        return row[0]
+
+    def put(self, key, text):
+        """
+        Сохраняет текст и вытесняет давно не использованные записи сверх лимита размера.
+
+        :param key: Ключ (см. make_cache_key).
+        :param text: Извлечённый текст.
+        """
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._flush_accessed()
+            self._db.execute(
+                "UPDATE totals SET size = size + ? - COALESCE((SELECT size FROM texts WHERE key = ?), 0)", (size, key))
+            self._db.execute("INSERT OR REPLACE INTO texts (key, text, accessed_at, size) VALUES (?, ?, ?, ?)",
+                             (key, text, time.time(), size))
+            self._evict()
+            self._db.commit()
+
+    def clear(self):
+        """Удаляет все записи кэша."""
+        with self._lock:
+            self._accessed.clear()
+            self._db.execute("DELETE FROM texts")
+            self._db.execute("UPDATE totals SET size = 0")
+            self._db.commit()
+
+    def size(self):
+        """
+        :return: Суммарный размер текстов в кэше в байтах.
+        """
+        with self._lock:
+            return self._db.execute("SELECT size FROM totals").fetchone()[0]
+
+    def stats(self):
+        """
+        :return: Словарь счётчиков: попадания, промахи, вытеснения.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def close(self):
+        """Записывает отложенные времена обращений и закрывает файл кэша."""
+        with self._lock:
+            self._flush_accessed()
+            self._db.commit()
+            self._db.close()
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._db.executemany("UPDATE texts SET accessed_at = ? WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        # Вызывается после _flush_accessed: порядок вытеснения учитывает все обращения
+        total = self._db.execute("SELECT size FROM totals").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM texts ORDER BY accessed_at LIMIT ?",
+                                    (EVICTION_BATCH,)).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM texts WHERE key = ?", (key,))
+                total -= size
+                self.evictions += 1
+            self._db.execute("UPDATE totals SET size = ?", (total,))
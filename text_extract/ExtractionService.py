@@ -0,0 +1,262 @@
+import argparse
+import io
+import json
+import os
+import signal
+import sys
+from urllib.parse import urlencode, urlsplit, parse_qsl
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from LocalService import (RETRY_AFTER, JsonRequestHandler, ServiceBusy, ServiceClient, WorkerPool, make_server,
+                          parse_address)
+
+# Адрес по умолчанию отличается от сервиса analyze_web, чтобы оба можно было запустить рядом
+DEFAULT_ADDRESS = '127.0.0.1:8766'
+DEFAULT_QUEUE_SIZE = 16
+# Значения параметров запроса, означающие «да»
+TRUE_VALUES = ('1', 'true', 'yes')
+OCR_MODES = ('document', 'page')
+
+# Кэш процесса-обработчика открывается один раз при его запуске
+_cache = None
+
+
+def _init_worker(cache_path, cache_max_bytes):
+    global _cache
+    # Извлекатели импортируют библиотеки при первом использовании; в процессе сервиса они импортируются
+    # заранее, один раз на процесс, чтобы не задерживать первые запросы
+    from TextExtraction import preload_dependencies
+    from ExtractionCache import ExtractionCache
+    preload_dependencies()
+    _cache = ExtractionCache(cache_path, max_bytes=cache_max_bytes) if cache_path else None
+
+
+def parse_options(query):
+    """
+    Разбирает параметры извлечения из строки запроса.
+
+    :param query: Словарь параметров запроса (строки).
+    :return: Именованные аргументы extract_text.
+    :raises ValueError: Если параметр неизвестен или его значение недопустимо.
+    """
+    from TextExtraction import DOCX_ENGINES, PDF_LAYOUTS, parse_page_ranges
+    options = {}
+    for name, value in query.items():
+        if name == 'lang':
+            options['lang'] = value
+        elif name == 'ocr_mode':
+            if value not in OCR_MODES:
+                raise ValueError(f"ocr_mode должен быть одним из {OCR_MODES}")
+            options['ocr_mode'] = value
+        elif name == 'min_page_chars':
+            options['min_page_chars'] = int(value)
+        elif name == 'docx_engine':
+            if value not in DOCX_ENGINES:
+                raise ValueError(f"docx_engine должен быть одним из {DOCX_ENGINES}")
+            options['docx_engine'] = value
+        elif name == 'docx_extras':
+            options['docx_extras'] = value.lower() in TRUE_VALUES
+        elif name == 'pdf_pages':
+            options['pdf_pages'] = parse_page_ranges(value)
+        elif name == 'pdf_max_pages':
+            options['pdf_max_pages'] = int(value)
+            if options['pdf_max_pages'] < 1:
+                raise ValueError("pdf_max_pages должно быть не меньше 1")
+        elif name == 'pdf_layout':
+            if value not in PDF_LAYOUTS:
+                raise ValueError(f"pdf_layout должен быть одним из {PDF_LAYOUTS}")
+            options['pdf_layout'] = value
+        elif name not in ('path', 'filename'):
+            raise ValueError(f"неизвестный параметр: {name}")
+    return options
+
+
+def extract_document(data, file_name=None, path=None, options=None):
+    """
+    Извлекает текст в процессе-обработчике: результат тот же, что у extract_text.
+
+    :param data: Содержимое документа (bytes) или None, если задан path.
+    :param file_name: Имя загруженного файла - для определения формата по расширению.
+    :param path: Путь к документу на машине сервиса (вместо загрузки содержимого).
+    :param options: Именованные аргументы extract_text.
+    :return: Словарь {'format', 'text', 'metadata'}; format равен None для неподдерживаемого файла.
+    """
+    from TextExtraction import extract_text
+    from DocumentFormats import as_source, detect_format
+    if path is not None:
+        source = path
+    else:
+        source = io.BytesIO(data)
+        if file_name:
+            source.name = file_name
+    name = detect_format(as_source(source))
+    if name is None:
+        return {'format': None, 'text': "", 'metadata': {}}
+    metadata = {}
+    # Параллельность обеспечивают процессы сервиса, поэтому OCR внутри каждого по умолчанию однопоточный
+    options = {'ocr_workers': 1, **(options or {})}
+    text = extract_text(source, cache=_cache, metadata=metadata, **options)
+    return {'format': name, 'text': text, 'metadata': metadata}
+
+
+class ExtractionServiceHandler(JsonRequestHandler):
+    """
+    POST /extract?filename=...&lang=... с содержимым документа в теле - извлечение текста;
+    POST /extract?path=... с пустым телом - извлечение из файла на машине сервиса;
+    GET /health - состояние сервиса.
+    """
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok', 'workers': self.server.pool.workers})
+        else:
+            self.send_json(404, {'error': "Неизвестный путь"})
+
+    def do_POST(self):
+        body = self.read_body()
+        if body is None:
+            return
+        url = urlsplit(self.path)
+        if url.path != '/extract':
+            self.send_json(404, {'error': "Неизвестный путь"})
+            return
+        query = dict(parse_qsl(url.query))
+        try:
+            options = parse_options(query)
+        except ValueError as e:
+            self.send_json(400, {'error': f"Некорректный запрос: {e}"})
+            return
+        path = query.get('path')
+        if path is None and not body:
+            self.send_json(400, {'error': "Некорректный запрос: нет содержимого документа и параметра path"})
+            return
+        try:
+            result = self.server.pool.run(extract_document, None if path else body, query.get('filename'), path,
+                                          options)
+        except ServiceBusy:
+            self.send_json(503, {'error': "Сервис перегружен"}, {'Retry-After': str(RETRY_AFTER)})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        if result['format'] is None:
+            self.send_json(415, {**result, 'error': "Формат файла не поддерживается"})
+        else:
+            self.send_json(200, {**result, 'error': None})
+
+
+def create_service(address=DEFAULT_ADDRESS, workers=None, queue_size=DEFAULT_QUEUE_SIZE, cache_path=None,
+                   cache_max_bytes=512 * 1024 * 1024):
+    """
+    Создаёт сервис извлечения текста с прогретыми процессами-обработчиками.
+
+    :param address: 'host:port' (HTTP) или 'unix:ПУТЬ' (Unix-сокет).
+    :param workers: Число процессов-обработчиков; по умолчанию - число ядер.
+    :param queue_size: Сколько запросов может ждать свободного процесса; остальные получают 503.
+    :param cache_path: Путь к файлу ExtractionCache; None - без кэша.
+    :param cache_max_bytes: Максимальный размер кэша.
+    :return: Сервер; запуск - serve_forever(), остановка - shutdown(), затем server_close() и pool.close().
+    """
+    pool = WorkerPool(workers or os.cpu_count() or 1, queue_size, _init_worker, (cache_path, cache_max_bytes))
+    try:
+        server = make_server(address, ExtractionServiceHandler)
+    except Exception:
+        pool.close()
+        raise
+    server.pool = pool
+    return server
+
+
+def extract_remote(paths, address=DEFAULT_ADDRESS, options=None, by_path=False, timeout=None):
+    """
+    Извлекает текст документов через сервис (не импортируя библиотеки извлечения в процесс клиента).
+
+    :param paths: Пути к документам.
+    :param address: Адрес сервиса.
+    :param options: Параметры извлечения (см. parse_options).
+    :param by_path: Передавать сервису путь вместо содержимого (сервис должен видеть тот же файл).
+    :param timeout: Таймаут операций с сокетом в секундах.
+    :return: Генератор записей {'path', 'format', 'text', 'metadata', 'error'}.
+    """
+    with ServiceClient(address, timeout) as client:
+        for path in paths:
+            query = {key: value for key, value in (options or {}).items() if value is not None}
+            if by_path:
+                query['path'] = os.path.abspath(path)
+                body = b''
+            else:
+                query['filename'] = os.path.basename(path)
+                with open(path, 'rb') as file:
+                    body = file.read()
+            _, payload = client.request('POST', f'/extract?{urlencode(query)}', body,
+                                        {'Content-Type': 'application/octet-stream'})
+            yield {'path': path, 'format': payload.get('format'), 'text': payload.get('text'),
+                   'metadata': payload.get('metadata'), 'error': payload.get('error')}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Сервис извлечения текста с прогретыми процессами и его клиент')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Запустить сервис')
+    serve_parser.add_argument('-w', '--workers', type=int, default=None,
+                              help='Число процессов-обработчиков (по умолчанию - число ядер)')
+    serve_parser.add_argument('-q', '--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                              help='Сколько запросов может ждать свободного процесса; остальные получают 503')
+    serve_parser.add_argument('--no-cache', action='store_true', help='Не использовать кэш извлечённого текста')
+    serve_parser.add_argument('--cache-path', type=str, default=None, help='Путь к файлу кэша')
+    serve_parser.add_argument('--cache-max-mb', type=float, default=512, help='Максимальный размер кэша в МБ')
+    serve_parser.add_argument('-v', '--verbose', action='store_true', help='Выводить журнал запросов в stderr')
+    client_parser = commands.add_parser('extract', help='Извлечь текст через запущенный сервис')
+    client_parser.add_argument('files', nargs='+', help='Пути к документам')
+    client_parser.add_argument('--by-path', action='store_true',
+                               help='Передавать сервису путь к файлу вместо содержимого (сервис на той же машине)')
+    client_parser.add_argument('--ocr-lang', type=str, default=None, help='Языки OCR (по умолчанию auto)')
+    client_parser.add_argument('--ocr-mode', choices=OCR_MODES, default=None, help='Режим OCR для PDF')
+    client_parser.add_argument('--docx-engine', type=str, default=None, help='Способ извлечения DOCX')
+    client_parser.add_argument('--pdf-pages', type=str, default=None, help='Диапазоны страниц PDF, например 1-5,8')
+    client_parser.add_argument('--pdf-max-pages', type=int, default=None, help='Максимальное число страниц PDF')
+    client_parser.add_argument('--pdf-layout', type=str, default=None, help='Профиль анализа вёрстки PDF')
+    client_parser.add_argument('--json', action='store_true',
+                               help='Выводить записи JSONL (path, format, text, metadata, error) вместо текста')
+    client_parser.add_argument('--timeout', type=float, default=None, help='Таймаут ожидания ответа в секундах')
+    for command_parser in (serve_parser, client_parser):
+        command_parser.add_argument('-a', '--address', type=str, default=DEFAULT_ADDRESS,
+                                    help=f'Адрес сервиса: host:port или unix:ПУТЬ (по умолчанию {DEFAULT_ADDRESS})')
+    args = parser.parse_args()
+    try:
+        parse_address(args.address)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == 'serve':
+        if args.workers is not None and args.workers < 1:
+            parser.error('--workers должно быть не меньше 1')
+        if args.queue_size < 0:
+            parser.error('--queue-size должно быть не меньше 0')
+        from TextExtraction import DEFAULT_CACHE_PATH
+        cache_path = None if args.no_cache else args.cache_path or DEFAULT_CACHE_PATH
+        server = create_service(args.address, args.workers, args.queue_size, cache_path,
+                                int(args.cache_max_mb * 1024 * 1024))
+        server.verbose = args.verbose
+        # Остановка по SIGTERM проходит через finally: процессы завершаются, файл сокета удаляется
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"Сервис запущен: {args.address}, процессов: {server.pool.workers}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            server.pool.close()
+    else:
+        options = {'lang': args.ocr_lang, 'ocr_mode': args.ocr_mode, 'docx_engine': args.docx_engine,
+                   'pdf_pages': args.pdf_pages, 'pdf_max_pages': args.pdf_max_pages, 'pdf_layout': args.pdf_layout}
+        errors = 0
+        for record in extract_remote(args.files, args.address, options, args.by_path, args.timeout):
+            if record['error'] is not None:
+                errors += 1
+                print(f"{record['path']}: {record['error']}", file=sys.stderr)
+            if args.json:
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+            elif record['error'] is None:
+                print(record['text'], flush=True)
+        sys.exit(1 if errors else 0)
@@ -0,0 +1,74 @@
+import functools
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require
+
+# Значение параметра lang, при котором языки OCR определяются по документу
+AUTO_LANG = 'auto'
+# Языки, если определить письменность не удалось
+DEFAULT_LANG = 'rus'
+# Сколько первых страниц, требующих OCR, растеризуется для определения письменности
+OSD_SAMPLE_PAGES = 2
+# Разрешение пробных страниц: для OSD достаточно меньшего, чем для распознавания текста
+OSD_DPI = 150
+# Письменность с меньшей уверенностью OSD не учитывается
+MIN_SCRIPT_CONFIDENCE = 1.0
+# Письменность по OSD tesseract -> языковой пакет
+SCRIPT_LANGUAGES = {
+    'Cyrillic': 'rus',
+    'Latin': 'eng',
+    'Han': 'chi_sim',
+    'HanS': 'chi_sim',
+    'HanT': 'chi_tra',
+    'Japanese': 'jpn',
+    'Hangul': 'kor',
+    'Korean': 'kor',
+    'Arabic': 'ara',
+    'Greek': 'ell',
+    'Hebrew': 'heb',
+}
+
+
+def detect_script(image):
+    """
+    Определяет письменность страницы через OSD tesseract (--psm 0).
+
+    :param image: Изображение страницы (PIL).
+    :return: Пара (письменность, уверенность) или None, если на странице слишком мало символов.
+    """
+    pytesseract = require('pytesseract', purpose='определения письменности (OSD)')
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractError:
+        return None
+    return osd['script'], float(osd['script_conf'])
+
+
+@functools.lru_cache(maxsize=None)
+def installed_languages():
+    """
+    :return: Множество установленных языковых пакетов tesseract или None, если список недоступен.
+    """
+    try:
+        return frozenset(require('pytesseract').get_languages(config=''))
+    except Exception:
+        return None
+
+
+def languages_for_scripts(scripts, default=DEFAULT_LANG):
+    """
+    Составляет строку языков tesseract по письменностям пробных страниц.
+
+    :param scripts: Пары (письменность, уверенность), см. detect_script.
+    :param default: Языки, если ни одна письменность не распознана уверенно.
+    :return: Языки через '+' в порядке первого появления, например 'chi_sim+eng'.
+    """
+    available = installed_languages()
+    languages = []
+    for script, confidence in scripts:
+        language = SCRIPT_LANGUAGES.get(script)
+        if language is None or confidence < MIN_SCRIPT_CONFIDENCE or language in languages:
+            continue
+        # Пакет, которого нет в системе, tesseract не загрузит - такую письменность пропускаем
+        if available is None or language in available:
+            languages.append(language)
+    return "+".join(languages) or default
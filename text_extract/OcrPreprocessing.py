@@ -0,0 +1,166 @@
+import statistics
+
+# Способы подготовки страницы к OCR
+OCR_PREPROCESS_MODES = ('none', 'grayscale', 'binarize')
+# Разрешение растеризации, если размер текста оценить не удалось (как по умолчанию в pdf2image)
+DEFAULT_DPI = 200
+# Разрешение пробной растеризации для оценки размера текста: 1 пиксель = 1 пункт
+SAMPLE_DPI = 72
+MIN_DPI = 150
+MAX_DPI = 400
+# Высота строки текста в пикселях, при которой tesseract распознаёт надёжно; больше - только дольше
+TARGET_TEXT_HEIGHT = 32
+# Предел пикселей страницы (A4 при 300 DPI): крупные страницы растеризуются с меньшим разрешением
+MAX_PAGE_PIXELS = 2480 * 3508
+# Яркость, ниже которой пиксель считается «чернилами» при поиске полей и строк
+INK_THRESHOLD = 200
+# Отступ вокруг содержимого при обрезке полей, в пикселях
+CROP_MARGIN = 16
+# Строка пикселей темнее фона страницы на столько уровней яркости (в среднем) считается строкой текста
+ROW_INK_DELTA = 4
+
+
+def make_ocr_settings(dpi='auto', preprocess='grayscale', crop=True, psm=None, oem=None):
+    """
+    Составляет настройки OCR страниц PDF.
+
+    :param dpi: Разрешение растеризации или 'auto' - по размеру страницы и оценке размера текста (см. choose_dpi).
+    :param preprocess: 'none' - цветное изображение, 'grayscale' - оттенки серого, 'binarize' - чёрно-белое (порог Оцу).
+    :param crop: Обрезать пустые поля страницы.
+    :param psm: Режим сегментации страницы tesseract (--psm, 0-13); None - по умолчанию tesseract.
+    :param oem: Режим движка tesseract (--oem, 0-3); None - по умолчанию tesseract.
+    :return: Словарь настроек (сериализуется в JSON, поэтому входит в ключ кэша).
+    """
+    if dpi != 'auto' and (not isinstance(dpi, int) or dpi < 1):
+        raise ValueError(f"Недопустимое разрешение OCR: {dpi}")
+    if preprocess not in OCR_PREPROCESS_MODES:
+        raise ValueError(f"Неизвестный способ подготовки изображения: {preprocess}")
+    if psm is not None and not 0 <= psm <= 13:
+        raise ValueError(f"Недопустимый режим сегментации tesseract: {psm}")
+    if oem is not None and not 0 <= oem <= 3:
+        raise ValueError(f"Недопустимый режим движка tesseract: {oem}")
+    return {'dpi': dpi, 'preprocess': preprocess, 'crop': crop, 'psm': psm, 'oem': oem}
+
+
+def tesseract_config(settings):
+    """
+    :param settings: Настройки OCR (см. make_ocr_settings).
+    :return: Строка параметров tesseract, например '--psm 6 --oem 1'.
+    """
+    options = []
+    if settings['psm'] is not None:
+        options.append(f"--psm {settings['psm']}")
+    if settings['oem'] is not None:
+        options.append(f"--oem {settings['oem']}")
+    return " ".join(options)
+
+
+def estimate_text_height(image):
+    """
+    Оценивает высоту строк текста по горизонтальной проекции страницы.
+
+    :param image: Изображение страницы (PIL).
+    :return: Медианная высота строки в пикселях или None, если строк не найдено.
+    """
+    # Изображение уже построено через PIL - модуль импортирован
+    from PIL import Image
+    gray = image.convert('L')
+    # Средняя яркость каждой строки пикселей: сжатие до ширины 1 с усреднением
+    profile = list(gray.resize((1, gray.height), Image.BOX).tobytes())
+    background = max(profile, default=255)
+    heights = []
+    run = 0
+    for value in profile + [background]:
+        if value < background - ROW_INK_DELTA:
+            run += 1
+        else:
+            if run >= 2:
+                heights.append(run)
+            run = 0
+    return statistics.median(heights) if heights else None
+
+
+def choose_dpi(page_width, page_height, text_height=None):
+    """
+    Выбирает разрешение растеризации страницы: строки текста должны получиться высотой около
+    TARGET_TEXT_HEIGHT пикселей, а страница - не больше MAX_PAGE_PIXELS пикселей.
+
+    :param page_width: Ширина страницы в пунктах (1/72 дюйма).
+    :param page_height: Высота страницы в пунктах.
+    :param text_height: Оценка высоты строки в пунктах (см. estimate_text_height при SAMPLE_DPI) или None.
+    :return: Разрешение в DPI.
+    """
+    dpi = DEFAULT_DPI
+    if text_height:
+        dpi = min(max(round(TARGET_TEXT_HEIGHT * 72 / text_height), MIN_DPI), MAX_DPI)
+    if page_width > 0 and page_height > 0:
+        pixel_limit = (MAX_PAGE_PIXELS / (page_width / 72 * page_height / 72)) ** 0.5
+        dpi = min(dpi, int(pixel_limit))
+    return max(dpi, 1)
+
+
+def otsu_threshold(histogram):
+    """
+    :param histogram: Гистограмма яркости из 256 значений (Image.histogram() для режима 'L').
+    :return: Порог, лучше всего разделяющий пиксели на фон и текст (метод Оцу).
+    """
+    total = sum(histogram)
+    total_sum = sum(value * count for value, count in enumerate(histogram))
+    # Тёмные пиксели - не ярче порога, светлые - остальные
+    dark_count = 0
+    dark_sum = 0
+    best_threshold, best_variance = 0, -1.0
+    for value, count in enumerate(histogram):
+        dark_count += count
+        if dark_count == 0:
+            continue
+        light_count = total - dark_count
+        if light_count == 0:
+            break
+        dark_sum += value * count
+        dark_mean = dark_sum / dark_count
+        light_mean = (total_sum - dark_sum) / light_count
+        variance = dark_count * light_count * (dark_mean - light_mean) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = value, variance
+    return best_threshold
+
+
+def content_box(image, margin=CROP_MARGIN):
+    """
+    Находит прямоугольник содержимого страницы без пустых полей.
+
+    :param image: Изображение в оттенках серого (режим 'L').
+    :param margin: Отступ вокруг содержимого в пикселях.
+    :return: Кортеж (left, top, right, bottom) или None, если страница пустая.
+    """
+    bbox = image.point(lambda value: 255 if value < INK_THRESHOLD else 0).getbbox()
+    if bbox is None:
+        return None
+    left, top, right, bottom = bbox
+    return (max(left - margin, 0), max(top - margin, 0),
+            min(right + margin, image.width), min(bottom + margin, image.height))
+
+
+def preprocess_image(image, settings):
+    """
+    Готовит изображение страницы к OCR: меньше каналов и пикселей - быстрее tesseract.
+
+    :param image: Изображение страницы (PIL).
+    :param settings: Настройки OCR (см. make_ocr_settings).
+    :return: Подготовленное изображение или None, если страница пустая (распознавать нечего).
+    """
+    if settings['preprocess'] == 'none' and not settings['crop']:
+        return image
+    gray = image.convert('L')
+    # В режиме 'none' поля ищутся по серому изображению, но распознаётся исходное
+    result = image if settings['preprocess'] == 'none' else gray
+    if settings['crop']:
+        box = content_box(gray)
+        if box is None:
+            return None
+        gray, result = gray.crop(box), result.crop(box)
+    if settings['preprocess'] == 'binarize':
+        threshold = otsu_threshold(gray.histogram())
+        return gray.point(lambda value: 255 if value > threshold else 0)
+    return result
@@ -0,0 +1,222 @@
+from io import StringIO
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require
+
+# Профили анализа вёрстки: default - полный анализ pdfminer (порядок блоков определяется их взаимным
+# расположением); fast - символы собираются в слова и строки, но без иерархической группировки блоков,
+# самой дорогой части анализа (квадратичной по числу блоков): блоки идут сверху вниз и слева направо
+PDF_LAYOUTS = ('default', 'fast')
+# Страницы PDF разбираются диапазонами: после каждого сбрасывается кэш объектов документа (см. iter_pdf_text),
+# при параллельном извлечении диапазон - единица работы процесса
+PDF_CHUNK_PAGES = 32
+
+
+def _require_pdfminer():
+    # pdfminer импортируется при первом извлечении PDF; если он не установлен - понятная ошибка
+    require('pdfminer', 'pdfminer.six', 'извлечения текста из PDF')
+
+
+def make_laparams(layout='default'):
+    """
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :return: Параметры анализа вёрстки pdfminer (LAParams).
+    """
+    _require_pdfminer()
+    from pdfminer.layout import LAParams
+    if layout == 'default':
+        return LAParams()
+    if layout == 'fast':
+        return LAParams(boxes_flow=None)
+    raise ValueError(f"неизвестный профиль вёрстки PDF: {layout}")
+
+
+def parse_page_ranges(spec):
+    """
+    Разбирает список диапазонов страниц вида '1-5,8,10-' (последний диапазон - до конца документа).
+
+    :param spec: Строка диапазонов; номера страниц с 1.
+    :return: Список пар (первая страница, последняя страница или None - до конца документа).
+    :raises ValueError: Если диапазон записан некорректно.
+    """
+    ranges = []
+    for part in spec.split(','):
+        first, dash, last = part.strip().partition('-')
+        try:
+            first = int(first)
+            last = (int(last) if last.strip() else None) if dash else first
+        except ValueError:
+            raise ValueError(f"некорректный диапазон страниц: '{part.strip()}'") from None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"некорректный диапазон страниц: '{part.strip()}'")
+        ranges.append((first, last))
+    return ranges
+
+
+def count_pdf_pages(pdf_file):
+    """
+    Возвращает число страниц PDF по дереву страниц, не разбирая их содержимое.
+
+    :param pdf_file: Путь к файлу PDF или двоичный файловый объект.
+    :return: Число страниц.
+    """
+    _require_pdfminer()
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import dict_value, resolve1
+    from pdfminer.utils import open_filename
+    with open_filename(pdf_file, 'rb') as fp:
+        document = PDFDocument(PDFParser(fp), caching=False)
+        try:
+            return int(resolve1(dict_value(document.catalog['Pages'])['Count']))
+        except Exception:
+            # Повреждённое дерево страниц: считаем страницы обходом
+            return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def select_pdf_pages(pdf_file, page_ranges=None, max_pages=None):
+    """
+    Определяет страницы PDF, из которых извлекается текст.
+
+    :param pdf_file: Путь к файлу PDF или двоичный файловый объект.
+    :param page_ranges: Диапазоны страниц: строка (см. parse_page_ranges) или список пар; None - все страницы.
+    :param max_pages: Извлекать не больше max_pages первых из выбранных страниц; None - без ограничения.
+    :return: Возрастающий список номеров страниц с 0 или None, если выбраны все страницы документа.
+    """
+    if not page_ranges and not max_pages:
+        return None
+    if isinstance(page_ranges, str):
+        page_ranges = parse_page_ranges(page_ranges)
+    page_count = count_pdf_pages(pdf_file)
+    if not page_ranges:
+        return list(range(min(max_pages, page_count)))
+    pages = set()
+    for first, last in page_ranges:
+        pages.update(range(first - 1, min(page_count if last is None else last, page_count)))
+    return sorted(pages)[:max_pages]
+
+
+def _iter_page_tree(document, page_numbers=None):
+    # Обход дерева страниц в глубину, как в PDFPage.create_pages, но поддеревья, все страницы которых
+    # идут раньше следующей выбранной, пропускаются по /Count без разбора их узлов.
+    # Возвращает число пройденных страниц
+    from pdfminer.pdfpage import PDFPage, LITERAL_PAGE, LITERAL_PAGES
+    from pdfminer.pdftypes import dict_value, list_value, resolve1
+    wanted = iter(page_numbers) if page_numbers is not None else None
+    target = next(wanted) if wanted is not None else 0
+    number = 0
+    visited = set()
+    pending = [(iter([document.catalog['Pages']]), document.catalog)]
+    while pending:
+        kids, parent = pending[-1]
+        kid = next(kids, pending)
+        if kid is pending:
+            pending.pop()
+            continue
+        objid = getattr(kid, 'objid', None)
+        if objid is not None:
+            if objid in visited:
+                continue
+            visited.add(objid)
+        attrs = dict_value(kid).copy()
+        for key, value in parent.items():
+            if key in PDFPage.INHERITABLE_ATTRS and key not in attrs:
+                attrs[key] = value
+        kind = attrs.get('Type', attrs.get('type'))
+        if kind is LITERAL_PAGES and 'Kids' in attrs:
+            count = resolve1(attrs.get('Count'))
+            if wanted is not None and isinstance(count, int) and 0 <= count <= target - number:
+                number += count
+            else:
+                pending.append((iter(list_value(attrs['Kids'])), attrs))
+        elif kind is LITERAL_PAGE:
+            if wanted is None or number == target:
+                yield number, PDFPage(document, objid, attrs, None)
+                if wanted is not None:
+                    target = next(wanted, None)
+                    if target is None:
+                        return number + 1
+            number += 1
+    return number
+
+
+def _release_cached_objects(document):
+    # pdfminer хранит все разобранные объекты документа до его закрытия
+    for cache in (getattr(document, '_cached_objs', None), getattr(document, '_parsed_objs', None)):
+        if cache is not None:
+            cache.clear()
+
+
+def _iter_selected_pages(document, page_numbers):
+    from pdfminer.pdfpage import PDFPage
+    if 'Pages' in document.catalog:
+        walked = yield from _iter_page_tree(document, page_numbers)
+        if walked:
+            return
+    # Дерева страниц нет или в нём не нашлось страниц: как и pdfminer, ищем страницы среди всех объектов
+    selected = None if page_numbers is None else set(page_numbers)
+    for number, page in enumerate(PDFPage.create_pages(document)):
+        if selected is None or number in selected:
+            yield number, page
+
+
+def _iter_document_pages(fp, page_numbers=None, chunk_pages=PDF_CHUNK_PAGES):
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    if page_numbers is not None and not page_numbers:
+        return
+    document = PDFDocument(PDFParser(fp))
+    for done, (_, page) in enumerate(_iter_selected_pages(document, page_numbers), start=1):
+        yield page
+        if done % chunk_pages == 0:
+            _release_cached_objects(document)
+
+
+def iter_pdf_text(pdf_file, page_numbers=None, layout='default', chunk_pages=PDF_CHUNK_PAGES):
+    """
+    Извлекает текстовый слой PDF постранично. Документ открывается один раз, и дерево страниц обходится
+    за один проход: поддеревья до следующей выбранной страницы пропускаются по /Count без разбора.
+    После каждых chunk_pages страниц кэш разобранных объектов документа сбрасывается, поэтому занятая
+    память не растёт с числом страниц; шрифты и другие ресурсы разбираются один раз и используются всеми страницами.
+
+    :param pdf_file: Путь к файлу PDF или двоичный файловый объект.
+    :param page_numbers: Возрастающий список номеров страниц с 0 (см. select_pdf_pages); None - все страницы.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :param chunk_pages: Через сколько страниц сбрасывается кэш объектов документа.
+    :return: Генератор текстов страниц; каждый завершается символом перевода страницы, как у pdfminer.
+    """
+    _require_pdfminer()
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.utils import open_filename
+    with open_filename(pdf_file, 'rb') as fp:
+        resources = PDFResourceManager(caching=True)
+        output = StringIO()
+        device = TextConverter(resources, output, laparams=make_laparams(layout))
+        interpreter = PDFPageInterpreter(resources, device)
+
+        def render(page):
+            interpreter.process_page(page)
+            text = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return text
+
+        try:
+            for page in _iter_document_pages(fp, page_numbers, chunk_pages):
+                yield render(page)
+        finally:
+            device.close()
+
+
+def extract_pdf_text(pdf_file, page_numbers=None, layout='default'):
+    """
+    Извлекает текстовый слой PDF (см. iter_pdf_text); результат для всех страниц с профилем default
+    совпадает с pdfminer.high_level.extract_text.
+
+    :param pdf_file: Путь к файлу PDF или двоичный файловый объект.
+    :param page_numbers: Возрастающий список номеров страниц с 0; None - все страницы.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :return: Текст страниц, каждая завершается символом перевода страницы.
+    """
+    return "".join(iter_pdf_text(pdf_file, page_numbers, layout))
@@ -0,0 +1,207 @@
+import importlib.util
+import json
+import os
+import sys
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ColumnarFile import ColumnarWriter, detect_file_format, read_blocks
+
+# Форматы вывода результатов: text - только текст, jsonl - запись JSON на файл,
+# columnar - колоночный файл (Parquet при установленном pyarrow, иначе встроенный формат)
+OUTPUT_FORMATS = ('text', 'jsonl', 'columnar')
+# Записи копятся в памяти до записи блока: ограничение по числу записей и по суммарной длине текста
+DEFAULT_BLOCK_SIZE = 100
+DEFAULT_BLOCK_CHARS = 16 * 1024 * 1024
+
+
+def parquet_available():
+    """Проверяет, установлен ли pyarrow (без его импорта)."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class TextRecord:
+    """
+    Компактное представление записи результата (см. BatchExtraction.extract_file_record):
+    вместо словаря - атрибуты в __slots__, каталог файла интернирован (у файлов пакета
+    обычно немного общих каталогов), метаданные хранятся строкой JSON.
+    """
+
+    __slots__ = ('directory', 'name', 'format', 'text', 'seconds', 'error', 'metadata')
+
+    def __init__(self, directory, name, format, text, seconds, error, metadata):
+        self.directory = directory
+        self.name = name
+        self.format = format
+        self.text = text
+        self.seconds = seconds
+        self.error = error
+        self.metadata = metadata
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        :param record: Словарь записи {'path', 'format', 'text', 'seconds', 'error', 'metadata'}.
+        :return: TextRecord.
+        """
+        # Разделитель остаётся в каталоге: путь восстанавливается без изменений на любой платформе
+        path = record['path']
+        split = max(path.rfind('/'), path.rfind(os.sep)) + 1
+        return cls(sys.intern(path[:split]), path[split:], record['format'], record['text'], record['seconds'],
+                   record['error'], json.dumps(record['metadata'], ensure_ascii=False))
+
+    @property
+    def path(self):
+        return self.directory + self.name
+
+    def to_record(self):
+        """:return: Словарь записи в исходном виде."""
+        return {'path': self.path, 'format': self.format, 'text': self.text, 'seconds': self.seconds,
+                'error': self.error, 'metadata': json.loads(self.metadata)}
+
+
+# Колонки встроенного формата: (атрибут TextRecord, тип колонки)
+COLUMNS = (('directory', 'dict'), ('name', 'str'), ('format', 'dict'), ('text', 'str'), ('seconds', 'float'),
+           ('error', 'str'), ('metadata', 'dict'))
+
+
+def records_to_columns(records):
+    """
+    :param records: Список TextRecord.
+    :return: Колонки блока встроенного формата (см. ColumnarWriter.write_block).
+    """
+    return {name: (kind, [getattr(record, name) for record in records]) for name, kind in COLUMNS}
+
+
+def records_from_columns(columns):
+    """
+    :param columns: Колонки блока (см. records_to_columns).
+    :return: Генератор TextRecord.
+    """
+    for values in zip(*(columns[name] for name, _ in COLUMNS)):
+        yield TextRecord(sys.intern(values[0]), *values[1:])
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    return pa.schema([('directory', pa.string()), ('name', pa.string()), ('format', pa.string()),
+                      ('text', pa.string()), ('seconds', pa.float64()), ('error', pa.string()),
+                      ('metadata', pa.string())])
+
+
+class JsonlRecordWriter:
+    """Записывает записи результатов в JSONL: строка на файл."""
+
+    def __init__(self, stream, close_stream=False):
+        """
+        :param stream: Текстовый поток для записи.
+        :param close_stream: Закрыть поток в close().
+        """
+        self.stream = stream
+        self.close_stream = close_stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        if self.close_stream:
+            self.stream.close()
+
+
+class ColumnarRecordWriter:
+    """
+    Записывает записи результатов в колоночный файл блоками: до записи блока записи хранятся
+    в памяти в компактном виде (TextRecord). Parquet - при установленном pyarrow, иначе встроенный формат.
+    """
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE, block_chars=DEFAULT_BLOCK_CHARS, engine=None):
+        """
+        :param path: Путь к файлу результатов.
+        :param block_size: Максимальное число записей в блоке (группе строк Parquet).
+        :param block_chars: Блок записывается раньше, если суммарная длина текстов его записей достигла этой.
+        :param engine: 'parquet' или 'builtin'; по умолчанию - parquet, если установлен pyarrow.
+        """
+        self.engine = engine or ('parquet' if parquet_available() else 'builtin')
+        self.block_size = block_size
+        self.block_chars = block_chars
+        self.records = []
+        self._chars = 0
+        if self.engine == 'parquet':
+            import pyarrow.parquet as pq
+            self._schema = _parquet_schema()
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, 'wb')
+            self._writer = ColumnarWriter(self._file)
+
+    def write(self, record):
+        self.records.append(TextRecord.from_record(record))
+        self._chars += len(record['text'])
+        if len(self.records) >= self.block_size or self._chars >= self.block_chars:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленные записи блоком."""
+        if not self.records:
+            return
+        if self.engine == 'parquet':
+            import pyarrow as pa
+            rows = [{name: getattr(record, name) for name, _ in COLUMNS} for record in self.records]
+            self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        else:
+            self._writer.write_block(records_to_columns(self.records))
+        self.records = []
+        self._chars = 0
+
+    def close(self):
+        self.flush()
+        if self.engine == 'parquet':
+            self._writer.close()
+        else:
+            self._file.close()
+
+
+def open_record_writer(output_format, path=None, stream=None, append=False):
+    """
+    :param output_format: 'jsonl' или 'columnar' (см. OUTPUT_FORMATS).
+    :param path: Файл результатов; для columnar обязателен.
+    :param stream: Текстовый поток для jsonl, если path не задан (по умолчанию stdout).
+    :param append: Дописывать в существующий файл JSONL (колоночный файл всегда создаётся заново).
+    :return: Объект с методами write(record) и close(). Файл, открытый по path, закрывается в close().
+    """
+    if output_format == 'columnar':
+        if path is None:
+            raise ValueError("для формата columnar необходимо указать файл результатов")
+        return ColumnarRecordWriter(path)
+    if output_format != 'jsonl':
+        raise ValueError(f"неизвестный формат результатов: {output_format}")
+    if path is None:
+        return JsonlRecordWriter(stream or sys.stdout)
+    return JsonlRecordWriter(open(path, 'a' if append else 'w', encoding='utf-8'), close_stream=True)
+
+
+def read_records(path):
+    """
+    Читает записи результатов из файла любого формата (определяется по сигнатуре).
+
+    :param path: Путь к файлу JSONL, Parquet или встроенного колоночного формата.
+    :return: Генератор словарей записей; недописанные строки JSONL пропускаются.
+    """
+    file_format = detect_file_format(path)
+    if file_format == 'columnar':
+        with open(path, 'rb') as file:
+            for columns in read_blocks(file):
+                for record in records_from_columns(columns):
+                    yield record.to_record()
+    elif file_format == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield TextRecord(**row).to_record()
+    else:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Недописанная строка после аварийного завершения
+                    continue
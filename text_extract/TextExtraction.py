@@ -1,35 +1,407 @@
 import argparse
-import subprocess
-from pdfminer.high_level import extract_text as pdfminer_extract_text
-from pdf2image import convert_from_path
-import pytesseract
-from docx import Document
+import atexit
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, repeat
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Dependencies import require, preload
+from DocxExtraction import iter_docx_texts
+from PdfExtraction import (PDF_LAYOUTS, PDF_CHUNK_PAGES, make_laparams, parse_page_ranges, count_pdf_pages,
+                           select_pdf_pages, extract_pdf_text)
+from ExtractionCache import ExtractionCache, file_digest, stream_digest, make_cache_key
+from DocumentFormats import (DocumentFormat, FORMATS, register_format, is_pdf, is_docx, is_ole2, is_djvu,
+                             is_word_package, as_source, detect_format, source_path)
+from ExternalTools import ToolRunner, DEFAULT_TOOL_TIMEOUT
+from OcrPreprocessing import (OCR_PREPROCESS_MODES, DEFAULT_DPI, SAMPLE_DPI, make_ocr_settings, tesseract_config,
+                              estimate_text_height, choose_dpi, preprocess_image)
+from OcrLanguages import AUTO_LANG, OSD_SAMPLE_PAGES, OSD_DPI, detect_script, languages_for_scripts
+from Instrumentation import instrumented, enable as enable_metrics, disable as disable_metrics, make_sink
+from ResultFormats import OUTPUT_FORMATS, open_record_writer
 
-def extract_text_from_pdf(pdf_path):
+# Число страниц, растеризуемых за один раз: ограничивает память, занятую изображениями
+OCR_BATCH_SIZE = 4
+# Страница, на которой меньше непробельных символов, считается сканированной
+MIN_PAGE_CHARS = 20
+# Версия извлекателей: увеличивается при изменении результата, чтобы записи кэша устарели
+EXTRACTOR_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'text_extract', 'text_cache.sqlite3')
+# Общий запускатель djvutxt/antiword: ограничивает число одновременных процессов и собирает статистику
+TOOL_RUNNER = ToolRunner()
+# Способы извлечения DOCX: потоковый разбор XML или объектная модель python-docx
+DOCX_ENGINES = ('native', 'python-docx')
+# Тяжёлые зависимости импортируются при первом использовании извлекателя (см. Dependencies.require):
+# вывод справки и извлечение DOC или DOCX не тратят время на импорт библиотек PDF и OCR
+HEAVY_MODULES = ('pdfminer.high_level', 'pdf2image', 'pytesseract', 'PIL.Image', 'docx')
+
+
+def _source_size(source):
+    # Размер источника для замеров: путь или bytes (для файловых объектов размер не определяется)
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    return os.path.getsize(source)
+
+
+def _page_count(text):
+    # pdfminer и извлечение по страницам завершают каждую страницу символом перевода страницы
+    return text.count('\f')
+
+
+# Вызовы сторонних библиотек замеряются как отдельные этапы (см. Instrumentation);
+# текстовый слой PDF извлекается через pdfminer постранично (см. PdfExtraction.extract_pdf_text)
+pdfminer_extract_text = instrumented('pdfminer', bytes_in=_source_size, bytes_out=len,
+                                     pages=_page_count)(extract_pdf_text)
+
+def preload_dependencies():
+    """
+    Импортирует установленные тяжёлые зависимости заранее (для прогреваемых процессов-обработчиков).
+    
+    :return: Список модулей, которые не удалось импортировать.
+    """
+    return preload(HEAVY_MODULES)
+
+def extract_pages(pdf_path, **kwargs):
+    """Разбор страниц PDF pdfminer (pdfminer.high_level.extract_pages), импортируемым при первом вызове."""
+    return require('pdfminer.high_level', 'pdfminer.six', 'извлечения текста из PDF').extract_pages(pdf_path, **kwargs)
+
+@instrumented('convert_from_path', pages=len)
+def convert_from_path(pdf_path, **kwargs):
+    """Растеризация страниц PDF (pdf2image.convert_from_path), импортируемой при первом вызове."""
+    return require('pdf2image', purpose='растеризации PDF для OCR').convert_from_path(pdf_path, **kwargs)
+
+def pdfinfo_from_path(pdf_path):
+    """Сведения о PDF через pdfinfo (pdf2image.pdfinfo_from_path)."""
+    return require('pdf2image', purpose='растеризации PDF для OCR').pdfinfo_from_path(pdf_path)
+
+def Document(docx_path):
+    """Объектная модель DOCX (docx.Document), python-docx импортируется при первом вызове."""
+    return require('docx', 'python-docx', 'извлечения DOCX через python-docx').Document(docx_path)
+
+def _tesseract():
+    return require('pytesseract', purpose='распознавания текста (OCR)')
+
+def get_pdf_page_count(pdf_path):
+    """
+    Возвращает число страниц PDF (через pdfinfo).
+    
+    :param pdf_path: Путь к файлу PDF.
+    :return: Число страниц или None, если его не удалось определить.
+    """
+    try:
+        return int(pdfinfo_from_path(pdf_path)['Pages'])
+    except Exception:
+        return None
+
+def choose_page_dpi(pdf_path, page):
+    """
+    Выбирает разрешение OCR страницы PDF по её пробной растеризации с низким разрешением (см. choose_dpi).
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param page: Номер страницы (с 1).
+    :return: Разрешение в DPI.
+    """
+    images = convert_from_path(pdf_path, dpi=SAMPLE_DPI, first_page=page, last_page=page, grayscale=True)
+    if not images:
+        return DEFAULT_DPI
+    # При SAMPLE_DPI размер изображения в пикселях равен размеру страницы в пунктах
+    sample = images[0]
+    return choose_dpi(sample.width, sample.height, estimate_text_height(sample))
+
+def detect_pdf_languages(pdf_path, pages, sample_pages=OSD_SAMPLE_PAGES):
+    """
+    Определяет языки OCR документа по письменности первых страниц, требующих распознавания (OSD tesseract).
+    Страницы растеризуются с пониженным разрешением, поэтому проверка много дешевле распознавания.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param pages: Возрастающая последовательность номеров страниц, которые будут распознаваться.
+    :param sample_pages: Сколько первых из них проверять.
+    :return: Языки tesseract, например 'eng' или 'chi_sim+eng'; 'rus', если письменность не определена.
+    """
+    scripts = []
+    for page in pages[:sample_pages]:
+        try:
+            images = convert_from_path(pdf_path, dpi=OSD_DPI, first_page=page, last_page=page, grayscale=True)
+            scripts.extend(script for script in map(detect_script, images) if script is not None)
+        except Exception:
+            # Без растеризации или OSD письменность не определить - используются языки по умолчанию
+            break
+    return languages_for_scripts(scripts)
+
+def resolve_ocr_lang(pdf_path, pages, lang, metadata=None):
+    """
+    Возвращает языки OCR документа. При lang='auto' они определяются один раз на документ:
+    результат запоминается в metadata['ocr_lang'], и следующие вызовы берут его оттуда.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param pages: Номера страниц, которые будут распознаваться (см. detect_pdf_languages).
+    :param lang: Языки tesseract или 'auto'.
+    :param metadata: Необязательный словарь сведений об извлечении документа.
+    :return: Языки tesseract.
+    """
+    if lang == AUTO_LANG:
+        lang = (metadata or {}).get('ocr_lang') or detect_pdf_languages(pdf_path, pages)
+    if metadata is not None:
+        metadata['ocr_lang'] = lang
+    return lang
+
+@instrumented('ocr_pdf_pages', pages=len)
+def ocr_pdf_pages(pdf_path, first_page, last_page, lang='rus', settings=None):
+    """
+    Растеризует диапазон страниц PDF и распознаёт их текст.
+    Выполняется в процессе-обработчике: изображения не передаются между процессами.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param first_page: Номер первой страницы (с 1).
+    :param last_page: Номер последней страницы включительно.
+    :param lang: Языки tesseract.
+    :param settings: Настройки OCR (см. make_ocr_settings); None - цветная растеризация с разрешением
+                     pdf2image по умолчанию и параметры tesseract по умолчанию.
+    :return: Список текстов страниц по порядку.
+    """
+    if settings is None:
+        images = convert_from_path(pdf_path, first_page=first_page, last_page=last_page)
+        return [_tesseract().image_to_string(image, lang=lang) for image in images]
+    dpi = settings['dpi']
+    if dpi == 'auto':
+        # Страницы одной партии обычно одного формата: разрешение выбирается по первой
+        dpi = choose_page_dpi(pdf_path, first_page)
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page,
+                               grayscale=settings['preprocess'] != 'none')
+    config = tesseract_config(settings)
+    texts = []
+    for image in images:
+        prepared = preprocess_image(image, settings)
+        # Для пустой страницы tesseract вернул бы только разделитель страниц - не запускаем его
+        texts.append("\f" if prepared is None else _tesseract().image_to_string(prepared, lang=lang, config=config))
+    return texts
+
+def split_page_batches(pages, batch_size):
+    """
+    Разбивает номера страниц на партии из подряд идущих страниц, не длиннее batch_size.
+    
+    :param pages: Возрастающая последовательность номеров страниц.
+    :param batch_size: Максимальный размер партии.
+    :return: Список пар (первая страница, последняя страница).
+    """
+    batches = []
+    for page in pages:
+        if batches and page == batches[-1][1] + 1 and page - batches[-1][0] < batch_size:
+            batches[-1][1] = page
+        else:
+            batches.append([page, page])
+    return [tuple(batch) for batch in batches]
+
+@instrumented('ocr_pdf_page_texts', pages=len)
+def ocr_pdf_page_texts(pdf_path, pages, lang='rus', workers=None, batch_size=OCR_BATCH_SIZE, settings=None):
+    """
+    Распознаёт через OCR указанные страницы PDF.
+    Страницы растеризуются партиями по batch_size и распознаются в пуле процессов.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param pages: Номера страниц (с 1).
+    :param lang: Языки tesseract.
+    :param workers: Число процессов; по умолчанию - число ядер.
+    :param batch_size: Число страниц, растеризуемых одним процессом за раз.
+    :param settings: Настройки OCR (см. ocr_pdf_pages).
+    :return: Словарь {номер страницы: распознанный текст}.
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = split_page_batches(sorted(pages), batch_size)
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            results = list(pool.map(ocr_pdf_pages, repeat(pdf_path), [first for first, _ in batches],
+                                    [last for _, last in batches], repeat(lang), repeat(settings)))
+    else:
+        results = [ocr_pdf_pages(pdf_path, first, last, lang, settings) for first, last in batches]
+    page_texts = {}
+    for (first, _), texts in zip(batches, results):
+        for offset, text in enumerate(texts):
+            page_texts[first + offset] = text
+    return page_texts
+
+def ocr_pdf(pdf_path, lang='rus', workers=None, batch_size=OCR_BATCH_SIZE, settings=None):
+    """
+    Распознаёт текст всех страниц PDF через OCR; результаты объединяются в порядке страниц.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param lang: Языки tesseract.
+    :param workers: Число процессов; по умолчанию - число ядер.
+    :param batch_size: Число страниц, растеризуемых одним процессом за раз.
+    :param settings: Настройки OCR (см. ocr_pdf_pages).
+    :return: Распознанный текст.
+    """
+    page_count = get_pdf_page_count(pdf_path)
+    if page_count is not None:
+        page_texts = ocr_pdf_page_texts(pdf_path, range(1, page_count + 1), lang, workers, batch_size,
+                                        settings)
+        return "".join(page_texts[page] for page in sorted(page_texts))
+
+    # Число страниц неизвестно: партии растеризуются по очереди, пока не кончатся страницы
+    text = ""
+    first_page = 1
+    while True:
+        texts = ocr_pdf_pages(pdf_path, first_page, first_page + batch_size - 1, lang, settings)
+        text += "".join(texts)
+        if len(texts) < batch_size:
+            return text
+        first_page += batch_size
+
+def extract_pdf_page_texts(pdf_path, page_numbers=None, layout='default'):
+    """
+    Извлекает текстовый слой PDF постранично.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param page_numbers: Возрастающий список номеров страниц с 0 (см. select_pdf_pages); None - все страницы.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :return: Список текстов страниц по порядку.
+    """
+    return [get_page_layout_text(page_layout) for page_layout in _extract_page_layouts(pdf_path, page_numbers, layout)]
+
+def _extract_page_layouts(pdf_path, page_numbers, layout):
+    if page_numbers is None:
+        return extract_pages(pdf_path, laparams=make_laparams(layout))
+    if not page_numbers:
+        return iter(())
+    return extract_pages(pdf_path, page_numbers=set(page_numbers), maxpages=page_numbers[-1] + 1,
+                         laparams=make_laparams(layout))
+
+@instrumented('extract_pdf_text_parallel', bytes_in=_source_size, bytes_out=len, pages=_page_count)
+def extract_pdf_text_parallel(pdf_path, page_numbers=None, layout='default', workers=None,
+                              chunk_pages=PDF_CHUNK_PAGES):
+    """
+    Извлекает текстовый слой PDF параллельно: непересекающиеся диапазоны по chunk_pages страниц
+    разбираются в пуле процессов, тексты объединяются в порядке страниц.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param page_numbers: Возрастающий список номеров страниц с 0 (см. select_pdf_pages); None - все страницы.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :param workers: Число процессов; по умолчанию - число ядер.
+    :param chunk_pages: Число страниц в диапазоне одного процесса.
+    :return: Текст страниц, каждая завершается символом перевода страницы.
+    """
+    workers = workers or os.cpu_count() or 1
+    if page_numbers is None:
+        page_numbers = list(range(count_pdf_pages(pdf_path)))
+    chunks = [page_numbers[start:start + chunk_pages] for start in range(0, len(page_numbers), chunk_pages)]
+    if workers < 2 or len(chunks) < 2:
+        return pdfminer_extract_text(pdf_path, page_numbers, layout)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return "".join(pool.map(extract_pdf_text, repeat(pdf_path), chunks, repeat(layout)))
+
+def get_page_layout_text(page_layout):
+    """
+    :param page_layout: Страница, разобранная pdfminer (LTPage).
+    :return: Текст текстовых блоков страницы.
+    """
+    # Страница уже разобрана pdfminer - модуль импортирован
+    from pdfminer.layout import LTTextContainer
+    return "".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+
+def is_scanned_page(text, min_page_chars=MIN_PAGE_CHARS):
+    """
+    :param text: Текст страницы из текстового слоя.
+    :param min_page_chars: Минимальное число непробельных символов страницы с текстом.
+    :return: True, если страницу нужно распознавать через OCR.
+    """
+    return len("".join(text.split())) < min_page_chars
+
+@instrumented('extract_text_from_pdf_by_page', bytes_in=_source_size, bytes_out=len, pages=_page_count)
+def extract_text_from_pdf_by_page(pdf_path, min_page_chars=MIN_PAGE_CHARS, ocr_workers=None,
+                                  ocr_batch_size=OCR_BATCH_SIZE, lang=AUTO_LANG, ocr_settings=None, metadata=None,
+                                  page_numbers=None, layout='default'):
+    """
+    Извлекает текст PDF постранично: страницы с текстовым слоем берутся как есть,
+    а страницы без текста (или с текстом короче min_page_chars) распознаются через OCR.
+    Страницы объединяются в исходном порядке и разделяются символом перевода страницы.
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param min_page_chars: Минимальное число непробельных символов, при котором страница не требует OCR.
+    :param ocr_workers: Число процессов OCR; по умолчанию - число ядер.
+    :param ocr_batch_size: Число страниц, растеризуемых за раз одним процессом.
+    :param lang: Языки tesseract или 'auto' (см. resolve_ocr_lang).
+    :param ocr_settings: Настройки OCR (см. ocr_pdf_pages).
+    :param metadata: Необязательный словарь, в который записываются языки OCR ('ocr_lang').
+    :param page_numbers: Возрастающий список номеров страниц с 0 (см. select_pdf_pages); None - все страницы.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :return: Текст документа.
+    """
+    page_texts = extract_pdf_page_texts(pdf_path, page_numbers, layout)
+    numbers = range(1, len(page_texts) + 1) if page_numbers is None else [number + 1 for number in page_numbers]
+    scanned = [index for index, text in enumerate(page_texts) if is_scanned_page(text, min_page_chars)]
+    if scanned:
+        scanned_pages = [numbers[index] for index in scanned]
+        with source_path(pdf_path, '.pdf') as path:
+            lang = resolve_ocr_lang(path, scanned_pages, lang, metadata)
+            ocr_texts = ocr_pdf_page_texts(path, scanned_pages, lang, ocr_workers, ocr_batch_size, ocr_settings)
+        for index, number in zip(scanned, scanned_pages):
+            page_texts[index] = ocr_texts.get(number, "")
+    return "".join(text + "\f" for text in page_texts)
+
+@instrumented('extract_text_from_pdf', bytes_in=_source_size, bytes_out=len)
+def extract_text_from_pdf(pdf_path, ocr_workers=None, ocr_batch_size=OCR_BATCH_SIZE, ocr_mode='document',
+                          min_page_chars=MIN_PAGE_CHARS, ocr_settings=None, lang=AUTO_LANG, metadata=None,
+                          pages=None, max_pages=None, layout='default', workers=None):
     """
     Извлекает текст из файла PDF.
     Если текст недоступен (например, в сканированных PDF), используется OCR (распознавание текста).
+    
+    :param ocr_workers: Число процессов OCR; по умолчанию - число ядер.
+    :param ocr_batch_size: Число страниц, растеризуемых за раз одним процессом.
+    :param ocr_mode: 'document' - OCR всего документа, если в нём нет текстового слоя;
+                     'page' - OCR только страниц без текста (см. extract_text_from_pdf_by_page).
+    :param min_page_chars: Порог текста на странице для режима 'page'.
+    :param ocr_settings: Настройки OCR (см. ocr_pdf_pages).
+    :param lang: Языки tesseract или 'auto' - определить по письменности первых страниц (см. resolve_ocr_lang).
+    :param metadata: Необязательный словарь, в который записываются языки OCR ('ocr_lang').
+    :param pages: Диапазоны страниц, например '1-5,8,10-' (см. parse_page_ranges); None - все страницы.
+    :param max_pages: Извлекать не больше max_pages первых из выбранных страниц.
+    :param layout: Профиль анализа вёрстки текстового слоя: 'default' или 'fast' (см. PDF_LAYOUTS).
+    :param workers: Число процессов для параллельного извлечения текстового слоя диапазонами по
+                    PDF_CHUNK_PAGES страниц (см. extract_pdf_text_parallel); None или 1 - в текущем процессе.
     """
     try:
+        page_numbers = select_pdf_pages(pdf_path, pages, max_pages)
+        if ocr_mode == 'page':
+            return extract_text_from_pdf_by_page(pdf_path, min_page_chars, ocr_workers, ocr_batch_size, lang,
+                                                 ocr_settings, metadata, page_numbers, layout)
         # Попытка извлечь текст напрямую
-        text = pdfminer_extract_text(pdf_path)
+        if workers is not None and workers > 1:
+            with source_path(pdf_path, '.pdf') as path:
+                text = extract_pdf_text_parallel(path, page_numbers, layout, workers)
+        else:
+            text = pdfminer_extract_text(pdf_path, page_numbers, layout)
         if text.strip():  # Если текст не пустой
             return text
         else:
-            # Если текст пустой, используем OCR
-            images = convert_from_path(pdf_path)
-            text = ""
-            for image in images:
-                text += pytesseract.image_to_string(image, lang='rus')  # Язык: русский
-            return text
+            # Если текст пустой, используем OCR (pdftoppm читает только файлы - данные из памяти временно пишутся на диск)
+            with source_path(pdf_path, '.pdf') as path:
+                if page_numbers is not None:
+                    numbers = [number + 1 for number in page_numbers]
+                    lang = resolve_ocr_lang(path, numbers, lang, metadata)
+                    page_texts = ocr_pdf_page_texts(path, numbers, lang, ocr_workers, ocr_batch_size, ocr_settings)
+                    return "".join(page_texts.get(number, "") for number in numbers)
+                lang = resolve_ocr_lang(path, range(1, OSD_SAMPLE_PAGES + 1), lang, metadata)
+                return ocr_pdf(path, lang=lang, workers=ocr_workers, batch_size=ocr_batch_size, settings=ocr_settings)
     except Exception as e:
         print(f"Ошибка при извлечении текста из PDF: {e}")
         return ""
     
-def extract_text_from_docx(docx_path):
+@instrumented('extract_text_from_docx', bytes_in=_source_size, bytes_out=len)
+def extract_text_from_docx(docx_path, engine='native', extras=False):
     """
     Извлекает текст из файла DOCX.
+    
+    :param engine: 'native' - потоковый разбор XML пакета (параграфы и ячейки таблиц в порядке документа),
+                   при ошибке разбора используется python-docx; 'python-docx' - только параграфы через python-docx.
+    :param extras: Для 'native': добавить текст колонтитулов и сносок.
     """
+    if engine == 'native':
+        try:
+            return "\n".join(iter_docx_texts(docx_path, extras))
+        except Exception:
+            # Нестандартный пакет: пробуем python-docx, он же сообщит об ошибке
+            pass
     try:
         doc = Document(docx_path)
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
@@ -38,56 +410,536 @@ def extract_text_from_docx(docx_path):
         print(f"Ошибка при извлечении текста из DOCX: {e}")
         return ""
     
-def extract_text_from_djvu(djvu_path):
+def get_djvu_page_count(djvu_path, timeout=None):
+    """
+    Возвращает число страниц DJVU (через djvused).
+    
+    :param djvu_path: Путь к файлу DJVU.
+    :param timeout: Тайм-аут вызова в секундах.
+    :return: Число страниц или None, если его не удалось определить.
+    """
+    try:
+        return int(TOOL_RUNNER.run(['djvused', '-e', 'n', djvu_path], timeout).strip())
+    except Exception:
+        return None
+
+@instrumented('extract_text_from_djvu', bytes_in=_source_size, bytes_out=len)
+def extract_text_from_djvu(djvu_path, chunk_pages=None, timeout=None):
     """
     Извлекает текст из файла DJVU с использованием внешнего инструмента djvutxt.
+    
+    :param chunk_pages: Если задано, документ делится на диапазоны по chunk_pages страниц,
+                        которые извлекаются параллельными процессами djvutxt.
+    :param timeout: Тайм-аут одного вызова djvutxt в секундах; по умолчанию - DEFAULT_TOOL_TIMEOUT.
     """
     try:
-        # Используем djvutxt для извлечения текста
-        result = subprocess.run(['djvutxt', djvu_path], capture_output=True, text=True, encoding='utf-8')
-        return result.stdout
+        with source_path(djvu_path, '.djvu') as path:
+            page_count = get_djvu_page_count(path, timeout) if chunk_pages else None
+            if page_count is not None and page_count > chunk_pages:
+                commands = [['djvutxt', f'--page={first}-{min(first + chunk_pages - 1, page_count)}', path]
+                            for first in range(1, page_count + 1, chunk_pages)]
+                chunks = TOOL_RUNNER.run_many(commands, timeout)
+                # djvutxt разделяет страницы символом перевода страницы - восстанавливаем его на границах диапазонов
+                return "".join(chunk if chunk.endswith('\f') or number == len(chunks) else chunk + '\f'
+                               for number, chunk in enumerate(chunks, start=1))
+            # Используем djvutxt для извлечения текста
+            return TOOL_RUNNER.run(['djvutxt', path], timeout)
     except Exception as e:
         print(f"Ошибка при извлечении текста из DJVU: {e}")
         return ""
     
-def extract_text_from_doc(doc_path):
+@instrumented('extract_text_from_doc', bytes_in=_source_size, bytes_out=len)
+def extract_text_from_doc(doc_path, timeout=None):
     """
     Извлекает текст из файла DOC (старый формат Word) с использованием внешнего инструмента antiword.
+    
+    :param timeout: Тайм-аут вызова antiword в секундах; по умолчанию - DEFAULT_TOOL_TIMEOUT.
     """
     try:
         # Используем antiword для извлечения текста
-        result = subprocess.run(['antiword', doc_path], capture_output=True, text=True, encoding='utf-8')
-        return result.stdout
+        with source_path(doc_path, '.doc') as path:
+            return TOOL_RUNNER.run(['antiword', path], timeout)
     except Exception as e:
         print(f"Ошибка при извлечении текста из DOC: {e}")
         return ""
     
-def extract_text(file_path):
+def iter_pdf_pages(pdf_path, ocr_workers=None, ocr_batch_size=OCR_BATCH_SIZE, ocr_mode='document',
+                   min_page_chars=MIN_PAGE_CHARS, lang=AUTO_LANG, ocr_settings=None, metadata=None,
+                   pages=None, max_pages=None, layout='default'):
     """
-    Извлекает текст из файла в зависимости от его расширения.
-    Поддерживаемые форматы: PDF, DOC, DOCX, DJVU.
+    Извлекает текст PDF постранично, по мере разбора страниц.
+    В режиме 'document' OCR запускается, только если во всём документе нет текстового слоя;
+    в режиме 'page' распознаются страницы без текста (подряд идущие - партиями по ocr_batch_size).
+    
+    :param pdf_path: Путь к файлу PDF.
+    :param ocr_workers: Число процессов OCR; по умолчанию - число ядер.
+    :param ocr_batch_size: Число страниц, растеризуемых за раз одним процессом.
+    :param ocr_mode: 'document' или 'page' (см. extract_text_from_pdf).
+    :param min_page_chars: Порог текста на странице для режима 'page'.
+    :param lang: Языки tesseract или 'auto' (определяются при первом OCR, см. resolve_ocr_lang).
+    :param ocr_settings: Настройки OCR (см. ocr_pdf_pages).
+    :param metadata: Необязательный словарь, в который записываются языки OCR ('ocr_lang').
+    :param pages: Диапазоны страниц (см. extract_text_from_pdf); None - все страницы.
+    :param max_pages: Извлекать не больше max_pages первых из выбранных страниц.
+    :param layout: Профиль анализа вёрстки (см. PDF_LAYOUTS).
+    :return: Генератор пар (номер страницы, текст страницы).
     """
-    if file_path.endswith('.pdf'):
-        return extract_text_from_pdf(file_path)
-    elif file_path.endswith('.docx'):
-        return extract_text_from_docx(file_path)
-    elif file_path.endswith('.djvu'):
-        return extract_text_from_djvu(file_path)
-    elif file_path.endswith('.doc'):
-        return extract_text_from_doc(file_path)
-    else:
-        print(f"Формат файла не поддерживается: {file_path}")
+    # Через metadata языки, определённые для первых распознанных страниц, используются и для остальных
+    metadata = {} if metadata is None else metadata
+    scanned = []        # номера страниц без текста, ожидающих OCR или первой страницы с текстом
+    has_text = False
+    page_numbers = select_pdf_pages(pdf_path, pages, max_pages)
+    numbers = count(1) if page_numbers is None else (number + 1 for number in page_numbers)
+    for page_number, page_layout in zip(numbers, _extract_page_layouts(pdf_path, page_numbers, layout)):
+        text = get_page_layout_text(page_layout)
+        if ocr_mode == 'page':
+            if not is_scanned_page(text, min_page_chars):
+                yield from _ocr_pages(pdf_path, scanned, lang, ocr_workers, ocr_batch_size, ocr_settings, metadata)
+                scanned = []
+                yield page_number, text
+                continue
+            scanned.append(page_number)
+            if len(scanned) >= ocr_batch_size * (ocr_workers or os.cpu_count() or 1):
+                yield from _ocr_pages(pdf_path, scanned, lang, ocr_workers, ocr_batch_size, ocr_settings, metadata)
+                scanned = []
+        elif has_text or text.strip():
+            # Пустые страницы в начале документа придерживаем, пока не станет ясно, нужен ли OCR
+            for number in scanned:
+                yield number, ""
+            scanned = []
+            has_text = True
+            yield page_number, text
+        else:
+            scanned.append(page_number)
+    # В режиме 'document' без текстового слоя в scanned оказываются все страницы
+    if ocr_mode == 'page' or not has_text:
+        batch = ocr_batch_size * (ocr_workers or os.cpu_count() or 1)
+        for start in range(0, len(scanned), batch):
+            yield from _ocr_pages(pdf_path, scanned[start:start + batch], lang, ocr_workers, ocr_batch_size,
+                                  ocr_settings, metadata)
+
+def _ocr_pages(pdf_path, pages, lang, workers, batch_size, settings, metadata):
+    if not pages:
+        return
+    with source_path(pdf_path, '.pdf') as path:
+        lang = resolve_ocr_lang(path, pages, lang, metadata)
+        page_texts = ocr_pdf_page_texts(path, pages, lang, workers, batch_size, settings)
+    for number in pages:
+        yield number, page_texts.get(number, "")
+
+def iter_tool_pages(args, timeout=None):
+    """
+    Запускает внешний инструмент и читает его вывод по мере появления, разделяя страницы
+    символом перевода страницы (так разделяют страницы djvutxt и antiword).
+    Если генератор закрыт досрочно или истёк тайм-аут, процесс останавливается.
+    
+    :param args: Команда и аргументы.
+    :param timeout: Тайм-аут вызова в секундах; по умолчанию - DEFAULT_TOOL_TIMEOUT.
+    :return: Генератор текстов страниц.
+    """
+    lines = []
+    for line in TOOL_RUNNER.stream(args, timeout):
+        *pages, rest = line.split('\f')
+        for page in pages:
+            lines.append(page)
+            yield "".join(lines)
+            lines = []
+        lines.append(rest)
+    if any(lines):
+        yield "".join(lines)
+
+def iter_docx_paragraphs(docx_path, engine='native', extras=False):
+    """
+    :param docx_path: Путь к файлу DOCX.
+    :param engine: 'native' или 'python-docx' (см. extract_text_from_docx).
+    :param extras: Для 'native': добавить текст колонтитулов и сносок.
+    :return: Генератор пар (None, текст параграфа или ячейки таблицы):
+             деление DOCX на страницы определяется при вёрстке.
+    """
+    if engine == 'native':
+        emitted = False
+        try:
+            for text in iter_docx_texts(docx_path, extras):
+                emitted = True
+                yield None, text
+            return
+        except Exception:
+            # Переходим на python-docx, только если ещё ничего не выдано
+            if emitted:
+                raise
+    for paragraph in Document(docx_path).paragraphs:
+        yield None, paragraph.text
+
+def iter_doc_paragraphs(doc_path, timeout=None):
+    """
+    :param doc_path: Путь к файлу DOC.
+    :param timeout: Тайм-аут вызова antiword в секундах.
+    :return: Генератор пар (номер страницы, текст параграфа) из вывода antiword.
+    """
+    with source_path(doc_path, '.doc') as path:
+        for page, page_text in enumerate(iter_tool_pages(['antiword', path], timeout), start=1):
+            for paragraph in re.split(r'\n\s*\n', page_text):
+                if paragraph.strip():
+                    yield page, paragraph.strip('\n')
+
+def iter_djvu_pages(djvu_path, timeout=None):
+    """
+    :param djvu_path: Путь к файлу DJVU.
+    :param timeout: Тайм-аут вызова djvutxt в секундах.
+    :return: Генератор пар (номер страницы, текст страницы) из вывода djvutxt.
+    """
+    with source_path(djvu_path, '.djvu') as path:
+        yield from enumerate(iter_tool_pages(['djvutxt', path], timeout), start=1)
+
+def _check_pdf_options(pdf_pages, pdf_layout):
+    # Ошибки параметров сообщаются до извлечения; диапазоны приводятся к списку пар и входят в ключ кэша
+    if pdf_layout not in PDF_LAYOUTS:
+        raise ValueError(f"неизвестный профиль вёрстки PDF: {pdf_layout}")
+    if isinstance(pdf_pages, str):
+        return parse_page_ranges(pdf_pages)
+    return pdf_pages
+
+def _describe_source(file_path):
+    return file_path if isinstance(file_path, str) else getattr(file_path, 'name', "<данные в памяти>")
+
+@instrumented('extract_text', bytes_in=_source_size, bytes_out=len)
+def extract_text(file_path, ocr_workers=None, ocr_batch_size=OCR_BATCH_SIZE, ocr_mode='document',
+                 min_page_chars=MIN_PAGE_CHARS, cache=None, tool_timeout=None, djvu_chunk_pages=None,
+                 docx_engine='native', docx_extras=False, ocr_settings=None, lang=AUTO_LANG, metadata=None,
+                 pdf_pages=None, pdf_max_pages=None, pdf_layout='default', pdf_workers=None):
+    """
+    Извлекает текст из файла в зависимости от его формата.
+    Формат определяется по сигнатуре в начале файла, а если она не распознана - по расширению.
+    Поддерживаемые форматы: PDF, DOC, DOCX, DJVU (см. FORMATS).
+    
+    :param file_path: Путь к файлу, bytes или двоичный файловый объект.
+    :param ocr_workers: Число процессов OCR для сканированных PDF; по умолчанию - число ядер.
+    :param ocr_batch_size: Число страниц PDF, растеризуемых за раз одним процессом.
+    :param ocr_mode: Режим OCR для PDF: 'document' или 'page' (см. extract_text_from_pdf).
+    :param min_page_chars: Порог текста на странице PDF для режима 'page'.
+    :param cache: Необязательный ExtractionCache. Ключ - хэш содержимого файла, извлекатель, его версия
+                  и параметры, влияющие на результат; при попадании текст возвращается без извлечения.
+    :param tool_timeout: Тайм-аут вызова djvutxt/antiword в секундах; по умолчанию - DEFAULT_TOOL_TIMEOUT.
+    :param djvu_chunk_pages: Размер диапазона страниц DJVU для параллельного извлечения (см. extract_text_from_djvu).
+    :param docx_engine: Способ извлечения DOCX: 'native' или 'python-docx' (см. extract_text_from_docx).
+    :param docx_extras: Добавить к тексту DOCX колонтитулы и сноски.
+    :param ocr_settings: Настройки OCR сканированных PDF (см. make_ocr_settings); None - без подготовки изображений.
+    :param lang: Языки OCR (например, 'rus+eng') или 'auto' - определить по письменности первых страниц.
+                 Определённые языки кэшируются для документа отдельно от текста.
+    :param metadata: Необязательный словарь, в который записываются сведения об извлечении:
+                     'ocr_lang' - языки, с которыми выполнялся OCR.
+    :param pdf_pages: Диапазоны страниц PDF, например '1-5,8,10-' (см. parse_page_ranges); None - все страницы.
+    :param pdf_max_pages: Извлекать не больше pdf_max_pages первых из выбранных страниц PDF.
+    :param pdf_layout: Профиль анализа вёрстки PDF: 'default' или 'fast' (см. PDF_LAYOUTS).
+    :param pdf_workers: Число процессов для параллельного извлечения текстового слоя больших PDF
+                        (см. extract_pdf_text_parallel); None или 1 - без параллельности.
+    :raises ValueError: Если диапазоны страниц или профиль вёрстки PDF заданы некорректно.
+    """
+    pdf_pages = _check_pdf_options(pdf_pages, pdf_layout)
+    source = as_source(file_path)
+    name = detect_format(source)
+    if name is None:
+        print(f"Формат файла не поддерживается: {_describe_source(file_path)}")
         return ""
+    document_format = FORMATS[name]
+    metadata = {} if metadata is None else metadata
+    options = {'lang': lang, 'ocr_workers': ocr_workers, 'ocr_batch_size': ocr_batch_size, 'ocr_mode': ocr_mode,
+               'min_page_chars': min_page_chars, 'tool_timeout': tool_timeout, 'djvu_chunk_pages': djvu_chunk_pages,
+               'docx_engine': docx_engine, 'docx_extras': docx_extras, 'ocr_settings': ocr_settings,
+               'pdf_pages': pdf_pages, 'pdf_max_pages': pdf_max_pages, 'pdf_layout': pdf_layout,
+               'pdf_workers': pdf_workers, 'metadata': metadata}
+    if cache is None:
+        return document_format.extract(source, options)
+    try:
+        digest = file_digest(source) if isinstance(source, str) else stream_digest(source)
+    except OSError:
+        # Файл не читается: ошибку сообщит сам извлекатель
+        return document_format.extract(source, options)
+    key_options = {option: options[option] for option in document_format.key_options}
+    key = make_cache_key(digest, name, EXTRACTOR_VERSION, key_options)
+    # Определённые языки OCR не зависят от остальных параметров и кэшируются для документа отдельно:
+    # при извлечении с другими настройками OSD не повторяется
+    lang_key = None
+    if lang == AUTO_LANG and 'lang' in document_format.key_options:
+        lang_key = make_cache_key(digest, 'ocr_lang', EXTRACTOR_VERSION)
+        detected = cache.get(lang_key, count=False)
+        if detected:
+            metadata['ocr_lang'] = detected
+            lang_key = None
+    text = cache.get(key)
+    if text is None:
+        text = document_format.extract(source, options)
+        # Пустой результат может быть следствием ошибки извлечения - его не сохраняем
+        if text:
+            cache.put(key, text)
+            if lang_key is not None and metadata.get('ocr_lang'):
+                cache.put(lang_key, metadata['ocr_lang'])
+    return text
+
+def iter_text(file_path, ocr_workers=None, ocr_batch_size=OCR_BATCH_SIZE, ocr_mode='document',
+              min_page_chars=MIN_PAGE_CHARS, tool_timeout=None, docx_engine='native', docx_extras=False,
+              ocr_settings=None, lang=AUTO_LANG, metadata=None, pdf_pages=None, pdf_max_pages=None,
+              pdf_layout='default'):
+    """
+    Извлекает текст из файла частями, не собирая его целиком в памяти:
+    PDF и DJVU - по страницам, DOCX и DOC - по параграфам.
     
+    :param file_path: Путь к файлу, bytes или двоичный файловый объект.
+    :param ocr_workers: Число процессов OCR для сканированных PDF; по умолчанию - число ядер.
+    :param ocr_batch_size: Число страниц PDF, растеризуемых за раз одним процессом.
+    :param ocr_mode: Режим OCR для PDF: 'document' или 'page' (см. extract_text_from_pdf).
+    :param min_page_chars: Порог текста на странице PDF для режима 'page'.
+    :param tool_timeout: Тайм-аут вызова djvutxt/antiword в секундах; по умолчанию - DEFAULT_TOOL_TIMEOUT.
+    :param docx_engine: Способ извлечения DOCX: 'native' или 'python-docx' (см. extract_text_from_docx).
+    :param docx_extras: Добавить к тексту DOCX колонтитулы и сноски.
+    :param ocr_settings: Настройки OCR сканированных PDF (см. make_ocr_settings); None - без подготовки изображений.
+    :param lang: Языки OCR или 'auto' (см. extract_text).
+    :param metadata: Необязательный словарь сведений об извлечении (см. extract_text); заполняется по ходу выдачи.
+    :param pdf_pages: Диапазоны страниц PDF (см. extract_text).
+    :param pdf_max_pages: Извлекать не больше pdf_max_pages первых из выбранных страниц PDF.
+    :param pdf_layout: Профиль анализа вёрстки PDF (см. PDF_LAYOUTS).
+    :return: Генератор пар (номер страницы с 1 или None для DOCX, текст).
+    :raises ValueError: Если диапазоны страниц или профиль вёрстки PDF заданы некорректно.
+    """
+    pdf_pages = _check_pdf_options(pdf_pages, pdf_layout)
+    source = as_source(file_path)
+    name = detect_format(source)
+    if name is None:
+        print(f"Формат файла не поддерживается: {_describe_source(file_path)}")
+        return
+    options = {'lang': lang, 'ocr_workers': ocr_workers, 'ocr_batch_size': ocr_batch_size, 'ocr_mode': ocr_mode,
+               'min_page_chars': min_page_chars, 'tool_timeout': tool_timeout, 'docx_engine': docx_engine,
+               'docx_extras': docx_extras, 'ocr_settings': ocr_settings, 'pdf_pages': pdf_pages,
+               'pdf_max_pages': pdf_max_pages, 'pdf_layout': pdf_layout,
+               'metadata': {} if metadata is None else metadata}
+    try:
+        yield from FORMATS[name].iterate(source, options)
+    except Exception as e:
+        print(f"Ошибка при извлечении текста из {name.upper()}: {e}")
+
+
+register_format(DocumentFormat(
+    'pdf', ('.pdf',), is_pdf,
+    lambda source, options: extract_text_from_pdf(source, options['ocr_workers'], options['ocr_batch_size'],
+                                                  options['ocr_mode'], options['min_page_chars'],
+                                                  options['ocr_settings'], options['lang'], options['metadata'],
+                                                  options['pdf_pages'], options['pdf_max_pages'],
+                                                  options['pdf_layout'], options['pdf_workers']),
+    lambda source, options: iter_pdf_pages(source, options['ocr_workers'], options['ocr_batch_size'],
+                                           options['ocr_mode'], options['min_page_chars'], options['lang'],
+                                           options['ocr_settings'], options['metadata'], options['pdf_pages'],
+                                           options['pdf_max_pages'], options['pdf_layout']),
+    key_options=('lang', 'ocr_mode', 'min_page_chars', 'ocr_settings', 'pdf_pages', 'pdf_max_pages', 'pdf_layout')))
+register_format(DocumentFormat(
+    'docx', ('.docx',), is_docx,
+    lambda source, options: extract_text_from_docx(source, options['docx_engine'], options['docx_extras']),
+    lambda source, options: iter_docx_paragraphs(source, options['docx_engine'], options['docx_extras']),
+    key_options=('docx_engine', 'docx_extras'), confirm=is_word_package))
+register_format(DocumentFormat(
+    'djvu', ('.djvu', '.djv'), is_djvu,
+    lambda source, options: extract_text_from_djvu(source, options['djvu_chunk_pages'], options['tool_timeout']),
+    lambda source, options: iter_djvu_pages(source, options['tool_timeout'])))
+register_format(DocumentFormat(
+    'doc', ('.doc',), is_ole2,
+    lambda source, options: extract_text_from_doc(source, options['tool_timeout']),
+    lambda source, options: iter_doc_paragraphs(source, options['tool_timeout'])))
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Извлечение текста из файла (.djvu, .docx, .pdf, .doc')
-    parser.add_argument('file_path', type=str, help='Путь к файлу')
+    parser.add_argument('file_path', type=str, nargs='?', help='Путь к файлу')
+    parser.add_argument('-i', '--input', type=str,
+                        help='Пакетный режим: каталог (рекурсивно), шаблон glob или файл со списком путей ("-" - stdin)')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Файл результатов для форматов jsonl и columnar (по умолчанию stdout); в пакетном '
+                             'режиме JSONL уже обработанные файлы при повторном запуске пропускаются')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=None,
+                        help='Формат результатов: text - только текст (по умолчанию для одного файла), jsonl - запись '
+                             'JSON на файл (по умолчанию в пакетном режиме), columnar - колоночный файл (Parquet при '
+                             'установленном pyarrow, иначе встроенный формат; нужен --output)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Пакетный режим: число процессов-обработчиков (по умолчанию - число ядер)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Пакетный режим: максимальное время обработки одного файла в секундах')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Пакетный режим: перезаписать файл результатов вместо продолжения')
+    parser.add_argument('--retry-errors', action='store_true',
+                        help='Пакетный режим: при продолжении повторно обработать файлы с ошибками')
+    parser.add_argument('--ocr-workers', type=int, default=None,
+                        help='Число процессов OCR для сканированных PDF (по умолчанию - число ядер)')
+    parser.add_argument('--ocr-batch-size', type=int, default=OCR_BATCH_SIZE,
+                        help='Число страниц PDF, растеризуемых за раз одним процессом')
+    parser.add_argument('--ocr-mode', choices=['document', 'page'], default='document',
+                        help='document - OCR всего PDF без текстового слоя, page - OCR только страниц без текста')
+    parser.add_argument('--min-page-chars', type=int, default=MIN_PAGE_CHARS,
+                        help='Режим page: страница с меньшим числом символов распознаётся через OCR')
+    parser.add_argument('--ocr-lang', type=str, default=AUTO_LANG,
+                        help='Языки tesseract для OCR (например, rus+eng); auto - определить по письменности '
+                             'первых страниц')
+    parser.add_argument('--ocr-dpi', type=str, default='auto',
+                        help='Разрешение растеризации для OCR; auto - по размеру страницы и оценке размера текста')
+    parser.add_argument('--ocr-preprocess', choices=OCR_PREPROCESS_MODES, default='grayscale',
+                        help='Подготовка страницы к OCR: none - цветное изображение, grayscale - оттенки серого, '
+                             'binarize - чёрно-белое')
+    parser.add_argument('--ocr-no-crop', action='store_true', help='Не обрезать пустые поля страниц перед OCR')
+    parser.add_argument('--ocr-psm', type=int, default=None, help='Режим сегментации страницы tesseract (--psm)')
+    parser.add_argument('--ocr-oem', type=int, default=None, help='Режим движка tesseract (--oem)')
+    parser.add_argument('--tool-timeout', type=float, default=DEFAULT_TOOL_TIMEOUT,
+                        help='Тайм-аут вызова djvutxt/antiword в секундах; зависший процесс останавливается')
+    parser.add_argument('--tool-concurrency', type=int, default=None,
+                        help='Максимальное число одновременно запущенных djvutxt/antiword (по умолчанию - число ядер)')
+    parser.add_argument('--djvu-chunk-pages', type=int, default=None,
+                        help='Извлекать DJVU параллельно диапазонами по указанному числу страниц')
+    parser.add_argument('--pdf-pages', type=str, default=None,
+                        help='Диапазоны страниц PDF, например 1-5,8,10- (последний - до конца документа)')
+    parser.add_argument('--pdf-max-pages', type=int, default=None,
+                        help='Извлекать не больше указанного числа первых (из выбранных) страниц PDF')
+    parser.add_argument('--pdf-layout', choices=PDF_LAYOUTS, default='default',
+                        help='Анализ вёрстки PDF: default - полный, fast - без группировки текстовых блоков '
+                             '(быстрее, блоки идут сверху вниз)')
+    parser.add_argument('--pdf-workers', type=int, default=None,
+                        help=f'Извлекать текстовый слой PDF параллельно указанным числом процессов '
+                             f'(диапазонами по {PDF_CHUNK_PAGES} страниц)')
+    parser.add_argument('--docx-engine', choices=DOCX_ENGINES, default='native',
+                        help='native - потоковый разбор XML (с таблицами), python-docx - только параграфы через python-docx')
+    parser.add_argument('--docx-extras', action='store_true',
+                        help='Добавить к тексту DOCX колонтитулы и сноски')
+    parser.add_argument('--tool-stats', action='store_true',
+                        help='Вывести в stderr статистику вызовов внешних инструментов')
+    parser.add_argument('--stream', action='store_true',
+                        help='Выводить текст по мере извлечения: PDF и DJVU - по страницам (разделитель - символ '
+                             'перевода страницы), DOCX и DOC - по параграфам; кэш не используется')
+    parser.add_argument('--metrics', action='append', default=None, metavar='SINK',
+                        help='Замеры этапов (pdfminer, растеризация, OCR, extract_text_from_*): log - строки в stderr, '
+                             'json:ПУТЬ - итоги в JSON, prometheus:ПУТЬ - итоги в формате Prometheus; можно указать '
+                             'несколько раз. В пакетном режиме этапы внутри процессов-обработчиков не замеряются')
+    parser.add_argument('--metrics-memory', action='store_true',
+                        help='Замерять также пиковую память Python этапов (tracemalloc, замедляет работу)')
+    parser.add_argument('--no-cache', action='store_true', help='Не использовать кэш извлечённого текста')
+    parser.add_argument('--clear-cache', action='store_true', help='Очистить кэш перед извлечением')
+    parser.add_argument('--cache-path', type=str, default=DEFAULT_CACHE_PATH, help='Путь к файлу кэша')
+    parser.add_argument('--cache-max-mb', type=float, default=512, help='Максимальный размер кэша в МБ')
+    parser.add_argument('--cache-stats', action='store_true', help='Вывести статистику кэша в stderr')
 
     args = parser.parse_args()
+    if not args.file_path and not args.input:
+        parser.error('необходимо указать путь к файлу или источник файлов (--input)')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers должно быть не меньше 1')
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error('--timeout должно быть больше 0')
+    if args.ocr_workers is not None and args.ocr_workers < 1:
+        parser.error('--ocr-workers должно быть не меньше 1')
+    if args.ocr_batch_size < 1:
+        parser.error('--ocr-batch-size должно быть не меньше 1')
+    if args.tool_timeout <= 0:
+        parser.error('--tool-timeout должно быть больше 0')
+    if args.tool_concurrency is not None and args.tool_concurrency < 1:
+        parser.error('--tool-concurrency должно быть не меньше 1')
+    if args.djvu_chunk_pages is not None and args.djvu_chunk_pages < 1:
+        parser.error('--djvu-chunk-pages должно быть не меньше 1')
+    if args.pdf_max_pages is not None and args.pdf_max_pages < 1:
+        parser.error('--pdf-max-pages должно быть не меньше 1')
+    if args.pdf_workers is not None and args.pdf_workers < 1:
+        parser.error('--pdf-workers должно быть не меньше 1')
+    if args.pdf_pages is not None:
+        try:
+            parse_page_ranges(args.pdf_pages)
+        except ValueError as e:
+            parser.error(f'--pdf-pages: {e}')
+    output_format = args.format or ('jsonl' if args.input else 'text')
+    if args.input and output_format == 'text':
+        parser.error('в пакетном режиме поддерживаются форматы jsonl и columnar')
+    if output_format == 'columnar' and not args.output:
+        parser.error('--format columnar требует --output')
+    if args.output and output_format == 'text':
+        parser.error('--output используется с форматами jsonl и columnar')
+    if args.stream and output_format != 'text':
+        parser.error('--stream поддерживает только --format text')
+    try:
+        ocr_settings = make_ocr_settings(args.ocr_dpi if args.ocr_dpi == 'auto' else int(args.ocr_dpi),
+                                         args.ocr_preprocess, not args.ocr_no_crop, args.ocr_psm, args.ocr_oem)
+    except ValueError as e:
+        parser.error(f'недопустимые настройки OCR: {e}')
+    TOOL_RUNNER = ToolRunner(args.tool_concurrency, args.tool_timeout)
+    if args.metrics or args.metrics_memory:
+        try:
+            sinks = [make_sink(spec, 'text_extract') for spec in args.metrics or ['log']]
+        except ValueError as e:
+            parser.error(str(e))
+        enable_metrics(sinks, trace_memory=args.metrics_memory)
+        # Итоги передаются приёмникам при любом завершении программы, в том числе через sys.exit
+        atexit.register(disable_metrics)
     
+    if args.input:
+        from BatchExtraction import run_batch
+        # Параллелизм обеспечивают процессы-обработчики, поэтому OCR внутри каждого по умолчанию однопоточный
+        options = {'ocr_workers': args.ocr_workers or 1, 'ocr_batch_size': args.ocr_batch_size,
+                   'ocr_mode': args.ocr_mode, 'min_page_chars': args.min_page_chars,
+                   'tool_timeout': args.tool_timeout, 'djvu_chunk_pages': args.djvu_chunk_pages,
+                   'docx_engine': args.docx_engine, 'docx_extras': args.docx_extras, 'ocr_settings': ocr_settings,
+                   'lang': args.ocr_lang, 'pdf_pages': args.pdf_pages, 'pdf_max_pages': args.pdf_max_pages,
+                   'pdf_layout': args.pdf_layout, 'pdf_workers': args.pdf_workers}
+        if args.clear_cache and not args.no_cache:
+            cache = ExtractionCache(args.cache_path)
+            cache.clear()
+            cache.close()
+        try:
+            stats = run_batch(args.input, args.output, args.workers, args.timeout, options,
+                              None if args.no_cache else args.cache_path, int(args.cache_max_mb * 1024 * 1024),
+                              resume=not args.no_resume, retry_errors=args.retry_errors,
+                              output_format=output_format)
+        except ValueError as e:
+            parser.error(f'{e} (укажите --no-resume)')
+        print(f"Обработано: {stats['processed']}, с ошибками: {stats['errors']}, "
+              f"пропущено: {stats['skipped']}", file=sys.stderr)
+        sys.exit(0)
+
     file_path = args.file_path
 
-    text = extract_text(file_path)
+    if args.stream:
+        # Страницы PDF и DJVU разделяются символом перевода страницы, параграфы DOCX и DOC - переводом строки
+        separator = '\f' if detect_format(file_path) in ('pdf', 'djvu') else '\n'
+        for _, chunk in iter_text(file_path, args.ocr_workers, args.ocr_batch_size, args.ocr_mode,
+                                  args.min_page_chars, args.tool_timeout, args.docx_engine, args.docx_extras,
+                                  ocr_settings, args.ocr_lang, None, args.pdf_pages, args.pdf_max_pages,
+                                  args.pdf_layout):
+            print(chunk, end=separator, flush=True)
+        if args.tool_stats:
+            print(f"Внешние инструменты: {TOOL_RUNNER.stats()}", file=sys.stderr)
+        sys.exit(0)
+
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_path, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        if args.clear_cache:
+            cache.clear()
 
-    print(text)
\ No newline at end of file
+    if output_format != 'text':
+        from BatchExtraction import extract_file_record
+        options = {'ocr_workers': args.ocr_workers, 'ocr_batch_size': args.ocr_batch_size,
+                   'ocr_mode': args.ocr_mode, 'min_page_chars': args.min_page_chars,
+                   'tool_timeout': args.tool_timeout, 'djvu_chunk_pages': args.djvu_chunk_pages,
+                   'docx_engine': args.docx_engine, 'docx_extras': args.docx_extras, 'ocr_settings': ocr_settings,
+                   'lang': args.ocr_lang, 'pdf_pages': args.pdf_pages, 'pdf_max_pages': args.pdf_max_pages,
+                   'pdf_layout': args.pdf_layout, 'pdf_workers': args.pdf_workers}
+        record = extract_file_record(file_path, options, cache)
+        writer = open_record_writer(output_format, args.output)
+        writer.write(record)
+        writer.close()
+        metadata = record['metadata']
+    else:
+        metadata = {}
+        text = extract_text(file_path, args.ocr_workers, args.ocr_batch_size, args.ocr_mode, args.min_page_chars,
+                            cache, args.tool_timeout, args.djvu_chunk_pages, args.docx_engine, args.docx_extras,
+                            ocr_settings, args.ocr_lang, metadata, args.pdf_pages, args.pdf_max_pages,
+                            args.pdf_layout, args.pdf_workers)
+        print(text)
+    if metadata.get('ocr_lang'):
+        print(f"Языки OCR: {metadata['ocr_lang']}", file=sys.stderr)
+    if args.tool_stats:
+        print(f"Внешние инструменты: {TOOL_RUNNER.stats()}", file=sys.stderr)
+    if cache is not None:
+        if args.cache_stats:
+            print(f"Кэш: {cache.stats()}", file=sys.stderr)
+        cache.close()
\ No newline at end of file
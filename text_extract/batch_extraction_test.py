@@ -0,0 +1,200 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from BatchExtraction import iter_input_files, read_finished_paths, extract_file_record, extract_files, run_batch
+from ResultFormats import read_records
+
+
+def fake_extract_text(file_path, cache=None, **options):
+    """Имитирует extract_text в процессах-обработчиках: поведение задаётся именем файла."""
+    name = os.path.basename(file_path)
+    if name.startswith('slow'):
+        time.sleep(30)
+    if name.startswith('tool'):
+        # Внешний инструмент, зависший вместе с обработчиком: его PID записывается рядом с файлом
+        tool = subprocess.Popen(['sleep', '30'])
+        with open(file_path + '.pid', 'w') as file:
+            file.write(str(tool.pid))
+        tool.wait()
+    if name.startswith('crash'):
+        os._exit(1)
+    if name.startswith('broken'):
+        print("Ошибка при извлечении текста из PDF: файл повреждён")
+        return ""
+    return f"текст {name}"
+
+
+def process_running(pid):
+    """Проверяет по /proc, что процесс существует и не завершён (завершённый, но не освобождённый - зомби)."""
+    try:
+        with open(f'/proc/{pid}/stat') as file:
+            return file.read().rpartition(')')[2].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+class TestIterInputFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name in ('a.pdf', 'b.txt', os.path.join('sub', 'c.docx'), os.path.join('sub', 'd.djvu')):
+            path = os.path.join(self.tmp.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_directory_is_walked_recursively(self):
+        """Проверка рекурсивного обхода каталога с отбором поддерживаемых форматов"""
+        files = [os.path.relpath(path, self.tmp.name) for path in iter_input_files(self.tmp.name)]
+        self.assertEqual(files, ['a.pdf', os.path.join('sub', 'c.docx'), os.path.join('sub', 'd.djvu')])
+
+    def test_glob_pattern(self):
+        """Проверка выбора файлов по шаблону glob"""
+        files = list(iter_input_files(os.path.join(self.tmp.name, '**', '*.d*')))
+        self.assertEqual([os.path.basename(path) for path in files], ['c.docx', 'd.djvu'])
+
+    def test_manifest_file(self):
+        """Проверка чтения списка путей из манифеста"""
+        manifest = os.path.join(self.tmp.name, 'manifest.txt')
+        with open(manifest, 'w', encoding='utf-8') as file:
+            file.write("# комментарий\none.pdf\n\n  two.doc  \n")
+        self.assertEqual(list(iter_input_files(manifest)), ['one.pdf', 'two.doc'])
+
+
+class TestExtractFileRecord(unittest.TestCase):
+    def test_printed_error_goes_to_record(self):
+        """Проверка, что сообщение извлекателя об ошибке попадает в поле error, а не в stdout"""
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            record = extract_file_record('broken.pdf', extractor=fake_extract_text)
+        self.assertEqual(mock_stdout.getvalue(), "")
+        self.assertEqual(record['format'], 'pdf')
+        self.assertEqual(record['text'], "")
+        self.assertIn("файл повреждён", record['error'])
+
+    def test_exception_goes_to_record(self):
+        """Проверка обработки исключения извлекателя"""
+        def failing_extractor(file_path, cache=None, **options):
+            raise RuntimeError("сбой")
+        record = extract_file_record('a.docx', extractor=failing_extractor)
+        self.assertEqual(record['error'], "RuntimeError: сбой")
+
+
+class TestExtractFiles(unittest.TestCase):
+    def test_results_for_all_files(self):
+        """Проверка обработки всех файлов пулом процессов"""
+        paths = [f"doc{number}.pdf" for number in range(6)]
+        records = list(extract_files(paths, workers=2, extractor=fake_extract_text))
+
+        self.assertEqual(sorted(record['path'] for record in records), sorted(paths))
+        for record in records:
+            self.assertEqual(record['text'], f"текст {record['path']}")
+            self.assertIsNone(record['error'])
+
+    def test_timeout_and_crash_do_not_stop_batch(self):
+        """Проверка, что зависший и аварийно завершившийся файлы не останавливают обработку остальных"""
+        paths = ['slow.pdf', 'crash.doc', 'ok1.docx', 'ok2.djvu']
+        started = time.perf_counter()
+        records = {record['path']: record for record in
+                   extract_files(paths, workers=2, timeout=1, extractor=fake_extract_text)}
+
+        self.assertLess(time.perf_counter() - started, 20)
+        self.assertIn("Превышено время", records['slow.pdf']['error'])
+        self.assertIn("аварийно", records['crash.doc']['error'])
+        self.assertEqual(records['ok1.docx']['text'], "текст ok1.docx")
+        self.assertEqual(records['ok2.djvu']['text'], "текст ok2.djvu")
+
+    @unittest.skipUnless(os.path.isdir('/proc'), "состояние процессов проверяется через /proc")
+    def test_timeout_kills_tool_processes(self):
+        """Проверка, что по тайм-ауту вместе с обработчиком останавливаются запущенные им процессы"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tool.djvu')
+            records = list(extract_files([path], workers=1, timeout=1, extractor=fake_extract_text))
+            self.assertIn("Превышено время", records[0]['error'])
+            with open(path + '.pid') as file:
+                pid = int(file.read())
+        # Процесс sleep - потомок обработчика, а не теста: после остановки он завершён
+        deadline = time.monotonic() + 5
+        while process_running(pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(process_running(pid))
+
+    def test_invalid_workers(self):
+        """Проверка на недопустимое число процессов"""
+        with self.assertRaises(ValueError):
+            list(extract_files(['a.pdf'], workers=0, extractor=fake_extract_text))
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.tmp.name, 'manifest.txt')
+        self.output = os.path.join(self.tmp.name, 'result.jsonl')
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def write_manifest(self, paths):
+        with open(self.manifest, 'w', encoding='utf-8') as file:
+            file.write("\n".join(paths))
+
+    def read_output(self):
+        with open(self.output, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_resume_skips_finished_files(self):
+        """Проверка продолжения прерванного запуска: обработанные файлы пропускаются"""
+        with open(self.output, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'path': 'a.pdf', 'text': 'готово', 'error': None}) + '\n')
+            file.write('{"path": "b.pdf", "te')
+        self.write_manifest(['a.pdf', 'b.pdf', 'c.pdf'])
+
+        stats = run_batch(self.manifest, self.output, workers=1, extractor=fake_extract_text)
+
+        self.assertEqual(stats, {'processed': 2, 'errors': 0, 'skipped': 1})
+        self.assertEqual([record['path'] for record in self.read_output()], ['a.pdf', 'b.pdf', 'c.pdf'])
+
+    def test_jsonl_to_stream(self):
+        """Проверка вывода записей JSONL в поток, если файл результатов не задан"""
+        self.write_manifest(['a.pdf', 'broken.doc'])
+        output = StringIO()
+        stats = run_batch(self.manifest, workers=1, output=output, extractor=fake_extract_text)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([(record['path'], record['format']) for record in records],
+                         [('a.pdf', 'pdf'), ('broken.doc', 'doc')])
+        self.assertEqual(stats['errors'], 1)
+
+    def test_columnar_output(self):
+        """Проверка записи результатов в колоночный файл и отказа дописывать в существующий"""
+        self.write_manifest(['docs/a.pdf', 'docs/broken.doc', 'c.pdf'])
+        stats = run_batch(self.manifest, self.output, workers=1, extractor=fake_extract_text,
+                          output_format='columnar')
+        self.assertEqual(stats['processed'], 3)
+        records = sorted(read_records(self.output), key=lambda record: record['path'])
+        self.assertEqual([(record['path'], record['text'], record['error'] is None) for record in records],
+                         [('c.pdf', 'текст c.pdf', True), ('docs/a.pdf', 'текст a.pdf', True),
+                          ('docs/broken.doc', '', False)])
+        with self.assertRaises(ValueError):
+            run_batch(self.manifest, self.output, workers=1, extractor=fake_extract_text, output_format='columnar')
+
+    def test_read_finished_paths_retry_errors(self):
+        """Проверка, что с retry_errors файлы с ошибками не считаются обработанными"""
+        with open(self.output, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'path': 'a.pdf', 'error': None}) + '\n')
+            file.write(json.dumps({'path': 'b.pdf', 'error': "сбой"}) + '\n')
+        self.assertEqual(read_finished_paths(self.output), {'a.pdf', 'b.pdf'})
+        self.assertEqual(read_finished_paths(self.output, retry_errors=True), {'a.pdf'})
+
+
+if __name__ == '__main__':
+    unittest.main()
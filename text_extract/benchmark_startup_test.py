@@ -0,0 +1,18 @@
+import unittest
+from BenchmarkStartup import DIRECTORY, ENTRY_POINTS
+from ImportTiming import run_benchmarks
+
+
+class TestBenchmarkStartup(unittest.TestCase):
+    def test_entry_points_do_not_import_heavy_modules(self):
+        """Проверка: точки входа запускаются со --help без импорта тяжёлых зависимостей"""
+        current = run_benchmarks(DIRECTORY, ENTRY_POINTS, repeat=1)
+        self.assertEqual(set(current['results']), set(ENTRY_POINTS))
+        for name, result in current['results'].items():
+            with self.subTest(entry_point=name):
+                self.assertEqual(result['forbidden'], [])
+                self.assertGreater(result['modules'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from unittest.mock import patch
+from BenchmarkText import DEFAULT_CORPUS, run_benchmarks, compare_results
+
+
+class TestBenchmarkText(unittest.TestCase):
+    @patch('shutil.which', return_value=None)
+    def test_stages_without_tools_are_skipped(self, mock_which):
+        """Проверка, что этапы без установленных внешних программ пропускаются с причиной"""
+        report = run_benchmarks(DEFAULT_CORPUS, ['docx/native', 'antiword', 'djvutxt'], repeat=1)
+        self.assertEqual(set(report['skipped']), {'antiword', 'djvutxt'})
+        self.assertIn('docx/native/en_txt.docx', report['results'])
+        result = report['results']['docx/native/en_txt.docx']
+        self.assertGreater(result['chars'], 0)
+        self.assertGreater(result['mb_per_second'], 0)
+
+    def test_compare_flags_regressions(self):
+        """Проверка поиска регрессий относительно базовых результатов"""
+        baseline = {'results': {'pdfminer/a.pdf': {'seconds': 1.0, 'peak_bytes': 10000000}}}
+        current = {'results': {'pdfminer/a.pdf': {'seconds': 1.05, 'peak_bytes': 20000000}}}
+        rows = {row['metric']: row['regression'] for row in compare_results(baseline, current)}
+        self.assertEqual(rows, {'seconds': False, 'peak_bytes': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
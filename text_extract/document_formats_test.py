@@ -0,0 +1,144 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch, MagicMock
+from docx import Document
+from DocumentFormats import FORMATS, DocumentFormat, register_format, detect_format, as_source, source_path
+from TextExtraction import extract_text, iter_text
+
+PDF_HEAD = b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n'
+DJVU_HEAD = b'AT&TFORM\x00\x00\x10\x00DJVUINFO'
+OLE2_HEAD = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 24
+
+
+def make_docx_bytes(*paragraphs):
+    """Создаёт DOCX в памяти."""
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+class TestDetectFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_signatures(self):
+        """Проверка определения формата по сигнатурам"""
+        cases = {'pdf': PDF_HEAD, 'docx': make_docx_bytes("текст"), 'djvu': DJVU_HEAD, 'doc': OLE2_HEAD}
+        for name, content in cases.items():
+            with self.subTest(name):
+                self.assertEqual(detect_format(as_source(content)), name)
+
+    def test_misnamed_file_detected_by_content(self):
+        """Проверка, что формат переименованного файла определяется по содержимому, а не по расширению"""
+        self.assertEqual(detect_format(self.write('scan.doc', PDF_HEAD)), 'pdf')
+        self.assertEqual(detect_format(self.write('report.pdf', make_docx_bytes("текст"))), 'docx')
+
+    def test_other_ooxml_packages_are_not_docx(self):
+        """Проверка: xlsx и pptx - тоже пакеты OOXML, но не DOCX; PDF внутри ZIP не делает его PDF"""
+        xlsx = io.BytesIO()
+        with zipfile.ZipFile(xlsx, 'w') as package:
+            package.writestr('[Content_Types].xml', '<Types><Override PartName="/xl/workbook.xml" ContentType='
+                             '"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/></Types>')
+            package.writestr('xl/workbook.xml', '<workbook/>')
+            package.writestr('embedded.pdf', PDF_HEAD)
+        self.assertIsNone(detect_format(as_source(xlsx.getvalue())))
+        self.assertIsNone(detect_format(self.write('table.xlsx', xlsx.getvalue())))
+        self.assertEqual(detect_format(as_source(OLE2_HEAD + PDF_HEAD)), 'doc')
+
+        # Главная часть документа Word под другим именем определяется по типу содержимого
+        docx = io.BytesIO()
+        with zipfile.ZipFile(docx, 'w') as package:
+            package.writestr('[Content_Types].xml', '<Types><Override PartName="/main.xml" ContentType='
+                             '"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                             '</Types>')
+        self.assertEqual(detect_format(as_source(docx.getvalue())), 'docx')
+
+    def test_extension_fallback(self):
+        """Проверка определения по расширению, если сигнатура не распознана или файл не читается"""
+        self.assertEqual(detect_format(self.write('old.doc', b'unknown')), 'doc')
+        self.assertEqual(detect_format('missing.djvu'), 'djvu')
+        self.assertIsNone(detect_format(self.write('notes.txt', b'plain text')))
+        self.assertIsNone(detect_format(as_source(b'plain text')))
+
+    def test_file_object_position_preserved(self):
+        """Проверка, что определение формата не сдвигает позицию файлового объекта"""
+        stream = io.BytesIO(PDF_HEAD)
+        stream.seek(3)
+        self.assertEqual(detect_format(stream), 'pdf')
+        self.assertEqual(stream.tell(), 3)
+
+    def test_source_path_spools_file_object(self):
+        """Проверка временного файла для инструментов, читающих только с диска"""
+        with source_path(io.BytesIO(OLE2_HEAD), '.doc') as path:
+            self.assertTrue(path.endswith('.doc'))
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(), OLE2_HEAD)
+        self.assertFalse(os.path.exists(path))
+        with source_path('document.doc') as path:
+            self.assertEqual(path, 'document.doc')
+
+
+class TestExtractFromMemory(unittest.TestCase):
+    def test_docx_bytes(self):
+        """Проверка извлечения текста DOCX из bytes без временных файлов"""
+        with patch('tempfile.NamedTemporaryFile') as mock_temp:
+            self.assertEqual(extract_text(make_docx_bytes("Первый.", "Второй.")), "Первый.\nВторой.")
+        mock_temp.assert_not_called()
+
+    @patch('TextExtraction.pdfminer_extract_text', return_value="Это текст из PDF.")
+    def test_pdf_file_object(self, mock_pdfminer):
+        """Проверка, что PDF из файлового объекта передаётся в pdfminer без записи на диск"""
+        stream = io.BytesIO(PDF_HEAD)
+        self.assertEqual(extract_text(stream), "Это текст из PDF.")
+        self.assertIs(mock_pdfminer.call_args.args[0], stream)
+
+    @patch('ExternalTools.subprocess.run')
+    def test_doc_bytes_spooled_for_antiword(self, mock_run):
+        """Проверка, что DOC из памяти передаётся antiword через временный файл"""
+        def fake_run(args, **kwargs):
+            with open(args[1], 'rb') as file:
+                self.assertEqual(file.read(), OLE2_HEAD)
+            return MagicMock(stdout="Извлеченный текст из DOC.")
+
+        mock_run.side_effect = fake_run
+        self.assertEqual(extract_text(OLE2_HEAD), "Извлеченный текст из DOC.")
+        self.assertEqual(mock_run.call_args.args[0][0], 'antiword')
+
+    def test_iter_text_bytes(self):
+        """Проверка потоковой выдачи параграфов DOCX из bytes"""
+        self.assertEqual(list(iter_text(make_docx_bytes("Первый.", "Второй."))), [(None, "Первый."), (None, "Второй.")])
+
+
+class TestRegisterFormat(unittest.TestCase):
+    def tearDown(self):
+        FORMATS.pop('txt', None)
+        return super().tearDown()
+
+    def test_new_format_plugged_in(self):
+        """Проверка подключения нового формата без изменения extract_text"""
+        register_format(DocumentFormat(
+            'txt', ('.txt',), lambda head: head.startswith(b'TXT:'),
+            lambda source, options: source.read().decode('utf-8')[len('TXT:'):]))
+
+        self.assertEqual(extract_text("TXT:простой текст".encode('utf-8')), "простой текст")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import glob
+import io
+import os
+import unittest
+import zipfile
+from unittest.mock import patch, MagicMock
+from docx import Document
+from docx.enum.text import WD_BREAK
+from DocxExtraction import iter_docx_texts
+from TextExtraction import extract_text_from_docx
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files')
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def make_docx(build):
+    """Создаёт DOCX в памяти через python-docx; build(document) наполняет документ."""
+    document = Document()
+    build(document)
+    stream = io.BytesIO()
+    document.save(stream)
+    stream.seek(0)
+    return stream
+
+
+def make_raw_docx(body):
+    """Создаёт минимальный DOCX с заданным содержимым w:body."""
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, 'w') as archive:
+        archive.writestr('word/document.xml', f'<w:document {W} {MC}><w:body>{body}</w:body></w:document>')
+    stream.seek(0)
+    return stream
+
+
+class TestNativeDocx(unittest.TestCase):
+    def test_same_as_python_docx_on_fixtures(self):
+        """Проверка совпадения с python-docx на документах без таблиц"""
+        paths = sorted(glob.glob(os.path.join(TEST_FILES, '*.docx')))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(os.path.basename(path)):
+                expected = "\n".join(paragraph.text for paragraph in Document(path).paragraphs)
+                self.assertEqual("\n".join(iter_docx_texts(path)), expected)
+
+    def test_runs_tabs_and_breaks(self):
+        """Проверка текста run: табуляция, перенос строки и разрыв страницы"""
+        def build(document):
+            paragraph = document.add_paragraph('A\tB')
+            run = paragraph.add_run('x')
+            run.add_break()
+            run.add_text('y')
+            paragraph.add_run('z').add_break(WD_BREAK.PAGE)
+            document.add_paragraph('')
+
+        self.assertEqual(list(iter_docx_texts(make_docx(build))), ['A\tBx\nyz', ''])
+
+    def test_tables_in_document_order(self):
+        """Проверка вывода ячеек таблиц между параграфами в порядке документа"""
+        def build(document):
+            document.add_paragraph('до')
+            table = document.add_table(rows=2, cols=2)
+            table.cell(0, 0).text = 'ячейка 1'
+            table.cell(1, 1).text = 'ячейка 2\nвторая строка'
+            document.add_paragraph('после')
+
+        self.assertEqual(list(iter_docx_texts(make_docx(build))),
+                         ['до', 'ячейка 1', 'ячейка 2\nвторая строка', 'после'])
+
+    def test_headers_and_footers(self):
+        """Проверка извлечения колонтитулов с extras=True"""
+        def build(document):
+            document.add_paragraph('текст')
+            document.sections[0].header.paragraphs[0].text = 'верхний'
+            document.sections[0].footer.paragraphs[0].text = 'нижний'
+
+        self.assertEqual(list(iter_docx_texts(make_docx(build))), ['текст'])
+        self.assertEqual(list(iter_docx_texts(make_docx(build), extras=True)), ['текст', 'верхний', 'нижний'])
+
+    def test_tab_stops_and_fallback_are_not_text(self):
+        """Проверка, что позиции табуляции и альтернативное содержимое mc:Fallback не попадают в текст"""
+        body = ('<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+                '<w:r><w:t xml:space="preserve">один </w:t></w:r>'
+                '<w:ins><w:r><w:t>вставка</w:t></w:r></w:ins><w:del><w:r><w:delText>удалено</w:delText></w:r></w:del>'
+                '<w:r><mc:AlternateContent><mc:Choice><w:p><w:r><w:t>надпись</w:t></w:r></w:p></mc:Choice>'
+                '<mc:Fallback><w:p><w:r><w:t>надпись</w:t></w:r></w:p></mc:Fallback></mc:AlternateContent></w:r>'
+                '</w:p>')
+
+        self.assertEqual(list(iter_docx_texts(make_raw_docx(body))), ['надпись', 'один вставка'])
+
+
+class TestDocxEngines(unittest.TestCase):
+    @patch('TextExtraction.Document')
+    def test_python_docx_engine(self, mock_document):
+        """Проверка выбора python-docx"""
+        mock_document.return_value.paragraphs = [MagicMock(text="Первый."), MagicMock(text="Второй.")]
+        self.assertEqual(extract_text_from_docx("dummy.docx", engine='python-docx'), "Первый.\nВторой.")
+
+    @patch('TextExtraction.Document')
+    @patch('TextExtraction.iter_docx_texts', side_effect=KeyError("word/document.xml"))
+    def test_fallback_to_python_docx(self, mock_native, mock_document):
+        """Проверка перехода на python-docx, если потоковый разбор не удался"""
+        mock_document.return_value.paragraphs = [MagicMock(text="Текст.")]
+        self.assertEqual(extract_text_from_docx("dummy.docx"), "Текст.")
+        mock_native.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from ExternalTools import ToolRunner
+from TextExtraction import extract_text_from_djvu
+
+
+class TestToolRunner(unittest.TestCase):
+    def test_run_returns_output_and_stats(self):
+        """Проверка вывода инструмента и статистики вызовов"""
+        runner = ToolRunner(max_concurrency=2)
+        self.assertEqual(runner.run([sys.executable, '-c', 'print("текст")']), "текст\n")
+
+        stats = runner.stats()[os.path.basename(sys.executable)]
+        self.assertEqual((stats['calls'], stats['errors'], stats['timeouts']), (1, 0, 0))
+        self.assertGreater(stats['max'], 0)
+
+    def test_timeout_kills_process(self):
+        """Проверка остановки зависшего процесса по тайм-ауту"""
+        runner = ToolRunner(timeout=0.5)
+        started = time.perf_counter()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            runner.run(['sleep', '30'])
+        self.assertLess(time.perf_counter() - started, 10)
+        self.assertEqual(runner.stats()['sleep']['timeouts'], 1)
+
+    def test_missing_tool_counted_as_error(self):
+        """Проверка учёта ошибки запуска отсутствующего инструмента"""
+        runner = ToolRunner()
+        with self.assertRaises(FileNotFoundError):
+            runner.run(['no-such-tool-for-test'])
+        self.assertEqual(runner.stats()['no-such-tool-for-test']['errors'], 1)
+
+    @patch('subprocess.run')
+    def test_run_many_respects_concurrency(self, mock_run):
+        """Проверка, что одновременно работает не больше max_concurrency процессов, а порядок выводов сохраняется"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def fake_run(args, **kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            return MagicMock(stdout=args[1])
+
+        mock_run.side_effect = fake_run
+        runner = ToolRunner(max_concurrency=2)
+        outputs = runner.run_many([['tool', str(number)] for number in range(6)])
+
+        self.assertEqual(outputs, [str(number) for number in range(6)])
+        self.assertEqual(state['peak'], 2)
+
+    def test_stream_timeout(self):
+        """Проверка остановки потокового вызова по тайм-ауту после частичного вывода"""
+        runner = ToolRunner(timeout=0.5)
+        lines = []
+        with self.assertRaises(subprocess.TimeoutExpired):
+            for line in runner.stream(['sh', '-c', 'echo first; exec sleep 30']):
+                lines.append(line)
+        self.assertEqual(lines, ["first\n"])
+        self.assertEqual(runner.stats()['sh']['timeouts'], 1)
+
+    def test_invalid_concurrency(self):
+        """Проверка на недопустимое число процессов"""
+        with self.assertRaises(ValueError):
+            ToolRunner(max_concurrency=0)
+
+
+class TestDjvuChunks(unittest.TestCase):
+    @patch('ExternalTools.subprocess.run')
+    def test_pages_extracted_in_chunks(self, mock_run):
+        """Проверка параллельного извлечения DJVU диапазонами страниц с сохранением порядка"""
+        def fake_run(args, **kwargs):
+            if args[0] == 'djvused':
+                return MagicMock(stdout="5\n")
+            first, last = map(int, args[1][len('--page='):].split('-'))
+            return MagicMock(stdout="\f".join(f"p{number}" for number in range(first, last + 1)))
+
+        mock_run.side_effect = fake_run
+        result = extract_text_from_djvu("dummy.djvu", chunk_pages=2)
+
+        self.assertEqual(result, "p1\fp2\fp3\fp4\fp5")
+        commands = sorted(call.args[0][1] for call in mock_run.call_args_list if call.args[0][0] == 'djvutxt')
+        self.assertEqual(commands, ['--page=1-2', '--page=3-4', '--page=5-5'])
+
+    @patch('ExternalTools.subprocess.run')
+    def test_whole_document_when_page_count_unknown(self, mock_run):
+        """Проверка извлечения одним вызовом, если число страниц не удалось определить"""
+        def fake_run(args, **kwargs):
+            if args[0] == 'djvused':
+                raise FileNotFoundError("djvused")
+            return MagicMock(stdout="весь текст")
+
+        mock_run.side_effect = fake_run
+        self.assertEqual(extract_text_from_djvu("dummy.djvu", chunk_pages=2), "весь текст")
+        self.assertEqual(mock_run.call_args.args[0], ['djvutxt', 'dummy.djvu'])
+        self.assertEqual(mock_run.call_args.kwargs['timeout'], 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
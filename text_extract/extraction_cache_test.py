@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from TextExtraction import extract_text
+from ExtractionCache import ExtractionCache, file_digest, make_cache_key
+
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache', 'text.sqlite3')
+        self.cache = ExtractionCache(self.path, max_bytes=100)
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_put_and_get(self):
+        """Проверка сохранения и чтения текста"""
+        self.cache.put("key", "Текст")
+        self.assertEqual(self.cache.get("key"), "Текст")
+        self.assertIsNone(self.cache.get("other"))
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 0})
+
+    def test_cache_persists_on_disk(self):
+        """Проверка, что записи доступны после повторного открытия кэша"""
+        self.cache.put("key", "Текст")
+        self.cache.close()
+        self.cache = ExtractionCache(self.path)
+        self.assertEqual(self.cache.get("key"), "Текст")
+
+    def test_lru_eviction(self):
+        """Проверка вытеснения давно не использованных записей при превышении размера"""
+        with patch('ExtractionCache.time.time', side_effect=range(1, 100)):
+            self.cache.put("a", "a" * 40)
+            self.cache.put("b", "b" * 40)
+            self.cache.get("a")
+            self.cache.put("c", "c" * 40)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertLessEqual(self.cache.size(), 100)
+
+    def test_clear(self):
+        """Проверка очистки кэша"""
+        self.cache.put("key", "Текст")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_get_defers_access_time(self):
+        """Проверка: обращения не пишутся в файл по одному, а записываются при сохранении и закрытии"""
+        with patch('ExtractionCache.time.time', return_value=10):
+            self.cache.put("a", "A")
+        with patch('ExtractionCache.time.time', return_value=20):
+            self.cache.get("a")
+
+        def accessed_at():
+            with sqlite3.connect(self.path) as db:
+                return db.execute("SELECT accessed_at FROM texts WHERE key = 'a'").fetchone()[0]
+
+        self.assertEqual(accessed_at(), 10)
+        self.cache.put("b", "B")
+        self.assertEqual(accessed_at(), 20)
+        with patch('ExtractionCache.time.time', return_value=30):
+            self.cache.get("a")
+        self.cache.close()
+        self.assertEqual(accessed_at(), 30)
+        self.cache = ExtractionCache(self.path)
+
+    def test_size_is_shared_between_connections(self):
+        """Проверка суммарного размера: замена записей, вытеснение и очистка из второго процесса с тем же файлом"""
+        other = ExtractionCache(self.path, max_bytes=100)
+        try:
+            self.cache.put("a", "a" * 30)
+            other.put("b", "b" * 30)
+            self.cache.put("a", "a" * 10)
+            self.assertEqual((self.cache.size(), other.size()), (40, 40))
+            # Вытесняется самая давно использованная запись, сохранённая другим соединением
+            other.put("c", "c" * 70)
+            self.assertEqual(other.size(), 80)
+            self.assertIsNone(self.cache.get("b"))
+            other.clear()
+            self.assertEqual(self.cache.size(), 0)
+        finally:
+            other.close()
+
+    def test_opens_cache_of_previous_version(self):
+        """Проверка открытия файла кэша прежней версии без счётчика размера"""
+        path = os.path.join(self.tmp.name, 'old.sqlite3')
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE texts (key TEXT PRIMARY KEY, text TEXT NOT NULL, accessed_at REAL NOT NULL, "
+                       "size INTEGER NOT NULL)")
+            db.execute("INSERT INTO texts VALUES ('a', 'AAA', 1, 3)")
+        db.close()
+        cache = ExtractionCache(path)
+        try:
+            self.assertEqual(cache.size(), 3)
+            self.assertEqual(cache.get("a"), "AAA")
+        finally:
+            cache.close()
+
+    def test_file_digest_streams_in_chunks(self):
+        """Проверка, что хэш не зависит от размера блока чтения"""
+        file_path = os.path.join(self.tmp.name, 'data.bin')
+        with open(file_path, 'wb') as file:
+            file.write(os.urandom(10000))
+        self.assertEqual(file_digest(file_path, chunk_size=7), file_digest(file_path))
+
+    def test_cache_key_depends_on_options(self):
+        """Проверка, что ключ зависит от версии и параметров извлекателя, но не от порядка параметров"""
+        key = make_cache_key("hash", "pdf", 1, {'lang': 'rus', 'ocr_mode': 'page'})
+        self.assertEqual(key, make_cache_key("hash", "pdf", 1, {'ocr_mode': 'page', 'lang': 'rus'}))
+        self.assertNotEqual(key, make_cache_key("hash", "pdf", 2, {'lang': 'rus', 'ocr_mode': 'page'}))
+        self.assertNotEqual(key, make_cache_key("hash", "pdf", 1, {'lang': 'eng', 'ocr_mode': 'page'}))
+
+
+class TestExtractTextWithCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(os.path.join(self.tmp.name, 'text.sqlite3'))
+        self.pdf_path = os.path.join(self.tmp.name, 'document.pdf')
+        with open(self.pdf_path, 'wb') as file:
+            file.write(b'%PDF-1.4 dummy')
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    @patch('TextExtraction.pdfminer_extract_text', return_value="Это текст из PDF.")
+    def test_hit_skips_extraction(self, mock_pdfminer):
+        """Проверка, что повторное извлечение того же содержимого берётся из кэша"""
+        copy_path = os.path.join(self.tmp.name, 'copy.pdf')
+        with open(copy_path, 'wb') as file:
+            file.write(b'%PDF-1.4 dummy')
+
+        self.assertEqual(extract_text(self.pdf_path, cache=self.cache), "Это текст из PDF.")
+        self.assertEqual(extract_text(copy_path, cache=self.cache), "Это текст из PDF.")
+        mock_pdfminer.assert_called_once()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    @patch('TextExtraction.pdfminer_extract_text', return_value="Это текст из PDF.")
+    def test_options_are_part_of_key(self, mock_pdfminer):
+        """Проверка, что при другом режиме OCR текст извлекается заново"""
+        extract_text(self.pdf_path, cache=self.cache)
+        with patch('TextExtraction.extract_pdf_page_texts', return_value=["Это текст из PDF."]):
+            extract_text(self.pdf_path, ocr_mode='page', cache=self.cache)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    @patch('TextExtraction.pdfminer_extract_text', return_value="   ")
+    @patch('TextExtraction.ocr_pdf', return_value="")
+    def test_empty_result_not_cached(self, mock_ocr, mock_pdfminer):
+        """Проверка, что пустой результат не сохраняется в кэш"""
+        extract_text(self.pdf_path, cache=self.cache)
+        extract_text(self.pdf_path, cache=self.cache)
+        self.assertEqual(mock_pdfminer.call_count, 2)
+        self.assertEqual(self.cache.size(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import threading
+import unittest
+from ExtractionService import create_service, extract_remote
+from TextExtraction import extract_text
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files')
+
+
+class TestExtractionService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.address = f"unix:{os.path.join(cls.directory.name, 'text.sock')}"
+        cls.service = create_service(cls.address, workers=1)
+        threading.Thread(target=cls.service.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+        cls.service.server_close()
+        cls.service.pool.close()
+        cls.directory.cleanup()
+
+    def test_upload_and_path_match_direct_extraction(self):
+        """Проверка, что текст из загруженного содержимого и по пути совпадает с extract_text"""
+        path = os.path.join(TEST_FILES, 'en_txt.docx')
+        expected = extract_text(path)
+        for by_path in (False, True):
+            [record] = extract_remote([path], self.address, by_path=by_path, timeout=30)
+            self.assertIsNone(record['error'])
+            self.assertEqual((record['format'], record['text']), ('docx', expected))
+
+    def test_unsupported_file_and_bad_options(self):
+        """Проверка ответов на неподдерживаемый файл и недопустимые параметры"""
+        path = os.path.join(self.directory.name, 'notes.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("просто текст")
+        [record] = extract_remote([path], self.address, timeout=30)
+        self.assertIsNone(record['format'])
+        self.assertIsNotNone(record['error'])
+        [record] = extract_remote([os.path.join(TEST_FILES, 'en_txt.docx')], self.address,
+                                  {'docx_engine': 'unknown'}, timeout=30)
+        self.assertIn('docx_engine', record['error'])
+        [record] = extract_remote([os.path.join(TEST_FILES, 'en_txt.docx')], self.address,
+                                  {'pdf_pages': '3-1'}, timeout=30)
+        self.assertIn('диапазон страниц', record['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import unittest
+from unittest.mock import patch
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from Instrumentation import enable, disable
+from TextExtraction import extract_text
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_files')
+
+
+class TestExtractionStages(unittest.TestCase):
+    def tearDown(self):
+        disable()
+        return super().tearDown()
+
+    def test_docx_stages(self):
+        """Проверка замеров извлечения DOCX: размер файла на входе и длина текста на выходе"""
+        path = os.path.join(TEST_FILES, 'en_txt.docx')
+        enable()
+        text = extract_text(path)
+        summary = disable()
+        self.assertEqual(set(summary), {'extract_text', 'extract_text_from_docx'})
+        self.assertEqual(summary['extract_text_from_docx']['bytes_in'], os.path.getsize(path))
+        self.assertEqual(summary['extract_text']['bytes_out'], len(text))
+
+    def test_pdf_pages_counted(self):
+        """Проверка подсчёта страниц PDF по разделителям страниц"""
+        with patch('TextExtraction.extract_pdf_page_texts', return_value=["первая", "вторая", "третья"]):
+            enable()
+            extract_text(b'%PDF-1.7\n', ocr_mode='page', min_page_chars=1)
+            summary = disable()
+        self.assertEqual(summary['extract_text_from_pdf_by_page']['pages'], 3)
+        self.assertEqual(summary['extract_text']['bytes_in'], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
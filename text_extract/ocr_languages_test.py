@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pytesseract
+from PIL import Image
+from OcrLanguages import detect_script, languages_for_scripts
+from OcrPreprocessing import make_ocr_settings
+from ExtractionCache import ExtractionCache
+from TextExtraction import detect_pdf_languages, extract_text, extract_text_from_pdf
+
+INSTALLED = frozenset({'rus', 'eng', 'chi_sim', 'osd'})
+
+
+def make_page():
+    """Создаёт изображение страницы с одной строкой «текста»."""
+    page = Image.new('L', (100, 100), 255)
+    page.paste(0, (20, 20, 80, 40))
+    return page
+
+
+def make_osd(script, confidence=5.0):
+    """Имитирует результат image_to_osd(output_type=DICT)."""
+    return {'script': script, 'script_conf': confidence, 'rotate': 0, 'orientation': 0}
+
+
+@patch('OcrLanguages.installed_languages', return_value=INSTALLED)
+class TestLanguagesForScripts(unittest.TestCase):
+    def test_scripts_to_languages(self, mock_installed):
+        """Проверка выбора языковых пакетов по письменностям страниц"""
+        self.assertEqual(languages_for_scripts([('Han', 4.2), ('Latin', 3.0), ('Han', 8.0)]), 'chi_sim+eng')
+        self.assertEqual(languages_for_scripts([('Cyrillic', 2.5)]), 'rus')
+
+    def test_fallback_to_default(self, mock_installed):
+        """Проверка языков по умолчанию при неуверенном, неизвестном или неустановленном результате"""
+        self.assertEqual(languages_for_scripts([]), 'rus')
+        self.assertEqual(languages_for_scripts([('Latin', 0.2)]), 'rus')
+        self.assertEqual(languages_for_scripts([('Fraktur', 9.0), ('Arabic', 9.0)]), 'rus')
+
+
+class TestDetectScript(unittest.TestCase):
+    @patch('pytesseract.image_to_osd', return_value=make_osd('Cyrillic', 3.5))
+    def test_detect_script(self, mock_osd):
+        """Проверка определения письменности через OSD"""
+        self.assertEqual(detect_script("image"), ('Cyrillic', 3.5))
+
+    @patch('pytesseract.image_to_osd', side_effect=pytesseract.TesseractError(1, "Too few characters"))
+    def test_too_few_characters(self, mock_osd):
+        """Проверка страницы, на которой слишком мало символов для OSD"""
+        self.assertIsNone(detect_script("image"))
+
+
+@patch('OcrLanguages.installed_languages', return_value=INSTALLED)
+class TestPdfLanguages(unittest.TestCase):
+    @patch('pytesseract.image_to_osd', side_effect=[make_osd('Han'), make_osd('Latin')])
+    @patch('TextExtraction.convert_from_path', side_effect=lambda path, **kwargs: [f"page{kwargs['first_page']}"])
+    def test_sample_first_pages(self, mock_convert, mock_osd, mock_installed):
+        """Проверка, что письменность определяется по первым страницам с пониженным разрешением"""
+        self.assertEqual(detect_pdf_languages("dummy_path.pdf", [3, 5, 8, 9]), 'chi_sim+eng')
+        self.assertEqual([call.kwargs['first_page'] for call in mock_convert.call_args_list], [3, 5])
+        self.assertEqual({call.kwargs['dpi'] for call in mock_convert.call_args_list}, {150})
+
+    @patch('TextExtraction.convert_from_path', side_effect=Exception("pdftoppm недоступен"))
+    def test_fallback_when_rendering_fails(self, mock_convert, mock_installed):
+        """Проверка языков по умолчанию, если страницы не растеризуются"""
+        self.assertEqual(detect_pdf_languages("dummy_path.pdf", range(1, 3)), 'rus')
+
+    @patch('pytesseract.image_to_string', side_effect=lambda image, lang: f"[{lang}]")
+    @patch('pytesseract.image_to_osd', return_value=make_osd('Latin'))
+    @patch('TextExtraction.convert_from_path', side_effect=lambda path, **kwargs: ["page"])
+    @patch('TextExtraction.pdfinfo_from_path', return_value={'Pages': 1})
+    @patch('TextExtraction.pdfminer_extract_text', return_value="")
+    def test_ocr_with_detected_languages(self, mock_pdfminer, mock_pdfinfo, mock_convert, mock_osd, mock_tesseract,
+                                         mock_installed):
+        """Проверка OCR документа только с определёнными языками и сведений о них в metadata"""
+        metadata = {}
+        self.assertEqual(extract_text_from_pdf("dummy_path.pdf", ocr_workers=1, metadata=metadata), "[eng]")
+        self.assertEqual(metadata, {'ocr_lang': 'eng'})
+        # Явно заданные языки OSD не требуют
+        mock_osd.reset_mock()
+        self.assertEqual(extract_text_from_pdf("dummy_path.pdf", ocr_workers=1, lang='rus+eng'), "[rus+eng]")
+        mock_osd.assert_not_called()
+
+
+@patch('OcrLanguages.installed_languages', return_value=INSTALLED)
+class TestLanguageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(os.path.join(self.tmp.name, 'text.sqlite3'))
+        self.pdf_path = os.path.join(self.tmp.name, 'scan.pdf')
+        with open(self.pdf_path, 'wb') as file:
+            file.write(b'%PDF-1.7\n')
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    @patch('pytesseract.image_to_string', side_effect=lambda image, lang, **kwargs: f"[{lang}]")
+    @patch('pytesseract.image_to_osd', return_value=make_osd('Han'))
+    @patch('TextExtraction.convert_from_path',
+           side_effect=lambda path, **kwargs: [make_page()] if kwargs['first_page'] == 1 else [])
+    @patch('TextExtraction.pdfinfo_from_path', return_value={'Pages': 1})
+    @patch('TextExtraction.pdfminer_extract_text', return_value="")
+    def test_languages_cached_per_document(self, mock_pdfminer, mock_pdfinfo, mock_convert, mock_osd,
+                                           mock_tesseract, mock_installed):
+        """Проверка, что языки документа определяются один раз и возвращаются в metadata и при попадании в кэш"""
+        first, second, third = {}, {}, {}
+        self.assertEqual(extract_text(self.pdf_path, ocr_workers=1, cache=self.cache, metadata=first), "[chi_sim]")
+        # Другие настройки OCR: текст извлекается заново, но языки берутся из кэша
+        extract_text(self.pdf_path, ocr_workers=1, cache=self.cache, metadata=second,
+                     ocr_settings=make_ocr_settings(dpi=300))
+        extract_text(self.pdf_path, ocr_workers=1, cache=self.cache, metadata=third)
+
+        self.assertEqual(mock_osd.call_count, 1)
+        self.assertEqual(first, {'ocr_lang': 'chi_sim'})
+        self.assertEqual(second, {'ocr_lang': 'chi_sim'})
+        self.assertEqual(third, {'ocr_lang': 'chi_sim'})
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+from OcrPreprocessing import (make_ocr_settings, tesseract_config, estimate_text_height, choose_dpi, otsu_threshold,
+                              content_box, preprocess_image, MIN_DPI, MAX_DPI, DEFAULT_DPI)
+from TextExtraction import ocr_pdf_pages
+
+
+def make_page(size=(400, 300), lines=((40, 12), (80, 12), (120, 12)), color=(20, 20, 20), background=(250, 250, 250)):
+    """Создаёт изображение страницы: строки текста - тёмные полосы заданной высоты (top, height)."""
+    image = Image.new('RGB', size, background)
+    draw = ImageDraw.Draw(image)
+    for top, height in lines:
+        draw.rectangle((60, top, 299, top + height - 1), fill=color)
+    return image
+
+
+class TestOcrSettings(unittest.TestCase):
+    def test_tesseract_config(self):
+        """Проверка передачи режимов сегментации и движка в tesseract"""
+        self.assertEqual(tesseract_config(make_ocr_settings()), "")
+        self.assertEqual(tesseract_config(make_ocr_settings(psm=6, oem=1)), "--psm 6 --oem 1")
+
+    def test_invalid_settings(self):
+        """Проверка отклонения недопустимых настроек"""
+        for kwargs in ({'dpi': 0}, {'dpi': 'high'}, {'preprocess': 'sharpen'}, {'psm': 14}, {'oem': 4}):
+            with self.subTest(kwargs):
+                with self.assertRaises(ValueError):
+                    make_ocr_settings(**kwargs)
+
+
+class TestAdaptiveDpi(unittest.TestCase):
+    def test_estimate_text_height(self):
+        """Проверка оценки высоты строк по горизонтальной проекции"""
+        self.assertEqual(estimate_text_height(make_page()), 12)
+        self.assertIsNone(estimate_text_height(make_page(lines=())))
+
+    def test_choose_dpi(self):
+        """Проверка выбора разрешения по размеру текста с ограничениями"""
+        self.assertEqual(choose_dpi(595, 842), DEFAULT_DPI)
+        # Крупный текст не требует высокого разрешения, мелкий - требует, но в пределах MIN_DPI..MAX_DPI
+        self.assertEqual(choose_dpi(595, 842, text_height=24), MIN_DPI)
+        self.assertEqual(choose_dpi(595, 842, text_height=12), 192)
+        self.assertEqual(choose_dpi(298, 420, text_height=3), MAX_DPI)
+        # Страница A4 растеризуется не выше 300 DPI, A2 - ещё ниже, чтобы не превысить предел пикселей
+        self.assertEqual(choose_dpi(595, 842, text_height=3), 300)
+        self.assertLess(choose_dpi(1191, 1684, text_height=3), MIN_DPI)
+
+
+class TestPreprocessImage(unittest.TestCase):
+    def test_crop_margins(self):
+        """Проверка обрезки пустых полей с отступом"""
+        self.assertEqual(content_box(make_page().convert('L'), margin=10), (50, 30, 310, 142))
+        self.assertIsNone(content_box(make_page(lines=()).convert('L')))
+
+    def test_grayscale_and_binarize(self):
+        """Проверка перевода в оттенки серого и бинаризации"""
+        page = make_page(color=(90, 90, 90), background=(200, 200, 200))
+        gray = preprocess_image(page, make_ocr_settings(crop=False))
+        self.assertEqual((gray.mode, gray.size), ('L', page.size))
+        binary = preprocess_image(page, make_ocr_settings(preprocess='binarize', crop=False))
+        self.assertEqual(sorted(value for value, count in enumerate(binary.histogram()) if count), [0, 255])
+
+    def test_otsu_threshold(self):
+        """Проверка порога Оцу на двух группах яркости"""
+        histogram = [0] * 256
+        histogram[40], histogram[210] = 100, 900
+        self.assertTrue(40 <= otsu_threshold(histogram) < 210)
+
+    def test_blank_page(self):
+        """Проверка, что пустая страница не отправляется на распознавание"""
+        self.assertIsNone(preprocess_image(make_page(lines=()), make_ocr_settings()))
+        self.assertIsNotNone(preprocess_image(make_page(lines=()), make_ocr_settings(preprocess='none', crop=False)))
+
+
+class TestOcrPdfPagesWithSettings(unittest.TestCase):
+    @patch('pytesseract.image_to_string', return_value="Текст\f")
+    @patch('TextExtraction.convert_from_path')
+    def test_adaptive_dpi_and_preprocessing(self, mock_convert, mock_tesseract):
+        """Проверка OCR с выбором разрешения по пробной растеризации, подготовкой изображений и параметрами tesseract"""
+        def render(pdf_path, dpi, first_page, last_page, grayscale):
+            if dpi == 72:
+                # Пробная страница: 1 пиксель = 1 пункт, строки высотой 12 пунктов
+                return [make_page(size=(595, 842)).convert('L')]
+            return [make_page().convert('L'), make_page(lines=()).convert('L')]
+
+        mock_convert.side_effect = render
+        texts = ocr_pdf_pages("dummy_path.pdf", 1, 2, settings=make_ocr_settings(psm=6))
+
+        self.assertEqual(texts, ["Текст\f", "\f"])
+        self.assertEqual(mock_convert.call_args.kwargs['dpi'], 192)
+        self.assertTrue(mock_convert.call_args.kwargs['grayscale'])
+        mock_tesseract.assert_called_once()
+        image = mock_tesseract.call_args.args[0]
+        self.assertEqual((image.mode, image.size), ('L', (272, 124)))
+        self.assertEqual(mock_tesseract.call_args.kwargs['config'], "--psm 6")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from pdfminer.high_level import extract_text as pdfminer_high_level_text
+from PdfExtraction import parse_page_ranges, count_pdf_pages, select_pdf_pages, iter_pdf_text, extract_pdf_text
+from TextExtraction import extract_text, extract_text_from_pdf, extract_pdf_text_parallel, iter_text
+
+
+def make_pdf(page_lines, group=None):
+    """
+    Создаёт PDF в памяти: страница на элемент page_lines, каждая строка - отдельный текстовый блок
+    шрифтом Helvetica (строки ASCII). Если задан group, страницы собираются в промежуточные узлы
+    дерева страниц по group штук.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in page_lines:
+        content = b"".join(b"BT /F1 12 Tf 72 %d Td (%s) Tj ET\n" % (720 - 40 * number, line.encode('ascii'))
+                           for number, line in enumerate(lines))
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % len(objects))
+        kids.append(b"%d 0 R" % len(objects))
+    nodes = kids
+    if group:
+        nodes = []
+        for start in range(0, len(kids), group):
+            members = kids[start:start + group]
+            objects.append(b"<< /Type /Pages /Parent 2 0 R /Kids [%s] /Count %d >>" % (b" ".join(members), len(members)))
+            nodes.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(nodes), len(kids))
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return data
+
+
+PAGES = [[f"Page {number} line {line}" for line in range(1, 4)] for number in range(1, 8)]
+
+
+class TestPageRanges(unittest.TestCase):
+    def test_parse_page_ranges(self):
+        """Проверка разбора диапазонов страниц"""
+        self.assertEqual(parse_page_ranges("1-5,8, 10-"), [(1, 5), (8, 8), (10, None)])
+        for spec in ("", "0", "5-3", "a-b", "1,,2"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_page_ranges(spec)
+
+    def test_select_pdf_pages(self):
+        """Проверка выбора страниц: диапазоны объединяются, обрезаются по числу страниц и max_pages"""
+        pdf = io.BytesIO(make_pdf(PAGES))
+        self.assertEqual(count_pdf_pages(pdf), 7)
+        self.assertIsNone(select_pdf_pages(pdf))
+        self.assertEqual(select_pdf_pages(pdf, "6-,2-3,3"), [1, 2, 5, 6])
+        self.assertEqual(select_pdf_pages(pdf, [(5, 20)], max_pages=2), [4, 5])
+        self.assertEqual(select_pdf_pages(pdf, None, max_pages=100), list(range(7)))
+        self.assertEqual(select_pdf_pages(pdf, "9-"), [])
+
+
+class TestExtractPdfText(unittest.TestCase):
+    def setUp(self):
+        self.data = make_pdf(PAGES)
+        return super().setUp()
+
+    def test_matches_pdfminer(self):
+        """Проверка: документ извлекается так же, как pdfminer.high_level.extract_text, при любом размере диапазонов"""
+        expected = pdfminer_high_level_text(io.BytesIO(self.data))
+        self.assertEqual(extract_pdf_text(io.BytesIO(self.data)), expected)
+        for chunk_pages in (1, 3, 7):
+            with self.subTest(chunk_pages=chunk_pages):
+                self.assertEqual("".join(iter_pdf_text(io.BytesIO(self.data), chunk_pages=chunk_pages)), expected)
+                self.assertEqual("".join(iter_pdf_text(io.BytesIO(self.data), [0, 2, 3, 6], chunk_pages=chunk_pages)),
+                                 "".join(expected.split("\f")[index] + "\f" for index in (0, 2, 3, 6)))
+
+    def test_skips_page_tree_before_selected_pages(self):
+        """Проверка: узлы дерева страниц до выбранных не разбираются, документ открывается один раз"""
+        from pdfminer.pdfdocument import PDFDocument
+        data = make_pdf(PAGES, group=3)
+        getobj = PDFDocument.getobj
+        with patch.object(PDFDocument, 'getobj', autospec=True, side_effect=getobj) as mock_getobj, \
+                patch.object(PDFDocument, '__init__', autospec=True, side_effect=PDFDocument.__init__) as mock_init:
+            text = "".join(iter_pdf_text(io.BytesIO(data), [4, 6], chunk_pages=1))
+        self.assertEqual(text, "".join(iter_pdf_text(io.BytesIO(self.data), [4, 6])))
+        mock_init.assert_called_once()
+        requested = {call.args[1] for call in mock_getobj.call_args_list}
+        # Объекты 5, 7, 9 - страницы первого промежуточного узла (страницы 1-3)
+        self.assertFalse(requested & {5, 7, 9})
+        self.assertEqual("".join(iter_pdf_text(io.BytesIO(data))), "".join(iter_pdf_text(io.BytesIO(self.data))))
+
+    def test_fast_layout(self):
+        """Проверка профиля fast: текст тот же, меняется только анализ вёрстки"""
+        text = extract_pdf_text(io.BytesIO(self.data), [1], layout='fast')
+        self.assertEqual(text.split(), "Page 2 line 1 Page 2 line 2 Page 2 line 3".split())
+        with self.assertRaises(ValueError):
+            extract_pdf_text(io.BytesIO(self.data), layout='unknown')
+
+    def test_extract_text_options(self):
+        """Проверка параметров страниц и профиля в extract_text и iter_text"""
+        text = extract_text(self.data, pdf_pages="2,5-6", pdf_max_pages=2, pdf_layout='fast')
+        self.assertEqual(text.count("\f"), 2)
+        self.assertIn("Page 2 line 1", text)
+        self.assertIn("Page 5 line 3", text)
+        self.assertNotIn("Page 6", text)
+        pages = list(iter_text(self.data, pdf_pages="3-4"))
+        self.assertEqual([number for number, _ in pages], [3, 4])
+        self.assertIn("Page 4 line 2", pages[1][1])
+        with self.assertRaises(ValueError):
+            extract_text(self.data, pdf_pages="4-2")
+
+    def test_page_mode_with_pages(self):
+        """Проверка режима 'page' с диапазоном: OCR запрашивается по настоящим номерам страниц"""
+        pages = [["Text layer page"] * 3, [], ["Another text layer page"] * 3]
+        with patch('TextExtraction.ocr_pdf_page_texts', return_value={2: "распознано"}) as mock_ocr:
+            text = extract_text_from_pdf(io.BytesIO(make_pdf(pages)), ocr_mode='page', lang='rus', pages="2-3")
+        self.assertEqual(mock_ocr.call_args[0][1], [2])
+        self.assertTrue(text.startswith("распознано\f"))
+        self.assertIn("Another text layer page", text)
+
+    @patch('TextExtraction.ProcessPoolExecutor', ThreadPoolExecutor)
+    def test_parallel_keeps_page_order(self):
+        """Проверка параллельного извлечения: диапазоны страниц собираются по порядку"""
+        expected = extract_pdf_text(io.BytesIO(self.data))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pages.pdf')
+            with open(path, 'wb') as file:
+                file.write(self.data)
+            self.assertEqual(extract_pdf_text_parallel(path, workers=3, chunk_pages=2), expected)
+            self.assertEqual(extract_pdf_text_parallel(path, [1, 2, 5], workers=2, chunk_pages=1),
+                             extract_pdf_text(path, [1, 2, 5]))
+            self.assertEqual(extract_text_from_pdf(path, workers=2), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import os
+import tempfile
+import unittest
+import CommonModules  # noqa: F401 (каталог common в sys.path)
+from ColumnarFile import detect_file_format
+from ResultFormats import ColumnarRecordWriter, TextRecord, open_record_writer, read_records
+
+
+def make_record(path, text, error=None, metadata=None):
+    return {'path': path, 'format': 'pdf', 'text': text, 'seconds': 0.25, 'error': error, 'metadata': metadata or {}}
+
+
+class TestResultFormats(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.records = [make_record('docs/a.pdf', "первый\fвторой", metadata={'ocr_lang': 'rus'}),
+                        make_record('docs/b.pdf', "", error="сбой"), make_record('c.pdf', "текст")]
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_text_record_roundtrip(self):
+        """Проверка, что компактная запись восстанавливает исходную, а каталоги интернированы"""
+        compact = [TextRecord.from_record(record) for record in self.records]
+        self.assertEqual([record.to_record() for record in compact], self.records)
+        self.assertIs(compact[0].directory, compact[1].directory)
+
+    def test_files_roundtrip(self):
+        """Проверка записи и чтения записей в JSONL и встроенном колоночном формате"""
+        for output_format in ('jsonl', 'columnar'):
+            path = os.path.join(self.tmp.name, f'results.{output_format}')
+            if output_format == 'columnar':
+                writer = ColumnarRecordWriter(path, block_size=2, engine='builtin')
+            else:
+                writer = open_record_writer(output_format, path)
+            for record in self.records:
+                writer.write(record)
+            writer.close()
+            self.assertEqual(detect_file_format(path), output_format)
+            self.assertEqual(list(read_records(path)), self.records)
+
+    def test_jsonl_to_stream(self):
+        """Проверка записи JSONL в поток без его закрытия"""
+        stream = io.StringIO()
+        writer = open_record_writer('jsonl', stream=stream)
+        writer.write(self.records[2])
+        writer.close()
+        self.assertFalse(stream.closed)
+        self.assertEqual(stream.getvalue().count('\n'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
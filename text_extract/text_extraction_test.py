@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import patch, MagicMock
 from io import StringIO
 from TextExtraction import extract_text_from_pdf, extract_text_from_docx, extract_text_from_djvu, extract_text_from_doc
+from TextExtraction import ocr_pdf, split_page_batches, extract_pdf_page_texts, iter_text
+from pdfminer.layout import LTTextContainer
+from concurrent.futures import ThreadPoolExecutor
 
 class TestExtractTextFromPDF(unittest.TestCase):
     def setUp(self):
@@ -38,6 +41,85 @@ class TestExtractTextFromPDF(unittest.TestCase):
         self.assertIn("Ошибка извлечения текста", mock_stdout.getvalue())
 
 
+class TestOcrPdf(unittest.TestCase):
+    def setUp(self):
+        self.dummy_pdf_path = "dummy_path.pdf"
+        return super().setUp()
+
+    @staticmethod
+    def render_pages(pdf_path, first_page, last_page):
+        """Имитирует convert_from_path: одно «изображение» на страницу."""
+        return [f"page{number}" for number in range(first_page, last_page + 1)]
+
+    @patch('TextExtraction.ProcessPoolExecutor', ThreadPoolExecutor)
+    @patch('pytesseract.image_to_string', side_effect=lambda image, lang: f"[{image}]")
+    @patch('TextExtraction.convert_from_path')
+    @patch('TextExtraction.pdfinfo_from_path', return_value={'Pages': 10})
+    def test_ocr_pdf_parallel_keeps_page_order(self, mock_pdfinfo, mock_convert, mock_tesseract):
+        """Проверка параллельного OCR: страницы растеризуются партиями и собираются по порядку"""
+        mock_convert.side_effect = lambda path, first_page, last_page: self.render_pages(path, first_page, last_page)
+        result = ocr_pdf(self.dummy_pdf_path, workers=3, batch_size=4)
+
+        self.assertEqual(result, "".join(f"[page{number}]" for number in range(1, 11)))
+        ranges = sorted((call.kwargs['first_page'], call.kwargs['last_page']) for call in mock_convert.call_args_list)
+        self.assertEqual(ranges, [(1, 4), (5, 8), (9, 10)])
+
+    @patch('pytesseract.image_to_string', side_effect=lambda image, lang: f"[{image}]")
+    @patch('TextExtraction.convert_from_path')
+    @patch('TextExtraction.pdfinfo_from_path', side_effect=Exception("pdfinfo недоступен"))
+    def test_ocr_pdf_sequential_batches_without_page_count(self, mock_pdfinfo, mock_convert, mock_tesseract):
+        """Проверка последовательной обработки партиями, если число страниц неизвестно"""
+        mock_convert.side_effect = lambda path, first_page, last_page: self.render_pages(
+            path, first_page, min(last_page, 6))
+        result = ocr_pdf(self.dummy_pdf_path, workers=4, batch_size=4)
+
+        self.assertEqual(result, "".join(f"[page{number}]" for number in range(1, 7)))
+        self.assertEqual(mock_convert.call_count, 2)
+
+
+class TestPerPageOcr(unittest.TestCase):
+    def setUp(self):
+        self.dummy_pdf_path = "dummy_path.pdf"
+        return super().setUp()
+
+    def test_split_page_batches(self):
+        """Проверка разбиения страниц на партии подряд идущих страниц"""
+        self.assertEqual(split_page_batches([1, 2, 3, 5, 6, 9], 2), [(1, 2), (3, 3), (5, 6), (9, 9)])
+        self.assertEqual(split_page_batches([], 4), [])
+
+    @patch('TextExtraction.extract_pages')
+    def test_extract_pdf_page_texts(self, mock_extract_pages):
+        """Проверка постраничного извлечения текстового слоя"""
+        text_box = MagicMock(spec=LTTextContainer)
+        text_box.get_text.return_value = "Текст\n"
+        mock_extract_pages.return_value = [[text_box, MagicMock()], []]
+
+        self.assertEqual(extract_pdf_page_texts(self.dummy_pdf_path), ["Текст\n", ""])
+
+    @patch('pytesseract.image_to_string', side_effect=lambda image, lang: f"[{image}]")
+    @patch('TextExtraction.convert_from_path')
+    @patch('TextExtraction.extract_pdf_page_texts')
+    def test_ocr_only_pages_without_text(self, mock_page_texts, mock_convert, mock_tesseract):
+        """Проверка, что в режиме page через OCR распознаются только страницы без текста"""
+        mock_page_texts.return_value = ["Страница с текстовым слоем", "", " \n", "Ещё одна страница с текстом"]
+        mock_convert.side_effect = lambda path, first_page, last_page: [
+            f"page{number}" for number in range(first_page, last_page + 1)]
+
+        result = extract_text_from_pdf(self.dummy_pdf_path, ocr_workers=1, ocr_mode='page', lang='rus')
+
+        self.assertEqual(result, "Страница с текстовым слоем\f[page2]\f[page3]\fЕщё одна страница с текстом\f")
+        mock_convert.assert_called_once_with(self.dummy_pdf_path, first_page=2, last_page=3)
+
+    @patch('TextExtraction.convert_from_path')
+    @patch('TextExtraction.extract_pdf_page_texts', return_value=["Страница с текстовым слоем"])
+    def test_no_ocr_when_all_pages_have_text(self, mock_page_texts, mock_convert):
+        """Проверка, что OCR не запускается, если на всех страницах есть текст"""
+        result = extract_text_from_pdf(self.dummy_pdf_path, ocr_mode='page')
+
+        self.assertEqual(result, "Страница с текстовым слоем\f")
+        mock_convert.assert_not_called()
+
+
 class TestExtractTextFromDocx(unittest.TestCase):
     def setUp(self):
         self.dummy_docx_path = "dummy_path.docx"
@@ -74,7 +156,7 @@ class TestExtractTextFromDjvu(unittest.TestCase):
         self.dummy_djvu_path = "dummy_path.djvu"
         return super().setUp()
     
-    @patch('TextExtraction.subprocess.run')
+    @patch('ExternalTools.subprocess.run')
     def test_extract_text_success(self, mock_run):
         mock_run.return_value = MagicMock(stdout="Извлеченный текст из DJVU.")
         
@@ -82,7 +164,7 @@ class TestExtractTextFromDjvu(unittest.TestCase):
         self.assertEqual(result, "Извлеченный текст из DJVU.")
 
     @patch('sys.stdout', new_callable=StringIO)
-    @patch('TextExtraction.subprocess.run')
+    @patch('ExternalTools.subprocess.run')
     def test_extract_text_failure(self, mock_run, mock_stdout):
         mock_run.side_effect = Exception("Вызов исключения из unittest")
         
@@ -95,7 +177,7 @@ class TestExtractTextFromDoc(unittest.TestCase):
         self.dummy_doc_path = "dummy_path.doc"
         return super().setUp()
     
-    @patch('TextExtraction.subprocess.run')
+    @patch('ExternalTools.subprocess.run')
     def test_extract_text_success(self, mock_run):
         mock_run.return_value = MagicMock(stdout="Извлеченный текст из DOC.")
         
@@ -103,7 +185,7 @@ class TestExtractTextFromDoc(unittest.TestCase):
         self.assertEqual(result, "Извлеченный текст из DOC.")
 
     @patch('sys.stdout', new_callable=StringIO)
-    @patch('TextExtraction.subprocess.run')
+    @patch('ExternalTools.subprocess.run')
     def test_extract_text_failure(self, mock_run, mock_stdout):
         mock_run.side_effect = Exception("Вызов исключения из unittest")
         
@@ -111,5 +193,101 @@ class TestExtractTextFromDoc(unittest.TestCase):
         self.assertIn("Вызов исключения из unittest", mock_stdout.getvalue())
 
 
+
+def make_page_layout(text):
+    """Имитирует страницу pdfminer с одним текстовым блоком (или без блоков, если текст пуст)."""
+    if not text:
+        return []
+    text_box = MagicMock(spec=LTTextContainer)
+    text_box.get_text.return_value = text
+    return [text_box]
+
+
+def make_process(output):
+    """Имитирует subprocess.Popen внешнего инструмента с заданным выводом."""
+    process = MagicMock()
+    process.stdout = StringIO(output)
+    process.poll.return_value = 0
+    return process
+
+
+class TestIterText(unittest.TestCase):
+    @patch('TextExtraction.ocr_pdf_page_texts')
+    @patch('TextExtraction.extract_pages')
+    def test_pdf_pages_with_text_layer(self, mock_extract_pages, mock_ocr):
+        """Проверка постраничной выдачи PDF: пустые страницы сохраняют нумерацию, OCR не нужен"""
+        mock_extract_pages.return_value = iter([make_page_layout(""), make_page_layout("Первая\n"),
+                                                make_page_layout(""), make_page_layout("Вторая\n")])
+
+        self.assertEqual(list(iter_text("dummy.pdf")), [(1, ""), (2, "Первая\n"), (3, ""), (4, "Вторая\n")])
+        mock_ocr.assert_not_called()
+
+    @patch('TextExtraction.ocr_pdf_page_texts', side_effect=lambda path, pages, *args: {
+        number: f"[page{number}]" for number in pages})
+    @patch('TextExtraction.extract_pages')
+    def test_pdf_without_text_layer_is_ocr(self, mock_extract_pages, mock_ocr):
+        """Проверка, что PDF без текстового слоя распознаётся через OCR с сохранением порядка страниц"""
+        mock_extract_pages.return_value = iter([make_page_layout("")] * 3)
+
+        result = list(iter_text("dummy.pdf", ocr_workers=1, ocr_batch_size=2))
+
+        self.assertEqual(result, [(1, "[page1]"), (2, "[page2]"), (3, "[page3]")])
+        self.assertEqual([list(call.args[1]) for call in mock_ocr.call_args_list], [[1, 2], [3]])
+
+    @patch('TextExtraction.ocr_pdf_page_texts', side_effect=lambda path, pages, *args: {
+        number: f"[page{number}]" for number in pages})
+    @patch('TextExtraction.extract_pages')
+    def test_pdf_page_mode(self, mock_extract_pages, mock_ocr):
+        """Проверка режима page: через OCR распознаются только страницы без текста"""
+        mock_extract_pages.return_value = iter([make_page_layout("Страница с текстовым слоем"), make_page_layout(""),
+                                                make_page_layout("Ещё одна страница с текстом")])
+
+        result = list(iter_text("dummy.pdf", ocr_workers=1, ocr_mode='page'))
+
+        self.assertEqual(result, [(1, "Страница с текстовым слоем"), (2, "[page2]"), (3, "Ещё одна страница с текстом")])
+        self.assertEqual([list(call.args[1]) for call in mock_ocr.call_args_list], [[2]])
+
+    @patch('ExternalTools.subprocess.Popen')
+    def test_djvu_pages(self, mock_popen):
+        """Проверка разбиения вывода djvutxt на страницы"""
+        mock_popen.return_value = make_process("Страница 1\nстрока\n\fСтраница 2\n\f")
+
+        self.assertEqual(list(iter_text("dummy.djvu")), [(1, "Страница 1\nстрока\n"), (2, "Страница 2\n")])
+        self.assertEqual(mock_popen.call_args.args[0], ['djvutxt', 'dummy.djvu'])
+
+    @patch('ExternalTools.subprocess.Popen')
+    def test_doc_paragraphs(self, mock_popen):
+        """Проверка выдачи параграфов DOC с номерами страниц"""
+        mock_popen.return_value = make_process("Первый\nпараграф.\n\nВторой.\n\fТретий.\n")
+
+        self.assertEqual(list(iter_text("dummy.doc")), [(1, "Первый\nпараграф."), (1, "Второй."), (2, "Третий.")])
+
+    @patch('ExternalTools.subprocess.Popen')
+    def test_early_close_kills_tool(self, mock_popen):
+        """Проверка остановки внешнего инструмента при досрочном закрытии генератора"""
+        process = make_process("1\f2\f3\f")
+        process.poll.return_value = None
+        mock_popen.return_value = process
+
+        pages = iter_text("dummy.djvu")
+        self.assertEqual(next(pages), (1, "1"))
+        pages.close()
+        process.kill.assert_called_once()
+
+    @patch('TextExtraction.Document')
+    def test_docx_paragraphs(self, mock_document):
+        """Проверка выдачи параграфов DOCX"""
+        mock_document.return_value.paragraphs = [MagicMock(text="Первый."), MagicMock(text="Второй.")]
+
+        self.assertEqual(list(iter_text("dummy.docx")), [(None, "Первый."), (None, "Второй.")])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    @patch('ExternalTools.subprocess.Popen', side_effect=FileNotFoundError("djvutxt не найден"))
+    def test_error_is_reported(self, mock_popen, mock_stdout):
+        """Проверка обработки ошибок"""
+        self.assertEqual(list(iter_text("dummy.djvu")), [])
+        self.assertIn("djvutxt не найден", mock_stdout.getvalue())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file